@@ -12,11 +12,17 @@ A modular algorithmic trading system integrating:
 __version__ = "1.0.0"
 __author__ = "AAFR Team"
 
-from .icc_module import ICCDetector
-from .cvd_module import CVDCalculator
-from .risk_engine import RiskEngine
-from .tradovate_api import TradovateAPI
-from .backtester import Backtester
+import importlib
+
+# Exports are imported on first access so that importing one submodule
+# (e.g. aafr.main) does not load the backtester, HTTP clients and plotting.
+_EXPORTS = {
+    'ICCDetector': '.icc_module',
+    'CVDCalculator': '.cvd_module',
+    'RiskEngine': '.risk_engine',
+    'TradovateAPI': '.tradovate_api',
+    'Backtester': '.backtester'
+}
 
 __all__ = [
     'ICCDetector',
@@ -26,3 +32,15 @@ __all__ = [
     'Backtester'
 ]
 
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
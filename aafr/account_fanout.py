@@ -0,0 +1,295 @@
+"""
+Multi-account order fan-out.
+Mirrors each accepted signal across an account group: every account sizes
+the trade with its own risk limits and receives its bracket concurrently,
+so a slow or rejecting account never holds up the others.
+"""
+
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+from aafr.order_manager import OrderManager, REJECTED, TIMED_OUT
+from aafr.risk_engine import RiskEngine
+
+
+class AccountRoute:
+    """
+    One account in a group: its risk engine, order manager and stats.
+    """
+
+    def __init__(self, name: str, risk_engine: RiskEngine, order_manager: OrderManager,
+                 track_trades: bool = True):
+        """
+        Initialize account route.
+
+        Args:
+            name: Display name for logs and reports
+            risk_engine: Risk limits used to size trades for this account
+            order_manager: Order manager bound to this account
+            track_trades: Count trades on the risk engine (False when the
+                          engine is shared with a caller that counts them)
+        """
+        self.name = name
+        self.risk_engine = risk_engine
+        self.order_manager = order_manager
+        self.track_trades = track_trades
+        self.enabled = True
+        self.stats = {
+            'signals': 0,
+            'risk_rejected': 0,
+            'dispatched': 0,
+            'order_rejected': 0,
+            'timed_out': 0,
+            'unresolved': 0,
+            'released': 0
+        }
+        order_manager.on_entry_closed(lambda entry: self.release_trade())
+
+    def reserve_trade(self) -> None:
+        """Count a trade against the daily limit before its bracket is sent."""
+        if self.track_trades:
+            self.risk_engine.increment_daily_trades()
+
+    def release_trade(self) -> None:
+        """Give back a reserved trade whose entry was rejected or cancelled unfilled."""
+        self.stats['released'] += 1
+        if self.track_trades:
+            self.risk_engine.release_daily_trade()
+
+    def report(self) -> Dict:
+        """
+        Get the account's dispatch statistics and ack latency.
+
+        Returns:
+            Report dictionary
+        """
+        return {
+            'account': self.order_manager.account_spec,
+            'enabled': self.enabled,
+            **self.stats,
+            'ack_latency': self.order_manager.ack_latency.summary()
+        }
+
+
+class AccountFanout:
+    """
+    Dispatches signals to every account of a group concurrently.
+    """
+
+    def __init__(self, routes: List[AccountRoute]):
+        """
+        Initialize fan-out.
+
+        Args:
+            routes: Accounts to mirror signals to
+        """
+        self.routes = routes
+
+    @classmethod
+    def from_config(cls, api, config: Dict, config_path: str = "config.json",
+                    risk_engine: Optional[RiskEngine] = None) -> "AccountFanout":
+        """
+        Build routes for the account group named by order_management.account_group.
+        Without a group, a single route uses the order_management account and
+        the given risk engine.
+
+        Args:
+            api: Async order client shared by all accounts (one Tradovate login)
+            config: Full configuration dictionary
+            config_path: Path to configuration file (for per-account risk engines)
+            risk_engine: Caller's risk engine for the single-account case
+
+        Returns:
+            AccountFanout
+        """
+        settings = config.get('order_management', {})
+        group_name = settings.get('account_group')
+        accounts = config.get('account_groups', {}).get(group_name) if group_name else None
+
+        if not accounts:
+            shared = risk_engine is not None
+            route = AccountRoute(
+                'default',
+                risk_engine if shared else RiskEngine(config_path),
+                OrderManager.from_config(api, config),
+                track_trades=not shared
+            )
+            return cls([route])
+
+        routes = []
+        for account in accounts:
+            if not account.get('enabled', True):
+                continue
+            manager = OrderManager(
+                api,
+                account_id=account.get('account_id'),
+                account_spec=account.get('account_spec'),
+                order_timeout=account.get('order_timeout_seconds', settings.get('order_timeout_seconds', 2.0)),
+                is_automated=settings.get('is_automated', True)
+            )
+            name = account.get('name') or account.get('account_spec') or str(account.get('account_id'))
+            routes.append(AccountRoute(name, RiskEngine(config_path, account.get('risk')), manager))
+        return cls(routes)
+
+    @property
+    def active_routes(self) -> List[AccountRoute]:
+        """Routes that resolved their account and are enabled."""
+        return [route for route in self.routes if route.enabled]
+
+    async def prepare(self, symbols: List[str]) -> bool:
+        """
+        Resolve every account and pre-build its order templates.
+        Accounts that cannot be resolved are disabled.
+
+        Args:
+            symbols: Symbols that may be traded
+
+        Returns:
+            True if at least one account is ready
+        """
+        results = await asyncio.gather(
+            *(route.order_manager.prepare(symbols) for route in self.routes),
+            return_exceptions=True
+        )
+        for route, ready in zip(self.routes, results):
+            if ready is not True:
+                route.enabled = False
+                print(f"[WARNING] Account {route.name} disabled: {ready if isinstance(ready, Exception) else 'not found'}")
+        return bool(self.active_routes)
+
+    def plan(self, signal: Dict, candles: List[Dict]) -> List[tuple]:
+        """
+        Size the signal for every active account.
+
+        Args:
+            signal: Trade signal ('symbol', 'direction', 'entry', 'stop_loss',
+                    'take_profit', optional 'risk_symbol' for spec lookup)
+            candles: Candles passed to the risk engines
+
+        Returns:
+            List of (route, account_signal or None, reason)
+        """
+        risk_symbol = signal.get('risk_symbol', signal['symbol'])
+        direction = 'LONG' if signal['direction'] in ('LONG', 'BUY') else 'SHORT'
+        plans = []
+        for route in self.active_routes:
+            route.stats['signals'] += 1
+            if not route.order_manager.account_resolved:
+                route.stats['unresolved'] += 1
+                plans.append((route, None, "account unresolved"))
+                continue
+            is_valid, msg, details = route.risk_engine.validate_trade_setup(
+                signal['entry'], signal['stop_loss'], direction, risk_symbol, candles
+            )
+            if not is_valid:
+                route.stats['risk_rejected'] += 1
+                plans.append((route, None, msg))
+                continue
+            account_signal = {
+                **signal,
+                'position_size': details['position_size'],
+                'dollar_risk': details['dollar_risk'],
+                'account': route.name
+            }
+            plans.append((route, account_signal, "OK"))
+        return plans
+
+    async def dispatch(self, signal: Dict, candles: List[Dict],
+                       tp_ladder: Optional[Callable[[Dict], List[Dict]]] = None,
+                       signal_time_ms: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Size and submit a signal to every account concurrently.
+        Each account's trade is counted before its bracket is sent and given
+        back if the entry is rejected; an entry without an ack stays counted
+        until the exchange reports it rejected or cancelled.
+
+        Args:
+            signal: Trade signal (see plan)
+            candles: Candles passed to the risk engines
+            tp_ladder: Optional function building a TP ladder for an account signal
+            signal_time_ms: now_ms() timestamp of signal detection
+
+        Returns:
+            Per-account results: {'accepted', 'reason', 'position_size', 'orders'}
+        """
+        results = {}
+        submissions = []
+        for route, account_signal, reason in self.plan(signal, candles):
+            if account_signal is None:
+                results[route.name] = {'accepted': False, 'reason': reason,
+                                       'position_size': 0, 'orders': []}
+                continue
+            ladder = tp_ladder(account_signal) if tp_ladder else None
+            route.reserve_trade()
+            submissions.append((route, account_signal,
+                                route.order_manager.submit_bracket(account_signal, ladder, signal_time_ms)))
+
+        outcomes = await asyncio.gather(*(submission for _, _, submission in submissions),
+                                        return_exceptions=True)
+
+        for (route, account_signal, _), orders in zip(submissions, outcomes):
+            route.stats['dispatched'] += 1
+            if isinstance(orders, Exception):
+                route.stats['order_rejected'] += 1
+                route.release_trade()
+                results[route.name] = {'accepted': False, 'reason': f"error: {orders}",
+                                       'position_size': account_signal['position_size'], 'orders': []}
+                continue
+
+            entry = orders[0]
+            if entry.state == REJECTED:
+                route.stats['order_rejected'] += 1
+                if entry.order_id is None:
+                    route.release_trade()  # Rejected in the ack (later rejections release via the listener)
+                reason = f"rejected: {entry.reject_reason}"
+            elif entry.state == TIMED_OUT:
+                route.stats['timed_out'] += 1
+                reason = "no ack"
+            else:
+                reason = "OK"
+            results[route.name] = {
+                'accepted': reason == "OK",
+                'reason': reason,
+                'position_size': account_signal['position_size'],
+                'orders': [order.to_dict() for order in orders]
+            }
+        return results
+
+    def report(self) -> Dict[str, Dict]:
+        """
+        Get per-account statistics.
+
+        Returns:
+            Dictionary keyed by account name
+        """
+        return {route.name: route.report() for route in self.routes}
+
+    def print_stats(self) -> None:
+        """Print per-account dispatch statistics."""
+        print(f"\n[ORDERS] Account fan-out ({len(self.active_routes)}/{len(self.routes)} accounts active)")
+        for route in self.routes:
+            s = route.stats
+            print(f"  {route.name}: {s['dispatched']} dispatched, {s['risk_rejected']} risk-rejected, "
+                  f"{s['order_rejected']} order-rejected, {s['timed_out']} timed out")
+            print(f"    {route.order_manager.ack_latency.format()}")
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.mock_exchange import MockExchange
+
+    async def demo():
+        exchange = MockExchange(ack_latency=0.002, accounts=[{'id': 1, 'name': 'TPT-A'}, {'id': 2, 'name': 'TPT-B'}])
+        routes = [
+            AccountRoute('A', RiskEngine(), OrderManager(exchange, account_spec='TPT-A')),
+            AccountRoute('B', RiskEngine(account_overrides={'size': 50000}), OrderManager(exchange, account_spec='TPT-B'))
+        ]
+        fanout = AccountFanout(routes)
+        await fanout.prepare(['NQ'])
+        results = await fanout.dispatch({'symbol': 'NQ', 'direction': 'LONG', 'entry': 21000.0,
+                                         'stop_loss': 20990.0, 'take_profit': 21030.0}, [])
+        for name, result in results.items():
+            print(f"{name}: {result['reason']} size={result['position_size']}")
+        fanout.print_stats()
+
+    asyncio.run(demo())
@@ -0,0 +1,653 @@
+"""
+Asyncio-native Tradovate API client for use inside the live event loop.
+Keeps connections alive in a shared pool and bounds request concurrency so
+every symbol's history can load in parallel without blocking the loop.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+
+from aafr.utils import load_config, generate_mock_candles, lazy_import
+from aafr.candle_cache import CandleCache
+from aafr.rate_limiter import TokenBucket
+from aafr.tradovate_api import (
+    TradovateAPI, build_auth_payload, parse_expiration_time, build_api_url,
+    build_history_request, parse_history_bars, next_mock_order_id
+)
+
+try:
+    aiohttp = lazy_import('aiohttp')  # Loaded when the first session is created
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+
+# HTTP status codes worth retrying (mirrors the sync client's Retry policy)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class AsyncTradovateAPI:
+    """
+    Async wrapper for Tradovate Demo/Live API.
+    Uses a pooled aiohttp session with keep-alive connections, per-request
+    timeouts and a semaphore limiting in-flight requests. Falls back to the
+    synchronous TradovateAPI in a worker thread when aiohttp is not installed.
+    """
+
+    def __init__(self, config_path: str = "config.json", max_connections: int = 20,
+                 max_concurrency: int = 10, request_timeout: float = 10.0,
+                 max_retries: int = 3, token_source: Optional[TradovateAPI] = None,
+                 rate_limiter: Optional[TokenBucket] = None):
+        """
+        Initialize async Tradovate API client.
+
+        Args:
+            config_path: Path to configuration file
+            max_connections: Size of the keep-alive connection pool
+            max_concurrency: Maximum number of in-flight requests
+            request_timeout: Default per-request timeout in seconds
+            max_retries: Retries for 429/5xx responses and connection errors
+            token_source: Optional authenticated sync client whose tokens are reused
+            rate_limiter: Optional token bucket shared by all requests
+                (defaults to the "rate_limit" config section)
+        """
+        self.config = load_config(config_path)
+        self.config_path = config_path
+        self.environment = self.config['environment']
+        self.api_config = self.config['tradovate'][self.environment]
+
+        self.base_url = self.api_config['base_url']
+        base_domain = self.base_url.replace('/v1', '')
+        self.auth_url = f"{base_domain}/v1/auth/accesstokenrequest"
+        self.token = None  # Regular access token for trading operations
+        self.md_token = None  # Market data access token
+        self.token_expiry = None
+
+        # Connection pool and concurrency settings
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.max_retries = max_retries
+        self._session = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._auth_lock = asyncio.Lock()
+        self._refresh_lock = asyncio.Lock()
+        self._renewal = None  # Background token renewal started from the order path
+        self.rate_limiter = rate_limiter or TokenBucket.from_config(self.config)
+
+        # Share tokens with an already authenticated sync client
+        self.token_source = token_source
+        self._sync_api = token_source  # Used as fallback when aiohttp is missing
+
+        # Mock data fallback
+        self.use_mock_data = False
+
+        # Local historical data cache, shared with the sync client when available
+        self._cache = None if token_source is not None else CandleCache.from_config(self.config)
+
+    @property
+    def cache(self) -> Optional[CandleCache]:
+        """Historical data cache (the sync client's cache when tokens are shared)."""
+        if self.token_source is not None:
+            return self.token_source.cache
+        return self._cache
+
+    async def __aenter__(self) -> "AsyncTradovateAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """
+        Get (or lazily create) the pooled HTTP session.
+
+        Returns:
+            aiohttp client session bound to the running loop
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                }
+            )
+        return self._session
+
+    def _get_sync_api(self) -> TradovateAPI:
+        """Get the sync client used when aiohttp is unavailable."""
+        if self._sync_api is None:
+            self._sync_api = TradovateAPI(self.config_path)
+        return self._sync_api
+
+    async def close(self) -> None:
+        """Close the pooled session and its keep-alive connections."""
+        if self._renewal is not None and not self._renewal.done():
+            self._renewal.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _sync_tokens_from_source(self) -> None:
+        """Adopt tokens and mock state from the shared sync client."""
+        source = self.token_source
+        if source is None:
+            return
+        if source.token:
+            self.token = source.token
+            self.md_token = source.md_token
+            self.token_expiry = source.token_expiry
+        if source.use_mock_data:
+            self.use_mock_data = True
+
+    async def authenticate(self, fallback_to_mock: bool = True) -> bool:
+        """
+        Authenticate with Tradovate API and obtain access tokens.
+        Rate limiting challenges (p-ticket) are waited out without blocking the loop.
+
+        Args:
+            fallback_to_mock: Switch to mock data if authentication fails
+                              (False when re-authenticating a live session)
+
+        Returns:
+            True if authentication successful, False otherwise
+        """
+        if self.cache is not None and self.cache.offline:
+            print("[INFO] Offline mode: serving historical data from local cache, skipping authentication")
+            return True
+
+        if not AIOHTTP_AVAILABLE:
+            api = self._get_sync_api()
+            result = await asyncio.to_thread(api.authenticate, fallback_to_mock=fallback_to_mock)
+            self.token, self.md_token, self.token_expiry = api.token, api.md_token, api.token_expiry
+            self.use_mock_data = api.use_mock_data
+            return result
+
+        auth_data = build_auth_payload(self.api_config)
+
+        try:
+            session = self._get_session()
+            async with self._auth_lock:
+                await self._acquire()
+                async with session.post(self.auth_url, json=auth_data) as response:
+                    status = response.status
+                    auth_response = await response.json(content_type=None) if status == 200 else None
+
+                if status == 200 and 'p-ticket' in auth_response:
+                    # Rate limiting/security challenge: wait, then retry with the ticket
+                    p_time = auth_response.get('p-time', 0)
+                    print(f"[WARNING] Rate limiting/security challenge detected, waiting {p_time} seconds")
+                    await self._honour_penalty(p_time)
+                    auth_data['p-ticket'] = auth_response.get('p-ticket')
+
+                    await self._acquire()
+                    async with session.post(self.auth_url, json=auth_data) as response:
+                        status = response.status
+                        auth_response = await response.json(content_type=None) if status == 200 else None
+
+                    if status == 200 and 'p-ticket' in auth_response:
+                        print(f"[ERROR] Still rate limited. Wait {auth_response.get('p-time', 0)} seconds and try again later.")
+                        return False
+
+            if status != 200:
+                print(f"[ERROR] Authentication failed: HTTP {status}")
+                if fallback_to_mock:
+                    print("[INFO] Falling back to mock data for testing")
+                    self.use_mock_data = True
+                return False
+
+            if 'errorText' in auth_response or 'accessToken' not in auth_response:
+                print(f"[ERROR] Authentication failed: {auth_response.get('errorText', 'missing accessToken')}")
+                return False
+
+            self.token = auth_response.get('accessToken')
+            self.md_token = auth_response.get('mdAccessToken')
+            self.token_expiry = parse_expiration_time(auth_response.get('expirationTime'))
+            print(f"[OK] Authenticated with Tradovate {self.environment} API (async)")
+            return True
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[ERROR] Authentication error: {e}")
+            if fallback_to_mock:
+                print("Falling back to mock data for testing")
+                self.use_mock_data = True
+            return False
+        except Exception as e:
+            print(f"[ERROR] Unexpected auth error: {e}")
+            if fallback_to_mock:
+                self.use_mock_data = True
+            return False
+
+    async def _acquire(self) -> None:
+        """Wait for a rate limiter token, if a limiter is configured."""
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+
+    async def _honour_penalty(self, p_time: float) -> None:
+        """
+        Wait out a Tradovate penalty (p-ticket/p-time) without blocking the loop.
+        With a rate limiter every other request pauses as well.
+
+        Args:
+            p_time: Penalty duration in seconds
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.penalize(p_time)
+            await self.rate_limiter.acquire()
+        elif p_time > 0:
+            await asyncio.sleep(p_time)
+
+    async def _ensure_authenticated(self, wait: bool = True) -> bool:
+        """
+        Ensure we have a valid authentication token.
+
+        Args:
+            wait: Authenticate inline if needed. Pass False on the order path:
+                  a missing or expired token then fails the call at once and
+                  the renewal runs in the background
+
+        Returns:
+            True if authenticated or using mock data
+        """
+        self._sync_tokens_from_source()
+
+        if self.use_mock_data:
+            return True
+
+        expired = self.token_expiry and time.time() > self.token_expiry
+        if self.token is not None and not expired:
+            return True
+        if not wait:
+            print("[WARNING] No valid access token, renewing in the background")
+            self._renew_in_background()
+            return False
+        # Only a standalone client's first authentication may fall back to mock data;
+        # a shared or once-authenticated session stays live
+        first_login = self.token is None and self.token_source is None
+        return await self.authenticate(fallback_to_mock=first_login)
+
+    def _renew_in_background(self, rejected_token: Optional[str] = None) -> None:
+        """
+        Start a token renewal without waiting for it (at most one at a time).
+
+        Args:
+            rejected_token: Token the server rejected (defaults to the current one)
+        """
+        if self._renewal is None or self._renewal.done():
+            self._renewal = asyncio.create_task(self._recover_unauthorized(rejected_token or self.token))
+
+    async def _recover_unauthorized(self, rejected_token: str) -> bool:
+        """
+        Obtain a new token after a 401.
+        With a shared sync client its token manager renews (once for all
+        callers) in a worker thread; otherwise this client re-authenticates.
+
+        Args:
+            rejected_token: Token that the server rejected
+
+        Returns:
+            True if a new token is available
+        """
+        source = self.token_source
+        if source is not None:
+            if not await asyncio.to_thread(source.token_manager.handle_unauthorized, rejected_token):
+                return False
+            self._sync_tokens_from_source()
+            return bool(self.token)
+
+        async with self._refresh_lock:
+            if self.token and self.token != rejected_token:
+                return True
+            return await self.authenticate(fallback_to_mock=False)
+
+    async def _make_request(self, method: str, endpoint: str, use_md_token: bool = False,
+                            timeout: Optional[float] = None, retry: bool = True,
+                            **kwargs) -> Optional[Any]:
+        """
+        Make authenticated API request through the connection pool.
+
+        Args:
+            method: HTTP method (GET, POST, etc.)
+            endpoint: API endpoint (without base URL)
+            use_md_token: If True, use market data token instead of regular token
+            timeout: Optional per-request timeout override in seconds
+            retry: Resend after timeouts, connection errors, 429/5xx and
+                   penalties, and renew the token inline on a 401. Pass False
+                   for requests that must not be sent twice or wait on
+                   authentication (order placement)
+            **kwargs: Additional arguments passed to aiohttp (json, params, ...)
+
+        Returns:
+            Response JSON or None if failed
+
+        Raises:
+            asyncio.TimeoutError: With retry=False, the request timed out
+            ConnectionError: With retry=False, the connection failed or the
+                server answered 5xx (the server may have acted on the request)
+        """
+        if not await self._ensure_authenticated(wait=retry):
+            return None
+
+        if self.use_mock_data:
+            return None
+
+        url = build_api_url(self.base_url, endpoint)
+
+        # Use market data token for market data requests, regular token for trading operations
+        token = self.md_token if use_md_token and self.md_token else self.token
+        if not token:
+            print(f"[ERROR] No access token available (use_md_token={use_md_token})")
+            return None
+
+        headers = kwargs.pop('headers', {})
+        headers['Authorization'] = f"Bearer {token}"
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.request_timeout)
+        renewed = False
+
+        attempts = self.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            try:
+                await self._acquire()
+                async with self._semaphore:
+                    session = self._get_session()
+                    async with session.request(method, url, headers=headers,
+                                               timeout=request_timeout, **kwargs) as response:
+                        status = response.status
+
+                        result = None
+                        if status != 401 and status not in RETRY_STATUSES:
+                            if status >= 400:
+                                print(f"[ERROR] API request failed: HTTP {status} for {url}")
+                                return None
+                            result = await response.json(content_type=None)
+                            if not (isinstance(result, dict) and 'p-ticket' in result):
+                                return result
+
+                if status == 401:
+                    # Renew the token once, then give up on this request only
+                    print(f"[WARNING] API request unauthorized (401). Request URL: {url}")
+                    if not retry:
+                        # Order path: fail now rather than wait out re-authentication
+                        self._renew_in_background(token)
+                        return None
+                    if renewed or not await self._recover_unauthorized(self.token):
+                        return None
+                    renewed = True
+                    token = self.md_token if use_md_token and self.md_token else self.token
+                    headers['Authorization'] = f"Bearer {token}"
+                    continue
+
+                if not retry:
+                    if status >= 500:
+                        raise ConnectionError(f"HTTP {status} for {url}")
+                    print(f"[ERROR] Request not accepted (HTTP {status}) for {url}, not resending")
+                    return None
+
+                if result is not None:
+                    # Penalty response: pause (every request when rate limited), then retry
+                    p_time = result.get('p-time', 0)
+                    print(f"[WARNING] Request penalty for {url}, waiting {p_time} seconds")
+                    await self._honour_penalty(p_time)
+                    continue
+
+                print(f"[WARNING] HTTP {status} for {url} (attempt {attempt + 1}/{attempts})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"[ERROR] API request failed: {e!r}")
+                if not retry:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise
+                    raise ConnectionError(f"{e!r} for {url}") from e
+
+            # Exponential backoff outside the semaphore so other requests proceed
+            if attempt < attempts - 1:
+                await asyncio.sleep(0.5 * (2 ** attempt))
+
+        return None
+
+    async def get_account_list(self) -> List[Dict]:
+        """
+        Retrieve list of trading accounts.
+
+        Returns:
+            List of account dictionaries (a placeholder account in mock or
+            offline mode, empty if the request failed)
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._get_sync_api().get_account_list)
+
+        result = await self._make_request('GET', '/account/list')
+
+        if result is None:
+            if not (self.use_mock_data or (self.cache is not None and self.cache.offline)):
+                print("[ERROR] Could not retrieve the Tradovate account list")
+                return []
+            # Return mock account for testing
+            return [{
+                'accountId': 'mock_account',
+                'accountName': 'Demo Account',
+                'userId': 'mock_user',
+                'status': 'active'
+            }]
+
+        return result if isinstance(result, list) else []
+
+    async def get_historical_candles(self, symbol: str, interval: str = "5Min",
+                                     count: int = 100, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Retrieve historical candle data without blocking the event loop.
+        When the data cache is enabled only bars missing from the cache are requested.
+
+        Args:
+            symbol: Trading instrument symbol (e.g., "MNQ")
+            interval: Candle interval (e.g., "5Min", "15Min", "1Hour", "1Day")
+            count: Number of candles to retrieve
+            timeout: Optional per-request timeout override in seconds
+
+        Returns:
+            List of candle dictionaries
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(
+                self._get_sync_api().get_historical_candles, symbol, interval, count
+            )
+
+        cache = self.cache
+        if cache is not None:
+            candles = await cache.get_candles_async(
+                symbol, interval, count,
+                lambda s, i, c, r: self._fetch_history(s, i, c, r, timeout)
+            )
+            if candles:
+                return candles
+            if cache.offline:
+                print(f"[WARNING] Offline mode: no cached {interval} data for {symbol}, using mock data")
+                return generate_mock_candles(count, symbol)
+        else:
+            candles = await self._fetch_history(symbol, interval, count, None, timeout)
+            if candles is not None:
+                return candles
+
+        if not self.use_mock_data:
+            print(f"Failed to fetch historical data, using mock data for {symbol}")
+        return generate_mock_candles(count, symbol)
+
+    async def _fetch_history(self, symbol: str, interval: str, count: int,
+                             time_range: Optional[Dict] = None,
+                             timeout: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Request bars from /chart/history (never returns mock data).
+
+        Args:
+            symbol: Trading instrument symbol
+            interval: Candle interval
+            count: Number of candles to retrieve
+            time_range: Optional explicit timeRange
+            timeout: Optional per-request timeout override in seconds
+
+        Returns:
+            List of candle dictionaries, or None if the request failed or in mock mode
+        """
+        await self._ensure_authenticated()
+        if self.use_mock_data:
+            return None
+
+        request_body = build_history_request(symbol, interval, count, time_range)
+        result = await self._make_request('POST', '/chart/history', use_md_token=True,
+                                          timeout=timeout, json=request_body)
+        if result is None:
+            return None
+
+        candles = parse_history_bars(result, symbol)
+        if candles:
+            print(f"[OK] Retrieved {len(candles)} candles from Tradovate API for {symbol}")
+        return candles
+
+    async def load_history(self, symbols: List[str], interval: str = "5Min",
+                           count: int = 100) -> Dict[str, List[Dict]]:
+        """
+        Load history for several symbols concurrently.
+
+        Args:
+            symbols: Trading symbols
+            interval: Candle interval
+            count: Number of candles per symbol
+
+        Returns:
+            Dictionary of symbol -> candle list (failed symbols map to [])
+        """
+        results = await asyncio.gather(
+            *[self.get_historical_candles(symbol, interval, count) for symbol in symbols],
+            return_exceptions=True
+        )
+
+        history = {}
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                print(f"[ERROR] History load failed for {symbol}: {result}")
+                history[symbol] = []
+            else:
+                history[symbol] = result
+        return history
+
+    async def place_order(self, order_details: Dict,
+                          timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Place an order (paper trading in demo environment).
+
+        Args:
+            order_details: Dictionary containing order parameters
+            timeout: Optional per-request timeout override in seconds
+
+        Returns:
+            Order confirmation dictionary or None
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._get_sync_api().place_order, order_details)
+
+        if not await self._ensure_authenticated(wait=False):
+            return None
+        if self.use_mock_data:
+            return {
+                'orderId': next_mock_order_id(),
+                'status': 'filled',
+                'filledQty': order_details.get('orderQty', order_details.get('quantity', 0)),
+                'timestamp': datetime.now().isoformat()
+            }
+
+        return await self._make_request('POST', '/order/placeorder', timeout=timeout, retry=False,
+                                        json=order_details)
+
+    async def place_oco(self, order_details: Dict, other: Dict,
+                        timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Place a one-cancels-other order pair (e.g., a take-profit and its stop).
+
+        Args:
+            order_details: placeorder body of the first order
+            other: Second order ('action', 'orderType', 'price'/'stopPrice');
+                   it shares the first order's account, symbol and quantity
+            timeout: Optional per-request timeout override in seconds
+
+        Returns:
+            Dictionary with 'orderId' and 'ocoId' (the second order), or None
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._get_sync_api()._make_request, 'POST', '/order/placeoco',
+                                           json={**order_details, 'other': other})
+
+        if not await self._ensure_authenticated(wait=False):
+            return None
+        if self.use_mock_data:
+            return {'orderId': next_mock_order_id(), 'ocoId': next_mock_order_id()}
+
+        return await self._make_request('POST', '/order/placeoco', timeout=timeout, retry=False,
+                                        json={**order_details, 'other': other})
+
+    async def cancel_order(self, order_id, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        Cancel a working order.
+
+        Args:
+            order_id: Exchange order id
+            timeout: Optional per-request timeout override in seconds
+
+        Returns:
+            Response dictionary or None
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._get_sync_api()._make_request, 'POST', '/order/cancelorder',
+                                           json={'orderId': order_id})
+
+        await self._ensure_authenticated()
+        if self.use_mock_data:
+            return {'orderId': order_id}
+
+        return await self._make_request('POST', '/order/cancelorder', timeout=timeout,
+                                        json={'orderId': order_id})
+
+    async def find_contract(self, symbol: str) -> Optional[int]:
+        """
+        Look up the contract id for a symbol (used to route streamed quotes).
+
+        Args:
+            symbol: Contract symbol (e.g., "MNQZ5")
+
+        Returns:
+            Contract id or None if not found
+        """
+        if not AIOHTTP_AVAILABLE:
+            return await asyncio.to_thread(self._get_sync_api().find_contract, symbol)
+
+        result = await self._make_request('GET', '/contract/find', params={'name': symbol})
+        return result.get('id') if isinstance(result, dict) else None
+
+    def is_using_mock_data(self) -> bool:
+        """
+        Check if API is using mock data fallback.
+
+        Returns:
+            True if in mock mode
+        """
+        return self.use_mock_data
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        async with AsyncTradovateAPI() as api:
+            await api.authenticate()
+            history = await api.load_history(["MNQ", "MES", "MGC"], count=50)
+            for symbol, candles in history.items():
+                print(f"{symbol}: {len(candles)} candles")
+
+    asyncio.run(demo())
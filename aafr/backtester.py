@@ -8,14 +8,10 @@ from datetime import datetime
 import csv
 import math
 from pathlib import Path
+import importlib.util
 
-try:
-    import matplotlib
-    matplotlib.use('Agg')  # Use non-interactive backend
-    import matplotlib.pyplot as plt
-    HAS_MATPLOTLIB = True
-except ImportError:
-    HAS_MATPLOTLIB = False
+# matplotlib is imported only when a plot is drawn (it dominates import time)
+HAS_MATPLOTLIB = importlib.util.find_spec('matplotlib') is not None
 
 from aafr.icc_module import ICCDetector
 from aafr.cvd_module import CVDCalculator
@@ -679,6 +675,10 @@ class Backtester:
                 # Use index as fallback
                 timestamps.append(len(timestamps))
         
+        import matplotlib
+        matplotlib.use('Agg')  # Use non-interactive backend
+        import matplotlib.pyplot as plt
+        
         # Create figure and axis
         fig, ax = plt.subplots(figsize=(12, 6))
         
@@ -0,0 +1,357 @@
+"""
+Push-driven bar-close pipeline.
+Market data callbacks push closed bars (or ticks, aggregated into bars)
+into a per-symbol queue; one consumer per symbol appends each bar to the
+symbol's buffer and runs detection exactly once per closed bar, recording
+bar-close -> detection and bar-close -> signal latency.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from aafr.bar_resampler import to_epoch_seconds
+from aafr.bulk_downloader import interval_seconds
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.candle_cache import to_iso_timestamp
+from aafr.journal import BAR, HISTORY, TICK
+from aafr.latency import LatencyHistogram, now_ms
+
+
+# Detection handler: (symbol, candle_buffer, bar_event) -> True if a signal was produced
+DetectionHandler = Callable[[str, CandleRingBuffer, Dict], Awaitable[bool]]
+
+
+class TickBarBuilder:
+    """
+    Aggregates trade prints into fixed-interval bars.
+    A bar is complete when the first tick of the next interval arrives.
+    """
+
+    def __init__(self, symbol: str, interval: str = "5Min"):
+        """
+        Initialize bar builder.
+
+        Args:
+            symbol: Trading symbol
+            interval: Bar interval (e.g., "1Min", "5Min")
+        """
+        self.symbol = symbol
+        self.seconds = interval_seconds(interval)
+        self.bar = None
+        self.bar_start = None
+
+    def update(self, price: float, size: int, timestamp) -> Optional[Dict]:
+        """
+        Add a trade print.
+
+        Args:
+            price: Trade price
+            size: Trade size
+            timestamp: Trade time (ISO string or epoch seconds)
+
+        Returns:
+            The completed previous bar, if this tick started a new one
+        """
+        epoch = to_epoch_seconds(timestamp)
+        start = epoch - epoch % self.seconds
+        if self.bar_start is not None and start < self.bar_start:
+            return None  # Late print for an already closed bar
+
+        closed = None
+        if self.bar_start is not None and start > self.bar_start:
+            closed = self.bar
+            self.bar = None
+
+        if self.bar is None:
+            self.bar_start = start
+            self.bar = {
+                'timestamp': to_iso_timestamp(start),
+                'open': price, 'high': price, 'low': price, 'close': price,
+                'volume': 0, 'symbol': self.symbol
+            }
+        bar = self.bar
+        bar['high'] = max(bar['high'], price)
+        bar['low'] = min(bar['low'], price)
+        bar['close'] = price
+        bar['volume'] += size
+        return closed
+
+
+class BarPipeline:
+    """
+    Per-symbol queues feeding detection once per closed bar.
+    """
+
+    def __init__(self, handler: DetectionHandler, max_bars: int = 500, interval: str = "5Min"):
+        """
+        Initialize pipeline.
+
+        Args:
+            handler: Coroutine run for every new closed bar
+            max_bars: Candle ring buffer capacity per symbol
+            interval: Bar interval used when aggregating ticks
+        """
+        self.handler = handler
+        self.max_bars = max_bars
+        self.interval = interval
+
+        self.buffers: Dict[str, CandleRingBuffer] = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.last_processed: Dict[str, float] = {}  # symbol -> epoch of the last detected bar
+        self._tick_builders: Dict[str, TickBarBuilder] = {}
+        self.journal = None  # Optional SessionJournal recording inbound market data
+
+        self.detection_latency = LatencyHistogram("bar close->detection")
+        self.signal_latency = LatencyHistogram("bar close->signal")
+        self.stats = {
+            'bars_pushed': 0,
+            'bars_processed': 0,
+            'duplicates': 0,
+            'signals': 0,
+            'max_backlog': 0
+        }
+
+    def _queue(self, symbol: str) -> asyncio.Queue:
+        queue = self.queues.get(symbol)
+        if queue is None:
+            queue = self.queues[symbol] = asyncio.Queue()
+        return queue
+
+    def _buffer(self, symbol: str) -> CandleRingBuffer:
+        buffer = self.buffers.get(symbol)
+        if buffer is None:
+            buffer = self.buffers[symbol] = CandleRingBuffer(self.max_bars)
+        return buffer
+
+    def seed(self, symbol: str, candles: List[Dict]) -> CandleRingBuffer:
+        """
+        Load a symbol's history into a fresh ring buffer.
+        Bars in the history are treated as processed; bars already pushed stay queued.
+
+        Args:
+            symbol: Trading symbol
+            candles: Historical candles (oldest first)
+
+        Returns:
+            The symbol's candle buffer
+        """
+        buffer = self.buffers[symbol] = CandleRingBuffer(self.max_bars)
+        buffer.extend(candles)
+        if self.journal is not None:
+            self.journal.append(HISTORY, {'symbol': symbol, 'candles': list(buffer)})
+        if buffer:
+            self.last_processed[symbol] = buffer.last_time
+        return buffer
+
+    def catch_up(self, symbol: str, candles: List[Dict]) -> int:
+        """
+        Merge bars missed while the process was down into a restored buffer.
+        Like seed(), the merged bars are treated as processed.
+
+        Args:
+            symbol: Trading symbol
+            candles: Recent candles (oldest first); bars older than the buffer are skipped
+
+        Returns:
+            Number of new bars added
+        """
+        buffer = self._buffer(symbol)
+        newest = buffer.last_time
+        added = 0
+        for candle in candles:
+            bar_time = to_epoch_seconds(candle['timestamp'])
+            if newest is not None and bar_time < newest:
+                continue
+            if newest is None or bar_time > newest:
+                added += 1
+            buffer.merge(candle)  # The newest stored bar may have been corrected
+            newest = bar_time
+        if self.journal is not None:
+            self.journal.append(HISTORY, {'symbol': symbol, 'candles': list(buffer)})
+        if buffer:
+            self.last_processed[symbol] = max(self.last_processed.get(symbol, 0.0), buffer.last_time)
+        return added
+
+    def snapshot(self) -> Dict:
+        """
+        Capture buffers, processed bar times and partial tick bars for a warm restart.
+
+        Returns:
+            JSON-compatible state
+        """
+        return {
+            'buffers': {symbol: buffer.snapshot() for symbol, buffer in self.buffers.items()},
+            'last_processed': dict(self.last_processed),
+            'tick_bars': {symbol: dict(builder.bar) for symbol, builder in self._tick_builders.items()
+                          if builder.bar is not None}
+        }
+
+    def restore(self, state: Dict, symbols: Optional[List[str]] = None) -> List[str]:
+        """
+        Load buffers saved by snapshot().
+
+        Args:
+            state: Result of snapshot()
+            symbols: Only restore these symbols (all if None)
+
+        Returns:
+            Symbols whose buffers were restored
+        """
+        restored = []
+        for symbol, buffer_state in state.get('buffers', {}).items():
+            if (symbols is not None and symbol not in symbols) or not buffer_state['candles']:
+                continue
+            self.buffers[symbol] = CandleRingBuffer.from_snapshot(buffer_state)
+            if symbol in state.get('last_processed', {}):
+                self.last_processed[symbol] = state['last_processed'][symbol]
+            restored.append(symbol)
+        for symbol, bar in state.get('tick_bars', {}).items():
+            if symbol in restored:
+                builder = self._tick_builders[symbol] = TickBarBuilder(symbol, self.interval)
+                builder.bar = bar
+                builder.bar_start = to_epoch_seconds(bar['timestamp'])
+        return restored
+
+    def push_bar(self, symbol: str, candle: Dict, closed_at_ms: Optional[float] = None) -> None:
+        """
+        Queue a closed bar (safe to call from market data callbacks).
+
+        Args:
+            symbol: Trading symbol
+            candle: Completed bar
+            closed_at_ms: now_ms() time the close was observed (defaults to now)
+        """
+        if self.journal is not None:
+            self.journal.append(BAR, {'symbol': symbol, 'candle': candle})
+        queue = self._queue(symbol)
+        queue.put_nowait({'symbol': symbol, 'candle': candle,
+                          'closed_at_ms': closed_at_ms if closed_at_ms is not None else now_ms()})
+        self.stats['bars_pushed'] += 1
+        self.stats['max_backlog'] = max(self.stats['max_backlog'], queue.qsize())
+
+    def push_tick(self, symbol: str, price: float, size: int, timestamp) -> None:
+        """
+        Aggregate a trade print; queues the previous bar when a new one starts.
+
+        Args:
+            symbol: Trading symbol
+            price: Trade price
+            size: Trade size
+            timestamp: Trade time (ISO string or epoch seconds)
+        """
+        if self.journal is not None:
+            self.journal.append(TICK, {'symbol': symbol, 'price': price, 'size': size, 'timestamp': timestamp})
+        builder = self._tick_builders.get(symbol)
+        if builder is None:
+            builder = self._tick_builders[symbol] = TickBarBuilder(symbol, self.interval)
+        closed = builder.update(price, size, timestamp)
+        if closed is not None:
+            self.push_bar(symbol, closed)
+
+    def push_candles(self, symbol: str, candles: List[Dict]) -> int:
+        """
+        Queue the bars of a polled candle list that are newer than the buffer.
+
+        Args:
+            symbol: Trading symbol
+            candles: Candles (oldest first), e.g., from a REST poll
+
+        Returns:
+            Number of bars queued
+        """
+        buffer = self.buffers.get(symbol)
+        newest = buffer.last_time if buffer is not None else None
+        queued = 0
+        for candle in candles:
+            if newest is None or to_epoch_seconds(candle['timestamp']) > newest:
+                self.push_bar(symbol, candle)
+                queued += 1
+        return queued
+
+    async def run_symbol(self, symbol: str) -> None:
+        """
+        Consume a symbol's queue until cancelled.
+
+        Args:
+            symbol: Trading symbol
+        """
+        queue = self._queue(symbol)
+        while True:
+            event = await queue.get()
+            try:
+                await self.process(event)
+            finally:
+                queue.task_done()
+
+    async def process(self, event: Dict) -> bool:
+        """
+        Merge one queued bar and run detection if it is a new closed bar.
+
+        Args:
+            event: Queued bar event
+
+        Returns:
+            True if detection ran
+        """
+        symbol, candle = event['symbol'], event['candle']
+        buffer = self._buffer(symbol)
+        bar_time = to_epoch_seconds(candle['timestamp'])
+
+        buffer.merge(candle)
+        last = self.last_processed.get(symbol)
+        if last is not None and bar_time <= last:
+            self.stats['duplicates'] += 1  # Correction of a bar already evaluated
+            return False
+        self.last_processed[symbol] = bar_time
+
+        signal = await self.handler(symbol, buffer, event)
+        self.stats['bars_processed'] += 1
+        self.detection_latency.record_since(event['closed_at_ms'])
+        if signal:
+            self.stats['signals'] += 1
+            event['signal_latency_ms'] = self.signal_latency.record_since(event['closed_at_ms'])
+        return True
+
+    async def drain(self) -> None:
+        """Wait until every queued bar has been processed."""
+        for queue in list(self.queues.values()):
+            await queue.join()
+
+    def backlog(self) -> Dict[str, int]:
+        """
+        Get queued bars per symbol.
+
+        Returns:
+            Dictionary of symbol -> queue size
+        """
+        return {symbol: queue.qsize() for symbol, queue in self.queues.items()}
+
+    def format_stats(self) -> str:
+        """
+        Format a latency and throughput report.
+
+        Returns:
+            Multi-line report
+        """
+        s = self.stats
+        return (f"bars pushed={s['bars_pushed']} processed={s['bars_processed']} "
+                f"duplicates={s['duplicates']} signals={s['signals']} max backlog={s['max_backlog']}\n"
+                f"  {self.detection_latency.format()}\n"
+                f"  {self.signal_latency.format()}")
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        async def detect(symbol, candles, event):
+            return candles[-1]['close'] > candles[-2]['close'] if len(candles) > 1 else False
+
+        pipeline = BarPipeline(detect, interval="1Min")
+        task = asyncio.create_task(pipeline.run_symbol("MNQ"))
+        for second, price in enumerate([100.0, 101.0, 100.5, 102.0, 101.5, 103.0]):
+            pipeline.push_tick("MNQ", price, 1, 1736172000 + second * 30)
+        await pipeline.drain()
+        task.cancel()
+        print(pipeline.format_stats())
+
+    asyncio.run(demo())
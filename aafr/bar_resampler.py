@@ -0,0 +1,307 @@
+"""
+Bar resampling utilities for deriving higher timeframes from 1-minute data.
+Converts candle lists to a columnar series and aggregates them into N-minute,
+hourly or session bars using per-segment reductions, so a single download of
+1-minute history can serve every timeframe.
+"""
+
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from itertools import compress
+from operator import ne, le
+from typing import Dict, List, Optional, Tuple, Any
+from zoneinfo import ZoneInfo
+
+
+# CME Globex futures sessions open at 17:00 Chicago time, which is 22:00 UTC
+# during daylight saving time and 23:00 UTC otherwise.
+SESSION_TIMEZONE = ZoneInfo("America/Chicago")
+SESSION_OPEN = time(17, 0)
+
+SECONDS_PER_DAY = 86400
+
+# Aggregation rules per column
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+SUM_COLUMNS = ('volume', 'delta', 'buy_volume', 'sell_volume')
+LAST_COLUMNS = ('cvd',)
+
+
+def parse_interval(interval: str) -> Tuple[str, int]:
+    """
+    Parse an interval string into Tradovate chart parameters.
+
+    Examples: "5Min" -> ("MinuteBar", 5), "1Hour" -> ("MinuteBar", 60),
+    "1Day" -> ("DayBar", 1). Unknown formats default to 5-minute bars.
+
+    Args:
+        interval: Candle interval (e.g., "5Min", "15Min", "1Hour", "1Day")
+
+    Returns:
+        Tuple of (underlying_type, element_size)
+    """
+    interval_lower = interval.lower()
+    if "day" in interval_lower or "d" in interval_lower:
+        return ("DayBar", 1)
+    elif "hour" in interval_lower or "h" in interval_lower:
+        # Extract number (e.g., "1Hour" -> 60, "2Hour" -> 120)
+        hour_match = interval_lower.replace("hour", "").replace("h", "").strip()
+        return ("MinuteBar", int(hour_match) * 60 if hour_match.isdigit() else 60)
+    elif "min" in interval_lower or "m" in interval_lower:
+        # Extract number (e.g., "5Min" -> 5, "15Min" -> 15)
+        min_match = interval_lower.replace("min", "").replace("m", "").strip()
+        return ("MinuteBar", int(min_match) if min_match.isdigit() else 5)
+
+    # Default to 5-minute bars
+    return ("MinuteBar", 5)
+
+
+def to_epoch_seconds(value: Any) -> int:
+    """
+    Normalize a candle timestamp to integer epoch seconds.
+
+    Accepts epoch seconds, epoch milliseconds, ISO-8601 strings
+    (with or without a trailing "Z") and datetime objects.
+
+    Args:
+        value: Timestamp value from a candle
+
+    Returns:
+        Epoch seconds
+
+    Raises:
+        ValueError: If the value cannot be interpreted as a timestamp
+    """
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    if isinstance(value, (int, float)):
+        # Values this large are epoch milliseconds (Tradovate/JS style)
+        return int(value / 1000) if value > 1e11 else int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if text.lstrip('-').isdigit():
+            return to_epoch_seconds(int(text))
+        if text.endswith('Z'):
+            text = text[:-1] + '+00:00'
+        return int(datetime.fromisoformat(text).timestamp())
+    raise ValueError(f"Unsupported timestamp value: {value!r}")
+
+
+def candles_to_columns(candles: List[Dict]) -> Dict[str, List]:
+    """
+    Convert a list of candle dictionaries into a columnar series.
+
+    Timestamps are normalized to epoch seconds. Optional order-flow columns
+    ('delta', 'buy_volume', 'sell_volume', 'cvd') are carried over only when
+    every candle provides them.
+
+    Args:
+        candles: List of candle dictionaries
+
+    Returns:
+        Dictionary of column name -> list of values
+    """
+    columns = {
+        'timestamp': [to_epoch_seconds(c['timestamp']) for c in candles],
+        'open': [float(c['open']) for c in candles],
+        'high': [float(c['high']) for c in candles],
+        'low': [float(c['low']) for c in candles],
+        'close': [float(c['close']) for c in candles],
+        'volume': [int(c.get('volume', 0)) for c in candles],
+    }
+
+    for name in SUM_COLUMNS[1:] + LAST_COLUMNS:
+        if candles and all(name in c for c in candles):
+            columns[name] = [c[name] for c in candles]
+
+    return columns
+
+
+def columns_to_candles(columns: Dict[str, List], symbol: Optional[str] = None) -> List[Dict]:
+    """
+    Convert a columnar series back into candle dictionaries.
+
+    Args:
+        columns: Dictionary of column name -> list of values
+        symbol: Optional symbol to stamp on every candle
+
+    Returns:
+        List of candle dictionaries
+    """
+    names = list(columns.keys())
+    candles = [dict(zip(names, row)) for row in zip(*(columns[n] for n in names))]
+
+    if symbol is not None:
+        for candle in candles:
+            candle['symbol'] = symbol
+
+    return candles
+
+
+def session_opens(start: int, end: int) -> List[int]:
+    """
+    List the session opens (17:00 Chicago time) covering a time range.
+
+    Args:
+        start: Epoch seconds of the first bar
+        end: Epoch seconds of the last bar
+
+    Returns:
+        Ascending epoch seconds of every session open, starting with the
+        last open at or before start
+    """
+    first = datetime.fromtimestamp(start, SESSION_TIMEZONE).date() - timedelta(days=1)
+    last = datetime.fromtimestamp(end, SESSION_TIMEZONE).date()
+    return [int(datetime.combine(first + timedelta(days=i), SESSION_OPEN, SESSION_TIMEZONE).timestamp())
+            for i in range((last - first).days + 1)]
+
+
+def _bucket_starts(timestamps: List[int], minutes: Optional[int],
+                   session_start_minute: Optional[int]) -> List[int]:
+    """
+    Compute the aligned bucket start for every source bar.
+
+    Buckets are anchored at the session open so that no output bar ever spans
+    two sessions; the last bucket of a session is truncated when the session
+    length is not a multiple of the bucket width.
+
+    Args:
+        timestamps: Epoch seconds per bar (ascending)
+        minutes: Bucket width in minutes, or None for one bucket per session
+        session_start_minute: Fixed session open in minutes after UTC midnight,
+            or None for 17:00 Chicago time (follows daylight saving time)
+
+    Returns:
+        List of bucket start timestamps (epoch seconds)
+    """
+    if session_start_minute is None:
+        opens = session_opens(timestamps[0], timestamps[-1])  # Timestamps are ascending
+        session = [opens[bisect_right(opens, t) - 1] for t in timestamps]
+        if minutes is None:
+            return session
+        width = minutes * 60
+        return [t - (t - o) % width for t, o in zip(timestamps, session)]
+
+    offset = session_start_minute * 60
+
+    if minutes is None:
+        # Whole-session buckets
+        return [offset + ((t - offset) // SECONDS_PER_DAY) * SECONDS_PER_DAY
+                for t in timestamps]
+
+    width = minutes * 60
+    # session_open + floor((t - session_open) / width) * width, with the
+    # bucket index restarted at every session open
+    return [t - ((t - offset) % SECONDS_PER_DAY) % width for t in timestamps]
+
+
+def resample_columns(columns: Dict[str, List], interval: str,
+                     session_start_minute: Optional[int] = None) -> Dict[str, List]:
+    """
+    Resample a columnar 1-minute series into a higher timeframe.
+
+    Aggregation per output bar:
+    - open: first, high: max, low: min, close: last
+    - volume, delta, buy_volume, sell_volume: sum
+    - cvd (cumulative): last
+
+    Segment boundaries are found once for the whole series, then every column
+    is reduced per segment with builtin min/max/sum over list slices.
+
+    Args:
+        columns: Columnar series (see candles_to_columns), ascending timestamps
+        interval: Target interval ("15Min", "1Hour", "4H", "1Day", "Session")
+        session_start_minute: Fixed session open in minutes after UTC midnight
+            (default: 17:00 Chicago time)
+
+    Returns:
+        Resampled columnar series; 'timestamp' is the bucket start
+
+    Raises:
+        ValueError: If the interval is not a positive minute multiple
+    """
+    timestamps = columns['timestamp']
+    n = len(timestamps)
+
+    if interval.lower() == 'session':
+        minutes = None
+    else:
+        underlying_type, element_size = parse_interval(interval)
+        if underlying_type == "DayBar":
+            minutes = None  # Daily futures bars are session bars
+        elif element_size <= 0:
+            raise ValueError(f"Invalid resample interval: {interval}")
+        else:
+            minutes = element_size
+
+    if n == 0:
+        return {name: [] for name in columns}
+
+    # Out-of-order input would split buckets; sort once if needed
+    if not all(map(le, timestamps[:-1], timestamps[1:])):
+        order = sorted(range(n), key=timestamps.__getitem__)
+        columns = {name: [values[i] for i in order] for name, values in columns.items()}
+        timestamps = columns['timestamp']
+
+    keys = _bucket_starts(timestamps, minutes, session_start_minute)
+
+    # Segment boundaries where the bucket key changes
+    starts = [0, *compress(range(1, n), map(ne, keys[1:], keys[:-1]))]
+    ends = starts[1:] + [n]
+    lasts = [e - 1 for e in ends]
+
+    result = {'timestamp': [keys[s] for s in starts]}
+
+    for name, values in columns.items():
+        if name == 'timestamp':
+            continue
+        if name == 'open':
+            result[name] = [values[s] for s in starts]
+        elif name == 'high':
+            result[name] = [max(values[s:e]) for s, e in zip(starts, ends)]
+        elif name == 'low':
+            result[name] = [min(values[s:e]) for s, e in zip(starts, ends)]
+        elif name in SUM_COLUMNS:
+            result[name] = [sum(values[s:e]) for s, e in zip(starts, ends)]
+        else:
+            # close, cvd and any other carried column take the last value
+            result[name] = [values[i] for i in lasts]
+
+    return result
+
+
+def resample_candles(candles: List[Dict], interval: str,
+                     session_start_minute: Optional[int] = None) -> List[Dict]:
+    """
+    Resample candle dictionaries into a higher timeframe.
+
+    Convenience wrapper around candles_to_columns/resample_columns that keeps
+    the list-of-dicts format used throughout the system.
+
+    Args:
+        candles: Source candles (typically 1-minute)
+        interval: Target interval ("15Min", "1Hour", "Session", ...)
+        session_start_minute: Fixed session open in minutes after UTC midnight
+            (default: 17:00 Chicago time)
+
+    Returns:
+        List of resampled candle dictionaries
+    """
+    if not candles:
+        return []
+
+    symbol = candles[0].get('symbol')
+    columns = resample_columns(candles_to_columns(candles), interval, session_start_minute)
+    return columns_to_candles(columns, symbol)
+
+
+# Example usage
+if __name__ == "__main__":
+    from datetime import timedelta
+    from aafr.utils import generate_mock_candles_for_period
+
+    end = datetime(2025, 1, 10, 22, 0)
+    one_minute = generate_mock_candles_for_period(end - timedelta(days=2), end, "MNQ", 1)
+
+    for target in ["5Min", "15Min", "1Hour", "Session"]:
+        bars = resample_candles(one_minute, target)
+        print(f"{target}: {len(one_minute)} x 1Min -> {len(bars)} bars, first: {bars[0]}")
@@ -0,0 +1,249 @@
+"""
+Concurrent paginated history downloader for deep backtests.
+Splits a long date range into fixed-size pages, fetches them concurrently
+under a token-bucket rate limit and streams every finished page into the
+candle store, so months of 1-minute data load in one run.
+"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from aafr.async_tradovate_api import AsyncTradovateAPI
+from aafr.bar_resampler import parse_interval, to_epoch_seconds
+from aafr.candle_cache import CandleCache, to_iso_timestamp
+from aafr.rate_limiter import TokenBucket
+
+
+# Defaults, overridable through the "bulk_download" config section
+DEFAULT_PAGE_BARS = 5000
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_BURST = 4
+
+TimeValue = Union[int, float, str, datetime]
+
+
+def interval_seconds(interval: str) -> int:
+    """
+    Get the bar width of an interval in seconds.
+
+    Args:
+        interval: Candle interval (e.g., "1Min", "5Min", "1Hour", "1Day")
+
+    Returns:
+        Bar width in seconds
+    """
+    underlying_type, element_size = parse_interval(interval)
+    if underlying_type == "DayBar":
+        return 86400 * element_size
+    return 60 * element_size
+
+
+def plan_pages(start: int, end: int, interval: str,
+               page_bars: int = DEFAULT_PAGE_BARS) -> List[Tuple[int, int]]:
+    """
+    Split [start, end) into consecutive pages of at most page_bars bars.
+
+    Args:
+        start: Range start (epoch seconds, inclusive)
+        end: Range end (epoch seconds, exclusive)
+        interval: Candle interval
+        page_bars: Maximum bars per page
+
+    Returns:
+        List of (page_start, page_end) tuples in epoch seconds
+    """
+    span = interval_seconds(interval) * page_bars
+    return [(page_start, min(page_start + span, end)) for page_start in range(start, end, span)]
+
+
+class BulkHistoryDownloader:
+    """
+    Downloads long historical ranges page by page.
+
+    Pages run concurrently (bounded by max_concurrency) while a shared token
+    bucket caps the request rate. Penalty responses (p-ticket/p-time) pause
+    the bucket for every page, and failed pages are retried with backoff.
+    """
+
+    def __init__(self, api: AsyncTradovateAPI, cache: Optional[CandleCache] = None,
+                 requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                 burst: int = DEFAULT_BURST, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 page_bars: int = DEFAULT_PAGE_BARS, max_page_retries: int = 3):
+        """
+        Initialize bulk downloader.
+
+        Args:
+            api: Async Tradovate client (its rate limiter is replaced if unset)
+            cache: Candle store receiving finished pages (defaults to the API's cache)
+            requests_per_second: Sustained request rate
+            burst: Maximum burst of requests
+            max_concurrency: Maximum pages in flight
+            page_bars: Maximum bars requested per page
+            max_page_retries: Retries for a page that returned no response
+        """
+        self.api = api
+        self.cache = cache if cache is not None else api.cache
+        if api.rate_limiter is None:
+            api.rate_limiter = TokenBucket(requests_per_second, burst)
+        self.rate_limiter = api.rate_limiter
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.page_bars = page_bars
+        self.max_page_retries = max_page_retries
+
+        # Pages that still failed after all retries: (symbol, interval, page_start, page_end)
+        self.failed_pages: List[Tuple[str, str, int, int]] = []
+        self.stats = {
+            'pages': 0,
+            'bars': 0,
+            'retries': 0,
+            'elapsed_seconds': 0.0
+        }
+
+    @classmethod
+    def from_config(cls, api: AsyncTradovateAPI,
+                    cache: Optional[CandleCache] = None) -> "BulkHistoryDownloader":
+        """
+        Build a downloader from the "bulk_download" config section.
+
+        Args:
+            api: Async Tradovate client
+            cache: Optional candle store
+
+        Returns:
+            BulkHistoryDownloader
+        """
+        settings = api.config.get('bulk_download', {})
+        return cls(
+            api, cache,
+            requests_per_second=settings.get('requests_per_second', DEFAULT_REQUESTS_PER_SECOND),
+            burst=settings.get('burst', DEFAULT_BURST),
+            max_concurrency=settings.get('max_concurrency', DEFAULT_MAX_CONCURRENCY),
+            page_bars=settings.get('page_bars', DEFAULT_PAGE_BARS)
+        )
+
+    async def _fetch_page(self, symbol: str, interval: str, page_start: int,
+                          page_end: int) -> Optional[List[Dict]]:
+        """
+        Fetch one page, retrying empty responses with exponential backoff.
+
+        Returns:
+            Candles within the page, or None if every attempt failed
+        """
+        time_range = {
+            'closestTimestamp': to_iso_timestamp(page_end - 1),
+            'asFarAsTimestamp': to_iso_timestamp(page_start),
+            'asMuchAsElements': self.page_bars
+        }
+
+        for attempt in range(self.max_page_retries + 1):
+            candles = await self.api._fetch_history(symbol, interval, self.page_bars, time_range)
+            if candles is not None:
+                return [c for c in candles
+                        if page_start <= to_epoch_seconds(c['timestamp']) < page_end]
+            if self.api.is_using_mock_data():
+                # Authentication failed; retrying cannot help
+                return None
+            if attempt < self.max_page_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(0.5 * (2 ** attempt))
+
+        return None
+
+    async def download(self, symbol: str, start: TimeValue, end: TimeValue,
+                       interval: str = "1Min",
+                       progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """
+        Download [start, end) for one symbol.
+
+        Args:
+            symbol: Trading symbol
+            start: Range start (epoch seconds, ISO string or datetime)
+            end: Range end (epoch seconds, ISO string or datetime)
+            interval: Candle interval
+            progress: Optional callback(pages_done, pages_total)
+
+        Returns:
+            Downloaded candles sorted by timestamp
+        """
+        start_ts, end_ts = to_epoch_seconds(start), to_epoch_seconds(end)
+        pages = plan_pages(start_ts, end_ts, interval, self.page_bars)
+        collected: Dict[int, Dict] = {}
+        done = 0
+        started = time.perf_counter()
+
+        async def run_page(page_start: int, page_end: int) -> None:
+            nonlocal done
+            async with self._semaphore:
+                candles = await self._fetch_page(symbol, interval, page_start, page_end)
+
+            if candles is None:
+                self.failed_pages.append((symbol, interval, page_start, page_end))
+            else:
+                for candle in candles:
+                    collected[to_epoch_seconds(candle['timestamp'])] = candle
+                if self.cache is not None:
+                    # Stream into the store; the file is written once at the end
+                    self.cache.merge(symbol, interval, candles, persist=False)
+                self.stats['bars'] += len(candles)
+
+            self.stats['pages'] += 1
+            done += 1
+            if progress:
+                progress(done, len(pages))
+
+        print(f"[INFO] Downloading {symbol} {interval}: {len(pages)} pages "
+              f"({to_iso_timestamp(start_ts)} -> {to_iso_timestamp(end_ts)})")
+
+        await asyncio.gather(*[run_page(s, e) for s, e in pages])
+
+        if self.cache is not None and collected:
+            self.cache.flush(symbol, interval)
+
+        self.stats['elapsed_seconds'] += time.perf_counter() - started
+        failed = sum(1 for page in self.failed_pages if page[0] == symbol)
+        if failed:
+            print(f"[WARNING] {symbol}: {failed} page(s) failed after retries")
+        print(f"[OK] {symbol}: {len(collected)} bars downloaded")
+
+        return [collected[t] for t in sorted(collected)]
+
+    async def download_many(self, symbols: List[str], start: TimeValue, end: TimeValue,
+                            interval: str = "1Min") -> Dict[str, List[Dict]]:
+        """
+        Download the same range for several symbols concurrently.
+        All symbols share the rate limiter and the page concurrency budget.
+
+        Args:
+            symbols: Trading symbols
+            start: Range start
+            end: Range end
+            interval: Candle interval
+
+        Returns:
+            Dictionary of symbol -> candles
+        """
+        results = await asyncio.gather(
+            *[self.download(symbol, start, end, interval) for symbol in symbols]
+        )
+        return dict(zip(symbols, results))
+
+
+# Example usage
+if __name__ == "__main__":
+    from datetime import timedelta, timezone
+
+    async def demo():
+        end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        async with AsyncTradovateAPI() as api:
+            await api.authenticate()
+            downloader = BulkHistoryDownloader.from_config(api)
+            history = await downloader.download_many(["MNQ", "MES"], end - timedelta(days=7), end)
+            for symbol, candles in history.items():
+                print(f"{symbol}: {len(candles)} bars")
+            print(f"Stats: {downloader.stats}, limiter: {downloader.rate_limiter.stats}")
+
+    asyncio.run(demo())
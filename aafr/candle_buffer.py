@@ -0,0 +1,343 @@
+"""
+Fixed-capacity candle ring buffer with incremental indicators.
+Live symbols keep their bars in a preallocated ring, so memory stays flat
+over long sessions, and ATR, CVD and swing high/low are updated per bar
+instead of being re-derived from the whole buffer on every detection pass.
+"""
+
+from array import array
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from aafr.bar_resampler import to_epoch_seconds
+from aafr.cvd_module import candle_volume_delta
+
+
+class CVDView:
+    """
+    Cumulative volume delta of a ring buffer, indexed like the buffer.
+    Values start from the oldest retained bar, matching
+    CVDCalculator.calculate_cvd() over the same candles.
+    """
+
+    def __init__(self, ring: "CandleRingBuffer"):
+        """
+        Initialize view.
+
+        Args:
+            ring: Ring buffer the view reads from
+        """
+        self._ring = ring
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        ring = self._ring
+        oldest = ring._slot(0)
+        base = ring._cum[oldest] - ring._delta[oldest]
+        return ring._cum[ring._slot(index)] - base
+
+    def __iter__(self) -> Iterator[float]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class CandleRingBuffer:
+    """
+    Bounded candle buffer (oldest first) that behaves like a read-only list.
+    The oldest bar is overwritten once the buffer is full.
+    """
+
+    def __init__(self, capacity: int = 500, atr_period: int = 14, swing_lookback: int = 20):
+        """
+        Initialize ring buffer.
+
+        Args:
+            capacity: Maximum number of bars kept
+            atr_period: ATR period (simple average of true ranges, like calculate_atr)
+            swing_lookback: Bars covered by swing_high/swing_low
+        """
+        if capacity <= atr_period + 1 or capacity < swing_lookback:
+            raise ValueError("capacity must exceed the ATR period and swing lookback")
+
+        self.capacity = capacity
+        self.atr_period = atr_period
+        self.swing_lookback = swing_lookback
+
+        # Preallocated storage; bar number n lives in slot n % capacity
+        self._candles: List[Optional[Dict]] = [None] * capacity
+        self._times = array('d', [0.0]) * capacity
+        self._highs = array('d', [0.0]) * capacity
+        self._lows = array('d', [0.0]) * capacity
+        self._closes = array('d', [0.0]) * capacity
+        self._tr = array('d', [0.0]) * capacity
+        self._delta = array('d', [0.0]) * capacity
+        self._cum = array('d', [0.0]) * capacity  # Session CVD through each bar
+
+        self.cvd = CVDView(self)
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove every bar and reset the indicator state."""
+        self._count = 0  # Bars ever appended (number of the next bar)
+        self._size = 0
+        self._tr_sum = 0.0
+        self._tr_n = 0  # True ranges in the ATR window
+        self._cvd_total = 0.0
+        self._swing_highs = deque()  # Bar numbers with decreasing highs
+        self._swing_lows = deque()  # Bar numbers with increasing lows
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        return self._candles[self._slot(index)]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self._size):
+            yield self._candles[(self._count - self._size + i) % self.capacity]
+
+    def __repr__(self) -> str:
+        return f"CandleRingBuffer({self._size}/{self.capacity} bars, atr={self.atr})"
+
+    def _slot(self, index: int) -> int:
+        """Map a list index (negative allowed) to a storage slot."""
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("candle index out of range")
+        return (self._count - self._size + index) % self.capacity
+
+    @property
+    def last_time(self) -> Optional[float]:
+        """Epoch seconds of the newest bar."""
+        return self._times[(self._count - 1) % self.capacity] if self._size else None
+
+    @property
+    def atr(self) -> Optional[float]:
+        """ATR over the last atr_period true ranges, or None if insufficient data."""
+        if self._tr_n < self.atr_period:
+            return None
+        return self._tr_sum / self.atr_period
+
+    @property
+    def current_cvd(self) -> float:
+        """CVD of the newest bar, measured from the oldest retained bar."""
+        return self.cvd[-1] if self._size else 0.0
+
+    @property
+    def swing_high(self) -> Optional[float]:
+        """Highest high of the last swing_lookback bars."""
+        return self._highs[self._swing_highs[0] % self.capacity] if self._swing_highs else None
+
+    @property
+    def swing_low(self) -> Optional[float]:
+        """Lowest low of the last swing_lookback bars."""
+        return self._lows[self._swing_lows[0] % self.capacity] if self._swing_lows else None
+
+    def append(self, candle: Dict) -> None:
+        """
+        Add a bar as the newest, evicting the oldest when full.
+
+        Args:
+            candle: Candle dictionary
+        """
+        n = self._count
+        slot = n % self.capacity
+        has_prev = self._size > 0
+        prev_close = self._closes[(n - 1) % self.capacity] if has_prev else None
+
+        if self._size == self.capacity:
+            self._size -= 1  # Oldest bar is overwritten below
+        self._write(slot, candle, prev_close)
+        self._count += 1
+        self._size += 1
+
+        # Rolling ATR window: the bar atr_period bars back leaves the window
+        if has_prev:
+            self._tr_sum += self._tr[slot]
+            if self._tr_n == self.atr_period:
+                self._tr_sum -= self._tr[(n - self.atr_period) % self.capacity]
+            else:
+                self._tr_n += 1
+        if self._count % self.capacity == 0:
+            self._resum_atr()  # Bound floating point drift over long sessions
+
+        self._cvd_total += self._delta[slot]
+        self._cum[slot] = self._cvd_total
+        self._push_swing(n)
+
+    def merge(self, candle: Dict) -> bool:
+        """
+        Add a streamed bar, replacing a bar with the same timestamp.
+        Same semantics as merge_closed_bar() on a list.
+
+        Args:
+            candle: Completed bar
+
+        Returns:
+            True if the buffer changed (False for a bar older than the newest)
+        """
+        bar_time = to_epoch_seconds(candle['timestamp'])
+        last_time = self.last_time
+        if last_time is not None:
+            if bar_time < last_time:
+                return False
+            if bar_time == last_time:
+                self.replace_last(candle)
+                return True
+        self.append(candle)
+        return True
+
+    def extend(self, candles: Iterable[Dict]) -> None:
+        """
+        Merge bars in order (oldest first).
+
+        Args:
+            candles: Candles to merge
+        """
+        for candle in candles:
+            self.merge(candle)
+
+    def replace_last(self, candle: Dict) -> None:
+        """
+        Replace the newest bar (a correction) and update the indicators.
+
+        Args:
+            candle: Corrected bar
+        """
+        if not self._size:
+            raise IndexError("replace_last on an empty buffer")
+        n = self._count - 1
+        slot = n % self.capacity
+        has_prev = self._size > 1
+        prev_close = self._closes[(n - 1) % self.capacity] if has_prev else None
+
+        old_tr = self._tr[slot]
+        self._cvd_total -= self._delta[slot]
+        self._write(slot, candle, prev_close)
+        if has_prev:
+            self._tr_sum += self._tr[slot] - old_tr
+        self._cvd_total += self._delta[slot]
+        self._cum[slot] = self._cvd_total
+
+        # A lower high/higher low cannot be undone in the monotonic queues; rebuild them
+        self._swing_highs.clear()
+        self._swing_lows.clear()
+        for number in range(max(self._count - self._size, n - self.swing_lookback + 1), n + 1):
+            self._push_swing(number)
+
+    def snapshot(self) -> Dict:
+        """
+        Capture the bars and indicator state for a warm restart.
+
+        Returns:
+            JSON-compatible state (per-bar values oldest first)
+        """
+        slots = [(self._count - self._size + i) % self.capacity for i in range(self._size)]
+        return {
+            'capacity': self.capacity,
+            'atr_period': self.atr_period,
+            'swing_lookback': self.swing_lookback,
+            'count': self._count,
+            'candles': [self._candles[slot] for slot in slots],
+            'tr': [self._tr[slot] for slot in slots],
+            'delta': [self._delta[slot] for slot in slots],
+            'cum': [self._cum[slot] for slot in slots],
+            'tr_sum': self._tr_sum,
+            'tr_n': self._tr_n,
+            'cvd_total': self._cvd_total,
+            'swing_highs': list(self._swing_highs),
+            'swing_lows': list(self._swing_lows)
+        }
+
+    @classmethod
+    def from_snapshot(cls, state: Dict) -> "CandleRingBuffer":
+        """
+        Rebuild a buffer from snapshot() without recomputing indicators.
+
+        Args:
+            state: Result of snapshot()
+
+        Returns:
+            CandleRingBuffer in the captured state
+        """
+        ring = cls(state['capacity'], state['atr_period'], state['swing_lookback'])
+        candles = state['candles']
+        first = state['count'] - len(candles)
+        for i, candle in enumerate(candles):
+            slot = (first + i) % ring.capacity
+            ring._candles[slot] = candle
+            ring._times[slot] = to_epoch_seconds(candle['timestamp']) if 'timestamp' in candle else 0.0
+            ring._highs[slot] = candle['high']
+            ring._lows[slot] = candle['low']
+            ring._closes[slot] = candle['close']
+            ring._tr[slot] = state['tr'][i]
+            ring._delta[slot] = state['delta'][i]
+            ring._cum[slot] = state['cum'][i]
+        ring._count = state['count']
+        ring._size = len(candles)
+        ring._tr_sum = state['tr_sum']
+        ring._tr_n = state['tr_n']
+        ring._cvd_total = state['cvd_total']
+        ring._swing_highs.extend(state['swing_highs'])
+        ring._swing_lows.extend(state['swing_lows'])
+        return ring
+
+    def _write(self, slot: int, candle: Dict, prev_close: Optional[float]) -> None:
+        """Store a bar and its per-bar indicator inputs in a slot."""
+        high, low, close = candle['high'], candle['low'], candle['close']
+        self._candles[slot] = candle
+        self._times[slot] = to_epoch_seconds(candle['timestamp']) if 'timestamp' in candle else 0.0
+        self._highs[slot] = high
+        self._lows[slot] = low
+        self._closes[slot] = close
+        self._tr[slot] = (max(high - low, abs(high - prev_close), abs(low - prev_close))
+                          if prev_close is not None else 0.0)
+        self._delta[slot] = candle_volume_delta(candle)
+
+    def _push_swing(self, n: int) -> None:
+        """Add bar n to the swing high/low queues and expire old bars."""
+        slot = n % self.capacity
+        highs, lows = self._swing_highs, self._swing_lows
+        while highs and self._highs[highs[-1] % self.capacity] <= self._highs[slot]:
+            highs.pop()
+        highs.append(n)
+        while lows and self._lows[lows[-1] % self.capacity] >= self._lows[slot]:
+            lows.pop()
+        lows.append(n)
+
+        oldest = n - self.swing_lookback + 1
+        while highs[0] < oldest:
+            highs.popleft()
+        while lows[0] < oldest:
+            lows.popleft()
+
+    def _resum_atr(self) -> None:
+        """Recompute the ATR window sum from the stored true ranges."""
+        self._tr_sum = sum(self._tr[(self._count - 1 - i) % self.capacity] for i in range(self._tr_n))
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.cvd_module import CVDCalculator
+    from aafr.utils import calculate_atr, generate_mock_candles
+
+    candles = generate_mock_candles(1000, "MNQ")
+    ring = CandleRingBuffer(capacity=500)
+    ring.extend(candles)
+
+    window = candles[-500:]
+    expected_atr = calculate_atr([c['high'] for c in window], [c['low'] for c in window],
+                                 [c['close'] for c in window])
+    expected_cvd = CVDCalculator().calculate_cvd(window)[-1]
+
+    print(ring)
+    print(f"ATR: {ring.atr:.4f} (recomputed {expected_atr:.4f})")
+    print(f"CVD: {ring.current_cvd:.0f} (recomputed {expected_cvd:.0f})")
+    print(f"Swing high/low (20 bars): {ring.swing_high:.2f} / {ring.swing_low:.2f}")
@@ -0,0 +1,403 @@
+"""
+Incremental on-disk cache for historical candles.
+Stores downloaded bars per symbol/interval and works out which tail (newer)
+or head (older) range is still missing, so repeated startups only request
+new bars from /chart/history. Offline mode serves purely from the cache.
+"""
+
+import json
+import os
+from bisect import bisect_left
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aafr.bar_resampler import to_epoch_seconds
+
+
+# Default location, relative to the working directory like logs/
+DEFAULT_CACHE_DIR = "data/cache"
+
+# Oldest bars are dropped once a series grows beyond this
+DEFAULT_MAX_BARS = 50000
+
+# Fetch callback: (symbol, interval, count, time_range) -> candles or None on failure
+FetchFn = Callable[[str, str, int, Dict], Optional[List[Dict]]]
+
+
+def to_iso_timestamp(epoch_seconds: int) -> str:
+    """
+    Format epoch seconds as the UTC ISO-8601 string Tradovate expects.
+
+    Args:
+        epoch_seconds: Epoch seconds
+
+    Returns:
+        Timestamp string (e.g., "2025-01-06T14:00:00Z")
+    """
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class CandleCache:
+    """
+    Per-symbol/interval candle store backed by JSON files.
+
+    Each series lives in <directory>/<SYMBOL>/<interval>.json and holds bars
+    sorted by timestamp without duplicates. Writes are atomic (temp file +
+    rename) so an interrupted run never leaves a truncated series behind.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, offline: bool = False,
+                 max_bars: int = DEFAULT_MAX_BARS):
+        """
+        Initialize candle cache.
+
+        Args:
+            directory: Cache root directory
+            offline: If True, never request data; serve purely from cache
+            max_bars: Maximum bars kept per symbol/interval series
+        """
+        self.directory = Path(directory)
+        self.offline = offline
+        self.max_bars = max_bars
+        self._series: Dict[Tuple[str, str], Dict] = {}
+
+        # Statistics
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'bars_fetched': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict, offline: Optional[bool] = None) -> Optional["CandleCache"]:
+        """
+        Build a cache from the "data_cache" config section.
+
+        Args:
+            config: Full configuration dictionary
+            offline: Optional override for the configured offline flag
+
+        Returns:
+            CandleCache, or None if caching is disabled (and offline not forced)
+        """
+        settings = config.get('data_cache', {})
+        if not settings.get('enabled', False) and not offline:
+            return None
+
+        return cls(
+            directory=settings.get('directory', DEFAULT_CACHE_DIR),
+            offline=settings.get('offline', False) if offline is None else offline,
+            max_bars=settings.get('max_bars_per_series', DEFAULT_MAX_BARS)
+        )
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        """Get the file path for a series."""
+        return self.directory / symbol.upper() / f"{interval}.json"
+
+    def _load(self, symbol: str, interval: str) -> Dict:
+        """
+        Load a series from memory or disk.
+
+        Returns:
+            Series dictionary with 'bars', 'times' and 'head_complete'
+        """
+        key = (symbol.upper(), interval)
+        if key in self._series:
+            return self._series[key]
+
+        series = {'bars': [], 'times': [], 'head_complete': False}
+        path = self._path(symbol, interval)
+        if path.exists():
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                series['bars'] = data.get('bars', [])
+                series['times'] = [to_epoch_seconds(b['timestamp']) for b in series['bars']]
+                series['head_complete'] = data.get('head_complete', False)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[WARNING] Ignoring unreadable cache file {path}: {e}")
+
+        self._series[key] = series
+        return series
+
+    def _save(self, symbol: str, interval: str, series: Dict) -> None:
+        """Atomically write a series to disk."""
+        path = self._path(symbol, interval)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.json.tmp')
+
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'symbol': symbol.upper(),
+                'interval': interval,
+                'head_complete': series['head_complete'],
+                'bars': series['bars']
+            }, f)
+        os.replace(tmp_path, path)
+
+    def get_cached(self, symbol: str, interval: str, count: Optional[int] = None) -> List[Dict]:
+        """
+        Get the most recent cached bars.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of bars (None for all)
+
+        Returns:
+            List of candle dictionaries, oldest first
+        """
+        bars = self._load(symbol, interval)['bars']
+        selected = bars if count is None else bars[-count:] if count > 0 else []
+        return [dict(bar) for bar in selected]
+
+    def merge(self, symbol: str, interval: str, candles: List[Dict], persist: bool = True) -> int:
+        """
+        Merge downloaded bars into a series and persist it.
+        Bars with an existing timestamp replace the cached bar (the last
+        cached bar may have been downloaded while still forming).
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            candles: Downloaded candles
+            persist: Write the series to disk now (see flush for batched writes)
+
+        Returns:
+            Number of new bars added
+        """
+        if not candles:
+            return 0
+
+        series = self._load(symbol, interval)
+        by_time = dict(zip(series['times'], series['bars']))
+        before = len(by_time)
+
+        for candle in candles:
+            by_time[to_epoch_seconds(candle['timestamp'])] = candle
+
+        times = sorted(by_time)
+        if len(times) > self.max_bars:
+            times = times[-self.max_bars:]
+            series['head_complete'] = False
+
+        series['times'] = times
+        series['bars'] = [by_time[t] for t in times]
+        if persist:
+            self._save(symbol, interval, series)
+
+        return len(by_time) - before
+
+    def flush(self, symbol: str, interval: str) -> None:
+        """
+        Write a series merged with persist=False to disk.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+        """
+        self._save(symbol, interval, self._load(symbol, interval))
+
+    def get_range(self, symbol: str, interval: str, start: int, end: int) -> List[Dict]:
+        """
+        Get cached bars with start <= timestamp < end.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            start: Range start (epoch seconds, inclusive)
+            end: Range end (epoch seconds, exclusive)
+
+        Returns:
+            List of candle dictionaries, oldest first
+        """
+        series = self._load(symbol, interval)
+        lo = bisect_left(series['times'], start)
+        hi = bisect_left(series['times'], end)
+        return [dict(bar) for bar in series['bars'][lo:hi]]
+
+    def tail_range(self, symbol: str, interval: str, count: int) -> Dict:
+        """
+        Build the timeRange for bars newer than the cache.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of bars the caller wants
+
+        Returns:
+            Tradovate timeRange dictionary (full request if the cache is empty)
+        """
+        times = self._load(symbol, interval)['times']
+        if not times:
+            return {'asMuchAsElements': count}
+
+        # Start at the last cached bar so a partially formed bar is refreshed
+        return {'asFarAsTimestamp': to_iso_timestamp(times[-1]), 'asMuchAsElements': count}
+
+    def head_range(self, symbol: str, interval: str, count: int) -> Optional[Dict]:
+        """
+        Build the timeRange for bars older than the cache, if still needed.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of bars the caller wants
+
+        Returns:
+            Tradovate timeRange dictionary, or None if the cache holds enough
+        """
+        series = self._load(symbol, interval)
+        missing = count - len(series['times'])
+        if missing <= 0 or not series['times'] or series['head_complete']:
+            return None
+
+        return {'closestTimestamp': to_iso_timestamp(series['times'][0] - 1), 'asMuchAsElements': missing}
+
+    def mark_head_complete(self, symbol: str, interval: str) -> None:
+        """Record that the server has no bars older than the cache."""
+        series = self._load(symbol, interval)
+        series['head_complete'] = True
+        self._save(symbol, interval, series)
+
+    def apply_tail(self, symbol: str, interval: str, count: int, tail: List[Dict]) -> None:
+        """
+        Merge the result of a tail_range request.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of bars requested
+            tail: Downloaded candles
+        """
+        self.stats['bars_fetched'] += len(tail)
+
+        times = self._load(symbol, interval)['times']
+        if times and len(tail) >= count and \
+                min(to_epoch_seconds(c['timestamp']) for c in tail) > times[-1]:
+            # The gap was wider than one request; start a fresh contiguous series
+            self._series[(symbol.upper(), interval)] = {'bars': [], 'times': [], 'head_complete': False}
+        self.merge(symbol, interval, tail)
+
+    def apply_head(self, symbol: str, interval: str, head_range: Dict, head: List[Dict]) -> None:
+        """
+        Merge the result of a head_range request.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            head_range: timeRange that was requested
+            head: Downloaded candles
+        """
+        self.stats['bars_fetched'] += len(head)
+        self.merge(symbol, interval, head)
+        if len(head) < head_range['asMuchAsElements']:
+            self.mark_head_complete(symbol, interval)
+
+    def _begin(self, symbol: str, interval: str, count: int) -> Optional[List[Dict]]:
+        """Record hit/miss stats; return cached bars when offline."""
+        cached = self.get_cached(symbol, interval, count) if self.offline else None
+        has_bars = bool(cached) if self.offline else bool(self._load(symbol, interval)['times'])
+        self.stats['hits' if has_bars else 'misses'] += 1
+        return cached
+
+    def get_candles(self, symbol: str, interval: str, count: int,
+                    fetch: FetchFn) -> Optional[List[Dict]]:
+        """
+        Get candles, downloading only the ranges missing from the cache.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of candles to return
+            fetch: Callback performing the /chart/history request
+
+        Returns:
+            Most recent candles, or None if nothing is cached and the download failed
+        """
+        cached = self._begin(symbol, interval, count)
+        if self.offline:
+            return cached or None
+
+        tail = fetch(symbol, interval, count, self.tail_range(symbol, interval, count))
+        if tail is None:
+            # Network failure: serve what we already have
+            return self.get_cached(symbol, interval, count) or None
+        self.apply_tail(symbol, interval, count, tail)
+
+        head_range = self.head_range(symbol, interval, count)
+        if head_range is not None:
+            head = fetch(symbol, interval, head_range['asMuchAsElements'], head_range)
+            if head is not None:
+                self.apply_head(symbol, interval, head_range, head)
+
+        return self.get_cached(symbol, interval, count)
+
+    async def get_candles_async(self, symbol: str, interval: str, count: int,
+                                fetch) -> Optional[List[Dict]]:
+        """
+        Async variant of get_candles for coroutine fetch callbacks.
+
+        Args:
+            symbol: Trading symbol
+            interval: Candle interval
+            count: Number of candles to return
+            fetch: Coroutine function with the FetchFn signature
+
+        Returns:
+            Most recent candles, or None if nothing is cached and the download failed
+        """
+        cached = self._begin(symbol, interval, count)
+        if self.offline:
+            return cached or None
+
+        tail = await fetch(symbol, interval, count, self.tail_range(symbol, interval, count))
+        if tail is None:
+            return self.get_cached(symbol, interval, count) or None
+        self.apply_tail(symbol, interval, count, tail)
+
+        head_range = self.head_range(symbol, interval, count)
+        if head_range is not None:
+            head = await fetch(symbol, interval, head_range['asMuchAsElements'], head_range)
+            if head is not None:
+                self.apply_head(symbol, interval, head_range, head)
+
+        return self.get_cached(symbol, interval, count)
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        """
+        Remove cached series.
+
+        Args:
+            symbol: Only clear this symbol (None clears everything)
+        """
+        targets = [self.directory / symbol.upper()] if symbol else \
+            ([p for p in self.directory.iterdir() if p.is_dir()] if self.directory.exists() else [])
+
+        for folder in targets:
+            if folder.exists():
+                for path in folder.glob('*.json'):
+                    path.unlink()
+
+        self._series = {k: v for k, v in self._series.items()
+                        if symbol is not None and k[0] != symbol.upper()}
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.utils import generate_mock_candles
+
+    cache = CandleCache("data/cache_demo")
+    source = generate_mock_candles(300, "MNQ")
+    for i, candle in enumerate(source):
+        candle['timestamp'] = 1736172000 + i * 300
+
+    def fake_fetch(symbol, interval, count, time_range):
+        print(f"Fetch {symbol} {interval}: {time_range}")
+        return source[-count:]
+
+    print(f"First load: {len(cache.get_candles('MNQ', '5Min', 100, fake_fetch))} candles")
+    print(f"Second load: {len(cache.get_candles('MNQ', '5Min', 100, fake_fetch))} candles")
+    print(f"Stats: {cache.stats}")
+    cache.clear()
@@ -7,6 +7,36 @@ from typing import Dict, List, Optional, Tuple
 from aafr.utils import generate_mock_volume_data
 
 
+def candle_volume_delta(candle: Dict) -> int:
+    """
+    Estimate a candle's buy/sell volume delta.
+    
+    Args:
+        candle: Candle dictionary
+    
+    Returns:
+        Volume delta (buy - sell)
+    """
+    # Simple heuristic: bullish candle = more buy volume
+    # In production, use actual bid/ask volume or Level II data
+    close = candle.get('close', 0)
+    open_price = candle.get('open', 0)
+    volume = candle.get('volume', 0)
+    
+    if close > open_price:
+        # Bullish candle: assume 52% buy volume
+        buy_vol = int(volume * 0.52)
+    elif close < open_price:
+        # Bearish candle: assume 48% buy volume
+        buy_vol = int(volume * 0.48)
+    else:
+        # Doji: 50/50 split
+        buy_vol = int(volume * 0.50)
+    sell_vol = volume - buy_vol
+    
+    return buy_vol - sell_vol
+
+
 class CVDCalculator:
     """
     Calculate and analyze Cumulative Volume Delta for trade confirmation.
@@ -24,12 +54,18 @@ class CVDCalculator:
         Calculate Cumulative Volume Delta from candle data.
         
         Args:
-            candles: List of candle dictionaries with volume data
+            candles: List of candle dictionaries with volume data (or a CandleRingBuffer)
             volume_deltas: Optional pre-calculated volume deltas
         
         Returns:
-            List of cumulative CVD values
+            List of cumulative CVD values (the ring's CVD view for a CandleRingBuffer)
         """
+        if volume_deltas is None and hasattr(candles, 'cvd'):
+            # Ring buffers carry their CVD incrementally
+            self.cvd_values = candles.cvd
+            self.current_cvd = candles.current_cvd
+            return self.cvd_values
+        
         if volume_deltas is None:
             volume_deltas = self._calculate_volume_deltas(candles)
         
@@ -56,32 +92,7 @@ class CVDCalculator:
         Returns:
             List of volume deltas (buy - sell)
         """
-        deltas = []
-        
-        for candle in candles:
-            # Simple heuristic: bullish candle = more buy volume
-            # In production, use actual bid/ask volume or Level II data
-            close = candle.get('close', 0)
-            open_price = candle.get('open', 0)
-            volume = candle.get('volume', 0)
-            
-            if close > open_price:
-                # Bullish candle: assume 52% buy volume
-                buy_vol = int(volume * 0.52)
-                sell_vol = volume - buy_vol
-            elif close < open_price:
-                # Bearish candle: assume 48% buy volume
-                buy_vol = int(volume * 0.48)
-                sell_vol = volume - buy_vol
-            else:
-                # Doji: 50/50 split
-                buy_vol = int(volume * 0.50)
-                sell_vol = volume - buy_vol
-            
-            delta = buy_vol - sell_vol
-            deltas.append(delta)
-        
-        return deltas
+        return [candle_volume_delta(candle) for candle in candles]
     
     def check_divergence(self, candles: List[Dict], lookback: int = 5) -> Tuple[bool, str]:
         """
@@ -0,0 +1,173 @@
+"""
+Executor for CPU-bound strategy evaluation.
+Runs detection in a thread or process pool so heavy passes never block the
+event loop (WebSocket broadcasts, order acks, other symbols), while jobs for
+the same symbol still run one at a time in submission order.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from aafr.latency import LatencyHistogram, now_ms
+
+
+# Execution modes
+INLINE = "inline"  # Run on the event loop (no pool)
+THREAD = "thread"
+PROCESS = "process"
+MODES = (INLINE, THREAD, PROCESS)
+
+
+class DetectionExecutor:
+    """
+    Runs strategy evaluation off the event loop with per-symbol ordering.
+
+    In process mode, only stateless jobs (module-level functions with
+    picklable arguments) go to the process pool; stateful jobs such as
+    AJRStrategy.process_candle run in a thread pool so their state stays
+    in this process.
+    """
+
+    def __init__(self, mode: str = THREAD, max_workers: Optional[int] = None):
+        """
+        Initialize executor.
+
+        Args:
+            mode: "inline", "thread" or "process"
+            max_workers: Pool size (None for the executor default)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown detection executor mode: {mode}")
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self.wait_time = LatencyHistogram("detection queue wait")
+        self.run_time = LatencyHistogram("detection run")
+        self.stats = {
+            'jobs': 0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "DetectionExecutor":
+        """
+        Create an executor from the "detection" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            DetectionExecutor
+        """
+        settings = config.get('detection', {})
+        return cls(settings.get('executor', THREAD), settings.get('max_workers'))
+
+    def _pool(self, stateful: bool) -> Optional[Executor]:
+        """Get (creating on first use) the pool a job runs in."""
+        if self.mode == INLINE:
+            return None
+        if self.mode == PROCESS and not stateful:
+            if self._process_pool is None:
+                # Spawned workers: forking a process that runs threads is unsafe
+                self._process_pool = ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(self.max_workers, thread_name_prefix="detection")
+        return self._thread_pool
+
+    async def warm_up(self) -> None:
+        """Start the worker pool ahead of the first bar (spawning processes takes a while)."""
+        pool = self._pool(stateful=False)
+        if pool is None:
+            return
+        loop = asyncio.get_running_loop()
+        workers = self.max_workers or 1
+        await asyncio.gather(*(loop.run_in_executor(pool, int) for _ in range(workers)))
+
+    async def run(self, symbol: str, fn: Callable, *args, stateful: bool = False) -> Any:
+        """
+        Run a detection job after every earlier job for the same symbol.
+
+        Args:
+            symbol: Ordering key (jobs with the same key never overlap)
+            fn: Function to run
+            *args: Positional arguments for fn
+            stateful: fn mutates in-process state (never sent to a process pool)
+
+        Returns:
+            fn's return value (exceptions are re-raised)
+        """
+        lock = self._locks.get(symbol)
+        if lock is None:
+            lock = self._locks[symbol] = asyncio.Lock()
+
+        queued_at = now_ms()
+        async with lock:  # asyncio.Lock wakes waiters in FIFO order
+            self.wait_time.record_since(queued_at)
+            started_at = now_ms()
+            self.stats['jobs'] += 1
+            try:
+                pool = self._pool(stateful)
+                if pool is None:
+                    return fn(*args)
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            finally:
+                self.run_time.record_since(started_at)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pools.
+
+        Args:
+            wait: Wait for running jobs to finish
+        """
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+    def format_stats(self) -> str:
+        """
+        Format a job count and latency report.
+
+        Returns:
+            Multi-line report
+        """
+        workers = self.max_workers if self.max_workers else "default"
+        return (f"{self.mode} executor ({workers} workers): {self.stats['jobs']} jobs, "
+                f"{self.stats['errors']} errors\n"
+                f"  {self.wait_time.format()}\n"
+                f"  {self.run_time.format()}")
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.icc_module import evaluate_icc_setup
+    from aafr.utils import generate_mock_candles
+
+    async def demo():
+        executor = DetectionExecutor(PROCESS, max_workers=2)
+        batches = {symbol: generate_mock_candles(500, symbol) for symbol in ["MNQ", "MES", "MGC"]}
+        try:
+            await executor.warm_up()
+            results = await asyncio.gather(*(executor.run(symbol, evaluate_icc_setup, candles)
+                                             for symbol, candles in batches.items()))
+            for symbol, (structure, is_valid, _) in zip(batches, results):
+                print(f"{symbol}: structure={'yes' if structure else 'no'} valid={is_valid}")
+        finally:
+            executor.shutdown()
+        print(executor.format_stats())
+
+    asyncio.run(demo())
@@ -8,6 +8,7 @@ from datetime import datetime
 
 from aafr.utils import detect_displacement, calculate_atr
 from aafr.cvd_module import CVDCalculator
+from aafr.candle_buffer import CandleRingBuffer
 
 
 class ICCDetector:
@@ -100,11 +101,14 @@ class ICCDetector:
         if len(candles) < 15:
             return None
         
-        # Calculate ATR for displacement detection
-        highs = [c['high'] for c in candles]
-        lows = [c['low'] for c in candles]
-        closes = [c['close'] for c in candles]
-        atr = calculate_atr(highs, lows, closes)
+        # Calculate ATR for displacement detection (ring buffers keep it incrementally)
+        if isinstance(candles, CandleRingBuffer):
+            atr = candles.atr
+        else:
+            highs = [c['high'] for c in candles]
+            lows = [c['low'] for c in candles]
+            closes = [c['close'] for c in candles]
+            atr = calculate_atr(highs, lows, closes)
         
         if atr is None:
             return None
@@ -265,10 +269,13 @@ class ICCDetector:
         
         # Use recent price structure to project target
         # Simple approach: use ATR for projection
-        highs = [c['high'] for c in candles[-20:]]
-        lows = [c['low'] for c in candles[-20:]]
-        closes = [c['close'] for c in candles[-20:]]
-        atr = calculate_atr(highs, lows, closes)
+        if isinstance(candles, CandleRingBuffer):
+            atr = candles.atr
+        else:
+            highs = [c['high'] for c in candles[-20:]]
+            lows = [c['low'] for c in candles[-20:]]
+            closes = [c['close'] for c in candles[-20:]]
+            atr = calculate_atr(highs, lows, closes)
         
         if atr is None:
             return preferred_r  # Default fallback
@@ -377,6 +384,29 @@ class ICCDetector:
         self.cvd_calculator.reset()
 
 
+def evaluate_icc_setup(candles: List[Dict], 
+                       min_atr_for_displacement: float = 1.5) -> Tuple[Optional[Dict], bool, List[str]]:
+    """
+    Detect and validate a complete ICC setup with a fresh detector.
+    Stateless, so it can run in a worker thread or process.
+    
+    Args:
+        candles: Candle history (list or CandleRingBuffer)
+        min_atr_for_displacement: ATR multiplier for displacement detection
+    
+    Returns:
+        Tuple of (icc_structure or None, is_valid, list_of_violations)
+    """
+    detector = ICCDetector(min_atr_for_displacement)
+    icc_structure = detector.detect_icc_structure(candles, require_all_phases=True)
+    
+    if not icc_structure or not icc_structure.get('complete'):
+        return (icc_structure, False, [])
+    
+    is_valid, violations = detector.validate_full_setup(icc_structure, candles)
+    return (icc_structure, is_valid, violations)
+
+
 # Example usage
 if __name__ == "__main__":
     from aafr.utils import generate_mock_candles
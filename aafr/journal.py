@@ -0,0 +1,392 @@
+"""
+Append-only binary session journal.
+Records inbound bars and ticks, detector outputs, arbiter/risk decisions
+and outbound WebSocket events as length-prefixed records with monotonic
+sequence numbers. Records are encoded on the caller's thread and written
+by a background thread, so journaling can stay on in live sessions.
+An indexed reader seeks by sequence number or time and rebuilds replay
+feeds, so a session can be run again through MarketReplay.
+
+Record layout (little endian):
+    uint32 payload length | uint32 CRC-32 of payload | uint64 sequence |
+    float64 epoch seconds | uint8 kind | payload (compact JSON)
+"""
+
+import bisect
+import json
+import queue
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+MAGIC = b"AAFRJNL1"
+RECORD_HEADER = struct.Struct("<IIQdB")
+
+# Record kinds
+SESSION = 0    # Session start/stop markers
+HISTORY = 1    # Candles seeded into a symbol's buffer
+BAR = 2        # Closed bar queued for detection
+TICK = 3       # Trade print
+DETECTION = 4  # Detector output
+DECISION = 5   # Arbiter / risk engine decision
+EVENT = 6      # Outbound WebSocket event
+
+KIND_NAMES = {
+    SESSION: "session",
+    HISTORY: "history",
+    BAR: "bar",
+    TICK: "tick",
+    DETECTION: "detection",
+    DECISION: "decision",
+    EVENT: "event"
+}
+
+
+def encode_payload(data: Any) -> bytes:
+    """
+    Encode a record payload as compact JSON.
+
+    Args:
+        data: JSON-compatible value (datetimes and other objects become strings)
+
+    Returns:
+        Encoded payload
+    """
+    return json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class SessionJournal:
+    """
+    Background writer for one journal file per session.
+
+    append() never blocks: records are queued and written by a daemon
+    thread that flushes every flush_interval seconds. When the queue is
+    full, records are dropped and counted rather than slowing the caller.
+    """
+
+    def __init__(self, directory: str = "logs/journal", enabled: bool = False,
+                 flush_interval: float = 0.5, max_queue: int = 100000):
+        """
+        Initialize journal.
+
+        Args:
+            directory: Directory for session files
+            enabled: Record sessions (start() does nothing when False)
+            flush_interval: Seconds between flushes to disk
+            max_queue: Records buffered before new records are dropped
+        """
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+
+        self.path: Optional[Path] = None
+        self.running = False
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._next_seq = 0
+
+        self.stats = {
+            'records': 0,
+            'bytes': 0,
+            'dropped': 0,
+            'flushes': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SessionJournal":
+        """
+        Create a journal from the "journal" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            SessionJournal
+        """
+        settings = config.get('journal', {})
+        return cls(settings.get('directory', "logs/journal"), settings.get('enabled', False),
+                   settings.get('flush_interval', 0.5), settings.get('max_queue', 100000))
+
+    def start(self, **session_info) -> Optional[Path]:
+        """
+        Open a new session file and start the writer thread.
+
+        Args:
+            **session_info: Stored in the opening SESSION record (system, mode, symbols)
+
+        Returns:
+            Path of the session file, or None when disabled
+        """
+        if not self.enabled or self.running:
+            return self.path
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jnl"
+        handle = open(self.path, 'wb', buffering=1024 * 1024)
+        handle.write(MAGIC)
+
+        self._next_seq = 0
+        self.running = True
+        self._thread = threading.Thread(target=self._write_loop, args=(handle,),
+                                        name="session-journal", daemon=True)
+        self._thread.start()
+        self.append(SESSION, dict(session_info, status="start"))
+        print(f"[OK] Session journal: {self.path}")
+        return self.path
+
+    def append(self, kind: int, data: Any) -> bool:
+        """
+        Queue a record (never blocks).
+
+        Args:
+            kind: Record kind (BAR, TICK, DETECTION, ...)
+            data: JSON-compatible payload, encoded immediately
+
+        Returns:
+            True if queued, False if the journal is stopped or full
+        """
+        if not self.running:
+            return False
+        payload = encode_payload(data)
+        with self._lock:
+            try:
+                self._queue.put_nowait((self._next_seq, time.time(), kind, payload))
+            except queue.Full:
+                self.stats['dropped'] += 1
+                return False
+            self._next_seq += 1
+        return True
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Write the closing SESSION record, flush and close the file.
+
+        Args:
+            timeout: Seconds to wait for queued records to be written
+        """
+        if not self.running:
+            return
+        self.append(SESSION, {'status': "stop", 'dropped': self.stats['dropped']})
+        self.running = False
+        self._queue.put(None)  # Writer exits after the records ahead of it
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _write_loop(self, handle) -> None:
+        """Write queued records until the stop sentinel arrives."""
+        last_flush = time.monotonic()
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = False  # Idle: flush what is buffered
+                if item is None:
+                    break
+                if item:
+                    seq, timestamp, kind, payload = item
+                    handle.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload),
+                                                    seq, timestamp, kind))
+                    handle.write(payload)
+                    self.stats['records'] += 1
+                    self.stats['bytes'] += RECORD_HEADER.size + len(payload)
+                if item is False or time.monotonic() - last_flush >= self.flush_interval:
+                    handle.flush()
+                    self.stats['flushes'] += 1
+                    last_flush = time.monotonic()
+        finally:
+            handle.close()
+
+    def format_stats(self) -> str:
+        """
+        Format a one-line summary.
+
+        Returns:
+            Summary line
+        """
+        s = self.stats
+        return (f"{s['records']} records ({s['bytes'] / 1024:.1f} KiB) written to {self.path}, "
+                f"dropped={s['dropped']}")
+
+
+class JournalReader:
+    """
+    Indexed reader for session journal files.
+
+    Opening a file scans only the record headers; payloads are read and
+    decoded on demand. A record cut short by a crash ends the index.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open a journal and build its index.
+
+        Args:
+            path: Session journal file
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            ValueError: If the file is not a session journal
+        """
+        self.path = Path(path)
+        if not self.path.exists():
+            raise FileNotFoundError(f"Journal not found: {path}")
+
+        self.offsets: List[int] = []
+        self.seqs: List[int] = []
+        self.timestamps: List[float] = []
+        self.kinds: List[int] = []
+        self.truncated = False
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """Scan record headers, skipping over payloads."""
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a session journal: {self.path}")
+            size = self.path.stat().st_size
+            offset = len(MAGIC)
+            while offset < size:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    self.truncated = True
+                    break
+                length, _, seq, timestamp, kind = RECORD_HEADER.unpack(header)
+                if offset + RECORD_HEADER.size + length > size:
+                    self.truncated = True
+                    break
+                self.offsets.append(offset)
+                self.seqs.append(seq)
+                self.timestamps.append(timestamp)
+                self.kinds.append(kind)
+                offset += RECORD_HEADER.size + length
+                f.seek(offset)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def _read_at(self, f, position: int) -> Dict:
+        """Read and verify the record at an index position."""
+        f.seek(self.offsets[position])
+        length, crc, seq, timestamp, kind = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+        payload = f.read(length)
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupt journal record seq={seq} in {self.path}")
+        return {'seq': seq, 'timestamp': timestamp, 'kind': kind,
+                'data': json.loads(payload.decode('utf-8'))}
+
+    def read(self, seq: int) -> Dict:
+        """
+        Read one record by sequence number.
+
+        Args:
+            seq: Sequence number
+
+        Returns:
+            Record dictionary (seq, timestamp, kind, data)
+
+        Raises:
+            KeyError: If the journal has no such record
+        """
+        position = bisect.bisect_left(self.seqs, seq)
+        if position == len(self.seqs) or self.seqs[position] != seq:
+            raise KeyError(seq)
+        with open(self.path, 'rb') as f:
+            return self._read_at(f, position)
+
+    def records(self, kinds: Optional[Tuple[int, ...]] = None, start_seq: int = 0,
+                start_time: Optional[float] = None, end_time: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Iterate records in sequence order.
+
+        Args:
+            kinds: Only these kinds (all if None)
+            start_seq: First sequence number
+            start_time: Skip records written before this epoch time
+            end_time: Stop at records written after this epoch time
+
+        Yields:
+            Record dictionaries
+        """
+        position = bisect.bisect_left(self.seqs, start_seq)
+        if start_time is not None:
+            position = max(position, bisect.bisect_left(self.timestamps, start_time))
+        with open(self.path, 'rb') as f:
+            for index in range(position, len(self.offsets)):
+                if end_time is not None and self.timestamps[index] > end_time:
+                    break
+                if kinds is None or self.kinds[index] in kinds:
+                    yield self._read_at(f, index)
+
+    def history(self) -> Dict[str, List[Dict]]:
+        """
+        Get the candles each symbol was last seeded with before streaming.
+
+        Returns:
+            Dictionary of symbol -> candles
+        """
+        seeded = {}
+        for record in self.records((HISTORY,)):
+            seeded[record['data']['symbol']] = record['data']['candles']
+        return seeded
+
+    def replay_feeds(self) -> Dict[str, Tuple[str, List[Dict]]]:
+        """
+        Rebuild the closed bars each symbol's detector received.
+        Tick-built bars are journaled as bars too, so bar feeds reproduce
+        the session's detection input exactly.
+
+        Returns:
+            Dictionary of symbol -> ("bars", bars in arrival order) for MarketReplay
+        """
+        from aafr.replay import BARS  # The reader is also used without the replay module
+
+        feeds: Dict[str, List[Dict]] = {}
+        for record in self.records((BAR,)):
+            feeds.setdefault(record['data']['symbol'], []).append(record['data']['candle'])
+        return {symbol: (BARS, bars) for symbol, bars in feeds.items()}
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count records by kind.
+
+        Returns:
+            Dictionary of kind name -> count
+        """
+        counts: Dict[str, int] = {}
+        for kind in self.kinds:
+            name = KIND_NAMES.get(kind, str(kind))
+            counts[name] = counts.get(name, 0) + 1
+        return counts
+
+
+# Example usage
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    if len(sys.argv) > 1:
+        reader = JournalReader(sys.argv[1])
+        print(f"{reader.path}: {len(reader)} records {reader.summary()}"
+              f"{' (truncated)' if reader.truncated else ''}")
+        for record in reader.records():
+            print(f"  #{record['seq']} {KIND_NAMES.get(record['kind'])}: {json.dumps(record['data'])[:120]}")
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = SessionJournal(tmp, enabled=True)
+            journal.start(system="demo", symbols=["MNQ"])
+            for i in range(1000):
+                journal.append(BAR, {'symbol': "MNQ", 'candle': {'timestamp': 1736172000 + i * 300,
+                                                                 'close': 20000.0 + i}})
+            journal.stop()
+            print(journal.format_stats())
+
+            reader = JournalReader(journal.path)
+            print(reader.summary())
+            print(reader.read(500))
@@ -0,0 +1,372 @@
+"""
+Latency measurement helpers.
+Fixed-bucket histograms with percentile estimates, cheap enough to record
+on every order or bar without allocating per sample.
+"""
+
+import bisect
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Bucket upper bounds in milliseconds (roughly logarithmic, 0.05 ms .. 60 s)
+DEFAULT_BUCKETS_MS = [
+    0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100,
+    150, 200, 300, 500, 750, 1000, 2000, 5000, 10000, 30000, 60000
+]
+
+
+def now_ms() -> float:
+    """
+    Get a monotonic timestamp for latency measurement.
+
+    Returns:
+        Milliseconds from an arbitrary origin (perf_counter based)
+    """
+    return time.perf_counter() * 1000.0
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in milliseconds.
+    Percentiles are estimated from bucket bounds; min/max/mean are exact.
+    """
+
+    def __init__(self, name: str = "", buckets_ms: Optional[List[float]] = None):
+        """
+        Initialize histogram.
+
+        Args:
+            name: Label used in reports
+            buckets_ms: Ascending bucket upper bounds in milliseconds
+        """
+        self.name = name
+        self.buckets_ms = list(buckets_ms or DEFAULT_BUCKETS_MS)
+        self.counts = [0] * (len(self.buckets_ms) + 1)  # Last slot is overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def record(self, value_ms: float) -> None:
+        """
+        Record one latency sample.
+
+        Args:
+            value_ms: Latency in milliseconds
+        """
+        value_ms = max(0.0, value_ms)
+        self.counts[bisect.bisect_left(self.buckets_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if self.max_ms is None or value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def record_since(self, start_ms: float) -> float:
+        """
+        Record the time elapsed since a now_ms() timestamp.
+
+        Args:
+            start_ms: Start timestamp from now_ms()
+
+        Returns:
+            Recorded latency in milliseconds
+        """
+        elapsed = now_ms() - start_ms
+        self.record(elapsed)
+        return elapsed
+
+    @property
+    def mean_ms(self) -> float:
+        """Mean latency in milliseconds (0 when empty)."""
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        """
+        Estimate a percentile.
+
+        Args:
+            pct: Percentile between 0 and 100
+
+        Returns:
+            Upper bound of the bucket containing the percentile, capped at the
+            observed maximum (0 when empty)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = max(1, int(round(pct / 100.0 * self.count)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.buckets_ms):
+                    return min(self.buckets_ms[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """
+        Add another histogram's samples (bucket bounds must match).
+
+        Args:
+            other: Histogram to merge
+        """
+        if other.buckets_ms != self.buckets_ms:
+            raise ValueError("Cannot merge histograms with different buckets")
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        for value in (other.min_ms, other.max_ms):
+            if value is not None:
+                self.min_ms = value if self.min_ms is None else min(self.min_ms, value)
+                self.max_ms = value if self.max_ms is None else max(self.max_ms, value)
+
+    def reset(self) -> None:
+        """Discard all samples."""
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def summary(self) -> Dict:
+        """
+        Get summary statistics.
+
+        Returns:
+            Dictionary with count, mean, min, p50, p90, p99 and max in ms
+        """
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean_ms, 3),
+            'min_ms': round(self.min_ms or 0.0, 3),
+            'p50_ms': round(self.percentile(50), 3),
+            'p90_ms': round(self.percentile(90), 3),
+            'p99_ms': round(self.percentile(99), 3),
+            'max_ms': round(self.max_ms or 0.0, 3)
+        }
+
+    def format(self) -> str:
+        """
+        Format a one-line report.
+
+        Returns:
+            Human readable summary
+        """
+        s = self.summary()
+        return (f"{self.name or 'latency'}: n={s['count']} mean={s['mean_ms']:.2f}ms "
+                f"p50={s['p50_ms']:.2f}ms p90={s['p90_ms']:.2f}ms "
+                f"p99={s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms")
+
+
+# Signal path stages, in order (each measured from the previous one)
+STAGE_DETECTION = "detection"  # Bar arrival -> detection result
+STAGE_RISK = "risk"  # -> risk validation / arbiter decision
+STAGE_ORDER = "order"  # Signal -> every account's orders acked (auto trading, off the signal path)
+STAGE_LOGGING = "logging"  # -> signal logged and alert queued
+STAGE_BROADCAST = "broadcast"  # -> WebSocket broadcast sent
+STAGE_GUI_RECEIPT = "gui_receipt"  # -> event received by the GUI bot
+STAGE_CLICK = "click"  # -> entry order clicked by the GUI bot
+STAGES = (STAGE_DETECTION, STAGE_RISK, STAGE_ORDER, STAGE_LOGGING,
+          STAGE_BROADCAST, STAGE_GUI_RECEIPT, STAGE_CLICK)
+
+# Totals
+PIPELINE = "pipeline"  # Bar arrival -> broadcast (this process)
+END_TO_END = "end_to_end"  # Bar arrival -> GUI bot click
+
+
+class StageLatencyTracker:
+    """
+    Per-stage latency histograms for the bar -> signal -> click path.
+
+    A trace is started when a bar arrives and marked as it passes each stage.
+    The GUI bot runs in another process, so its stages come back as
+    LATENCY_REPORT messages measured against wall-clock send times.
+    """
+
+    def __init__(self, dump_path: Optional[str] = None):
+        """
+        Initialize tracker.
+
+        Args:
+            dump_path: JSON file written by dump_json() (None to disable)
+        """
+        self.dump_path = dump_path
+        self.histograms: Dict[str, LatencyHistogram] = {
+            stage: LatencyHistogram(stage) for stage in STAGES + (PIPELINE, END_TO_END)
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "StageLatencyTracker":
+        """
+        Create a tracker from the "latency" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            StageLatencyTracker
+        """
+        settings = config.get('latency', {})
+        return cls(settings.get('dump_path', "logs/latency/stage_latency.json"))
+
+    def start(self, origin_ms: Optional[float] = None) -> Dict:
+        """
+        Start a trace.
+
+        Args:
+            origin_ms: now_ms() time the bar arrived (defaults to now)
+
+        Returns:
+            Trace dictionary passed to mark()
+        """
+        origin = origin_ms if origin_ms is not None else now_ms()
+        return {'origin_ms': origin, 'last_ms': origin, 'stages': {}}
+
+    def mark(self, trace: Optional[Dict], stage: str) -> float:
+        """
+        Record the time since the trace's previous stage.
+
+        Args:
+            trace: Trace from start() (None is ignored)
+            stage: Stage that just completed
+
+        Returns:
+            Stage latency in milliseconds (0 without a trace)
+        """
+        if trace is None:
+            return 0.0
+        at = now_ms()
+        elapsed = at - trace['last_ms']
+        trace['last_ms'] = at
+        trace['stages'][stage] = elapsed
+        self.record(stage, elapsed)
+        return elapsed
+
+    def elapsed(self, trace: Dict) -> float:
+        """
+        Get the time from a trace's origin to its latest stage.
+
+        Args:
+            trace: Trace from start()
+
+        Returns:
+            Milliseconds
+        """
+        return trace['last_ms'] - trace['origin_ms']
+
+    def finish(self, trace: Optional[Dict]) -> float:
+        """
+        Record a trace's in-process total (bar arrival -> latest stage).
+
+        Args:
+            trace: Trace from start() (None is ignored)
+
+        Returns:
+            Total in milliseconds (0 without a trace)
+        """
+        if trace is None:
+            return 0.0
+        total = self.elapsed(trace)
+        self.record(PIPELINE, total)
+        return total
+
+    def record(self, stage: str, value_ms: float) -> None:
+        """
+        Record a stage latency measured elsewhere.
+
+        Args:
+            stage: Stage name
+            value_ms: Latency in milliseconds
+        """
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms[stage] = LatencyHistogram(stage)
+        histogram.record(value_ms)
+
+    def record_report(self, report: Dict) -> None:
+        """
+        Record a GUI bot LATENCY_REPORT message.
+
+        Args:
+            report: Message with receipt_ms, click_ms and the echoed pipeline_ms
+        """
+        receipt_ms = report.get('receipt_ms')
+        click_ms = report.get('click_ms')
+        if receipt_ms is not None:
+            self.record(STAGE_GUI_RECEIPT, receipt_ms)
+        if click_ms is not None:
+            self.record(STAGE_CLICK, click_ms)
+        if None not in (receipt_ms, click_ms, report.get('pipeline_ms')):
+            self.record(END_TO_END, report['pipeline_ms'] + receipt_ms + click_ms)
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Get summary statistics of every stage with samples.
+
+        Returns:
+            Dictionary of stage -> LatencyHistogram.summary()
+        """
+        return {stage: histogram.summary()
+                for stage, histogram in self.histograms.items() if histogram.count}
+
+    def format(self) -> str:
+        """
+        Format a per-stage report (p50/p99/max).
+
+        Returns:
+            Multi-line report
+        """
+        lines = []
+        for stage, s in self.summary().items():
+            lines.append(f"  {stage:<12} n={s['count']:<6} p50={s['p50_ms']:.2f}ms "
+                         f"p99={s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms")
+        return "\n".join(lines) if lines else "  no samples"
+
+    def dump_json(self, path: Optional[str] = None) -> Optional[Path]:
+        """
+        Write the per-stage summary as JSON.
+
+        Args:
+            path: Output file (defaults to dump_path)
+
+        Returns:
+            Path written, or None if no path is configured
+        """
+        path = path or self.dump_path
+        if not path:
+            return None
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with open(out, 'w') as f:
+            json.dump({
+                'generated_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+                'stages': self.summary()
+            }, f, indent=2)
+        return out
+
+
+# Example usage
+if __name__ == "__main__":
+    import random
+
+    histogram = LatencyHistogram("submit->ack")
+    for _ in range(1000):
+        histogram.record(random.lognormvariate(1.0, 0.5))
+    print(histogram.format())
+
+    tracker = StageLatencyTracker(dump_path=None)
+    for _ in range(100):
+        trace = tracker.start()
+        for stage in (STAGE_DETECTION, STAGE_RISK, STAGE_LOGGING, STAGE_BROADCAST):
+            time.sleep(random.uniform(0, 0.0005))
+            tracker.mark(trace, stage)
+        tracker.record_report({'pipeline_ms': tracker.finish(trace),
+                               'receipt_ms': random.uniform(0.2, 2), 'click_ms': random.uniform(50, 150)})
+    print(tracker.format())
@@ -4,25 +4,36 @@ Integrates ICC detection, CVD analysis, risk management, and backtesting.
 """
 
 import sys
+import time
 import asyncio
 from datetime import datetime
+from functools import cached_property
 from typing import Dict, List, Optional
 from pathlib import Path
 
-from aafr.icc_module import ICCDetector
+from aafr.icc_module import ICCDetector, evaluate_icc_setup
 from aafr.cvd_module import CVDCalculator
 from aafr.risk_engine import RiskEngine
 from aafr.tradovate_api import TradovateAPI
-from aafr.backtester import Backtester
-from aafr.utils import format_trade_output, log_trade_signal, load_config, load_candles_from_csv, load_candles_from_json, get_formatted_timestamp, get_micro_symbol, calculate_atr
-from aafr.telegram_bot import send_telegram_alert, format_telegram_message
-from aafr.websocket_server import WebSocketServer
+from aafr.utils import format_trade_output, log_trade_signal, load_config, load_candles_from_csv, load_candles_from_json, get_formatted_timestamp, get_micro_symbol
+from aafr.signal_dedup import SignalDedupCache, icc_fingerprint
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.journal import DETECTION, DECISION
+from aafr.latency import (
+    StageLatencyTracker, now_ms, STAGE_DETECTION, STAGE_RISK, STAGE_ORDER,
+    STAGE_LOGGING, STAGE_BROADCAST, STAGE_GUI_RECEIPT
+)
 
 
 class AAFRTradingSystem:
     """
     Main AAFR trading system orchestrator.
     Coordinates all modules for live trading and backtesting.
+    
+    Components only the live and replay paths use (async client, order
+    fan-out, alerts, metrics, journal, snapshots, detection pool and bar
+    pipeline) are created, and their modules imported, on first access, so
+    backtest, analyze and test modes load only detection and risk.
     """
     
     def __init__(self, config_path: str = "config.json"):
@@ -33,6 +44,7 @@ class AAFRTradingSystem:
             config_path: Path to configuration file
         """
         self.config = load_config(config_path)
+        self.config_path = config_path
         
         # Initialize core modules
         self.api = TradovateAPI(config_path)
@@ -40,17 +52,138 @@ class AAFRTradingSystem:
         self.cvd_calculator = CVDCalculator()
         self.risk_engine = RiskEngine(config_path)
         
+        # Order placement (paper trading in demo) when enabled in config
+        self.auto_trade = self.config.get('order_management', {}).get('enabled', False)
+        self._order_tasks = set()  # Order dispatches still waiting on account acks
+        
         # Initialize WebSocket server for GUI bot integration
         gui_bot_config = self.config.get('gui_bot', {})
         self.ws_server = None
         if gui_bot_config.get('enabled', False):
-            ws_host = gui_bot_config.get('websocket_host', 'localhost')
-            ws_port = gui_bot_config.get('websocket_port', 8765)
-            self.ws_server = WebSocketServer(ws_host, ws_port)
+            from aafr.websocket_server import WebSocketServer
+            self.ws_server = WebSocketServer.from_config(self.config)
+        
+        # Per-stage latency of the bar -> signal -> GUI click path
+        self.latency = StageLatencyTracker.from_config(self.config)
+        self.status_interval = self.config.get('latency', {}).get('status_interval', 60)
+        if self.ws_server:
+            self.ws_server.on('LATENCY_REPORT', self.latency.record_report)
         
         # System state
         self.running = False
-        self.candle_buffers = {}  # Per-symbol candle buffers for independent state
+        self.clock = datetime.now  # Wall clock (simulated during replays)
+        self.max_buffer_bars = 500
+        self.poll_interval = 5  # Seconds between REST polls when no bar stream is available
+        
+        # Each ICC structure signals once; re-detections on later bars are dropped
+        self.signal_cache = SignalDedupCache.from_config(self.config)
+        
+        # Set in shard worker processes: validated setups go to the supervisor
+        self.signal_sink = None
+    
+    @cached_property
+    def async_api(self):
+        """Pooled asyncio Tradovate client sharing the sync client's tokens."""
+        from aafr.async_tradovate_api import AsyncTradovateAPI
+        return AsyncTradovateAPI(self.config_path, token_source=self.api)
+    
+    @cached_property
+    def order_fanout(self):
+        """Order routing to every account of the configured group."""
+        from aafr.account_fanout import AccountFanout
+        return AccountFanout.from_config(self.async_api, self.config, self.config_path, self.risk_engine)
+    
+    @cached_property
+    def alerts(self):
+        """Live alerts, queued and sent in the background, never on the signal path."""
+        from aafr.telegram_bot import TelegramDispatcher
+        return TelegramDispatcher.from_config(self.config)
+    
+    @cached_property
+    def detection_executor(self):
+        """Worker pool for CPU-bound detection, one job at a time per symbol."""
+        from aafr.detection_executor import DetectionExecutor
+        return DetectionExecutor.from_config(self.config)
+    
+    @cached_property
+    def journal(self):
+        """Append-only record of market data, detections, decisions and events."""
+        from aafr.journal import SessionJournal
+        journal = SessionJournal.from_config(self.config)
+        if self.ws_server:
+            self.ws_server.journal = journal
+        return journal
+    
+    @cached_property
+    def pipeline(self):
+        """Per-symbol closed bar queues; detection runs once per bar."""
+        from aafr.bar_pipeline import BarPipeline
+        pipeline = BarPipeline(self._detect_on_bar, max_bars=self.max_buffer_bars)
+        pipeline.journal = self.journal
+        return pipeline
+    
+    @property
+    def candle_buffers(self) -> Dict[str, CandleRingBuffer]:
+        """Per-symbol candle ring buffers."""
+        return self.pipeline.buffers
+    
+    @cached_property
+    def snapshots(self):
+        """Periodic state snapshots, so a restarted live session resumes warm."""
+        from aafr.state_snapshot import SnapshotStore
+        return SnapshotStore.from_config(self.config, "aafr")
+    
+    @cached_property
+    def metrics(self):
+        """Opt-in Prometheus endpoint (config "metrics" section)."""
+        from aafr.metrics import MetricsServer
+        metrics = MetricsServer.from_config(self.config)
+        self._register_metrics(metrics.registry)
+        return metrics
+    
+    async def _wait_for_orders(self) -> None:
+        """Let order dispatches still waiting on account acks finish."""
+        if self._order_tasks:
+            await asyncio.gather(*self._order_tasks, return_exceptions=True)
+    
+    def _loaded(self, name: str) -> bool:
+        """True if a lazily created component exists."""
+        return name in self.__dict__
+    
+    def _count(self, name: str, **labels) -> None:
+        """Bump a metrics counter, only once the metrics endpoint exists and is enabled."""
+        if self._loaded('metrics') and self.metrics.enabled:
+            self.metrics.registry.inc(name, **labels)
+    
+    def _register_metrics(self, registry) -> None:
+        """Export pipeline, signal, WebSocket and latency stats to the metrics registry."""
+        from aafr.metrics import COUNTER, GAUGE, HISTOGRAM
+        pipeline = self.pipeline.stats
+        registry.register("bars_pushed_total", COUNTER, "Closed bars queued by market data",
+                          lambda: pipeline['bars_pushed'])
+        registry.register("bars_processed_total", COUNTER, "Closed bars run through detection",
+                          lambda: pipeline['bars_processed'])
+        registry.register("bar_backlog", GAUGE, "Closed bars waiting for detection",
+                          self.pipeline.backlog, label="symbol")
+        registry.register("detections_total", COUNTER, "Complete ICC structures detected")
+        registry.register("signals_total", COUNTER, "Trade signals issued")
+        registry.register("rejections_total", COUNTER, "Detected structures rejected, by reason")
+        if self.ws_server:
+            registry.register("websocket_clients", GAUGE, "Connected GUI bot clients",
+                              lambda: len(self.ws_server.clients))
+            registry.register("websocket_send_queue_bytes", GAUGE, "Bytes queued for WebSocket clients",
+                              self.ws_server.send_backlog)
+            registry.register("websocket_client_lag_seconds", GAUGE, "Age of each client's oldest unsent event",
+                              self.ws_server.client_lag, label="client")
+            registry.register("websocket_dropped_events_total", COUNTER, "Events dropped from full client queues",
+                              lambda: self.ws_server.stats['dropped'])
+            registry.register("websocket_send_latency_seconds", HISTOGRAM, "Broadcast to client send time",
+                              lambda: self.ws_server.send_latency)
+        registry.register("stage_latency_seconds", HISTOGRAM, "Signal path latency per stage",
+                          lambda: self.latency.histograms, label="stage")
+        registry.register("detection_latency_seconds", HISTOGRAM, "Detection job queue wait and run time",
+                          lambda: {'wait': self.detection_executor.wait_time,
+                                   'run': self.detection_executor.run_time}, label="phase")
     
     async def start_live_monitoring(self, symbols: List[str]) -> None:
         """
@@ -63,12 +196,30 @@ class AAFRTradingSystem:
         print("="*60)
         print("Press Ctrl+C to stop monitoring\n")
         
-        # Authenticate with API
-        if not self.api.authenticate():
+        # Authenticate with API (off the event loop)
+        if not await asyncio.to_thread(self.api.authenticate):
             print("[WARNING] API authentication failed, running in mock mode")
         
+        # Renew tokens in the background so requests never wait on authentication
+        if not self.api.is_using_mock_data() and not self.api.is_offline():
+            self.api.token_manager.start()
+        
         self.running = True
         
+        # Resume from the last state snapshot; only symbols without one load full history
+        resumed = self._restore_snapshot(symbols)
+        histories = await self.async_api.load_history([s for s in symbols if s not in resumed], count=100)
+        
+        # Pre-build order templates so signals go straight to submission
+        if self.auto_trade and not await self.order_fanout.prepare(symbols):
+            print("[WARNING] Order placement disabled: no trading account")
+            self.auto_trade = False
+        
+        await self.detection_executor.warm_up()
+        self.alerts.start()
+        await self.metrics.start()
+        self.journal.start(system="AAFR", mode="live", symbols=symbols)
+        
         try:
             # Start WebSocket server if enabled
             tasks = []
@@ -77,11 +228,29 @@ class AAFRTradingSystem:
                 tasks.append(ws_task)
                 await asyncio.sleep(0.5)  # Give server time to start
             
+            # Stream completed bars (or trade prints aggregated into bars) for
+            # every symbol over one market data connection
+            tick_bars = self.config.get('market_data', {}).get('bar_source', 'chart') == 'ticks'
+            for symbol in symbols:
+                if tick_bars:
+                    self.api.subscribe_live_ticks(symbol, self.pipeline.push_tick)
+                else:
+                    self.api.subscribe_live_data(symbol, self._on_bar_close)
+            stream = self.api.market_data_stream
+            if stream is not None:
+                tasks.append(asyncio.create_task(stream.run()))
+            
             # Start monitoring each symbol
             for symbol in symbols:
-                task = asyncio.create_task(self._monitor_symbol(symbol))
+                task = asyncio.create_task(self._monitor_symbol(symbol, histories.get(symbol),
+                                                                resumed=symbol in resumed))
                 tasks.append(task)
             
+            if self.status_interval:
+                tasks.append(asyncio.create_task(self._report_latency()))
+            if self.snapshots.enabled:
+                tasks.append(asyncio.create_task(self.snapshots.run(self.capture_state)))
+            
             # Wait for all tasks
             await asyncio.gather(*tasks)
         except KeyboardInterrupt:
@@ -90,83 +259,306 @@ class AAFRTradingSystem:
                 await self.ws_server.stop()
             self.stop()
             print("[OK] System stopped gracefully")
+        finally:
+            if self.api.market_data_stream is not None:
+                await self.api.market_data_stream.stop()
+            await self._wait_for_orders()
+            await self.api.token_manager.stop()
+            await self.alerts.stop()
+            await self.metrics.stop()
+            await self.async_api.close()
+            self.detection_executor.shutdown(wait=False)
+            self.journal.stop()
+            self.snapshots.save(self.capture_state())
+    
+    async def start_sharded_monitoring(self, symbols: List[str], shards: Optional[int] = None) -> None:
+        """
+        Monitor symbols in worker processes, one shard of symbols each.
+        Workers stream bars and run detection; this process validates risk,
+        places orders, sends alerts and serves the GUI bot for every symbol.
+        
+        Args:
+            symbols: List of trading symbols to monitor
+            shards: Worker process count (config "sharding" section if None)
+        """
+        from aafr.shard_supervisor import ShardSupervisor
+        
+        supervisor = ShardSupervisor.from_config(self, self.config, "aafr", self.config_path, shards)
+        supervisor.offline = self.api.is_offline()
+        print("Starting AAFR Live Trading System (sharded)...")
+        print("="*60)
+        print("Press Ctrl+C to stop monitoring\n")
+        
+        # Orders are placed from this process, so only it needs an order session
+        if self.auto_trade:
+            if not await asyncio.to_thread(self.api.authenticate):
+                print("[WARNING] API authentication failed, running in mock mode")
+            if not self.api.is_using_mock_data() and not self.api.is_offline():
+                self.api.token_manager.start()
+            if not await self.order_fanout.prepare(symbols):
+                print("[WARNING] Order placement disabled: no trading account")
+                self.auto_trade = False
+        
+        self.running = True
+        self._restore_snapshot([])  # Risk counters and signal fingerprints; workers keep their own buffers
+        self.alerts.start()
+        await self.metrics.start()
+        self.journal.start(system="AAFR", mode="supervisor", symbols=symbols)
+        
+        tasks = []
+        try:
+            if self.ws_server:
+                tasks.append(asyncio.create_task(self.ws_server.start()))
+                await asyncio.sleep(0.5)  # Give server time to start
+            if self.status_interval:
+                tasks.append(asyncio.create_task(self._report_latency()))
+            if self.snapshots.enabled:
+                tasks.append(asyncio.create_task(self.snapshots.run(self.capture_state)))
+            tasks.append(asyncio.create_task(supervisor.run(symbols)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await supervisor.stop()
+            if self.ws_server:
+                await self.ws_server.stop()
+            await self._wait_for_orders()
+            await self.api.token_manager.stop()
+            await self.alerts.stop()
+            await self.metrics.stop()
+            await self.async_api.close()
+            self.snapshots.save(self.capture_state())
+            print(f"\n[SHARDS] {supervisor.format_stats()}")
+            self.stop()
+    
+    async def process_remote_signal(self, payload: Dict, trace: Optional[Dict] = None) -> bool:
+        """
+        Process a setup detected by a shard worker.
+        
+        Args:
+            payload: {'symbol', 'structure', 'candles'} sent by the worker
+            trace: Stage latency trace rebuilt from the worker's timings
+        
+        Returns:
+            True if a signal was issued
+        """
+        candle_buffer = CandleRingBuffer(self.max_buffer_bars)
+        candle_buffer.extend(payload['candles'])
+        return await self._process_trade_signal(payload['symbol'], payload['structure'], candle_buffer, trace)
+    
+    def capture_state(self) -> Dict:
+        """
+        Capture the state a live session builds up, for a warm restart snapshot.
+        Open ICC phases are re-detected from the restored candle buffers; the
+        dedup fingerprints keep already signalled structures from signalling again.
+        
+        Returns:
+            JSON-compatible state
+        """
+        return {
+            'pipeline': self.pipeline.snapshot(),
+            'signal_cache': self.signal_cache.snapshot(),
+            'risk': self.risk_engine.snapshot()
+        }
+    
+    def restore_state(self, state: Dict, symbols: List[str]) -> List[str]:
+        """
+        Restore a snapshot taken by capture_state().
+        
+        Args:
+            state: Saved state
+            symbols: Symbols being monitored (buffers of other symbols are ignored)
+        
+        Returns:
+            Symbols whose candle buffers were restored
+        """
+        self.signal_cache.restore(state.get('signal_cache', []))
+        if not self.risk_engine.restore(state.get('risk', {})):
+            print("[INFO] Snapshot is from an earlier trading day: daily risk counters start fresh")
+        return self.pipeline.restore(state.get('pipeline', {}), symbols)
+    
+    def _restore_snapshot(self, symbols: List[str]) -> List[str]:
+        """
+        Load the last state snapshot, if any.
+        
+        Args:
+            symbols: Symbols being monitored
+        
+        Returns:
+            Symbols resumed from the snapshot
+        """
+        state = self.snapshots.load()
+        if state is None:
+            return []
+        resumed = self.restore_state(state, symbols)
+        if resumed:
+            print(f"[OK] Resuming {', '.join(resumed)} from snapshot")
+        return resumed
+    
+    async def _catch_up(self, symbol: str) -> bool:
+        """
+        Fetch only the bars missed since a restored buffer's newest bar.
+        
+        Args:
+            symbol: Trading symbol with a restored buffer
+        
+        Returns:
+            True if resumed, False if too much was missed (full history is needed)
+        """
+        from aafr.bulk_downloader import interval_seconds
+        from aafr.state_snapshot import missed_bar_count
+        
+        buffer = self.candle_buffers[symbol]
+        missed = missed_bar_count(buffer.last_time, interval_seconds(self.pipeline.interval))
+        if missed > 100:
+            return False
+        candles = await self.async_api.get_historical_candles(symbol, count=missed)
+        added = self.pipeline.catch_up(symbol, candles or [])
+        timestamp_str = get_formatted_timestamp()
+        print(f"[{timestamp_str}] [OK] {symbol}: Resumed {len(buffer)} bars from snapshot, "
+              f"{added} missed bars fetched")
+        return True
+    
+    def _on_bar_close(self, symbol: str, candle: Dict) -> None:
+        """
+        Market data callback: queue a completed bar for the symbol's detection.
+        
+        Args:
+            symbol: Trading symbol
+            candle: Completed bar
+        """
+        self.pipeline.push_bar(symbol, candle)
     
-    async def _monitor_symbol(self, symbol: str) -> None:
+    async def _monitor_symbol(self, symbol: str,
+                              historical_candles: Optional[List[Dict]] = None,
+                              resumed: bool = False) -> None:
         """
         Monitor a single symbol for trade setups.
         
         Args:
             symbol: Trading symbol
+            historical_candles: Preloaded history (fetched asynchronously if None)
+            resumed: The symbol's buffer was restored from a snapshot
         """
         print(f"\nMonitoring {symbol}...")
         
-        # Initialize with historical data
-        historical_candles = self.api.get_historical_candles(symbol, count=100)
-        
-        if not historical_candles:
-            print(f"[ERROR] Failed to get historical data for {symbol}")
-            return
+        if not (resumed and await self._catch_up(symbol)):
+            # Initialize with historical data
+            if historical_candles is None:
+                historical_candles = await self.async_api.get_historical_candles(symbol, count=100)
+            
+            if not historical_candles:
+                print(f"[ERROR] Failed to get historical data for {symbol}")
+                return
+            
+            # Store per-symbol candle buffer (independent state per symbol);
+            # bars streamed while history was loading are still queued
+            self.pipeline.seed(symbol, historical_candles)
+            timestamp_str = get_formatted_timestamp()
+            print(f"[{timestamp_str}] [OK] {symbol}: Loaded {len(historical_candles)} historical candles")
         
-        # Store per-symbol candle buffer (independent state per symbol)
-        self.candle_buffers[symbol] = historical_candles
+        streaming = self.api.market_data_stream is not None
+        poller = None
         timestamp_str = get_formatted_timestamp()
-        print(f"[{timestamp_str}] [OK] {symbol}: Loaded {len(historical_candles)} historical candles")
-        
         if self.api.is_using_mock_data():
-            timestamp_str = get_formatted_timestamp()
             print(f"[{timestamp_str}] [INFO] {symbol}: Using mock data (no API credentials or API unavailable)")
-            print(f"[{timestamp_str}] [INFO] {symbol}: Monitoring will check for ICC patterns every 5 seconds...")
-        else:
-            timestamp_str = get_formatted_timestamp()
+            print(f"[{timestamp_str}] [INFO] {symbol}: Checking loaded history for ICC patterns once...")
+        elif streaming:
             print(f"[{timestamp_str}] [INFO] {symbol}: Using live API data")
-            print(f"[{timestamp_str}] [INFO] {symbol}: Monitoring will check for ICC patterns every 5 seconds...")
+            print(f"[{timestamp_str}] [INFO] {symbol}: Monitoring will check for ICC patterns on every closed bar...")
+        else:
+            print(f"[{timestamp_str}] [INFO] {symbol}: Using live API data (no bar stream, polling every {self.poll_interval}s)")
+            print(f"[{timestamp_str}] [INFO] {symbol}: Monitoring will check for ICC patterns on every new bar...")
+            poller = asyncio.create_task(self._poll_bars(symbol))
         
-        # Create independent ICC and CVD detectors for this symbol
-        symbol_icc_detector = ICCDetector()
-        symbol_cvd_calculator = CVDCalculator()
+        # Evaluate the latest loaded bar, then consume closed bars as they are pushed
+        await self._detect_on_bar(symbol, self.candle_buffers[symbol], None)
+        try:
+            await self.pipeline.run_symbol(symbol)
+        finally:
+            if poller is not None:
+                poller.cancel()
+    
+    async def _poll_bars(self, symbol: str) -> None:
+        """
+        Fallback producer: poll recent bars over REST and push new ones.
         
-        # Main monitoring loop
-        check_count = 0
+        Args:
+            symbol: Trading symbol
+        """
         while self.running:
-            # TODO: Implement live data streaming
-            # For now, simulate with delays
-            await asyncio.sleep(5)
-            
-            check_count += 1
-            if check_count % 12 == 0:  # Print status every minute (12 * 5s = 60s)
+            await asyncio.sleep(self.poll_interval)
+            candles = await self.async_api.get_historical_candles(symbol, count=5)
+            if candles:
+                self.pipeline.push_candles(symbol, candles)
+    
+    async def _report_latency(self) -> None:
+        """Periodically print per-stage latency and write the JSON dump."""
+        while self.running:
+            await asyncio.sleep(self.status_interval)
+            print(f"\n[LATENCY] Stages:\n{self.latency.format()}")
+            self.latency.dump_json()
+    
+    async def _detect_on_bar(self, symbol: str, candle_buffer: List[Dict],
+                             bar_event: Optional[Dict]) -> bool:
+        """
+        Run ICC detection for a symbol's newest closed bar.
+        
+        Args:
+            symbol: Trading symbol
+            candle_buffer: Symbol's candle buffer (newest bar last)
+            bar_event: Pipeline event of the bar (None for the initial check)
+        
+        Returns:
+            True if a trade signal was produced
+        """
+        trace = self.latency.start(bar_event['closed_at_ms'] if bar_event is not None else None)
+        
+        # Detect and validate ICC structure off the event loop
+        icc_structure, is_valid, violations = await self.detection_executor.run(
+            symbol, evaluate_icc_setup, candle_buffer
+        )
+        self.latency.mark(trace, STAGE_DETECTION)
+        
+        if not icc_structure or not icc_structure.get('complete'):
+            return False
+        self._count("detections_total", symbol=symbol)
+        self.journal.append(DETECTION, {'symbol': symbol, 'bar': candle_buffer[-1]['timestamp'],
+                                        'valid': is_valid, 'violations': violations,
+                                        'structure': icc_structure})
+        
+        if not is_valid:
+            self._count("rejections_total", reason="invalid_setup")
+            if violations:
                 timestamp_str = get_formatted_timestamp()
-                print(f"[{timestamp_str}] [INFO] {symbol}: Still monitoring... ({check_count * 5}s elapsed)")
-            
-            # Get this symbol's candle buffer
-            candle_buffer = self.candle_buffers.get(symbol, [])
-            
-            # Check for ICC structures using symbol-specific detector
-            icc_structure = symbol_icc_detector.detect_icc_structure(
-                candle_buffer, require_all_phases=True
-            )
-            
-            if not icc_structure or not icc_structure.get('complete'):
-                continue
-            
-            timestamp_str = get_formatted_timestamp()
-            print(f"[{timestamp_str}] [INFO] {symbol}: ICC structure detected, validating...")
-            
-            # Validate setup
-            is_valid, violations = symbol_icc_detector.validate_full_setup(
-                icc_structure, candle_buffer
-            )
-            
-            if not is_valid:
-                if violations:
-                    timestamp_str = get_formatted_timestamp()
-                    print(f"[{timestamp_str}] [INFO] {symbol}: Setup invalid - {', '.join(violations[:2])}")
-                continue
-            
-            # Process trade signal with symbol's candle buffer
-            await self._process_trade_signal(symbol, icc_structure, candle_buffer)
+                print(f"[{timestamp_str}] [INFO] {symbol}: ICC structure detected, setup invalid - {', '.join(violations[:2])}")
+            return False
+        
+        # Drop structures that already produced a signal before any downstream work
+        if not self.signal_cache.add(icc_fingerprint(symbol, icc_structure, candle_buffer)):
+            self._count("rejections_total", reason="duplicate")
+            return False
+        
+        timestamp_str = get_formatted_timestamp()
+        print(f"[{timestamp_str}] [INFO] {symbol}: ICC structure detected and validated")
+        
+        if self.signal_sink is not None:
+            # Shard worker: risk, orders and broadcasting happen in the supervisor
+            return await self.signal_sink({'symbol': symbol, 'structure': icc_structure,
+                                           'candles': list(candle_buffer)}, trace)
+        
+        # Process trade signal with symbol's candle buffer
+        if not await self._process_trade_signal(symbol, icc_structure, candle_buffer, trace):
+            return False
+        
+        if bar_event is not None:
+            print(f"[LATENCY] {symbol}: bar close->signal {now_ms() - bar_event['closed_at_ms']:.2f}ms")
+        return True
     
     async def _process_trade_signal(self, symbol: str, icc_structure: Dict, 
-                                   candle_buffer: List[Dict]) -> None:
+                                   candle_buffer: List[Dict],
+                                   trace: Optional[Dict] = None) -> bool:
         """
         Process and execute a valid trade signal.
         
@@ -174,7 +566,12 @@ class AAFRTradingSystem:
             symbol: Trading symbol
             icc_structure: ICC structure dictionary
             candle_buffer: Candle data for this symbol
+            trace: Stage latency trace started when the bar arrived
+        
+        Returns:
+            True if a signal was issued
         """
+        detected_at = now_ms()
         timestamp = get_formatted_timestamp()
         print(f"\n[{timestamp}] >>> TRADE SIGNAL DETECTED for {symbol}")
         
@@ -189,20 +586,27 @@ class AAFRTradingSystem:
         if not entry or not stop:
             timestamp_str = get_formatted_timestamp()
             print(f"[{timestamp_str}] [ERROR] {symbol}: Could not calculate trade levels")
-            return
+            self._count("rejections_total", reason="trade_levels")
+            return False
         
         # Validate with risk engine
         is_valid, msg, trade_details = self.risk_engine.validate_trade_setup(
             entry, stop, icc_structure['indication']['direction'], 
             symbol, candle_buffer
         )
+        self.journal.append(DECISION, {'symbol': symbol, 'accepted': is_valid, 'reason': msg,
+                                       'details': trade_details})
         
         if not is_valid:
             print(f"[ERROR] Risk validation failed: {msg}")
-            return
+            self._count("rejections_total", reason="risk")
+            return False
+        # Reserve the trade before any await so concurrent symbols cannot overrun the daily limit
+        self.risk_engine.increment_daily_trades()
+        self.latency.mark(trace, STAGE_RISK)
         
         # Format and display trade signal
-        signal_timestamp = datetime.now()
+        signal_timestamp = self.clock()
         signal = {
             'timestamp': signal_timestamp,
             'symbol': symbol,
@@ -217,6 +621,13 @@ class AAFRTradingSystem:
             'status': 'pending'
         }
         
+        # Execute trade via API (paper trading in demo) in the background, so a
+        # slow account's acks never hold up logging, alerts or the GUI broadcast
+        if self.auto_trade:
+            task = asyncio.create_task(self._place_trade_order(signal, candle_buffer, detected_at))
+            self._order_tasks.add(task)
+            task.add_done_callback(self._order_tasks.discard)
+        
         # Print formatted trade signal with timestamp
         timestamp_str = get_formatted_timestamp(signal_timestamp)
         print(f"[{timestamp_str}] {symbol}: {format_trade_output(signal)}")
@@ -224,25 +635,20 @@ class AAFRTradingSystem:
         # Log trade signal
         log_trade_signal(signal)
         
-        # Send Telegram alert
-        telegram_msg = format_telegram_message(signal)
-        send_telegram_alert(telegram_msg)
+        # Queue Telegram alert (delivered by the background dispatcher)
+        self.alerts.enqueue_signal(signal)
+        self.latency.mark(trace, STAGE_LOGGING)
         
         # Emit WebSocket event for GUI bot
         if self.ws_server:
-            await self._emit_new_position_event(signal, icc_structure, candle_buffer)
-        
-        # TODO: Execute trade via API (paper trading in demo)
-        # order_result = await self._place_trade_order(signal)
-        
-        # Update risk engine
-        self.risk_engine.increment_daily_trades()
-        
-        # Reset detector to avoid duplicate signals
-        self.icc_detector.reset()
+            await self._emit_new_position_event(signal, icc_structure, candle_buffer, trace)
+        self.latency.finish(trace)
+        self._count("signals_total", symbol=symbol)
+        return True
     
     async def _emit_new_position_event(self, signal: Dict, icc_structure: Dict, 
-                                       candle_buffer: List[Dict]) -> None:
+                                       candle_buffer: List[Dict],
+                                       trace: Optional[Dict] = None) -> None:
         """
         Emit NEW_POSITION event to GUI bot via WebSocket.
         
@@ -250,9 +656,10 @@ class AAFRTradingSystem:
             signal: Trade signal dictionary
             icc_structure: ICC structure details
             candle_buffer: Historical candle data
+            trace: Stage latency trace (its timing is sent for the GUI bot to report back)
         """
-        # Calculate ATR for stop buffer
-        atr = calculate_atr(candle_buffer, period=14) if len(candle_buffer) >= 14 else 0
+        # ATR for stop buffer (kept incrementally by the symbol's ring buffer)
+        atr = getattr(candle_buffer, 'atr', None) or 0
         
         # Get GUI bot mode from config
         gui_bot_config = self.config.get('gui_bot', {})
@@ -278,11 +685,21 @@ class AAFRTradingSystem:
             'tps': tp_ladder,
             'mode': mode,
             'atr': round(atr, 2) if atr else 0,
+            'strategy': 'AAFR',
             'timestamp': signal['timestamp'].isoformat()
         }
         
+        # The GUI bot measures receipt against the wall-clock send time
+        # (monotonic clocks are not comparable across processes)
+        if trace is not None:
+            event['latency'] = {
+                'pipeline_ms': round(now_ms() - trace['origin_ms'], 3),
+                'sent_at': time.time()
+            }
+        
         # Broadcast event
         await self.ws_server.broadcast_event(event)
+        self.latency.mark(trace, STAGE_BROADCAST)
         print(f"[WS] Emitted NEW_POSITION event for {signal['symbol']}")
     
     def _calculate_tp_ladder(self, entry: float, final_tp: float, size: int, 
@@ -324,28 +741,133 @@ class AAFRTradingSystem:
             {'price': round(tp3_price, 2), 'qty': remaining}
         ]
     
-    async def _place_trade_order(self, signal: Dict) -> Optional[Dict]:
+    async def _place_trade_order(self, signal: Dict, candle_buffer: List[Dict],
+                                 detected_at: Optional[float] = None) -> Dict[str, Dict]:
         """
-        Place a trade order via API (paper trading).
+        Place a trade's entry, stop and TP ladder orders via API (paper trading).
+        The signal is sized and submitted for every configured account concurrently;
+        the reserved daily trade is released if every account rejects the entry.
         
         Args:
             signal: Trade signal dictionary
+            candle_buffer: Candle data for this symbol
+            detected_at: now_ms() timestamp of signal detection
         
         Returns:
-            Order result or None
+            Per-account order results
         """
-        # TODO: Implement actual order placement
-        order_details = {
-            'accountId': 'YOUR_ACCOUNT_ID',
-            'action': 'Buy' if signal['direction'] == 'LONG' else 'Sell',
-            'symbol': signal['symbol'],
-            'orderQty': signal['position_size'],
-            'orderType': 'Market',
-            'route': 'Default'
-        }
+        try:
+            results = await self.order_fanout.dispatch(
+                signal, candle_buffer,
+                tp_ladder=lambda s: self._calculate_tp_ladder(
+                    s['entry'], s['take_profit'], s['position_size'], s['direction']
+                ),
+                signal_time_ms=detected_at
+            )
+        except Exception as e:
+            print(f"[ERROR] Order dispatch failed for {signal['symbol']}: {e}")
+            return {}
+        if detected_at is not None:
+            self.latency.record(STAGE_ORDER, now_ms() - detected_at)
         
-        result = self.api.place_order(order_details)
-        return result
+        if any(r['accepted'] for r in results.values()):
+            signal['status'] = 'submitted'
+        elif any(r['reason'] == "no ack" for r in results.values()):
+            signal['status'] = 'unconfirmed'  # The exchange may still hold the entry
+        else:
+            signal['status'] = 'rejected'
+            self.risk_engine.release_daily_trade()
+        for account, result in results.items():
+            print(f"[ORDER] {signal['symbol']} -> {account}: {result['reason']} "
+                  f"({result['position_size']} contracts, {len(result['orders'])} orders)")
+        return results
+    
+    async def run_replay(self, feeds: Dict[str, tuple], speed: Optional[float] = 1.0,
+                         warmup_bars: int = 100, gui_bot: bool = False,
+                         history: Optional[Dict[str, List[Dict]]] = None) -> Dict:
+        """
+        Replay recorded data through the live pipeline (detection, risk,
+        logging, WebSocket) on a simulated clock.
+        Orders and Telegram alerts are never sent for replayed signals.
+        
+        Args:
+            feeds: symbol -> (kind, records) from load_replay_file()
+            speed: Replay speed multiplier (None for maximum speed)
+            warmup_bars: Leading bars per symbol loaded as history
+            gui_bot: Run a dry-run GUI bot client against the WebSocket server
+            history: Recorded history per symbol (replaces warm-up bars)
+        
+        Returns:
+            Replay statistics
+        """
+        from aafr.replay import MarketReplay, ReplayClock, start_dry_run_gui_bot, stop_gui_bot
+        from aafr.websocket_server import WebSocketServer
+        
+        clock = ReplayClock(speed)
+        self.clock = clock.now
+        self.risk_engine.clock = clock.now
+        self.signal_cache.clock = clock.time
+        self.auto_trade = False
+        self.alerts.enabled = False
+        
+        if gui_bot and self.ws_server is None:
+            self.ws_server = WebSocketServer.from_config(self.config)
+            self.ws_server.on('LATENCY_REPORT', self.latency.record_report)
+            self.ws_server.journal = self.journal
+        
+        speed_label = f"{speed:g}x" if speed is not None else "max speed"
+        print(f"Replaying {', '.join(feeds)} at {speed_label} (orders and alerts disabled)")
+        print("="*60)
+        
+        self.running = True
+        self.journal.start(system="AAFR", mode="replay", symbols=list(feeds))
+        replay = MarketReplay(self.pipeline, clock, warmup_bars,
+                              on_new_day=lambda now: self.risk_engine.reset_daily_tracking())
+        remaining = replay.seed(feeds, history)
+        await self.detection_executor.warm_up()
+        await self.metrics.start()
+        
+        tasks = []
+        bot = None
+        try:
+            if self.ws_server:
+                tasks.append(asyncio.create_task(self.ws_server.start()))
+                await asyncio.sleep(0.5)  # Give server time to start
+                if gui_bot:
+                    bot = start_dry_run_gui_bot(self.ws_server.host, self.ws_server.port)
+                    await asyncio.sleep(0.5)  # Let the client connect
+            tasks.extend(asyncio.create_task(self.pipeline.run_symbol(symbol)) for symbol in feeds)
+            
+            await replay.run({symbol: (feeds[symbol][0], remaining[symbol]) for symbol in feeds})
+            if bot is not None:
+                await self._wait_for_gui_bot()
+        finally:
+            if bot is not None:
+                await stop_gui_bot(*bot)
+            if self.ws_server:
+                await self.ws_server.stop()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.metrics.stop()
+            self.detection_executor.shutdown(wait=False)
+        
+        print(f"\n[REPLAY] {replay.format_stats()}")
+        self.stop()
+        return replay.stats
+    
+    async def _wait_for_gui_bot(self, timeout: float = 30.0) -> None:
+        """
+        Wait until the GUI bot has reported on every broadcast event.
+        
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        broadcasts = self.latency.histograms[STAGE_BROADCAST]
+        receipts = self.latency.histograms[STAGE_GUI_RECEIPT]
+        deadline = now_ms() + timeout * 1000.0
+        while receipts.count < broadcasts.count and now_ms() < deadline:
+            await asyncio.sleep(0.1)
     
     def run_backtest(self, symbol: Optional[str] = None, 
                     candle_data: Optional[List[Dict]] = None,
@@ -402,6 +924,8 @@ class AAFRTradingSystem:
             return {}
         
         # Run backtest(s)
+        from aafr.backtester import Backtester
+        
         if len(candles_by_symbol) == 1:
             # Single instrument backtest
             sym = list(candles_by_symbol.keys())[0]
@@ -514,12 +1038,31 @@ class AAFRTradingSystem:
         print(f"[{timestamp_str}] [OK] Trade signal logged to logs/trades/trades_{datetime.now().strftime('%Y%m%d')}.csv")
         
         # Send Telegram alert
+        from aafr.telegram_bot import send_telegram_alert, format_telegram_message
         telegram_msg = format_telegram_message(signal)
         send_telegram_alert(telegram_msg)
     
     def stop(self) -> None:
         """Stop the trading system."""
         self.running = False
+        if self._loaded('pipeline'):
+            print(f"\n[LATENCY] Bar pipeline: {self.pipeline.format_stats()}")
+        if self._loaded('detection_executor'):
+            print(f"[LATENCY] Detection: {self.detection_executor.format_stats()}")
+        print(f"[SIGNALS] Dedup: {self.signal_cache.format_stats()}")
+        print(f"[LATENCY] Stages:\n{self.latency.format()}")
+        dump = self.latency.dump_json()
+        if dump:
+            print(f"[OK] Stage latency written to {dump}")
+        if self._loaded('alerts') and self.alerts.enabled:
+            print(f"[TELEGRAM] {self.alerts.format_stats()}")
+        if self.auto_trade and self._loaded('order_fanout'):
+            self.order_fanout.print_stats()
+        if self._loaded('journal') and self.journal.running:
+            self.journal.stop()
+            print(f"[JOURNAL] {self.journal.format_stats()}")
+        if self._loaded('snapshots') and self.snapshots.stats['saves']:
+            print(f"[SNAPSHOT] {self.snapshots.format_stats()}")
         print("\nAAFR Trading System stopped.")
 
 
@@ -530,8 +1073,9 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='AAFR Trading System')
-    parser.add_argument('--mode', choices=['live', 'backtest', 'test', 'analyze'], 
-                       default='test', help='Operating mode (analyze: analyze custom data file)')
+    parser.add_argument('--mode', choices=['live', 'backtest', 'test', 'analyze', 'replay'], 
+                       default='test', help='Operating mode (analyze: analyze custom data file, '
+                                            'replay: stream a recorded bar/tick file through the live pipeline)')
     parser.add_argument('--symbol', default='MNQ', 
                        help='Trading symbol (NQ/ES/GC/CL/YM will be mapped to micro contracts)')
     parser.add_argument('--symbols', nargs='+', 
@@ -540,8 +1084,18 @@ def main():
                        help='List of instruments to backtest (e.g., MNQ MES MGC)')
     parser.add_argument('--all-instruments', action='store_true',
                        help='Run backtest on all 5 instruments')
+    parser.add_argument('--offline', action='store_true',
+                       help='Serve historical data purely from the local cache (no API access)')
     parser.add_argument('--data-file', type=str,
                        help='Path to CSV or JSON file containing candle data')
+    parser.add_argument('--speed', default='1',
+                       help='Replay speed: multiplier (1, 10, 1000) or "max"')
+    parser.add_argument('--warmup-bars', type=int, default=100,
+                       help='Bars loaded as history before a replay starts streaming')
+    parser.add_argument('--gui-bot', action='store_true',
+                       help='Replay with a dry-run GUI bot connected over WebSocket')
+    parser.add_argument('--shards', type=int,
+                       help='Live mode: monitor symbols in this many worker processes (default: config "sharding")')
     
     args = parser.parse_args()
     
@@ -555,11 +1109,13 @@ def main():
     
     # Initialize system
     system = AAFRTradingSystem()
+    if args.offline:
+        system.api.enable_offline_mode()
     
     try:
         # Load data from file if provided
         candle_data = None
-        if args.data_file:
+        if args.data_file and args.mode != 'replay':
             print(f"[INFO] Loading data from: {args.data_file}")
             file_path = Path(args.data_file)
             
@@ -601,11 +1157,38 @@ def main():
                 sys.exit(1)
             system.analyze_data(candle_data, args.symbol)
             
+        elif args.mode == 'replay':
+            # Stream a recorded file through the live pipeline
+            if not args.data_file:
+                print("[ERROR] --data-file required for replay mode")
+                sys.exit(1)
+            from aafr.journal import JournalReader
+            from aafr.replay import load_replay_file, parse_speed
+            
+            try:
+                speed = parse_speed(args.speed)
+                if args.data_file.endswith('.jnl'):
+                    # Session journal: the bars and history the live detector saw
+                    journal = JournalReader(args.data_file)
+                    feeds, history = journal.replay_feeds(), journal.history()
+                else:
+                    feeds, history = {args.symbol: load_replay_file(args.data_file, args.symbol)}, None
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Failed to load replay: {e}")
+                sys.exit(1)
+            for symbol, (kind, records) in feeds.items():
+                print(f"[OK] Loaded {len(records)} {kind} for {symbol} from {args.data_file}")
+            asyncio.run(system.run_replay(feeds, speed, args.warmup_bars, args.gui_bot, history))
+            
         elif args.mode == 'live':
         
             # Start live monitoring
             symbols = args.symbols if args.symbols else [args.symbol]
-            asyncio.run(system.start_live_monitoring(symbols))
+            shards = args.shards or system.config.get('sharding', {}).get('shards', 1)
+            if shards > 1 and len(symbols) > 1:
+                asyncio.run(system.start_sharded_monitoring(symbols, shards))
+            else:
+                asyncio.run(system.start_live_monitoring(symbols))
             
         else:  # test mode
             # Quick test of all modules
@@ -613,7 +1196,7 @@ def main():
             print("="*60)
             
             # Test API connection
-            api = TradovateAPI()
+            api = system.api
             api.authenticate()
 
             # Test data fetch
@@ -0,0 +1,523 @@
+"""
+Persistent WebSocket market-data client for Tradovate.
+Subscribes to quotes and chart bars for many symbols over one connection,
+delivers tick and bar-close callbacks into the strategy pipeline and
+replays every subscription after a reconnect.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    import websockets
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+from aafr.bar_resampler import parse_interval, to_epoch_seconds
+
+
+# Tradovate expects a client heartbeat ("[]") at least every 2.5 seconds
+HEARTBEAT_INTERVAL = 2.5
+
+# Reconnect backoff bounds (seconds)
+RECONNECT_MIN_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+
+# Callback signatures; both sync functions and coroutines are accepted
+BarCallback = Callable[[str, Dict], Union[None, Awaitable[None]]]
+TickCallback = Callable[[str, float, float, int], Union[None, Awaitable[None]]]
+
+
+def parse_frame(frame: str) -> Tuple[str, Optional[Any]]:
+    """
+    Split a Tradovate WebSocket frame into its type and payload.
+
+    Frame types: 'o' (open), 'h' (heartbeat), 'a' (JSON array of messages),
+    'c' (close, JSON [code, reason]). Only 'a' and 'c' frames carry a payload
+    and it is decoded with a single json.loads of the frame body.
+
+    Args:
+        frame: Raw text frame
+
+    Returns:
+        Tuple of (frame_type, payload)
+    """
+    if not frame:
+        return ('', None)
+    kind = frame[0]
+    if kind in ('a', 'c') and len(frame) > 1:
+        return (kind, json.loads(frame[1:]))
+    return (kind, None)
+
+
+def build_request(endpoint: str, request_id: int, body: Optional[Dict] = None) -> str:
+    """
+    Build a Tradovate WebSocket request frame ("endpoint\\nid\\n\\nbody").
+
+    Args:
+        endpoint: Endpoint name (e.g., "md/subscribeQuote")
+        request_id: Request id echoed in the response
+        body: Optional JSON body
+
+    Returns:
+        Request frame text
+    """
+    payload = json.dumps(body, separators=(',', ':')) if body is not None else ''
+    return f"{endpoint}\n{request_id}\n\n{payload}"
+
+
+def chart_bar_to_candle(bar: Dict, symbol: str) -> Dict:
+    """
+    Convert a chart bar from a WebSocket chart event to the standard candle format.
+
+    Args:
+        bar: Chart bar (timestamp, open, high, low, close, upVolume, downVolume, ...)
+        symbol: Trading symbol
+
+    Returns:
+        Candle dictionary (with 'delta' when up/down volume is present)
+    """
+    up_volume = bar.get('upVolume')
+    down_volume = bar.get('downVolume')
+    candle = {
+        'timestamp': bar['timestamp'],
+        'open': float(bar['open']),
+        'high': float(bar['high']),
+        'low': float(bar['low']),
+        'close': float(bar['close']),
+        'volume': int(bar.get('volume', (up_volume or 0) + (down_volume or 0))),
+        'symbol': symbol
+    }
+    if up_volume is not None and down_volume is not None:
+        candle['delta'] = int(up_volume - down_volume)
+    return candle
+
+
+class MarketDataStream:
+    """
+    Async Tradovate market-data WebSocket client.
+
+    One connection carries every subscription. Chart updates for the forming
+    bar are tracked per subscription; when a bar with a newer timestamp
+    arrives the previous bar is complete and on_bar_close fires.
+    """
+
+    def __init__(self, url: str, token_provider: Callable[[], Optional[str]],
+                 contract_ids: Optional[Dict[str, int]] = None,
+                 contract_resolver: Optional[Callable[[str], Awaitable[Optional[int]]]] = None):
+        """
+        Initialize market data stream.
+
+        Args:
+            url: Market data WebSocket URL (md_ws_url in config)
+            token_provider: Returns the current market data access token
+            contract_ids: Optional symbol -> contractId map used to route quotes
+            contract_resolver: Optional coroutine looking up a symbol's contractId
+        """
+        self.url = url
+        self.token_provider = token_provider
+        self.contract_resolver = contract_resolver
+        self.contract_ids = dict(contract_ids or {})
+        self._contract_symbols = {cid: sym for sym, cid in self.contract_ids.items()}
+
+        # Subscriptions replayed on every (re)connect
+        self.quote_subscriptions: Dict[str, List[TickCallback]] = {}
+        self.bar_subscriptions: Dict[Tuple[str, str], List[BarCallback]] = {}
+
+        self.reconnect_min_delay = RECONNECT_MIN_DELAY
+        self.reconnect_max_delay = RECONNECT_MAX_DELAY
+        self.running = False
+        self.connected = asyncio.Event()
+        self._ws = None
+        self._next_id = 1
+        self._pending: Dict[int, asyncio.Future] = {}
+        # Chart subscription id -> (symbol, interval)
+        self._charts: Dict[int, Tuple[str, str]] = {}
+        # (symbol, interval) -> forming bar
+        self._forming: Dict[Tuple[str, str], Dict] = {}
+
+        # Statistics
+        self.stats = {
+            'frames': 0,
+            'ticks': 0,
+            'bars_closed': 0,
+            'reconnects': 0,
+            'last_message_time': None
+        }
+
+    @classmethod
+    def from_api(cls, api) -> "MarketDataStream":
+        """
+        Build a stream for a TradovateAPI/AsyncTradovateAPI client.
+
+        Args:
+            api: Client providing config, environment and md_token
+
+        Returns:
+            MarketDataStream using the client's market data token
+        """
+        api_config = api.config['tradovate'][api.environment]
+        url = api_config.get('md_ws_url', 'wss://md-demo.tradovateapi.com/v1/websocket')
+
+        if asyncio.iscoroutinefunction(api.find_contract):
+            resolver = api.find_contract
+        else:
+            async def resolver(symbol):
+                return await asyncio.to_thread(api.find_contract, symbol)
+
+        return cls(url, lambda: api.md_token or api.token, contract_resolver=resolver)
+
+    # ------------------------------------------------------------------
+    # Subscription API
+    # ------------------------------------------------------------------
+
+    async def subscribe_bars(self, symbol: str, interval: str, on_bar_close: BarCallback) -> None:
+        """
+        Subscribe to chart bars; on_bar_close(symbol, candle) fires per completed bar.
+
+        Args:
+            symbol: Trading symbol
+            interval: Bar interval (e.g., "1Min", "5Min")
+            on_bar_close: Callback for completed bars
+        """
+        if self.register_bars(symbol, interval, on_bar_close) and self._ws is not None:
+            await self._send_chart_request(symbol, interval)
+
+    def register_bars(self, symbol: str, interval: str, on_bar_close: BarCallback) -> bool:
+        """
+        Record a chart subscription without sending it (sent on the next connect).
+
+        Args:
+            symbol: Trading symbol
+            interval: Bar interval
+            on_bar_close: Callback for completed bars
+
+        Returns:
+            True if this is the first callback for the symbol/interval
+        """
+        key = (symbol, interval)
+        first = key not in self.bar_subscriptions
+        self.bar_subscriptions.setdefault(key, []).append(on_bar_close)
+        return first
+
+    async def subscribe_quotes(self, symbol: str, on_tick: TickCallback) -> None:
+        """
+        Subscribe to quotes; on_tick(symbol, price, size, timestamp) fires per trade print.
+
+        Args:
+            symbol: Trading symbol
+            on_tick: Callback for trades
+        """
+        first = self.register_quotes(symbol, on_tick)
+        if first:
+            await self._resolve_contract(symbol)
+        if first and self._ws is not None:
+            await self._request('md/subscribeQuote', {'symbol': symbol})
+
+    def register_quotes(self, symbol: str, on_tick: TickCallback) -> bool:
+        """
+        Record a quote subscription without sending it (sent on the next connect).
+
+        Args:
+            symbol: Trading symbol
+            on_tick: Callback for trades
+
+        Returns:
+            True if this is the first callback for the symbol
+        """
+        first = symbol not in self.quote_subscriptions
+        self.quote_subscriptions.setdefault(symbol, []).append(on_tick)
+        return first
+
+    async def _resolve_contract(self, symbol: str) -> None:
+        """Look up a symbol's contractId (quote updates carry only the contractId)."""
+        if symbol in self.contract_ids or self.contract_resolver is None:
+            return
+        contract_id = await self.contract_resolver(symbol)
+        if contract_id is not None:
+            self.contract_ids[symbol] = contract_id
+            self._contract_symbols[contract_id] = symbol
+
+    async def unsubscribe(self, symbol: str) -> None:
+        """
+        Remove every subscription for a symbol.
+
+        Args:
+            symbol: Trading symbol
+        """
+        if self.quote_subscriptions.pop(symbol, None) is not None and self._ws is not None:
+            await self._request('md/unsubscribeQuote', {'symbol': symbol})
+
+        for key in [k for k in self.bar_subscriptions if k[0] == symbol]:
+            del self.bar_subscriptions[key]
+            self._forming.pop(key, None)
+            for chart_id in [cid for cid, ck in self._charts.items() if ck == key]:
+                del self._charts[chart_id]
+                if self._ws is not None:
+                    await self._request('md/cancelChart', {'subscriptionId': chart_id})
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def run(self) -> None:
+        """
+        Connect and process frames until stop() is called.
+        Reconnects with exponential backoff and replays all subscriptions.
+        """
+        if not WEBSOCKETS_AVAILABLE:
+            print("[ERROR] Market data stream cannot start: websockets library not installed")
+            return
+
+        self.running = True
+        delay = self.reconnect_min_delay
+
+        while self.running:
+            try:
+                async with websockets.connect(self.url, ping_interval=None,
+                                              max_queue=1024) as ws:
+                    self._ws = ws
+                    await self._session(ws)
+                    delay = self.reconnect_min_delay
+            except (OSError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                print(f"[WARNING] Market data connection lost: {e!r}")
+            finally:
+                self._ws = None
+                self.connected.clear()
+                for future in self._pending.values():
+                    if not future.done():
+                        future.cancel()
+                self._pending.clear()
+
+            if not self.running:
+                break
+
+            self.stats['reconnects'] += 1
+            print(f"[INFO] Reconnecting market data stream in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.reconnect_max_delay)
+
+    async def stop(self) -> None:
+        """Stop the stream and close the connection."""
+        self.running = False
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _session(self, ws) -> None:
+        """Authorize, replay subscriptions and dispatch frames for one connection."""
+        heartbeat = asyncio.create_task(self._heartbeat(ws))
+        reader = asyncio.create_task(self._read_frames(ws))
+        try:
+            token = self.token_provider()
+            response = await self._request('authorize', token=token)
+            if not response or response.get('s') != 200:
+                print(f"[ERROR] Market data authorization failed: {response}")
+                self.running = False
+                return
+
+            self._charts.clear()
+            self._forming.clear()
+            for symbol in list(self.quote_subscriptions):
+                await self._resolve_contract(symbol)
+                await self._request('md/subscribeQuote', {'symbol': symbol})
+            for symbol, interval in list(self.bar_subscriptions):
+                await self._send_chart_request(symbol, interval)
+
+            self.connected.set()
+            print(f"[OK] Market data stream connected ({len(self.quote_subscriptions)} quote, "
+                  f"{len(self.bar_subscriptions)} chart subscriptions)")
+            await reader
+        finally:
+            heartbeat.cancel()
+            reader.cancel()
+
+    async def _heartbeat(self, ws) -> None:
+        """Send client heartbeats while connected."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            await ws.send('[]')
+
+    async def _request(self, endpoint: str, body: Optional[Dict] = None,
+                       token: Optional[str] = None, timeout: float = 10.0) -> Optional[Dict]:
+        """
+        Send a request and wait for its response message.
+
+        Args:
+            endpoint: Endpoint name
+            body: Optional JSON body
+            token: Raw body for "authorize" (sent as plain text)
+            timeout: Seconds to wait for the response
+
+        Returns:
+            Response message ({"s": status, "i": id, "d": ...}) or None on timeout
+        """
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        if token is not None:
+            frame = f"{endpoint}\n{request_id}\n\n{token}"
+        else:
+            frame = build_request(endpoint, request_id, body)
+        await self._ws.send(frame)
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARNING] No response to {endpoint} within {timeout}s")
+            return None
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _send_chart_request(self, symbol: str, interval: str) -> None:
+        """Subscribe to a chart and map its subscription ids to the symbol."""
+        underlying_type, element_size = parse_interval(interval)
+        response = await self._request('md/getChart', {
+            'symbol': symbol,
+            'chartDescription': {
+                'underlyingType': underlying_type,
+                'elementSize': element_size,
+                'elementSizeUnit': 'UnderlyingUnits',
+                'withHistogram': False
+            },
+            # One historical bar seeds the forming bar
+            'timeRange': {'asMuchAsElements': 1}
+        })
+        if not response or response.get('s') != 200:
+            print(f"[ERROR] Chart subscription failed for {symbol} {interval}: {response}")
+            return
+
+        data = response.get('d') or {}
+        for id_key in ('realtimeId', 'historicalId'):
+            if id_key in data:
+                self._charts[data[id_key]] = (symbol, interval)
+
+    async def _read_frames(self, ws) -> None:
+        """Dispatch incoming frames until the connection closes."""
+        async for frame in ws:
+            self.stats['frames'] += 1
+            self.stats['last_message_time'] = time.time()
+
+            kind, payload = parse_frame(frame)
+            if kind == 'a':
+                for message in payload:
+                    await self._dispatch(message)
+            elif kind == 'c':
+                print(f"[WARNING] Market data server closed the connection: {payload}")
+                return
+
+    async def _dispatch(self, message: Dict) -> None:
+        """Route one message from an 'a' frame."""
+        event = message.get('e')
+        if event is None:
+            # Response to a request
+            future = self._pending.get(message.get('i'))
+            if future is not None and not future.done():
+                future.set_result(message)
+        elif event == 'chart':
+            for chart in message['d'].get('charts', ()):
+                key = self._charts.get(chart.get('id'))
+                if key is not None:
+                    for bar in chart.get('bars', ()):
+                        await self._on_chart_bar(key, bar)
+        elif event == 'md':
+            for quote in message['d'].get('quotes', ()):
+                await self._on_quote(quote)
+
+    async def _on_chart_bar(self, key: Tuple[str, str], bar: Dict) -> None:
+        """Track the forming bar and emit the previous one when a newer bar starts."""
+        forming = self._forming.get(key)
+        bar_time = to_epoch_seconds(bar['timestamp'])
+
+        if forming is None or bar_time == forming['_time']:
+            self._forming[key] = {'_time': bar_time, 'bar': bar}
+            return
+        if bar_time < forming['_time']:
+            return  # Late update for an already closed bar
+
+        self._forming[key] = {'_time': bar_time, 'bar': bar}
+        symbol = key[0]
+        candle = chart_bar_to_candle(forming['bar'], symbol)
+        self.stats['bars_closed'] += 1
+        for callback in self.bar_subscriptions.get(key, ()):
+            await self._invoke(callback, symbol, candle)
+
+    async def _on_quote(self, quote: Dict) -> None:
+        """Emit trade prints from a quote update."""
+        trade = quote.get('entries', {}).get('Trade')
+        if not trade:
+            return
+
+        symbol = self._contract_symbols.get(quote.get('contractId'))
+        if symbol is None:
+            symbol = quote.get('symbol')
+        if symbol is None:
+            return
+
+        self.stats['ticks'] += 1
+        timestamp = to_epoch_seconds(quote['timestamp']) if 'timestamp' in quote else int(time.time())
+        for callback in self.quote_subscriptions.get(symbol, ()):
+            await self._invoke(callback, symbol, trade['price'], trade.get('size', 0), timestamp)
+
+    @staticmethod
+    async def _invoke(callback: Callable, *args) -> None:
+        """Call a sync or async callback, isolating its errors from the stream."""
+        try:
+            result = callback(*args)
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            print(f"[ERROR] Market data callback failed: {e}")
+
+
+def merge_closed_bar(candles: List[Dict], candle: Dict, max_bars: Optional[int] = None) -> bool:
+    """
+    Append a streamed bar to a candle buffer, replacing a bar with the same timestamp.
+
+    Args:
+        candles: Candle buffer (oldest first), modified in place
+        candle: Completed bar
+        max_bars: Optional buffer length limit (oldest bars are dropped)
+
+    Returns:
+        True if the buffer changed
+    """
+    bar_time = to_epoch_seconds(candle['timestamp'])
+    if candles:
+        last_time = to_epoch_seconds(candles[-1]['timestamp'])
+        if bar_time < last_time:
+            return False
+        if bar_time == last_time:
+            candles[-1] = candle
+            return True
+
+    candles.append(candle)
+    if max_bars is not None and len(candles) > max_bars:
+        del candles[:len(candles) - max_bars]
+    return True
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.tradovate_api import TradovateAPI
+
+    async def demo():
+        api = TradovateAPI()
+        if not api.authenticate() or api.is_using_mock_data():
+            print("Market data stream requires live API credentials")
+            return
+
+        stream = MarketDataStream.from_api(api)
+
+        def on_bar(symbol, candle):
+            print(f"[BAR] {symbol}: {candle}")
+
+        await stream.subscribe_bars("MNQ", "1Min", on_bar)
+        await stream.subscribe_quotes("MNQ", lambda s, p, q, t: print(f"[TICK] {s} {p} x {q}"))
+        await stream.run()
+
+    asyncio.run(demo())
@@ -0,0 +1,345 @@
+"""
+Prometheus metrics for live trading processes.
+An opt-in local HTTP endpoint serves counters, gauges and latency
+histograms in the Prometheus text exposition format, so throughput,
+rejections and latency regressions can be scraped instead of read from
+status prints.
+"""
+
+import asyncio
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+from aafr.latency import LatencyHistogram
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False  # Windows
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+def current_rss_bytes() -> int:
+    """
+    Get the resident set size of this process.
+
+    Returns:
+        RSS in bytes (peak RSS where the current value is unavailable, 0 if unknown)
+    """
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if RESOURCE_AVAILABLE:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024  # macOS reports bytes, Linux KiB
+    return 0
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Render a label set as {name="value",...}."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry:
+    """
+    Metric families rendered in Prometheus text format.
+
+    Values are either updated directly (inc/set) or read from a callback at
+    scrape time, so existing stats dictionaries can be exported without
+    being duplicated.
+    """
+
+    def __init__(self, prefix: str = "aafr"):
+        """
+        Initialize registry.
+
+        Args:
+            prefix: Prepended to every metric name
+        """
+        self.prefix = prefix
+        self._families: Dict[str, Dict] = {}  # name -> {type, help, label, samples, source}
+        self._failing = set()  # Families whose scrape-time source raised (warned once)
+
+    def _name(self, name: str) -> str:
+        return f"{self.prefix}_{name}" if self.prefix else name
+
+    def register(self, name: str, kind: str, help_text: str,
+                 source: Optional[Callable] = None, label: Optional[str] = None) -> None:
+        """
+        Declare a metric family.
+
+        Args:
+            name: Metric name (without prefix)
+            kind: COUNTER, GAUGE or HISTOGRAM
+            help_text: HELP line
+            source: Scrape-time callback returning a number, or a dict of
+                label value -> number (LatencyHistogram for histograms)
+            label: Label name for dict-valued sources
+        """
+        self._families[self._name(name)] = {
+            'type': kind, 'help': help_text, 'label': label,
+            'source': source, 'samples': {}
+        }
+
+    def _family(self, name: str, kind: str) -> Dict:
+        family = self._families.get(self._name(name))
+        if family is None:
+            self.register(name, kind, name.replace("_", " "))
+            family = self._families[self._name(name)]
+        return family
+
+    def inc(self, name: str, value: float = 1, /, **labels) -> None:
+        """
+        Increment a counter.
+
+        Args:
+            name: Metric name (registered on first use if needed)
+            value: Amount to add
+            **labels: Label values
+        """
+        samples = self._family(name, COUNTER)['samples']
+        key = tuple(sorted(labels.items()))
+        samples[key] = samples.get(key, 0) + value
+
+    def set(self, name: str, value: float, /, **labels) -> None:
+        """
+        Set a gauge.
+
+        Args:
+            name: Metric name (registered on first use if needed)
+            value: Gauge value
+            **labels: Label values
+        """
+        self._family(name, GAUGE)['samples'][tuple(sorted(labels.items()))] = value
+
+    def value(self, name: str, /, **labels) -> Optional[float]:
+        """
+        Get a directly updated sample (mainly for tests and status output).
+
+        Args:
+            name: Metric name
+            **labels: Label values
+
+        Returns:
+            Sample value, or None if never set
+        """
+        family = self._families.get(self._name(name))
+        if family is None:
+            return None
+        return family['samples'].get(tuple(sorted(labels.items())))
+
+    def _samples(self, family: Dict) -> List:
+        """Get (labels, value) pairs of a family, calling its source if any."""
+        if family['source'] is None:
+            return [(dict(key), value) for key, value in family['samples'].items()]
+        result = family['source']()
+        if result is None:
+            return []
+        if isinstance(result, dict):
+            return [({family['label']: key}, value) for key, value in result.items()]
+        return [({}, result)]
+
+    def render(self) -> str:
+        """
+        Render every family in Prometheus text format. A family whose
+        scrape-time source raises is left out of this scrape.
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for name, family in self._families.items():
+            try:
+                samples = self._samples(family)
+            except Exception as e:
+                if name not in self._failing:
+                    self._failing.add(name)
+                    print(f"[WARNING] Metric {name} skipped: {type(e).__name__}: {e}")
+                continue
+            self._failing.discard(name)
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for labels, value in samples:
+                if family['type'] == HISTOGRAM:
+                    lines.extend(self._render_histogram(name, labels, value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histogram(name: str, labels: Dict, histogram: LatencyHistogram) -> List[str]:
+        """Render a millisecond LatencyHistogram as cumulative buckets in seconds."""
+        lines = []
+        cumulative = 0
+        for bound_ms, bucket_count in zip(histogram.buckets_ms, histogram.counts):
+            cumulative += bucket_count
+            bucket_labels = dict(labels, le=_format_value(bound_ms / 1000.0))
+            lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {cumulative}")
+        lines.append(f"{name}_bucket{_format_labels(dict(labels, le='+Inf'))} {histogram.count}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total_ms / 1000.0)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return lines
+
+
+class MetricsServer:
+    """
+    Local HTTP endpoint serving a MetricsRegistry at /metrics.
+    Also samples event loop lag and process RSS.
+    """
+
+    def __init__(self, enabled: bool = False, host: str = "127.0.0.1", port: int = 9108,
+                 lag_interval: float = 0.5, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize metrics server.
+
+        Args:
+            enabled: Serve metrics (start() does nothing when False)
+            host: Bind address (keep local; there is no authentication)
+            port: Port number
+            lag_interval: Seconds between event loop lag samples
+            registry: Registry to serve (a new one if None)
+        """
+        self.enabled = enabled
+        self.host = host
+        self.port = port
+        self.lag_interval = lag_interval
+        self.registry = registry or MetricsRegistry()
+        self._server = None
+        self._lag_task: Optional[asyncio.Task] = None
+
+        self.loop_lag = LatencyHistogram("event loop lag")
+        self.stats = {
+            'scrapes': 0,
+            'max_loop_lag_ms': 0.0
+        }
+
+        self.registry.register("event_loop_lag_seconds", HISTOGRAM,
+                               "Delay of event loop wake-ups past their scheduled time",
+                               lambda: self.loop_lag)
+        self.registry.register("process_resident_memory_bytes", GAUGE,
+                               "Resident set size of the process", current_rss_bytes)
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "MetricsServer":
+        """
+        Create a metrics server from the "metrics" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            MetricsServer
+        """
+        settings = config.get('metrics', {})
+        return cls(settings.get('enabled', False), settings.get('host', "127.0.0.1"),
+                   settings.get('port', 9108), settings.get('lag_interval', 0.5))
+
+    async def start(self) -> None:
+        """Start serving and sampling loop lag (no-op when disabled)."""
+        if not self.enabled or self._server is not None:
+            return
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        except OSError as e:
+            print(f"[WARNING] Metrics endpoint disabled: {e}")
+            return
+        self.port = self._server.sockets[0].getsockname()[1]  # Resolves port 0
+        self._lag_task = asyncio.create_task(self._sample_loop_lag())
+        print(f"[OK] Metrics endpoint on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        """Stop the endpoint."""
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _sample_loop_lag(self) -> None:
+        """Measure how late the loop wakes a sleeping task."""
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.lag_interval
+            await asyncio.sleep(self.lag_interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000.0)
+            self.loop_lag.record(lag_ms)
+            self.stats['max_loop_lag_ms'] = max(self.stats['max_loop_lag_ms'], lag_ms)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer one HTTP request."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5.0)
+            while (await asyncio.wait_for(reader.readline(), timeout=5.0)) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else ""
+            if parts and parts[0] == "GET" and path in ("/metrics", "/"):
+                self.stats['scrapes'] += 1
+                try:
+                    status, body = "200 OK", self.registry.render().encode("utf-8")
+                except Exception as e:
+                    print(f"[ERROR] Metrics render failed: {type(e).__name__}: {e}")
+                    status, body = "500 Internal Server Error", b"Metrics render failed\n"
+            else:
+                status, body = "404 Not Found", b"Not found\n"
+
+            writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\n"
+                          f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        server = MetricsServer(enabled=True, port=0)
+        registry = server.registry
+        registry.register("bars_processed_total", COUNTER, "Closed bars run through detection")
+        registry.inc("bars_processed_total", 42)
+        registry.inc("rejections_total", reason="risk")
+        await server.start()
+        await asyncio.sleep(1.1)
+
+        reader, writer = await asyncio.open_connection(server.host, server.port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        print((await reader.read()).decode())
+        writer.close()
+        await server.stop()
+
+    asyncio.run(demo())
@@ -0,0 +1,213 @@
+"""
+In-process mock exchange for order management testing.
+Acks orders after a configurable latency, fills market orders, links
+one-cancels-other pairs, and can reject orders, so the order pipeline can
+be exercised and timed offline.
+"""
+
+import asyncio
+import itertools
+import random
+from typing import Callable, Dict, List, Optional
+
+
+class MockExchange:
+    """
+    Stand-in for the async Tradovate order endpoints.
+    Implements get_account_list(), place_order(), place_oco() and
+    cancel_order() like AsyncTradovateAPI.
+    """
+
+    def __init__(self, ack_latency: float = 0.0, jitter: float = 0.0, fill_latency: float = 0.0,
+                 reject_rate: float = 0.0, accounts: Optional[List[Dict]] = None, seed: Optional[int] = None,
+                 account_latency: Optional[Dict[str, float]] = None):
+        """
+        Initialize mock exchange.
+
+        Args:
+            ack_latency: Seconds before an order is acked
+            jitter: Maximum extra random ack delay in seconds
+            fill_latency: Seconds after the ack before market orders fill
+            reject_rate: Fraction of orders rejected (0-1)
+            accounts: Accounts returned by get_account_list()
+            seed: Random seed for reproducible jitter/rejections
+            account_latency: Extra ack delay in seconds per account name
+        """
+        self.ack_latency = ack_latency
+        self.jitter = jitter
+        self.fill_latency = fill_latency
+        self.reject_rate = reject_rate
+        self.accounts = accounts or [{'id': 1, 'name': 'DEMO0001'}]
+        self.random = random.Random(seed)
+        self.account_latency = dict(account_latency or {})
+
+        self.orders = {}  # order id -> order body with 'status'
+        self.listeners = []  # callback(order_id, status, filled_qty)
+        self.rejected_symbols = set()
+        self.rejected_accounts = set()
+        self._ids = itertools.count(1000)
+        self._tasks = set()
+
+    def subscribe(self, callback: Callable) -> None:
+        """
+        Register for order updates (like a user sync subscription).
+
+        Args:
+            callback: Called with (order_id, status, filled_qty)
+        """
+        self.listeners.append(callback)
+
+    async def get_account_list(self) -> List[Dict]:
+        """
+        Get accounts.
+
+        Returns:
+            List of account dictionaries
+        """
+        return list(self.accounts)
+
+    async def _accept(self, order_details: Dict) -> bool:
+        """Wait for the ack latency and decide whether an order is accepted."""
+        delay = self.ack_latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        delay += self.account_latency.get(order_details.get('accountSpec'), 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        return not (order_details.get('symbol') in self.rejected_symbols or
+                    order_details.get('accountSpec') in self.rejected_accounts or
+                    (self.reject_rate and self.random.random() < self.reject_rate))
+
+    async def place_order(self, order_details: Dict, timeout: Optional[float] = None) -> Dict:
+        """
+        Ack (or reject) an order after the configured latency.
+
+        Args:
+            order_details: Tradovate placeorder body
+            timeout: Ignored (the caller enforces its own timeout)
+
+        Returns:
+            {'orderId': id} or {'failureReason', 'failureText'}
+        """
+        if not await self._accept(order_details):
+            return {'failureReason': 'RiskCheck', 'failureText': 'Rejected by mock exchange'}
+
+        order_id = next(self._ids)
+        self.orders[order_id] = {**order_details, 'status': 'Working'}
+
+        if order_details.get('orderType') == 'Market':
+            task = asyncio.ensure_future(self._fill_later(order_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        return {'orderId': order_id}
+
+    async def place_oco(self, order_details: Dict, other: Dict, timeout: Optional[float] = None) -> Dict:
+        """
+        Ack (or reject) a one-cancels-other pair after the configured latency.
+        A full fill of either order cancels the other.
+
+        Args:
+            order_details: Tradovate placeorder body of the first order
+            other: Second order's side, type and price
+            timeout: Ignored (the caller enforces its own timeout)
+
+        Returns:
+            {'orderId': id, 'ocoId': other id} or {'failureReason', 'failureText'}
+        """
+        if not await self._accept(order_details):
+            return {'failureReason': 'RiskCheck', 'failureText': 'Rejected by mock exchange'}
+
+        order_id, oco_id = next(self._ids), next(self._ids)
+        self.orders[order_id] = {**order_details, 'status': 'Working', 'oco': oco_id}
+        self.orders[oco_id] = {**order_details, **other, 'status': 'Working', 'oco': order_id}
+        return {'orderId': order_id, 'ocoId': oco_id}
+
+    async def cancel_order(self, order_id: int, timeout: Optional[float] = None) -> Dict:
+        """
+        Cancel a working order after the ack latency.
+
+        Args:
+            order_id: Exchange order id
+            timeout: Ignored (the caller enforces its own timeout)
+
+        Returns:
+            {'orderId': id} or {'failureReason', 'failureText'}
+        """
+        if self.ack_latency > 0:
+            await asyncio.sleep(self.ack_latency)
+        order = self.orders.get(order_id)
+        if order is None or order['status'] not in ('Working', 'PartiallyFilled'):
+            return {'failureReason': 'UnknownReason', 'failureText': 'Order is not working'}
+        self.cancel(order_id)
+        return {'orderId': order_id}
+
+    def working_orders(self) -> List[int]:
+        """
+        Get ids of orders that are still live.
+
+        Returns:
+            List of exchange order ids
+        """
+        return [order_id for order_id, order in self.orders.items()
+                if order['status'] in ('Working', 'PartiallyFilled')]
+
+    async def _fill_later(self, order_id: int) -> None:
+        """Fill a market order after the fill latency."""
+        if self.fill_latency > 0:
+            await asyncio.sleep(self.fill_latency)
+        if self.orders[order_id]['status'] == 'Working':
+            self.fill(order_id)
+
+    def fill(self, order_id: int, quantity: Optional[int] = None) -> None:
+        """
+        Fill an order (fully unless a partial quantity is given).
+
+        Args:
+            order_id: Exchange order id
+            quantity: Cumulative filled quantity
+        """
+        order = self.orders[order_id]
+        filled = order['orderQty'] if quantity is None else quantity
+        order['status'] = 'Filled' if filled >= order['orderQty'] else 'PartiallyFilled'
+        self._notify(order_id, order['status'], filled)
+
+        other = self.orders.get(order.get('oco'))
+        if order['status'] == 'Filled' and other and other['status'] == 'Working':
+            self.cancel(order['oco'])
+
+    def cancel(self, order_id: int) -> None:
+        """
+        Cancel a working order.
+
+        Args:
+            order_id: Exchange order id
+        """
+        self.orders[order_id]['status'] = 'Canceled'
+        self._notify(order_id, 'Canceled', None)
+
+    def reject(self, order_id: int) -> None:
+        """
+        Reject an acked order (e.g., a late risk check).
+
+        Args:
+            order_id: Exchange order id
+        """
+        self.orders[order_id]['status'] = 'Rejected'
+        self._notify(order_id, 'Rejected', 0)
+
+    def _notify(self, order_id: int, status: str, filled_qty: Optional[int]) -> None:
+        """Send an order update to every listener."""
+        for callback in self.listeners:
+            callback(order_id, status, filled_qty)
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        exchange = MockExchange(ack_latency=0.001)
+        exchange.subscribe(lambda oid, status, qty: print(f"Update: {oid} {status} {qty}"))
+        print(await exchange.place_order({'symbol': 'MNQ', 'action': 'Buy',
+                                          'orderQty': 1, 'orderType': 'Market'}))
+        await asyncio.sleep(0.01)
+
+    asyncio.run(demo())
@@ -0,0 +1,450 @@
+"""
+Local mock Tradovate server for load, latency and failure testing.
+Serves the REST endpoints the clients use (auth, token renewal, accounts,
+contracts, /chart/history and orders) plus the market data WebSocket from
+one aiohttp application, with configurable latency, 5xx errors, p-ticket
+penalties and 401 injection.
+
+Run standalone with:
+    python -m aafr.mock_tradovate_server --port 8089 --latency 0.005
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from typing import Dict, List, Optional
+
+try:
+    from aiohttp import web, WSMsgType
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from aafr.bar_resampler import to_epoch_seconds
+from aafr.candle_cache import to_iso_timestamp
+
+
+class MockTradovateServer:
+    """
+    In-process stand-in for the Tradovate REST and market data APIs.
+
+    REST endpoints live under base_url (".../v1"), the market data
+    WebSocket at md_url. Faults apply to every REST request except the
+    access token request, so clients can always (re)authenticate.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 fail_first: int = 0, penalties: int = 0, penalty_seconds: float = 0.2,
+                 unauthorized_rate: float = 0.0, token_lifetime: float = 5400,
+                 series_start: int = 1736172000, series_bars: int = 1000,
+                 host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+        """
+        Initialize mock server.
+
+        Args:
+            latency: Seconds each REST request takes
+            jitter: Maximum extra random latency in seconds
+            error_rate: Fraction of REST requests answered with HTTP 503
+            fail_first: Number of initial REST requests answered with HTTP 503
+            penalties: Number of REST requests (after fail_first) answered with a p-ticket
+            penalty_seconds: p-time sent with each penalty
+            unauthorized_rate: Fraction of REST requests answered with HTTP 401
+            token_lifetime: Seconds until issued tokens expire
+            series_start: Epoch seconds of the first 1-minute history bar
+            series_bars: Number of 1-minute bars available from /chart/history
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            seed: Random seed for reproducible jitter and fault injection
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for the mock Tradovate server")
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.fail_first = fail_first
+        self.penalties = penalties
+        self.penalty_seconds = penalty_seconds
+        self.unauthorized_rate = unauthorized_rate
+        self.token_lifetime = token_lifetime
+        self.series_start = series_start
+        self.series_bars = series_bars
+        self.host = host
+        self.port = port
+        self.random = random.Random(seed)
+
+        self.accounts = [{'id': 1, 'name': 'DEMO0001', 'userId': 1, 'active': True}]
+        self.contracts = {}  # symbol -> contract id
+        self.orders = {}  # order id -> order
+        self.valid_tokens = {}  # token -> expiry (epoch seconds)
+        self._ids = itertools.count(1000)
+        self._token_ids = itertools.count(1)
+
+        # Request statistics
+        self.calls = 0
+        self.endpoint_calls = {}
+        self.history_calls = 0
+        self.auth_calls = 0
+        self.renew_calls = 0
+        self.unauthorized = 0
+        self.request_times = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.peers = set()
+
+        # Market data WebSocket state
+        self.md_connections = set()
+        self.md_requests = []
+        self.heartbeats = 0
+        self.charts = {}  # realtime chart id -> symbol
+        self.quotes = set()
+        self.subscribed = asyncio.Event()
+        self._chart_ids = itertools.count(100, 2)
+
+        self.runner = None
+        self.base_url = None
+        self.md_url = None
+
+    # ------------------------------------------------------------------
+    # Tokens and fault injection
+    # ------------------------------------------------------------------
+
+    def issue_tokens(self) -> Dict:
+        """
+        Create a new access/md token pair.
+
+        Returns:
+            Access token response body
+        """
+        n = next(self._token_ids)
+        expiry = time.time() + self.token_lifetime
+        token, md_token = f"mock-token-{n}", f"mock-md-token-{n}"
+        self.valid_tokens[token] = expiry
+        self.valid_tokens[md_token] = expiry
+        return {
+            'accessToken': token,
+            'mdAccessToken': md_token,
+            'expirationTime': to_iso_timestamp(int(expiry)),
+            'userId': 1,
+            'hasMarketData': True
+        }
+
+    def revoke_tokens(self) -> None:
+        """Invalidate every issued token (simulates a session expiring server-side)."""
+        self.valid_tokens.clear()
+
+    def _token_valid(self, token: Optional[str]) -> bool:
+        expiry = self.valid_tokens.get(token)
+        return expiry is not None and expiry > time.time()
+
+    def _bearer(self, request) -> Optional[str]:
+        header = request.headers.get('Authorization', '')
+        return header[7:] if header.startswith('Bearer ') else None
+
+    async def _handle(self, request, handler):
+        """Apply auth checks, fault injection and latency around an endpoint."""
+        self.calls += 1
+        path = request.path
+        self.endpoint_calls[path] = self.endpoint_calls.get(path, 0) + 1
+        self.request_times.append(asyncio.get_running_loop().time())
+        self.peers.add(request.transport.get_extra_info('peername') if request.transport else None)
+
+        if not self._token_valid(self._bearer(request)) or (
+                self.unauthorized_rate and self.random.random() < self.unauthorized_rate):
+            self.unauthorized += 1
+            return web.json_response({'errorText': 'Access is denied'}, status=401)
+        if self.calls <= self.fail_first or (self.error_rate and self.random.random() < self.error_rate):
+            return web.json_response({'errorText': 'busy'}, status=503)
+        if self.calls <= self.fail_first + self.penalties:
+            return web.json_response({'p-ticket': 'mock-ticket', 'p-time': self.penalty_seconds})
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return await handler(request)
+        finally:
+            self.in_flight -= 1
+
+    def _route(self, handler):
+        async def wrapped(request):
+            return await self._handle(request, handler)
+        return wrapped
+
+    # ------------------------------------------------------------------
+    # REST endpoints
+    # ------------------------------------------------------------------
+
+    async def _auth(self, request):
+        self.auth_calls += 1
+        body = await request.json()
+        if not body.get('name') or not body.get('password'):
+            return web.json_response({'errorText': 'Incorrect username or password'})
+        return web.json_response(self.issue_tokens())
+
+    async def _renew(self, request):
+        self.renew_calls += 1
+        return web.json_response(self.issue_tokens())
+
+    async def _account_list(self, request):
+        return web.json_response(self.accounts)
+
+    async def _contract_find(self, request):
+        name = request.query.get('name', '')
+        if name not in self.contracts:
+            self.contracts[name] = next(self._ids)
+        return web.json_response({'id': self.contracts[name], 'name': name})
+
+    def _bar(self, index: int) -> Dict:
+        base = 100.0 + (index % 50)
+        return {
+            'timestamp': to_iso_timestamp(self.series_start + index * 60),
+            'open': base, 'high': base + 1.0, 'low': base - 1.0, 'close': base + 0.5,
+            'volume': 15
+        }
+
+    def _select(self, time_range: Dict) -> List[Dict]:
+        """Apply a Tradovate timeRange to the 1-minute series."""
+        first, last = 0, self.series_bars - 1
+        if 'asFarAsTimestamp' in time_range:
+            since = to_epoch_seconds(time_range['asFarAsTimestamp'])
+            first = max(first, -(-(since - self.series_start) // 60))
+        if 'closestTimestamp' in time_range:
+            until = to_epoch_seconds(time_range['closestTimestamp'])
+            last = min(last, (until - self.series_start) // 60)
+        count = time_range.get('asMuchAsElements')
+        if count is not None:
+            first = max(first, last - count + 1)
+        return [self._bar(i) for i in range(first, last + 1)]
+
+    async def _history(self, request):
+        self.history_calls += 1
+        body = await request.json()
+        return web.json_response({'bars': self._select(body.get('timeRange', {}))})
+
+    async def _place_order(self, request):
+        body = await request.json()
+        if not body.get('symbol') or body.get('orderQty', 0) <= 0:
+            return web.json_response({'failureReason': 'UnknownReason',
+                                      'failureText': 'Invalid order'})
+        order_id = next(self._ids)
+        status = 'Filled' if body.get('orderType') == 'Market' else 'Working'
+        self.orders[order_id] = {**body, 'id': order_id, 'ordStatus': status,
+                                 'timestamp': to_iso_timestamp(int(time.time()))}
+        return web.json_response({'orderId': order_id})
+
+    async def _place_oco(self, request):
+        body = await request.json()
+        other = body.pop('other', None) or {}
+        if not body.get('symbol') or body.get('orderQty', 0) <= 0 or not other.get('orderType'):
+            return web.json_response({'failureReason': 'UnknownReason',
+                                      'failureText': 'Invalid order'})
+        order_id, oco_id = next(self._ids), next(self._ids)
+        timestamp = to_iso_timestamp(int(time.time()))
+        self.orders[order_id] = {**body, 'id': order_id, 'ordStatus': 'Working',
+                                 'ocoId': oco_id, 'timestamp': timestamp}
+        self.orders[oco_id] = {**body, **other, 'id': oco_id, 'ordStatus': 'Working',
+                               'ocoId': order_id, 'timestamp': timestamp}
+        return web.json_response({'orderId': order_id, 'ocoId': oco_id})
+
+    async def _order_list(self, request):
+        return web.json_response(list(self.orders.values()))
+
+    async def _cancel_order(self, request):
+        body = await request.json()
+        order = self.orders.get(body.get('orderId'))
+        if order is None:
+            return web.json_response({'errorText': 'Order not found'}, status=404)
+        if order['ordStatus'] == 'Working':
+            order['ordStatus'] = 'Canceled'
+        return web.json_response({'orderId': order['id']})
+
+    # ------------------------------------------------------------------
+    # Market data WebSocket
+    # ------------------------------------------------------------------
+
+    async def _md_websocket(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.md_connections.add(ws)
+        authorized = False
+        await ws.send_str('o')
+        try:
+            async for message in ws:
+                if message.type != WSMsgType.TEXT:
+                    break
+                if message.data == '[]':
+                    self.heartbeats += 1
+                    continue
+                endpoint, request_id, _, body = message.data.split('\n', 3)
+                self.md_requests.append(endpoint)
+                if endpoint == 'authorize':
+                    authorized = self._token_valid(body)
+                    response = {'s': 200 if authorized else 401, 'i': int(request_id)}
+                elif not authorized:
+                    response = {'s': 401, 'i': int(request_id)}
+                else:
+                    response = self._md_respond(endpoint, int(request_id), body)
+                await ws.send_str('a' + json.dumps([response]))
+        finally:
+            self.md_connections.discard(ws)
+        return ws
+
+    def _md_respond(self, endpoint: str, request_id: int, body: str) -> Dict:
+        if endpoint == 'md/subscribeQuote':
+            self.quotes.add(json.loads(body)['symbol'])
+            return {'s': 200, 'i': request_id}
+        if endpoint == 'md/getChart':
+            chart_id = next(self._chart_ids)
+            self.charts[chart_id] = json.loads(body)['symbol']
+            self.subscribed.set()
+            return {'s': 200, 'i': request_id,
+                    'd': {'historicalId': chart_id + 1, 'realtimeId': chart_id}}
+        if endpoint in ('md/unsubscribeQuote', 'md/cancelChart'):
+            return {'s': 200, 'i': request_id}
+        return {'s': 404, 'i': request_id}
+
+    async def push_bar(self, symbol: str, bar: Dict) -> None:
+        """
+        Send a chart update to every chart subscribed to symbol.
+
+        Args:
+            symbol: Subscribed symbol
+            bar: Tradovate chart bar
+        """
+        charts = [{'id': cid, 'td': 0, 'bars': [bar]} for cid, sym in self.charts.items() if sym == symbol]
+        await self._broadcast({'e': 'chart', 'd': {'charts': charts}})
+
+    async def push_quote(self, contract_id: int, price: float, size: int,
+                         timestamp: str = '2025-01-06T14:00:30Z') -> None:
+        """
+        Send a quote update with a trade print.
+
+        Args:
+            contract_id: Contract id of the quote
+            price: Trade price
+            size: Trade size
+            timestamp: Quote timestamp
+        """
+        await self._broadcast({'e': 'md', 'd': {'quotes': [{
+            'timestamp': timestamp,
+            'contractId': contract_id,
+            'entries': {'Trade': {'price': price, 'size': size}}
+        }]}})
+
+    async def _broadcast(self, message: Dict) -> None:
+        frame = 'a' + json.dumps([message])
+        for ws in list(self.md_connections):
+            if not ws.closed:
+                await ws.send_str(frame)
+
+    async def drop_connections(self) -> None:
+        """Close every market data connection (simulates a network drop)."""
+        self.charts.clear()
+        self.quotes.clear()
+        self.subscribed.clear()
+        for ws in list(self.md_connections):
+            await ws.close()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def build_app(self) -> "web.Application":
+        """
+        Build the aiohttp application.
+
+        Returns:
+            Application with every mock route
+        """
+        app = web.Application()
+        app.router.add_post('/v1/auth/accesstokenrequest', self._auth)
+        app.router.add_get('/v1/auth/renewaccesstoken', self._route(self._renew))
+        app.router.add_get('/v1/account/list', self._route(self._account_list))
+        app.router.add_get('/v1/contract/find', self._route(self._contract_find))
+        app.router.add_post('/v1/chart/history', self._route(self._history))
+        app.router.add_post('/v1/order/placeorder', self._route(self._place_order))
+        app.router.add_post('/v1/order/placeoco', self._route(self._place_oco))
+        app.router.add_get('/v1/order/list', self._route(self._order_list))
+        app.router.add_post('/v1/order/cancelorder', self._route(self._cancel_order))
+        app.router.add_get('/v1/websocket', self._md_websocket)
+        return app
+
+    async def start(self) -> None:
+        """Start serving; base_url and md_url are set afterwards."""
+        self.runner = web.AppRunner(self.build_app())
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{self.host}:{port}/v1"
+        self.md_url = f"ws://{self.host}:{port}/v1/websocket"
+
+    async def stop(self) -> None:
+        """Close market data connections and stop serving."""
+        for ws in list(self.md_connections):
+            await ws.close()
+        await self.runner.cleanup()
+
+    async def __aenter__(self) -> "MockTradovateServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
+
+
+def point_at(api, base_url: str, md_url: Optional[str] = None) -> None:
+    """
+    Redirect a TradovateAPI/AsyncTradovateAPI client to a mock server.
+    The client's on-disk candle and token caches are bypassed.
+
+    Args:
+        api: Client to redirect
+        base_url: Mock REST base URL (server.base_url)
+        md_url: Mock market data URL (server.md_url)
+    """
+    if hasattr(api, '_cache'):
+        api._cache = None
+    else:
+        api.cache = None
+    if hasattr(api, 'token_manager'):
+        api.token_manager.persist = False
+    api.base_url = base_url
+    api.auth_url = f"{base_url}/auth/accesstokenrequest"
+    if md_url:
+        api.api_config['md_ws_url'] = md_url
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a local mock Tradovate server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per REST request')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum extra random latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 503 responses')
+    parser.add_argument('--unauthorized-rate', type=float, default=0.0, help='Fraction of HTTP 401 responses')
+    args = parser.parse_args()
+
+    async def serve():
+        server = MockTradovateServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                                     unauthorized_rate=args.unauthorized_rate, host=args.host, port=args.port)
+        await server.start()
+        print(f"[OK] Mock Tradovate REST at {server.base_url}")
+        print(f"[OK] Mock market data WebSocket at {server.md_url}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\nMock server stopped")
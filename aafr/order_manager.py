@@ -0,0 +1,585 @@
+"""
+Asynchronous order management.
+Pre-builds order templates per symbol and account, submits a signal's entry
+and, once the entry is acked, one take-profit/stop OCO pair per ladder level,
+tracks acks and fills through an order state machine, and records
+submit->ack and signal->order latency.
+"""
+
+import asyncio
+import itertools
+from typing import Callable, Dict, List, Optional
+
+from aafr.latency import LatencyHistogram, now_ms
+
+
+# Order states
+PENDING = "PENDING"        # Built, not yet sent
+SUBMITTED = "SUBMITTED"    # Sent, waiting for the exchange ack
+WORKING = "WORKING"        # Acked, resting at the exchange
+PARTIAL = "PARTIAL"        # Partially filled
+FILLED = "FILLED"
+CANCELLED = "CANCELLED"
+REJECTED = "REJECTED"
+TIMED_OUT = "TIMED_OUT"    # No ack within the order timeout (state unknown)
+
+TERMINAL_STATES = {FILLED, CANCELLED, REJECTED}
+
+# Allowed transitions; anything else is ignored as a stale/out-of-order update
+TRANSITIONS = {
+    PENDING: {SUBMITTED, REJECTED, CANCELLED},  # CANCELLED: never sent
+    SUBMITTED: {WORKING, PARTIAL, FILLED, REJECTED, CANCELLED, TIMED_OUT},
+    TIMED_OUT: {WORKING, PARTIAL, FILLED, REJECTED, CANCELLED},
+    WORKING: {PARTIAL, FILLED, CANCELLED, REJECTED},
+    PARTIAL: {PARTIAL, FILLED, CANCELLED},
+    FILLED: set(),
+    CANCELLED: set(),
+    REJECTED: set()
+}
+
+# Tradovate ordStatus values mapped to order states
+EXCHANGE_STATUS = {
+    'pendingnew': WORKING,
+    'working': WORKING,
+    'partiallyfilled': PARTIAL,
+    'filled': FILLED,
+    'canceled': CANCELLED,
+    'cancelled': CANCELLED,
+    'rejected': REJECTED,
+    'expired': CANCELLED
+}
+
+# Entry states after which the bracket's exits may be sent
+LIVE_STATES = {WORKING, PARTIAL, FILLED}
+
+# Order roles within a bracket
+ROLE_ENTRY = "entry"
+ROLE_STOP = "stop"
+ROLE_TP = "tp"
+
+
+def opposite_action(action: str) -> str:
+    """
+    Get the closing action for an entry action.
+
+    Args:
+        action: "Buy" or "Sell"
+
+    Returns:
+        "Sell" or "Buy"
+    """
+    return "Sell" if action == "Buy" else "Buy"
+
+
+class ManagedOrder:
+    """
+    One order and its lifecycle.
+    """
+
+    def __init__(self, client_id: str, role: str, request: Dict, signal_id: Optional[str] = None):
+        """
+        Initialize managed order.
+
+        Args:
+            client_id: Locally unique order id
+            role: ROLE_ENTRY, ROLE_STOP or ROLE_TP
+            request: Tradovate placeorder body
+            signal_id: Id of the signal the order belongs to
+        """
+        self.client_id = client_id
+        self.role = role
+        self.request = request
+        self.signal_id = signal_id
+        self.parent = None  # Entry order of an exit
+        self.oco = None  # Exit cancelled by the exchange when this one fills
+        self.order_id = None  # Exchange order id, known after the ack
+        self.state = PENDING
+        self.filled_qty = 0
+        self.reject_reason = None
+        self.submitted_at_ms = None
+        self.acked_at_ms = None
+        self.history = [PENDING]
+
+    @property
+    def quantity(self) -> int:
+        """Ordered quantity."""
+        return self.request.get('orderQty', 0)
+
+    @property
+    def is_terminal(self) -> bool:
+        """True once the order can no longer change."""
+        return self.state in TERMINAL_STATES
+
+    @property
+    def ack_latency_ms(self) -> Optional[float]:
+        """Submit->ack latency in milliseconds, if acked."""
+        if self.submitted_at_ms is None or self.acked_at_ms is None:
+            return None
+        return self.acked_at_ms - self.submitted_at_ms
+
+    def transition(self, state: str) -> bool:
+        """
+        Move to a new state if the transition is allowed.
+
+        Args:
+            state: Target state
+
+        Returns:
+            True if the state changed (PARTIAL->PARTIAL counts as a change)
+        """
+        if state not in TRANSITIONS[self.state]:
+            return False
+        self.state = state
+        self.history.append(state)
+        return True
+
+    def to_dict(self) -> Dict:
+        """
+        Convert to a dictionary for logging.
+
+        Returns:
+            Order summary dictionary
+        """
+        return {
+            'client_id': self.client_id,
+            'order_id': self.order_id,
+            'signal_id': self.signal_id,
+            'role': self.role,
+            'action': self.request.get('action'),
+            'order_type': self.request.get('orderType'),
+            'quantity': self.quantity,
+            'price': self.request.get('price', self.request.get('stopPrice')),
+            'state': self.state,
+            'filled_qty': self.filled_qty,
+            'ack_latency_ms': self.ack_latency_ms,
+            'reject_reason': self.reject_reason
+        }
+
+
+class OrderManager:
+    """
+    Submits and tracks bracket orders for trade signals.
+
+    Order bodies are pre-built per symbol when monitoring starts so the hot
+    path only copies a template and fills in side, quantity and price.
+    """
+
+    def __init__(self, api, account_id: Optional[int] = None, account_spec: Optional[str] = None,
+                 order_timeout: float = 2.0, is_automated: bool = True):
+        """
+        Initialize order manager.
+
+        Args:
+            api: Client with an async place_order(order_details, timeout=...) and
+                 get_account_list() (AsyncTradovateAPI or a mock exchange)
+            account_id: Tradovate account id (resolved from the account list if None)
+            account_spec: Tradovate account name (resolved with the id if None)
+            order_timeout: Seconds to wait for each order ack
+            is_automated: Flag orders as automated (required by Tradovate for algos)
+        """
+        self.api = api
+        self.account_id = account_id
+        self.account_spec = account_spec
+        self.order_timeout = order_timeout
+        self.is_automated = is_automated
+
+        self.templates = {}  # symbol -> base order body
+        self.orders = {}  # client_id -> ManagedOrder
+        self._by_exchange_id = {}  # exchange order id -> ManagedOrder
+        self._early_updates = {}  # exchange order id -> updates that beat the REST ack
+        self._exits = {}  # entry client_id -> exit orders
+        self._ids = itertools.count(1)
+        self._cancelling = set()  # client_ids with a cancel request sent
+        self._tasks = set()
+        self.entry_listeners = []
+
+        self.ack_latency = LatencyHistogram("submit->ack")
+        self.signal_latency = LatencyHistogram("signal->order")
+        self.stats = {
+            'brackets': 0,
+            'submitted': 0,
+            'acked': 0,
+            'filled': 0,
+            'rejected': 0,
+            'timed_out': 0,
+            'exits_withheld': 0,
+            'exits_cancelled': 0
+        }
+
+    @classmethod
+    def from_config(cls, api, config: Dict) -> "OrderManager":
+        """
+        Build a manager from the "order_management" config section.
+
+        Args:
+            api: Async order client
+            config: Full configuration dictionary
+
+        Returns:
+            OrderManager
+        """
+        settings = config.get('order_management', {})
+        return cls(
+            api,
+            account_id=settings.get('account_id'),
+            account_spec=settings.get('account_spec'),
+            order_timeout=settings.get('order_timeout_seconds', 2.0),
+            is_automated=settings.get('is_automated', True)
+        )
+
+    @property
+    def account_resolved(self) -> bool:
+        """True once both the account id and name are known."""
+        return self.account_id is not None and bool(self.account_spec)
+
+    async def resolve_account(self) -> bool:
+        """
+        Look up the account to trade if it is not configured.
+        An unavailable account list leaves the account unresolved.
+
+        Returns:
+            True if an account is known
+        """
+        if self.account_resolved:
+            return True
+
+        accounts = await self.api.get_account_list()
+        if not accounts:
+            print(f"[ERROR] Account list unavailable; account {self.account_spec or self.account_id} unresolved")
+            return False
+        for account in accounts:
+            account_id = account.get('id', account.get('accountId'))
+            account_spec = account.get('name', account.get('accountName'))
+            if self.account_id is not None and account_id != self.account_id:
+                continue
+            if self.account_spec and account_spec != self.account_spec:
+                continue
+            self.account_id = account_id
+            self.account_spec = account_spec
+            return True
+
+        print(f"[ERROR] No trading account available for order placement "
+              f"(id={self.account_id}, name={self.account_spec})")
+        return False
+
+    async def prepare(self, symbols: List[str]) -> bool:
+        """
+        Resolve the account and pre-build order templates for symbols.
+
+        Args:
+            symbols: Symbols that may be traded
+
+        Returns:
+            True if templates are ready
+        """
+        if not await self.resolve_account():
+            return False
+        for symbol in symbols:
+            self.templates[symbol] = self._build_template(symbol)
+        print(f"[OK] Order templates ready for {', '.join(symbols)} (account {self.account_spec})")
+        return True
+
+    def _build_template(self, symbol: str) -> Dict:
+        """Build the invariant part of an order body."""
+        return {
+            'accountSpec': self.account_spec,
+            'accountId': self.account_id,
+            'symbol': symbol,
+            'isAutomated': self.is_automated
+        }
+
+    def build_bracket(self, signal: Dict, tp_ladder: Optional[List[Dict]] = None) -> List[ManagedOrder]:
+        """
+        Build the entry and, per take-profit level, a take-profit and a stop
+        for that level's quantity (sent as an OCO pair, so each fill leaves
+        no stop working for contracts already closed).
+
+        Args:
+            signal: Trade signal ('symbol', 'direction', 'position_size',
+                    'stop_loss', 'take_profit', optional 'signal_id')
+            tp_ladder: Optional list of {'price', 'qty'}; defaults to one TP
+                       for the full size
+
+        Returns:
+            Entry followed by (take-profit, stop) per level
+        """
+        symbol = signal['symbol']
+        template = self.templates.get(symbol) or self._build_template(symbol)
+        action = "Buy" if signal['direction'] in ('LONG', 'BUY') else "Sell"
+        exit_action = opposite_action(action)
+        size = int(signal['position_size'])
+        signal_id = signal.get('signal_id')
+
+        if not tp_ladder:
+            tp_ladder = [{'price': signal['take_profit'], 'qty': size}]
+
+        entry = self._new_order(ROLE_ENTRY, {**template, 'action': action, 'orderQty': size,
+                                             'orderType': 'Market'}, signal_id)
+        orders = [entry]
+        for level in tp_ladder:
+            if level['qty'] <= 0:
+                continue
+            tp = self._new_order(ROLE_TP, {**template, 'action': exit_action, 'orderQty': level['qty'],
+                                           'orderType': 'Limit', 'price': level['price']}, signal_id)
+            stop = self._new_order(ROLE_STOP, {**template, 'action': exit_action, 'orderQty': level['qty'],
+                                               'orderType': 'Stop', 'stopPrice': signal['stop_loss']}, signal_id)
+            tp.parent = stop.parent = entry
+            tp.oco, stop.oco = stop, tp
+            orders.extend([tp, stop])
+        self._exits[entry.client_id] = orders[1:]
+        return orders
+
+    def _new_order(self, role: str, body: Dict, signal_id: Optional[str]) -> ManagedOrder:
+        """Create and register an order."""
+        client_id = f"{body['symbol']}-{next(self._ids)}"
+        order = ManagedOrder(client_id, role, body, signal_id)
+        self.orders[client_id] = order
+        return order
+
+    async def submit_bracket(self, signal: Dict, tp_ladder: Optional[List[Dict]] = None,
+                             signal_time_ms: Optional[float] = None) -> List[ManagedOrder]:
+        """
+        Submit a signal's bracket.
+
+        The entry goes first; the exit OCO pairs are sent concurrently once
+        it is acked. If the entry is rejected or not acked in time, the exits
+        are never sent (marked CANCELLED), so no exit can open a position in
+        the opposite direction.
+
+        Args:
+            signal: Trade signal (see build_bracket)
+            tp_ladder: Optional take-profit ladder
+            signal_time_ms: now_ms() timestamp of signal detection, for
+                            signal->order latency
+
+        Returns:
+            Orders with their resulting states
+        """
+        orders = self.build_bracket(signal, tp_ladder)
+        self.stats['brackets'] += 1
+
+        if signal_time_ms is not None:
+            self.signal_latency.record_since(signal_time_ms)
+
+        entry, exits = orders[0], orders[1:]
+        await self._submit(entry)
+
+        if entry.state not in LIVE_STATES:
+            self._withhold_exits(entry)
+            reason = entry.reject_reason if entry.state == REJECTED else f"entry {entry.state}"
+            print(f"[ERROR] {signal['symbol']} entry not placed ({reason}); exit orders not sent")
+            return orders
+
+        await asyncio.gather(*(self._submit(tp, stop) for tp, stop in zip(exits[::2], exits[1::2])))
+        if entry.state not in LIVE_STATES:
+            # Entry rejected or cancelled while the exits were in flight
+            await self.cancel_exits(entry)
+        return orders
+
+    async def _submit(self, order: ManagedOrder, oco: Optional[ManagedOrder] = None) -> None:
+        """Send one order (or an OCO pair) and apply the ack."""
+        sent = [order] if oco is None else [order, oco]
+        for item in sent:
+            item.transition(SUBMITTED)
+            item.submitted_at_ms = now_ms()
+            self.stats['submitted'] += 1
+
+        if oco is None:
+            request = self.api.place_order(dict(order.request), timeout=self.order_timeout)
+        else:
+            request = self.api.place_oco(dict(order.request), self._oco_leg(oco), timeout=self.order_timeout)
+        try:
+            result = await asyncio.wait_for(request, self.order_timeout)
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            # Sent but not acked: the exchange may have the order, so it is never resent
+            reason = str(e) or f"within {self.order_timeout}s"
+            for item in sent:
+                item.transition(TIMED_OUT)
+                self.stats['timed_out'] += 1
+                print(f"[WARNING] No ack for {item.client_id} ({reason})")
+            return
+        except Exception as e:
+            result = {'failureReason': 'ClientError', 'failureText': str(e)}
+
+        self.apply_ack(order, result)
+        if oco is not None:
+            self.apply_ack(oco, dict(result, orderId=result.get('ocoId')) if result else result)
+
+    @staticmethod
+    def _oco_leg(order: ManagedOrder) -> Dict:
+        """Second order of an OCO pair (shares account, symbol and quantity)."""
+        keys = ('action', 'orderType', 'price', 'stopPrice')
+        return {key: order.request[key] for key in keys if key in order.request}
+
+    def _withhold_exits(self, entry: ManagedOrder) -> None:
+        """Mark a dead entry's unsent exits CANCELLED."""
+        for order in self._exits.get(entry.client_id, []):
+            if order.state == PENDING and order.transition(CANCELLED):
+                self.stats['exits_withheld'] += 1
+
+    async def cancel_exits(self, entry: ManagedOrder) -> int:
+        """
+        Cancel the exits of an entry that was rejected or cancelled.
+
+        Args:
+            entry: Entry order
+
+        Returns:
+            Number of cancel requests sent
+        """
+        self._withhold_exits(entry)
+        working = [order for order in self._exits.get(entry.client_id, [])
+                   if order.order_id is not None and not order.is_terminal
+                   and order.client_id not in self._cancelling]
+        self._cancelling.update(order.client_id for order in working)
+        results = await asyncio.gather(*(self.cancel_order(order) for order in working))
+        return sum(results)
+
+    async def cancel_order(self, order: ManagedOrder) -> bool:
+        """
+        Request cancellation of a working order.
+        The CANCELLED state arrives with the exchange's order update.
+
+        Args:
+            order: Acked order
+
+        Returns:
+            True if the cancel request was accepted
+        """
+        try:
+            result = await asyncio.wait_for(
+                self.api.cancel_order(order.order_id, timeout=self.order_timeout),
+                self.order_timeout
+            )
+        except Exception as e:
+            result = {'failureText': str(e) or type(e).__name__}
+        if not result or result.get('failureReason') or result.get('failureText'):
+            print(f"[ERROR] Cancel failed for {order.client_id}: {(result or {}).get('failureText')}")
+            return False
+        self.stats['exits_cancelled'] += 1
+        return True
+
+    def apply_ack(self, order: ManagedOrder, result: Optional[Dict]) -> None:
+        """
+        Apply a placeorder response.
+
+        Args:
+            order: Order that was submitted
+            result: Response body (None when the request failed)
+        """
+        order.acked_at_ms = now_ms()
+
+        if not result or result.get('failureReason') or not result.get('orderId'):
+            order.reject_reason = (result or {}).get('failureText') or (result or {}).get('failureReason') or 'no response'
+            order.transition(REJECTED)
+            self.stats['rejected'] += 1
+            return
+
+        order.order_id = result['orderId']
+        self._by_exchange_id[order.order_id] = order
+        self.ack_latency.record(order.ack_latency_ms)
+        self.stats['acked'] += 1
+
+        order.transition(WORKING)
+        # Mock/paper endpoints may report the fill in the ack itself
+        if result.get('status'):
+            self.on_order_update(order.order_id, result['status'],
+                                 result.get('filledQty', order.quantity))
+        for status, filled_qty in self._early_updates.pop(order.order_id, []):
+            self.on_order_update(order.order_id, status, filled_qty)
+
+    def on_order_update(self, order_id, status: str, filled_qty: Optional[int] = None) -> Optional[ManagedOrder]:
+        """
+        Apply an order status update (user sync or polling).
+
+        Args:
+            order_id: Exchange order id
+            status: Tradovate ordStatus (e.g., "Working", "Filled")
+            filled_qty: Cumulative filled quantity
+
+        Returns:
+            The updated order, or None for unknown orders/stale updates
+        """
+        order = self._by_exchange_id.get(order_id)
+        if order is None:
+            # Fill reports can arrive before the placeorder response; replay them on ack
+            self._early_updates.setdefault(order_id, []).append((status, filled_qty))
+            return None
+
+        state = EXCHANGE_STATUS.get(str(status).replace(' ', '').lower())
+        if state is None:
+            return None
+        if state == FILLED and filled_qty is not None and filled_qty < order.quantity:
+            state = PARTIAL
+
+        if not order.transition(state):
+            return None
+
+        if filled_qty is not None:
+            order.filled_qty = filled_qty
+        if state == FILLED:
+            order.filled_qty = order.quantity
+            self.stats['filled'] += 1
+        elif state == REJECTED:
+            self.stats['rejected'] += 1
+
+        if order.role == ROLE_ENTRY and state in (REJECTED, CANCELLED) and not order.filled_qty:
+            for callback in self.entry_listeners:
+                callback(order)
+            self._schedule(self.cancel_exits(order))
+        return order
+
+    def on_entry_closed(self, callback: Callable) -> None:
+        """
+        Register for entries rejected or cancelled without a fill after they
+        were acked or timed out (a rejected ack is reported by submit_bracket).
+
+        Args:
+            callback: Called with the entry ManagedOrder
+        """
+        self.entry_listeners.append(callback)
+
+    def _schedule(self, coroutine) -> None:
+        """Run a coroutine in the background from a synchronous update callback."""
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def open_orders(self) -> List[ManagedOrder]:
+        """
+        Get orders that are not in a terminal state.
+
+        Returns:
+            List of open orders
+        """
+        return [order for order in self.orders.values() if not order.is_terminal]
+
+    def latency_report(self) -> Dict:
+        """
+        Get latency summaries.
+
+        Returns:
+            Dictionary with 'submit_to_ack' and 'signal_to_order' summaries
+        """
+        return {
+            'submit_to_ack': self.ack_latency.summary(),
+            'signal_to_order': self.signal_latency.summary()
+        }
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.mock_exchange import MockExchange
+
+    async def demo():
+        manager = OrderManager(MockExchange(ack_latency=0.002))
+        await manager.prepare(['MNQ'])
+        signal = {'symbol': 'MNQ', 'direction': 'LONG', 'position_size': 3,
+                  'stop_loss': 20990.0, 'take_profit': 21030.0}
+        orders = await manager.submit_bracket(signal, signal_time_ms=now_ms())
+        for order in orders:
+            print(order.to_dict())
+        print(manager.ack_latency.format())
+        print(manager.signal_latency.format())
+
+    asyncio.run(demo())
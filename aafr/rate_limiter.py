@@ -0,0 +1,136 @@
+"""
+Token-bucket rate limiting for Tradovate API requests.
+Smooths bursts of concurrent requests to a configured rate and pauses every
+caller when the server responds with a penalty (p-ticket/p-time).
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """
+    Asyncio token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Waiters are served in arrival order; a penalty blocks all of them until
+    it expires and empties the bucket so requests resume at the base rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[int] = None):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum burst size (defaults to max(1, rate))
+
+        Raises:
+            ValueError: If rate is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+        # Statistics
+        self.stats = {
+            'acquired': 0,
+            'waited_seconds': 0.0,
+            'penalties': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["TokenBucket"]:
+        """
+        Build a bucket from the "rate_limit" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            TokenBucket, or None if no rate limit is configured
+        """
+        settings = config.get('rate_limit')
+        if not settings or not settings.get('requests_per_second'):
+            return None
+        return cls(settings['requests_per_second'], settings.get('burst'))
+
+    def _refill(self, now: float) -> None:
+        """Add tokens for the time elapsed since the last update."""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Wait until tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            Seconds spent waiting
+        """
+        started = time.monotonic()
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    break
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+        waited = time.monotonic() - started
+        self.stats['acquired'] += 1
+        self.stats['waited_seconds'] += waited
+        return waited
+
+    def penalize(self, seconds: float) -> None:
+        """
+        Block all acquirers for a server-imposed penalty.
+
+        Args:
+            seconds: Penalty duration (Tradovate p-time)
+        """
+        self.stats['penalties'] += 1
+        now = time.monotonic()
+        self._blocked_until = max(self._blocked_until, now + max(0.0, seconds))
+        # Resume at the sustained rate rather than with a full burst
+        self._tokens = 0.0
+        self._updated = self._blocked_until
+
+    def is_blocked(self) -> bool:
+        """
+        Check if a penalty is currently active.
+
+        Returns:
+            True while acquirers are blocked
+        """
+        return time.monotonic() < self._blocked_until
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        bucket = TokenBucket(rate=5, capacity=2)
+        start = time.monotonic()
+        for i in range(8):
+            await bucket.acquire()
+            print(f"Request {i + 1} at {time.monotonic() - start:.2f}s")
+        bucket.penalize(1.0)
+        await bucket.acquire()
+        print(f"After penalty at {time.monotonic() - start:.2f}s, stats: {bucket.stats}")
+
+    asyncio.run(demo())
@@ -0,0 +1,361 @@
+"""
+Accelerated replay of recorded market data through the live pipeline.
+Recorded bars or ticks are pushed into the same BarPipeline the live
+systems use, paced at 1x, Nx or maximum speed, while a simulated clock
+stands in for the wall clock so time-of-day rules, signal timestamps and
+de-duplication TTLs follow the replayed session.
+"""
+
+import asyncio
+import csv
+import heapq
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from aafr.bar_pipeline import BarPipeline
+from aafr.bar_resampler import to_epoch_seconds
+from aafr.bulk_downloader import interval_seconds
+
+
+# Record kinds
+BARS = "bars"
+TICKS = "ticks"
+
+
+def parse_speed(value: str) -> Optional[float]:
+    """
+    Parse a replay speed argument.
+
+    Args:
+        value: "max", or a multiplier such as "1", "10x" or "1000"
+
+    Returns:
+        Speed multiplier, or None for maximum speed
+
+    Raises:
+        ValueError: If the value is not a positive number or "max"
+    """
+    text = str(value).strip().lower()
+    if text == "max":
+        return None
+    speed = float(text.rstrip('x'))
+    if speed <= 0:
+        raise ValueError("Replay speed must be positive")
+    return speed
+
+
+def _parse_timestamp(text: str):
+    """Keep numeric timestamps numeric and everything else as text."""
+    text = text.strip()
+    return int(text) if text.lstrip('-').isdigit() else text
+
+
+def load_replay_file(path: str, symbol: str) -> Tuple[str, List[Dict]]:
+    """
+    Load a recorded bar or tick file.
+    Files with a "price" column (or key) are ticks; otherwise bars with
+    open/high/low/close/volume. Timestamps may be epoch seconds,
+    epoch milliseconds or ISO-8601 strings.
+
+    Args:
+        path: CSV or JSON file
+        symbol: Symbol for records without one
+
+    Returns:
+        Tuple of (kind, records sorted by time)
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the format is not supported or the file is empty
+    """
+    file_path = Path(path)
+    if not file_path.exists():
+        raise FileNotFoundError(f"Replay file not found: {path}")
+
+    if file_path.suffix.lower() == '.json':
+        with open(file_path, 'r') as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError("JSON replay file must contain a list of records")
+    elif file_path.suffix.lower() == '.csv':
+        with open(file_path, 'r', newline='') as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise ValueError("Unsupported replay file format. Use .csv or .json")
+
+    if not rows:
+        raise ValueError("Replay file contains no records")
+
+    kind = TICKS if 'price' in rows[0] else BARS
+    records = []
+    for idx, row in enumerate(rows):
+        try:
+            timestamp = row.get('timestamp', idx)
+            if isinstance(timestamp, str):
+                timestamp = _parse_timestamp(timestamp)
+            if kind == TICKS:
+                record = {
+                    'timestamp': timestamp,
+                    'price': float(row['price']),
+                    'size': int(float(row.get('size') or row.get('volume') or 1))
+                }
+            else:
+                record = {
+                    'timestamp': timestamp,
+                    'open': float(row['open']),
+                    'high': float(row['high']),
+                    'low': float(row['low']),
+                    'close': float(row['close']),
+                    'volume': int(float(row['volume']))
+                }
+            record['symbol'] = row.get('symbol') or symbol
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Error parsing replay record {idx + 1}: {e}")
+        records.append(record)
+
+    records.sort(key=lambda r: to_epoch_seconds(r['timestamp']))
+    return kind, records
+
+
+class ReplayClock:
+    """
+    Simulated wall clock for replays.
+    Jumps to each replayed event's time; between events it runs at the
+    replay speed (and stands still at maximum speed).
+    """
+
+    def __init__(self, speed: Optional[float] = 1.0, start: float = 0.0):
+        """
+        Initialize clock.
+
+        Args:
+            speed: Simulated seconds per real second (None for maximum speed)
+            start: Initial simulated epoch seconds
+        """
+        self.speed = speed
+        self._base = start
+        self._anchor = time.perf_counter()
+
+    def set(self, epoch_seconds: float) -> None:
+        """
+        Move the clock to a replayed event's time.
+
+        Args:
+            epoch_seconds: Simulated epoch seconds
+        """
+        self._base = epoch_seconds
+        self._anchor = time.perf_counter()
+
+    def time(self) -> float:
+        """Simulated epoch seconds (drop-in for time.time / time.monotonic)."""
+        if self.speed is None:
+            return self._base
+        return self._base + (time.perf_counter() - self._anchor) * self.speed
+
+    def now(self) -> datetime:
+        """Simulated local time (drop-in for datetime.now)."""
+        return datetime.fromtimestamp(self.time())
+
+
+class MarketReplay:
+    """
+    Feeds recorded records into a BarPipeline in time order.
+
+    At a finite speed, records are pushed on the replayed schedule and the
+    pipeline consumes them exactly as it consumes a live stream. At maximum
+    speed, each bar is processed before the next is pushed, so the clock
+    always shows the time of the bar being evaluated.
+    """
+
+    def __init__(self, pipeline: BarPipeline, clock: ReplayClock, warmup_bars: int = 100,
+                 on_new_day: Optional[Callable[[datetime], None]] = None):
+        """
+        Initialize replay.
+
+        Args:
+            pipeline: Live bar pipeline to feed (its consumers must be running)
+            clock: Simulated clock (its speed sets the pacing)
+            warmup_bars: Leading bars per symbol loaded as history instead of streamed
+            on_new_day: Called with the simulated time when the replayed date changes
+        """
+        self.pipeline = pipeline
+        self.clock = clock
+        self.warmup_bars = warmup_bars
+        self.on_new_day = on_new_day
+
+        self.stats = {
+            'records': 0,
+            'bars_seeded': 0,
+            'simulated_seconds': 0.0,
+            'wall_seconds': 0.0
+        }
+
+    def seed(self, feeds: Dict[str, Tuple[str, List[Dict]]],
+             history: Optional[Dict[str, List[Dict]]] = None) -> Dict[str, List[Dict]]:
+        """
+        Load each bar feed's warm-up bars into the pipeline as history.
+
+        Args:
+            feeds: symbol -> (kind, records)
+            history: symbol -> recorded history to seed instead of warm-up
+                bars (e.g., from a session journal); its feed streams in full
+
+        Returns:
+            symbol -> records still to stream
+        """
+        remaining = {}
+        for symbol, (kind, records) in feeds.items():
+            if history and symbol in history:
+                self.pipeline.seed(symbol, history[symbol])
+                self.stats['bars_seeded'] += len(history[symbol])
+            elif kind == BARS and self.warmup_bars:
+                history = records[:self.warmup_bars]
+                self.pipeline.seed(symbol, history)
+                self.stats['bars_seeded'] += len(history)
+                records = records[self.warmup_bars:]
+            else:
+                self.pipeline.seed(symbol, [])
+            remaining[symbol] = records
+        return remaining
+
+    @staticmethod
+    def bar_seconds(records: List[Dict], default: int) -> int:
+        """
+        Infer the bar spacing of recorded bars.
+
+        Args:
+            records: Bars sorted by time
+            default: Spacing when it cannot be inferred
+
+        Returns:
+            Smallest positive gap between the first bars, in seconds
+        """
+        times = [to_epoch_seconds(r['timestamp']) for r in records[:50]]
+        gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+        return min(gaps) if gaps else default
+
+    async def run(self, feeds: Dict[str, Tuple[str, List[Dict]]]) -> Dict:
+        """
+        Replay every feed, merged in time order, and wait for the pipeline to finish.
+
+        Args:
+            feeds: symbol -> (kind, records); bar feeds should be seeded first
+
+        Returns:
+            Replay statistics
+        """
+        default_close = interval_seconds(self.pipeline.interval)
+        streams = []
+        for symbol, (kind, records) in feeds.items():
+            # A bar closes (and is streamed live) one bar after its start time
+            close = self.bar_seconds(records, default_close) if kind == BARS else 0
+            streams.append(((to_epoch_seconds(r['timestamp']) + close, symbol, kind, r) for r in records))
+
+        started = time.perf_counter()
+        first_time = None
+        current_day = None
+        for event_time, symbol, kind, record in heapq.merge(*streams, key=lambda e: e[0]):
+            if first_time is None:
+                first_time = event_time
+            if self.clock.speed is not None:
+                due = started + (event_time - first_time) / self.clock.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            self.clock.set(event_time)
+            day = self.clock.now().date()
+            if self.on_new_day is not None and current_day is not None and day != current_day:
+                self.on_new_day(self.clock.now())
+            current_day = day
+
+            if kind == BARS:
+                self.pipeline.push_bar(symbol, record)
+            else:
+                self.pipeline.push_tick(symbol, record['price'], record['size'], record['timestamp'])
+            self.stats['records'] += 1
+
+            if self.clock.speed is None:
+                await self.pipeline.drain()
+            else:
+                await asyncio.sleep(0)  # Let consumers run between records due at once
+
+        await self.pipeline.drain()
+        self.stats['wall_seconds'] = time.perf_counter() - started
+        if first_time is not None:
+            self.stats['simulated_seconds'] = self.clock.time() - first_time
+        return self.stats
+
+    def format_stats(self) -> str:
+        """
+        Format a throughput report.
+
+        Returns:
+            Report line
+        """
+        s = self.stats
+        wall = s['wall_seconds'] or 1e-9
+        speed = f"{self.clock.speed:g}x" if self.clock.speed is not None else "max"
+        return (f"{s['records']} records replayed ({s['bars_seeded']} warm-up bars) at {speed}: "
+                f"{s['simulated_seconds']:.0f}s simulated in {s['wall_seconds']:.2f}s "
+                f"({s['simulated_seconds'] / wall:.0f}x real time, {s['records'] / wall:.0f} records/s)")
+
+
+def start_dry_run_gui_bot(host: str, port: int) -> Tuple[object, asyncio.Task]:
+    """
+    Run a GUI bot client in this process with DOM clicks disabled.
+
+    Args:
+        host: WebSocket server host
+        port: WebSocket server port
+
+    Returns:
+        Tuple of (GUIBotClient, task running it)
+    """
+    from gui_bot.client import GUIBotClient  # Only needed for replays with a GUI bot
+
+    client = GUIBotClient()
+    client.automator.dry_run = True
+    client.uri = f"ws://{host}:{port}"
+    return client, asyncio.create_task(client.start())
+
+
+async def stop_gui_bot(client, task: asyncio.Task) -> None:
+    """
+    Stop a client started by start_dry_run_gui_bot().
+
+    Args:
+        client: GUIBotClient
+        task: Task running it
+    """
+    client.stop()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.utils import generate_mock_candles
+
+    async def demo():
+        async def detect(symbol, candles, event):
+            return False
+
+        pipeline = BarPipeline(detect)
+        clock = ReplayClock(speed=None)
+        replay = MarketReplay(pipeline, clock, warmup_bars=50)
+        candles = generate_mock_candles(1000, "MNQ")
+        feeds = replay.seed({"MNQ": (BARS, candles)})
+        consumer = asyncio.create_task(pipeline.run_symbol("MNQ"))
+        await replay.run({"MNQ": (BARS, feeds["MNQ"])})
+        consumer.cancel()
+        print(replay.format_stats())
+        print(pipeline.format_stats())
+
+    asyncio.run(demo())
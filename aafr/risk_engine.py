@@ -4,7 +4,7 @@ Enforces position sizing, daily limits, and restricted event detection.
 """
 
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, date
+from datetime import datetime
 import json
 
 from aafr.utils import load_config, calculate_atr
@@ -16,15 +16,18 @@ class RiskEngine:
     Manages position sizing, daily limits, and event restrictions.
     """
     
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json", account_overrides: Optional[Dict] = None):
         """
         Initialize Risk Engine.
         
         Args:
             config_path: Path to configuration file
+            account_overrides: Optional per-account limits replacing values of
+                               the "account" config section (e.g., size,
+                               max_risk_per_trade, daily_loss_limit)
         """
         self.config = load_config(config_path)
-        self.account_config = self.config['account']
+        self.account_config = {**self.config['account'], **(account_overrides or {})}
         self.icc_config = self.config['icc']
         
         # Account parameters
@@ -39,7 +42,8 @@ class RiskEngine:
         # Daily tracking
         self.daily_pnl = 0.0
         self.daily_trades = 0
-        self.max_daily_trades = 20  # Optional limit
+        self.max_daily_trades = self.account_config.get('max_daily_trades', 20)  # Optional limit
+        self.clock = datetime.now  # Wall clock (simulated during replays)
         
         # Restricted events (hardcoded important dates - TODO: dynamic calendar)
         self.restricted_events = self.config.get('restricted_events', [])
@@ -76,7 +80,7 @@ class RiskEngine:
             True if trading should be disabled
         """
         if check_date is None:
-            check_date = date.today().isoformat()
+            check_date = self.clock().date().isoformat()
         
         return check_date in self.event_dates
     
@@ -264,12 +268,45 @@ class RiskEngine:
         """Increment daily trade counter."""
         self.daily_trades += 1
     
+    def release_daily_trade(self) -> None:
+        """Undo increment_daily_trades() for a trade whose entry was rejected."""
+        self.daily_trades = max(0, self.daily_trades - 1)
+    
     def reset_daily_tracking(self) -> None:
         """Reset daily tracking counters."""
         self.daily_pnl = 0.0
         self.daily_trades = 0
         print("Daily tracking reset")
     
+    def snapshot(self) -> Dict:
+        """
+        Capture the daily counters for a warm restart.
+        
+        Returns:
+            Dictionary with the trading date and daily counters
+        """
+        return {
+            'date': self.clock().date().isoformat(),
+            'daily_pnl': self.daily_pnl,
+            'daily_trades': self.daily_trades
+        }
+    
+    def restore(self, state: Dict) -> bool:
+        """
+        Restore daily counters saved by snapshot() on the same trading date.
+        
+        Args:
+            state: Result of snapshot()
+        
+        Returns:
+            True if restored (False for a snapshot from an earlier day)
+        """
+        if state.get('date') != self.clock().date().isoformat():
+            return False
+        self.daily_pnl = state['daily_pnl']
+        self.daily_trades = state['daily_trades']
+        return True
+    
     def get_daily_summary(self) -> Dict:
         """
         Get current daily summary statistics.
@@ -0,0 +1,453 @@
+"""
+Multi-process symbol sharding for live monitoring.
+A supervisor splits the symbol list across worker processes. Each worker
+runs its own market data stream, bar pipeline and detectors, and forwards
+detected setups over a local socket to the supervisor, which alone owns
+risk state, the arbiter, order placement and the WebSocket server.
+Workers that exit are restarted.
+"""
+
+import asyncio
+import hmac
+import importlib
+import multiprocessing
+import pickle
+import secrets
+import struct
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from aafr.detection_executor import DetectionExecutor, PROCESS, THREAD
+from aafr.latency import now_ms
+from aafr.metrics import COUNTER, GAUGE
+
+
+FRAME_HEADER = struct.Struct("<I")
+TOKEN_BYTES = 16  # Sent raw (hex) before any pickled frame is accepted
+
+# Message types
+SIGNAL = "signal"
+STATS = "stats"
+STOP = "stop"
+
+# Systems a worker can run: name -> (module, class, live monitoring coroutine)
+SYSTEMS = {
+    "aafr": ("aafr.main", "AAFRTradingSystem", "start_live_monitoring"),
+    "dual": ("dual_strategy_main", "DualStrategySystem", "start")
+}
+
+
+def partition_symbols(symbols: List[str], shards: int) -> List[List[str]]:
+    """
+    Split symbols round-robin across shards.
+
+    Args:
+        symbols: Symbols to monitor
+        shards: Number of worker processes
+
+    Returns:
+        Non-empty symbol lists, one per shard
+    """
+    shards = max(1, min(shards, len(symbols)))
+    return [symbols[i::shards] for i in range(shards)]
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Any) -> None:
+    """
+    Queue a length-prefixed pickled message.
+
+    Args:
+        writer: Stream to write to
+        message: Picklable message
+    """
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    """
+    Read one length-prefixed pickled message.
+
+    Args:
+        reader: Stream to read from
+
+    Returns:
+        Decoded message
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection
+    """
+    header = await reader.readexactly(FRAME_HEADER.size)
+    (length,) = FRAME_HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
+
+
+class ShardWorker:
+    """
+    Worker process side: runs a trading system for a subset of symbols
+    with risk, orders, alerts, metrics and the WebSocket server disabled,
+    forwarding detected signals to the supervisor.
+    """
+
+    def __init__(self, system_name: str, config_path: str, shard_id: int, symbols: List[str],
+                 host: str, port: int, token: str, offline: bool = False, stats_interval: float = 5.0):
+        """
+        Initialize worker.
+
+        Args:
+            system_name: Key of SYSTEMS
+            config_path: Configuration file
+            shard_id: Shard number
+            symbols: Symbols owned by this shard
+            host: Supervisor host
+            port: Supervisor port
+            token: Shared secret proving the worker was started by the supervisor
+            offline: Serve history from the local cache only
+            stats_interval: Seconds between pipeline stats reports
+        """
+        self.system_name = system_name
+        self.config_path = config_path
+        self.shard_id = shard_id
+        self.symbols = symbols
+        self.host = host
+        self.port = port
+        self.token = token
+        self.offline = offline
+        self.stats_interval = stats_interval
+        self.system = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    def _build_system(self):
+        """Create the shard's trading system in detection-only form."""
+        module_name, class_name, _ = SYSTEMS[self.system_name]
+        system = getattr(importlib.import_module(module_name), class_name)(self.config_path)
+        if self.offline:
+            system.api.enable_offline_mode()
+        system.ws_server = None
+        system.auto_trade = False
+        system.status_interval = 0
+        system.latency.dump_path = None  # Stage latency is reported by the supervisor
+        system.metrics.enabled = False
+        if getattr(system, 'alerts', None) is not None:
+            system.alerts.enabled = False
+        if system.detection_executor.mode == PROCESS:
+            # Shards already spread detection across processes
+            system.detection_executor = DetectionExecutor(THREAD, system.detection_executor.max_workers)
+        system.journal.directory = Path(system.journal.directory) / f"shard{self.shard_id}"
+        system.snapshots.path = system.snapshots.path.parent / f"shard{self.shard_id}" / system.snapshots.path.name
+        system.signal_sink = self.send_signal
+        return system
+
+    async def send_signal(self, payload: Dict, trace: Optional[Dict]) -> bool:
+        """
+        Forward a detected signal to the supervisor.
+
+        Args:
+            payload: System-specific signal data
+            trace: Stage latency trace started when the bar arrived
+
+        Returns:
+            True (the supervisor decides whether the signal is taken)
+        """
+        latency = None
+        if trace is not None:
+            latency = {'elapsed_ms': now_ms() - trace['origin_ms'], 'stages': trace['stages'],
+                       'sent_at': time.time()}
+        write_frame(self._writer, {'type': SIGNAL, 'shard': self.shard_id,
+                                   'payload': payload, 'latency': latency})
+        await self._writer.drain()
+        return True
+
+    async def _report_stats(self) -> None:
+        """Send pipeline stats to the supervisor periodically."""
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            write_frame(self._writer, {'type': STATS, 'shard': self.shard_id,
+                                       'pipeline': dict(self.system.pipeline.stats),
+                                       'backlog': sum(self.system.pipeline.backlog().values())})
+            await self._writer.drain()
+
+    async def run(self) -> None:
+        """Connect to the supervisor and monitor the shard's symbols until told to stop."""
+        self.system = self._build_system()
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._writer.write(self.token.encode('ascii') + FRAME_HEADER.pack(self.shard_id))
+        await self._writer.drain()
+
+        run_method = SYSTEMS[self.system_name][2]
+        monitor = asyncio.create_task(getattr(self.system, run_method)(self.symbols))
+        stats = asyncio.create_task(self._report_stats())
+        try:
+            # Exit on STOP, or when the supervisor goes away
+            while not monitor.done():
+                read = asyncio.create_task(read_frame(reader))
+                done, _ = await asyncio.wait({read, monitor}, return_when=asyncio.FIRST_COMPLETED)
+                if read not in done:
+                    read.cancel()
+                    break
+                if read.exception() is not None or read.result().get('type') == STOP:
+                    break
+        finally:
+            stats.cancel()
+            monitor.cancel()
+            await asyncio.gather(monitor, stats, return_exceptions=True)
+            self.system.stop()
+            self._writer.close()
+
+
+def run_shard_worker(system_name: str, config_path: str, shard_id: int, symbols: List[str],
+                     host: str, port: int, token: str, offline: bool = False) -> None:
+    """
+    Worker process entry point.
+
+    Args:
+        system_name: Key of SYSTEMS
+        config_path: Configuration file
+        shard_id: Shard number
+        symbols: Symbols owned by this shard
+        host: Supervisor host
+        port: Supervisor port
+        token: Shared secret for the supervisor connection
+        offline: Serve history from the local cache only
+    """
+    worker = ShardWorker(system_name, config_path, shard_id, symbols, host, port, token, offline)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass  # The supervisor shuts the shard down
+
+
+class ShardSupervisor:
+    """
+    Runs one worker process per symbol shard and processes their signals
+    in this process, so risk limits, the arbiter and GUI bot events see
+    every symbol while detection uses every core.
+    """
+
+    def __init__(self, system, shards: int, system_name: str = "aafr", config_path: str = "config.json",
+                 host: str = "127.0.0.1", max_restarts: int = 5, restart_delay: float = 5.0,
+                 worker_target: Callable = run_shard_worker):
+        """
+        Initialize supervisor.
+
+        Args:
+            system: Trading system owning risk, orders and the WebSocket server;
+                must provide process_remote_signal(payload, trace)
+            shards: Number of worker processes
+            system_name: Key of SYSTEMS run by the workers
+            config_path: Configuration file passed to the workers
+            host: Local address for worker connections
+            max_restarts: Restarts allowed per shard before it is given up
+            restart_delay: Seconds to wait before restarting a worker
+            worker_target: Worker process entry point
+        """
+        self.system = system
+        self.shards = shards
+        self.system_name = system_name
+        self.config_path = config_path
+        self.host = host
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        self.worker_target = worker_target
+
+        self.offline = False  # Passed to workers (offline cache mode)
+        self.port: Optional[int] = None
+        self.token = secrets.token_hex(TOKEN_BYTES)
+        self.assignments: List[List[str]] = []
+        self.processes: Dict[int, multiprocessing.Process] = {}
+        self.connections: Dict[int, asyncio.StreamWriter] = {}
+        self.shard_stats: Dict[int, Dict] = {}
+        self.restarts: Dict[int, int] = {}
+        self._server = None
+        self._handlers = set()  # Connection handler tasks
+        self._context = multiprocessing.get_context("spawn")
+
+        self.stats = {
+            'signals': 0,
+            'rejected_connections': 0,
+            'restarts': 0
+        }
+
+        registry = system.metrics.registry
+        registry.register("shard_workers", GAUGE, "Connected shard worker processes",
+                          lambda: len(self.connections))
+        registry.register("shard_bars_processed_total", COUNTER, "Closed bars run through detection per shard",
+                          lambda: {shard: s['pipeline']['bars_processed'] for shard, s in self.shard_stats.items()},
+                          label="shard")
+        registry.register("shard_bar_backlog", GAUGE, "Closed bars waiting for detection per shard",
+                          lambda: {shard: s['backlog'] for shard, s in self.shard_stats.items()},
+                          label="shard")
+
+    @classmethod
+    def from_config(cls, system, config: Dict, system_name: str = "aafr",
+                    config_path: str = "config.json", shards: Optional[int] = None) -> "ShardSupervisor":
+        """
+        Create a supervisor from the "sharding" config section.
+
+        Args:
+            system: Trading system owning risk, orders and the WebSocket server
+            config: Full configuration dictionary
+            system_name: Key of SYSTEMS run by the workers
+            config_path: Configuration file passed to the workers
+            shards: Worker count (overrides the config when given)
+
+        Returns:
+            ShardSupervisor
+        """
+        settings = config.get('sharding', {})
+        return cls(system, shards or settings.get('shards', 1), system_name,
+                   config_path, settings.get('host', "127.0.0.1"), settings.get('max_restarts', 5),
+                   settings.get('restart_delay', 5.0))
+
+    async def start(self) -> None:
+        """Listen for worker connections."""
+        self._server = await asyncio.start_server(self._handle_worker, self.host, 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def spawn(self, shard_id: int) -> None:
+        """
+        Start (or restart) a shard's worker process.
+
+        Args:
+            shard_id: Shard number
+        """
+        process = self._context.Process(
+            target=self.worker_target, name=f"shard-{shard_id}", daemon=True,
+            args=(self.system_name, self.config_path, shard_id, self.assignments[shard_id],
+                  self.host, self.port, self.token, self.offline)
+        )
+        process.start()
+        self.processes[shard_id] = process
+        print(f"[OK] Shard {shard_id} (pid {process.pid}): {', '.join(self.assignments[shard_id])}")
+
+    async def run(self, symbols: List[str]) -> None:
+        """
+        Shard symbols across workers and supervise them until cancelled
+        (call stop() afterwards to shut the workers down).
+
+        Args:
+            symbols: Symbols to monitor
+        """
+        self.assignments = partition_symbols(symbols, self.shards)
+        await self.start()
+        print(f"[INFO] Sharding {len(symbols)} symbols across {len(self.assignments)} worker processes")
+        for shard_id in range(len(self.assignments)):
+            self.spawn(shard_id)
+        await self._watch()
+
+    async def _watch(self) -> None:
+        """Restart workers that exit, up to max_restarts per shard."""
+        while self.processes:
+            await asyncio.sleep(1.0)
+            for shard_id, process in list(self.processes.items()):
+                if process.is_alive():
+                    continue
+                restarts = self.restarts.get(shard_id, 0)
+                if restarts >= self.max_restarts:
+                    print(f"[ERROR] Shard {shard_id} exited (code {process.exitcode}); restart limit reached")
+                    del self.processes[shard_id]
+                    continue
+                print(f"[WARNING] Shard {shard_id} exited (code {process.exitcode}); "
+                      f"restarting in {self.restart_delay:g}s")
+                self.restarts[shard_id] = restarts + 1
+                self.stats['restarts'] += 1
+                await asyncio.sleep(self.restart_delay)
+                self.spawn(shard_id)
+
+    async def _handle_worker(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Authenticate a worker connection and process its messages."""
+        shard_id = None
+        self._handlers.add(asyncio.current_task())
+        try:
+            # Nothing is unpickled before the peer proves it knows the token
+            hello = await asyncio.wait_for(reader.readexactly(TOKEN_BYTES * 2 + FRAME_HEADER.size), timeout=30.0)
+            if not hmac.compare_digest(hello[:TOKEN_BYTES * 2], self.token.encode('ascii')):
+                self.stats['rejected_connections'] += 1
+                return
+            (shard_id,) = FRAME_HEADER.unpack(hello[TOKEN_BYTES * 2:])
+            self.connections[shard_id] = writer
+            while True:
+                message = await read_frame(reader)
+                if message['type'] == SIGNAL:
+                    await self._process_signal(message)
+                elif message['type'] == STATS:
+                    self.shard_stats[shard_id] = message
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, pickle.UnpicklingError):
+            pass
+        finally:
+            if shard_id is not None and self.connections.get(shard_id) is writer:
+                del self.connections[shard_id]
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def _process_signal(self, message: Dict) -> bool:
+        """Rebuild the signal's latency trace and hand it to the owning system."""
+        self.stats['signals'] += 1
+        trace = None
+        latency = message.get('latency')
+        if latency is not None:
+            transit_ms = max(0.0, (time.time() - latency['sent_at']) * 1000.0)
+            received = now_ms()
+            # Time spent in transit counts towards the next stage (risk)
+            trace = self.system.latency.start(received - transit_ms - latency['elapsed_ms'])
+            trace['last_ms'] = received - transit_ms
+            trace['stages'] = dict(latency['stages'])
+        try:
+            return await self.system.process_remote_signal(message['payload'], trace)
+        except Exception as e:
+            print(f"[ERROR] Shard {message.get('shard')} signal failed: {e}")
+            return False
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Ask workers to stop, then terminate any that do not exit.
+
+        Args:
+            timeout: Seconds to wait for workers to exit
+        """
+        for writer in list(self.connections.values()):
+            try:
+                write_frame(writer, {'type': STOP})
+                await writer.drain()
+            except ConnectionError:
+                pass
+        processes = list(self.processes.values())
+        self.processes = {}
+        deadline = time.monotonic() + timeout
+        while any(p.is_alive() for p in processes) and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join(1.0)
+        # Closing the connections ends their handlers (cancelling them makes asyncio log errors)
+        for writer in list(self.connections.values()):
+            writer.close()
+        if self._handlers:
+            await asyncio.wait(list(self._handlers), timeout=1.0)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def format_stats(self) -> str:
+        """
+        Format a per-shard summary.
+
+        Returns:
+            Multi-line report
+        """
+        lines = [f"signals={self.stats['signals']} restarts={self.stats['restarts']} "
+                 f"rejected connections={self.stats['rejected_connections']}"]
+        for shard_id, symbols in enumerate(self.assignments):
+            stats = self.shard_stats.get(shard_id, {})
+            processed = stats.get('pipeline', {}).get('bars_processed', 0)
+            lines.append(f"  shard {shard_id}: {', '.join(symbols)} bars={processed} "
+                         f"backlog={stats.get('backlog', 0)}")
+        return "\n".join(lines)
+
+
+# Example usage
+if __name__ == "__main__":
+    print(partition_symbols(["MNQ", "MES", "MGC", "MCL", "MYM", "M2K", "MBT"], 3))
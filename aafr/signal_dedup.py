@@ -0,0 +1,193 @@
+"""
+Duplicate signal suppression for live trading.
+The same ICC structure stays detectable for several bars; a TTL cache of
+structure fingerprints lets each structure produce one signal and drops
+repeats before risk checks, logging, alerts and GUI events.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional
+
+
+def icc_fingerprint(symbol: str, icc_structure: Dict, candles: List[Dict]) -> tuple:
+    """
+    Identify an ICC structure independently of the buffer's position.
+    Uses candle timestamps instead of buffer indexes, which shift as bars roll.
+
+    Args:
+        symbol: Trading symbol
+        icc_structure: ICC structure dictionary
+        candles: Candles the structure was detected on
+
+    Returns:
+        Hashable fingerprint (symbol, direction, indication, correction start, correction end)
+    """
+    def stamp(idx: Optional[int]):
+        if idx is None or not 0 <= idx < len(candles):
+            return idx
+        return candles[idx].get('timestamp', idx)
+
+    indication = icc_structure['indication']
+    correction = icc_structure.get('correction') or {}
+    return (
+        symbol,
+        indication['direction'],
+        indication['candle'].get('timestamp', stamp(indication['idx'])),
+        stamp(correction.get('start_idx')),
+        stamp(correction.get('end_idx'))
+    )
+
+
+class SignalDedupCache:
+    """
+    TTL cache of signal fingerprints.
+    An entry expires ttl_seconds after it was last seen, so a structure that
+    keeps being re-detected never signals twice.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600.0, max_entries: int = 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: Seconds an unseen fingerprint is remembered
+            max_entries: Maximum fingerprints kept (least recently seen evicted)
+            clock: Time source in seconds
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()  # fingerprint -> last seen
+
+        self.hits_by_symbol: Dict[str, int] = {}
+        self.stats = {
+            'checked': 0,
+            'hits': 0,
+            'expired': 0,
+            'evicted': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict) -> "SignalDedupCache":
+        """
+        Create a cache from the "signal_dedup" config section.
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            SignalDedupCache
+        """
+        settings = config.get('signal_dedup', {})
+        return cls(settings.get('ttl_seconds', 3600.0), settings.get('max_entries', 1024))
+
+    def __len__(self) -> int:
+        self._expire(self.clock())
+        return len(self._entries)
+
+    def __contains__(self, fingerprint: Hashable) -> bool:
+        self._expire(self.clock())
+        return fingerprint in self._entries
+
+    def _expire(self, now: float) -> None:
+        """Drop entries not seen within the TTL (oldest are first)."""
+        while self._entries:
+            fingerprint, seen = next(iter(self._entries.items()))
+            if now - seen < self.ttl_seconds:
+                break
+            del self._entries[fingerprint]
+            self.stats['expired'] += 1
+
+    def add(self, fingerprint: Hashable) -> bool:
+        """
+        Record a fingerprint.
+
+        Args:
+            fingerprint: Signal fingerprint (first element is the symbol)
+
+        Returns:
+            True if it is new, False if it is a repeat (a cache hit)
+        """
+        now = self.clock()
+        self._expire(now)
+        self.stats['checked'] += 1
+
+        repeat = fingerprint in self._entries
+        self._entries[fingerprint] = now
+        self._entries.move_to_end(fingerprint)
+        if repeat:
+            self.stats['hits'] += 1
+            symbol = fingerprint[0] if isinstance(fingerprint, tuple) and fingerprint else None
+            self.hits_by_symbol[symbol] = self.hits_by_symbol.get(symbol, 0) + 1
+            return False
+
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evicted'] += 1
+        return True
+
+    def snapshot(self) -> List[list]:
+        """
+        Capture live fingerprints with their age for a warm restart
+        (the clock is monotonic, so absolute times do not survive a restart).
+
+        Returns:
+            List of [fingerprint, seconds since last seen], oldest first
+        """
+        now = self.clock()
+        self._expire(now)
+        return [[list(fingerprint) if isinstance(fingerprint, tuple) else fingerprint, now - seen]
+                for fingerprint, seen in self._entries.items()]
+
+    def restore(self, entries: List[list]) -> int:
+        """
+        Load fingerprints saved by snapshot().
+
+        Args:
+            entries: Result of snapshot()
+
+        Returns:
+            Number of fingerprints restored
+        """
+        now = self.clock()
+        for fingerprint, age in entries:
+            if isinstance(fingerprint, list):
+                fingerprint = tuple(fingerprint)
+            self._entries[fingerprint] = now - age
+            self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._expire(now)
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget every fingerprint."""
+        self._entries.clear()
+
+    def format_stats(self) -> str:
+        """
+        Format a hit-count report.
+
+        Returns:
+            Report line
+        """
+        s = self.stats
+        by_symbol = ", ".join(f"{symbol}={hits}" for symbol, hits in sorted(self.hits_by_symbol.items()))
+        return (f"{s['hits']}/{s['checked']} duplicate signals dropped"
+                f"{f' ({by_symbol})' if by_symbol else ''}, {len(self)} cached, "
+                f"{s['expired']} expired, {s['evicted']} evicted")
+
+
+# Example usage
+if __name__ == "__main__":
+    cache = SignalDedupCache(ttl_seconds=60)
+    structure = {
+        'indication': {'idx': 10, 'direction': 'LONG', 'candle': {'timestamp': '2025-01-06T14:50:00'}},
+        'correction': {'start_idx': 11, 'end_idx': 13}
+    }
+    candles = [{'timestamp': f"2025-01-06T14:{i:02d}:00"} for i in range(40, 60)]
+    for _ in range(3):
+        print(f"New signal: {cache.add(icc_fingerprint('MNQ', structure, candles))}")
+    print(cache.format_stats())
@@ -0,0 +1,198 @@
+"""
+Warm-restart state snapshots for live sessions.
+Periodically saves the state a live session builds up (candle ring buffers
+with their incremental indicators, strategy phase state, dedup fingerprints,
+daily risk counters and open positions) as one compact JSON file, so a
+restarted process resumes from it and fetches only the bars it missed
+instead of reloading history and rebuilding everything from scratch.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Union
+
+
+SNAPSHOT_VERSION = 1
+
+
+def missed_bar_count(last_time: Optional[float], interval_seconds: int,
+                     now: Optional[float] = None) -> int:
+    """
+    Count the bars to fetch to catch a restored buffer up.
+    Includes the newest stored bar (it may have been corrected) and the
+    bar currently forming.
+
+    Args:
+        last_time: Epoch seconds of the newest bar in the buffer
+        interval_seconds: Bar interval in seconds
+        now: Current epoch seconds (defaults to time.time())
+
+    Returns:
+        Number of bars to request
+    """
+    if last_time is None:
+        return 0
+    now = time.time() if now is None else now
+    return max(0, math.ceil((now - last_time) / interval_seconds)) + 1
+
+
+class SnapshotStore:
+    """
+    Atomic JSON snapshot file for one trading system.
+
+    save() writes to a temporary file and renames it over the previous
+    snapshot, so a crash mid-write never leaves a truncated snapshot.
+    """
+
+    def __init__(self, path: str = "logs/state/aafr.json", enabled: bool = False,
+                 interval: float = 30.0, max_age: float = 4 * 3600.0):
+        """
+        Initialize store.
+
+        Args:
+            path: Snapshot file
+            enabled: Save and load snapshots (both do nothing when False)
+            interval: Seconds between periodic snapshots
+            max_age: Snapshots older than this many seconds are ignored on load
+        """
+        self.path = Path(path)
+        self.enabled = enabled
+        self.interval = interval
+        self.max_age = max_age
+
+        self.stats = {
+            'saves': 0,
+            'bytes': 0,
+            'last_save_ms': 0.0,
+            'errors': 0
+        }
+
+    @classmethod
+    def from_config(cls, config: Dict, name: str) -> "SnapshotStore":
+        """
+        Create a store from the "snapshots" config section.
+
+        Args:
+            config: Full configuration dictionary
+            name: System name (the snapshot file is <directory>/<name>.json)
+
+        Returns:
+            SnapshotStore
+        """
+        settings = config.get('snapshots', {})
+        path = Path(settings.get('directory', "logs/state")) / f"{name}.json"
+        return cls(path, settings.get('enabled', False), settings.get('interval', 30.0),
+                   settings.get('max_age', 4 * 3600.0))
+
+    def save(self, state: Dict[str, Any]) -> bool:
+        """
+        Write a snapshot (safe to call from a worker thread).
+
+        Args:
+            state: JSON-compatible system state
+
+        Returns:
+            True if written
+        """
+        if not self.enabled:
+            return False
+        start = time.perf_counter()
+        try:
+            payload = json.dumps({'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'state': state},
+                                 separators=(',', ':'), default=str)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(temp_path, self.path)
+        except (OSError, TypeError, ValueError) as e:
+            self.stats['errors'] += 1
+            print(f"[ERROR] State snapshot not saved: {e}")
+            return False
+        self.stats['saves'] += 1
+        self.stats['bytes'] = len(payload)
+        self.stats['last_save_ms'] = (time.perf_counter() - start) * 1000.0
+        return True
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the last snapshot.
+
+        Returns:
+            Saved state, or None if disabled, missing, unreadable or too old
+        """
+        if not self.enabled or not self.path.exists():
+            return None
+        start = time.perf_counter()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Ignoring unreadable state snapshot {self.path}: {e}")
+            return None
+        if snapshot.get('version') != SNAPSHOT_VERSION:
+            print(f"[WARNING] Ignoring state snapshot {self.path}: version {snapshot.get('version')}")
+            return None
+        age = time.time() - snapshot.get('saved_at', 0)
+        if age > self.max_age:
+            print(f"[INFO] State snapshot {self.path} is {age / 60:.0f} minutes old, starting fresh")
+            return None
+        print(f"[OK] State snapshot loaded from {self.path} (saved {age:.0f}s ago, "
+              f"{(time.perf_counter() - start) * 1000.0:.1f}ms)")
+        return snapshot['state']
+
+    async def run(self, capture: Callable[[], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]) -> None:
+        """
+        Save a snapshot every interval seconds until cancelled.
+        State is captured on the event loop; encoding and writing run in a thread.
+
+        Args:
+            capture: Returns the current system state (or a coroutine returning it)
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+            state = capture()
+            if asyncio.iscoroutine(state):
+                state = await state
+            await asyncio.to_thread(self.save, state)
+
+    def format_stats(self) -> str:
+        """
+        Format a one-line summary.
+
+        Returns:
+            Summary line
+        """
+        s = self.stats
+        return (f"{s['saves']} snapshots saved to {self.path} ({s['bytes'] / 1024:.1f} KiB, "
+                f"last {s['last_save_ms']:.1f}ms), errors={s['errors']}")
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    from aafr.bar_pipeline import BarPipeline
+    from aafr.utils import generate_mock_candles
+
+    async def detect(symbol, candles, event):
+        return False
+
+    pipeline = BarPipeline(detect, max_bars=500)
+    for symbol in ("MNQ", "MES", "MGC", "MCL", "MYM"):
+        pipeline.seed(symbol, generate_mock_candles(500, symbol))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SnapshotStore(Path(tmp) / "aafr.json", enabled=True)
+        store.save({'pipeline': pipeline.snapshot()})
+        print(store.format_stats())
+
+        restored = BarPipeline(detect, max_bars=500)
+        start = time.perf_counter()
+        symbols = restored.restore(store.load()['pipeline'])
+        print(f"Restored {symbols} in {(time.perf_counter() - start) * 1000.0:.1f}ms")
+        for symbol in symbols:
+            print(f"  {symbol}: {restored.buffers[symbol]} (was {pipeline.buffers[symbol]})")
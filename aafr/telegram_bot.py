@@ -4,10 +4,21 @@ Sends trade signal alerts to Telegram when valid signals are generated.
 """
 
 import os
+import asyncio
+import random
 import requests
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from aafr.latency import LatencyHistogram, now_ms
+from aafr.utils import lazy_import
+
+try:
+    aiohttp = lazy_import('aiohttp')  # Loaded when the first session is created
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
 try:
     from dotenv import load_dotenv
     # Load .env file from project root
@@ -18,6 +29,41 @@ except ImportError:
     pass
 
 
+TELEGRAM_API_URL = "https://api.telegram.org"
+MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for one message
+
+
+def get_telegram_credentials(verbose: bool = True) -> Optional[Tuple[str, str]]:
+    """
+    Get the bot token and chat id if Telegram alerts are enabled.
+    
+    Args:
+        verbose: Print why alerts are unavailable
+    
+    Returns:
+        Tuple of (bot_token, chat_id), or None if alerts are disabled
+    """
+    # Check if Telegram is enabled
+    telegram_enabled = os.getenv('TELEGRAM_ENABLED', 'false').lower()
+    
+    if telegram_enabled != 'true':
+        if verbose:
+            print("[INFO] Telegram alerts are disabled (TELEGRAM_ENABLED=false or not set)")
+        return None
+    
+    # Get Telegram credentials
+    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
+    chat_id = os.getenv('TELEGRAM_CHAT_ID')
+    
+    if not bot_token or not chat_id:
+        if verbose:
+            print("[WARNING] Telegram credentials not found in .env file")
+            print("[WARNING] Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env to enable alerts")
+        return None
+    
+    return (bot_token, chat_id)
+
+
 def format_telegram_message(signal: Dict) -> str:
     """
     Format trade signal message for Telegram.
@@ -64,24 +110,13 @@ def send_telegram_alert(message: str) -> bool:
     Returns:
         True if message sent successfully, False otherwise
     """
-    # Check if Telegram is enabled
-    telegram_enabled = os.getenv('TELEGRAM_ENABLED', 'false').lower()
-    
-    if telegram_enabled != 'true':
-        print("[INFO] Telegram alerts are disabled (TELEGRAM_ENABLED=false or not set)")
-        return False
-    
-    # Get Telegram credentials
-    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-    chat_id = os.getenv('TELEGRAM_CHAT_ID')
-    
-    if not bot_token or not chat_id:
-        print("[WARNING] Telegram credentials not found in .env file")
-        print("[WARNING] Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env to enable alerts")
+    credentials = get_telegram_credentials()
+    if credentials is None:
         return False
+    bot_token, chat_id = credentials
     
     # Prepare API request
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    url = f"{TELEGRAM_API_URL}/bot{bot_token}/sendMessage"
     
     payload = {
         'chat_id': chat_id,
@@ -143,3 +178,320 @@ def send_telegram_alert(message: str) -> bool:
         print(f"[ERROR] Telegram alert failed: Unexpected error - {str(e)}")
         return False
 
+
+
+def chunk_messages(messages: List[str], limit: int = MAX_MESSAGE_LENGTH) -> List[List[str]]:
+    """
+    Group messages into digests that fit Telegram's message length limit.
+    
+    Args:
+        messages: Message texts in order
+        limit: Maximum length of one joined digest
+    
+    Returns:
+        List of message groups (each joined with blank lines when sent)
+    """
+    groups = []
+    current = []
+    length = 0
+    for message in messages:
+        message = message[:limit]
+        added = len(message) + (2 if current else 0)
+        if current and length + added > limit:
+            groups.append(current)
+            current, length, added = [], 0, len(message)
+        current.append(message)
+        length += added
+    if current:
+        groups.append(current)
+    return groups
+
+
+class TelegramDispatcher:
+    """
+    Non-blocking Telegram alert sender.
+    enqueue() only queues the message; a background task delivers it with
+    retry/backoff, honours 429 retry_after, paces sends per chat and can
+    batch messages arriving within a digest window into one message.
+    """
+    
+    def __init__(self, bot_token: Optional[str] = None, chat_id: Optional[str] = None,
+                 api_url: str = TELEGRAM_API_URL, max_queue: int = 1000, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 60.0, digest_seconds: float = 0.0,
+                 min_interval: float = 1.0, request_timeout: float = 10.0):
+        """
+        Initialize dispatcher.
+        
+        Args:
+            bot_token: Bot token (read from the environment with chat_id if both are None)
+            chat_id: Target chat id
+            api_url: Telegram Bot API base URL
+            max_queue: Maximum queued messages (new messages are dropped when full)
+            max_retries: Retries per message after the first attempt
+            backoff_base: First retry delay in seconds (doubles per attempt)
+            backoff_max: Maximum retry delay in seconds
+            digest_seconds: Batch messages arriving within this window (0 = send each)
+            min_interval: Minimum seconds between sends (Telegram allows ~1/s per chat)
+            request_timeout: Per-request timeout in seconds
+        """
+        if bot_token is None and chat_id is None:
+            bot_token, chat_id = get_telegram_credentials(verbose=False) or (None, None)
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.enabled = bool(bot_token and chat_id)
+        self.url = f"{api_url}/bot{bot_token}/sendMessage"
+        
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.digest_seconds = digest_seconds
+        self.min_interval = min_interval
+        self.request_timeout = request_timeout
+        
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+        self._last_send = None
+        
+        self.delivery_latency = LatencyHistogram("alert enqueue->delivered")
+        self.stats = {
+            'enqueued': 0,
+            'sent': 0,
+            'messages_sent': 0,
+            'failed': 0,
+            'dropped': 0,
+            'retries': 0,
+            'rate_limited': 0
+        }
+    
+    @classmethod
+    def from_config(cls, config: Dict) -> "TelegramDispatcher":
+        """
+        Create a dispatcher from the "telegram" config section (credentials from .env).
+        
+        Args:
+            config: Full configuration dictionary
+        
+        Returns:
+            TelegramDispatcher
+        """
+        settings = config.get('telegram', {})
+        return cls(
+            max_queue=settings.get('max_queue', 1000),
+            max_retries=settings.get('max_retries', 5),
+            backoff_base=settings.get('backoff_seconds', 1.0),
+            backoff_max=settings.get('max_backoff_seconds', 60.0),
+            digest_seconds=settings.get('digest_seconds', 0.0),
+            min_interval=settings.get('min_interval_seconds', 1.0)
+        )
+    
+    def enqueue(self, message: str) -> bool:
+        """
+        Queue an alert for delivery (never blocks).
+        
+        Args:
+            message: Message text
+        
+        Returns:
+            True if queued, False if alerts are disabled or the queue is full
+        """
+        if not self.enabled:
+            return False
+        try:
+            self.queue.put_nowait((now_ms(), message))
+        except asyncio.QueueFull:
+            self.stats['dropped'] += 1
+            print("[WARNING] Telegram alert dropped: queue full")
+            return False
+        self.stats['enqueued'] += 1
+        return True
+
+    def enqueue_signal(self, signal: Dict) -> bool:
+        """
+        Format a trade signal alert and queue it (skips formatting when disabled).
+
+        Args:
+            signal: Trade signal dictionary
+
+        Returns:
+            True if queued
+        """
+        if not self.enabled:
+            return False
+        return self.enqueue(format_telegram_message(signal))
+
+    def start(self) -> None:
+        """Start the background sender (no-op when alerts are disabled)."""
+        if not self.enabled:
+            print("[INFO] Telegram alerts are disabled (TELEGRAM_ENABLED=false or credentials missing)")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+    
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Deliver queued alerts (up to a timeout) and stop the sender.
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARNING] Telegram: {self.queue.qsize()} alerts not delivered before shutdown")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def run(self) -> None:
+        """Deliver queued alerts until cancelled."""
+        session = None
+        if AIOHTTP_AVAILABLE:
+            session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.request_timeout))
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                try:
+                    if self.digest_seconds > 0:
+                        await self._collect_digest(batch)
+                    await self._deliver(session, batch)
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+        finally:
+            if session is not None:
+                await session.close()
+    
+    async def _collect_digest(self, batch: List[Tuple[float, str]]) -> None:
+        """Add every message arriving within the digest window to the batch."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.digest_seconds
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return
+    
+    async def _deliver(self, session, batch: List[Tuple[float, str]]) -> None:
+        """Send a batch as one or more digests."""
+        queued_at = [queued for queued, _ in batch]
+        offset = 0
+        for group in chunk_messages([message for _, message in batch]):
+            if await self._send_with_retry(session, "\n\n".join(group)):
+                self.stats['sent'] += 1
+                self.stats['messages_sent'] += len(group)
+                for queued in queued_at[offset:offset + len(group)]:
+                    self.delivery_latency.record_since(queued)
+            else:
+                self.stats['failed'] += len(group)
+            offset += len(group)
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with jitter."""
+        return min(self.backoff_max, self.backoff_base * 2 ** attempt) * random.uniform(0.5, 1.0)
+    
+    async def _send_with_retry(self, session, text: str) -> bool:
+        """
+        Send one message, retrying 429, 5xx and network errors.
+        
+        Returns:
+            True if Telegram accepted the message
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            # Pace sends so bursts do not trigger rate limiting
+            if self._last_send is not None:
+                wait = self._last_send + self.min_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            status, result, retry_after = await self._post(session, text)
+            self._last_send = loop.time()
+            
+            if status == 200 and result.get('ok'):
+                return True
+            if status == 429:
+                self.stats['rate_limited'] += 1
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+            elif status is None or status >= 500:
+                delay = self._backoff(attempt)
+            else:
+                # Bad request, unauthorized bot, unknown chat: retrying will not help
+                print(f"[ERROR] Telegram alert failed ({status}): {result.get('description', '')}")
+                return False
+            
+            if attempt == self.max_retries:
+                break
+            self.stats['retries'] += 1
+            await asyncio.sleep(delay)
+        
+        print(f"[ERROR] Telegram alert failed after {self.max_retries + 1} attempts")
+        return False
+    
+    async def _post(self, session, text: str) -> Tuple[Optional[int], Dict, Optional[float]]:
+        """
+        POST sendMessage.
+        
+        Returns:
+            Tuple of (HTTP status or None on network error, response JSON, retry_after seconds)
+        """
+        payload = {'chat_id': self.chat_id, 'text': text, 'parse_mode': 'HTML'}
+        try:
+            if session is not None:
+                async with session.post(self.url, json=payload) as response:
+                    status = response.status
+                    try:
+                        result = await response.json(content_type=None)
+                    except Exception:
+                        result = {}
+            else:
+                response = await asyncio.to_thread(
+                    requests.post, self.url, json=payload, timeout=self.request_timeout
+                )
+                status = response.status_code
+                try:
+                    result = response.json()
+                except Exception:
+                    result = {}
+        except Exception as e:
+            print(f"[WARNING] Telegram request error: {e}")
+            return (None, {}, None)
+        
+        result = result if isinstance(result, dict) else {}
+        retry_after = (result.get('parameters') or {}).get('retry_after')
+        return (status, result, float(retry_after) if retry_after is not None else None)
+    
+    def format_stats(self) -> str:
+        """
+        Format a delivery report.
+        
+        Returns:
+            Multi-line report
+        """
+        s = self.stats
+        return (f"{s['messages_sent']}/{s['enqueued']} alerts delivered in {s['sent']} messages, "
+                f"{s['failed']} failed, {s['dropped']} dropped, {s['retries']} retries "
+                f"({s['rate_limited']} rate limited)\n"
+                f"  {self.delivery_latency.format()}")
+
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        dispatcher = TelegramDispatcher(digest_seconds=2.0)
+        dispatcher.start()
+        for symbol in ["MNQ", "MES"]:
+            dispatcher.enqueue(format_telegram_message({
+                'symbol': symbol, 'direction': 'LONG', 'entry': 100.0, 'stop_loss': 99.0,
+                'take_profit': 103.0, 'r_multiple': 3.0, 'dollar_risk': 50.0, 'position_size': 1
+            }))
+        await dispatcher.stop()
+        print(dispatcher.format_stats())
+    
+    asyncio.run(demo())
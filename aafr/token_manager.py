@@ -0,0 +1,306 @@
+"""
+Tradovate access token lifecycle management.
+Persists access/market-data tokens to disk so restarts skip the auth
+round-trip, renews them in a background task before they expire, and
+recovers from a 401 by renewing or re-authenticating once instead of
+giving up on the live API.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Defaults, overridable through the "token_cache" config section
+DEFAULT_TOKEN_DIR = "data/tokens"
+DEFAULT_REFRESH_MARGIN = 600  # Renew 10 minutes before expiry (tokens last ~90 minutes)
+DEFAULT_CHECK_INTERVAL = 60
+DEFAULT_REAUTH_ATTEMPTS = 3
+DEFAULT_REAUTH_BACKOFF = 2.0  # Seconds before the second attempt, doubled after each failure
+
+
+def token_cache_path(directory: str, environment: str, username: str) -> Path:
+    """
+    Get the token file for an environment/user pair.
+
+    Args:
+        directory: Token cache directory
+        environment: API environment ("demo" or "live")
+        username: Tradovate username
+
+    Returns:
+        Path to the token file
+    """
+    safe_user = ''.join(ch if ch.isalnum() else '_' for ch in (username or 'default'))
+    return Path(directory) / f"{environment}_{safe_user}.json"
+
+
+def load_cached_tokens(path: Path, min_valid_seconds: float = 0) -> Optional[Dict]:
+    """
+    Read persisted tokens if they are still valid.
+
+    Args:
+        path: Token file
+        min_valid_seconds: Required remaining lifetime
+
+    Returns:
+        Token dictionary ('token', 'md_token', 'token_expiry') or None
+    """
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable token cache {path}: {e}")
+        return None
+
+    if not data.get('token') or not data.get('token_expiry'):
+        return None
+    if data['token_expiry'] - time.time() <= min_valid_seconds:
+        return None
+    return data
+
+
+def save_cached_tokens(path: Path, tokens: Dict) -> None:
+    """
+    Atomically write tokens to disk, readable by the owner only.
+
+    Args:
+        path: Token file
+        tokens: Token dictionary ('token', 'md_token', 'token_expiry')
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.json.tmp')
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        json.dump(tokens, f)
+    os.replace(tmp_path, path)
+
+
+class TokenManager:
+    """
+    Keeps a TradovateAPI client's tokens fresh.
+
+    The renewal loop runs as an asyncio task and performs the blocking HTTP
+    calls in a worker thread, so neither order placement nor market data
+    handling ever waits on authentication.
+    """
+
+    def __init__(self, api, directory: str = DEFAULT_TOKEN_DIR,
+                 refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+                 check_interval: float = DEFAULT_CHECK_INTERVAL, persist: bool = True,
+                 reauth_attempts: int = DEFAULT_REAUTH_ATTEMPTS,
+                 reauth_backoff: float = DEFAULT_REAUTH_BACKOFF):
+        """
+        Initialize token manager.
+
+        Args:
+            api: TradovateAPI client whose tokens are managed
+            directory: Token cache directory
+            refresh_margin: Seconds before expiry at which tokens are renewed
+            check_interval: Maximum sleep between expiry checks
+            persist: Whether tokens are written to/read from disk
+            reauth_attempts: Credential authentications tried per refresh
+            reauth_backoff: Initial delay between those attempts in seconds
+        """
+        self.api = api
+        self.path = token_cache_path(directory, api.environment, api.api_config.get('username', ''))
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.persist = persist
+        self.reauth_attempts = max(1, reauth_attempts)
+        self.reauth_backoff = reauth_backoff
+
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.stats = {
+            'loaded_from_disk': 0,
+            'renewals': 0,
+            'reauthentications': 0,
+            'failures': 0,
+            'unauthorized_recoveries': 0
+        }
+
+    @classmethod
+    def from_config(cls, api) -> "TokenManager":
+        """
+        Build a manager from the "token_cache" config section.
+
+        Args:
+            api: TradovateAPI client
+
+        Returns:
+            TokenManager (persistence disabled when the section says so)
+        """
+        settings = api.config.get('token_cache', {})
+        return cls(
+            api,
+            directory=settings.get('directory', DEFAULT_TOKEN_DIR),
+            refresh_margin=settings.get('refresh_margin_seconds', DEFAULT_REFRESH_MARGIN),
+            check_interval=settings.get('check_interval_seconds', DEFAULT_CHECK_INTERVAL),
+            persist=settings.get('enabled', True),
+            reauth_attempts=settings.get('reauth_attempts', DEFAULT_REAUTH_ATTEMPTS),
+            reauth_backoff=settings.get('reauth_backoff_seconds', DEFAULT_REAUTH_BACKOFF)
+        )
+
+    def load(self) -> bool:
+        """
+        Adopt persisted tokens that outlive the refresh margin.
+
+        Returns:
+            True if valid tokens were loaded
+        """
+        if not self.persist:
+            return False
+
+        data = load_cached_tokens(self.path, min_valid_seconds=self.refresh_margin)
+        if data is None:
+            return False
+
+        self.api.token = data['token']
+        self.api.md_token = data.get('md_token')
+        self.api.token_expiry = data['token_expiry']
+        self.stats['loaded_from_disk'] += 1
+        minutes = (data['token_expiry'] - time.time()) / 60
+        print(f"[OK] Reusing cached Tradovate {self.api.environment} token (expires in {minutes:.0f} min)")
+        return True
+
+    def save(self) -> None:
+        """Persist the client's current tokens."""
+        if not self.persist or not self.api.token:
+            return
+        try:
+            save_cached_tokens(self.path, {
+                'token': self.api.token,
+                'md_token': self.api.md_token,
+                'token_expiry': self.api.token_expiry,
+                'saved_at': time.time()
+            })
+        except OSError as e:
+            print(f"[WARNING] Could not persist Tradovate token: {e}")
+
+    def clear(self) -> None:
+        """Delete the persisted tokens (e.g., after they were rejected)."""
+        if self.path.exists():
+            self.path.unlink()
+
+    def seconds_until_refresh(self) -> float:
+        """
+        Get the time until the tokens should be renewed.
+
+        Returns:
+            Seconds (0 if renewal is due now)
+        """
+        if not self.api.token or not self.api.token_expiry:
+            return 0.0
+        return max(0.0, self.api.token_expiry - self.refresh_margin - time.time())
+
+    def refresh(self) -> bool:
+        """
+        Renew the tokens, falling back to a full authentication retried with
+        exponential backoff. A failure never switches the client to mock
+        data; the current tokens are kept and the caller may try again.
+        Blocking; call from a worker thread when on the event loop.
+
+        Returns:
+            True if the client holds fresh tokens afterwards
+        """
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> bool:
+        if self.api.token and self.api.renew_token():
+            self.stats['renewals'] += 1
+            return True
+
+        for attempt in range(self.reauth_attempts):
+            if attempt:
+                delay = self.reauth_backoff * 2 ** (attempt - 1)
+                print(f"[INFO] Re-authentication failed, retrying in {delay:.0f}s "
+                      f"({attempt + 1}/{self.reauth_attempts})")
+                time.sleep(delay)
+            self.stats['reauthentications'] += 1
+            if self.api.authenticate(use_cache=False, fallback_to_mock=False):
+                return True
+
+        self.stats['failures'] += 1
+        print("[ERROR] Could not renew the Tradovate session; keeping live mode and retrying later")
+        return False
+
+    def handle_unauthorized(self, rejected_token: Optional[str]) -> bool:
+        """
+        Recover from a 401 once per rejected token.
+        If another thread already replaced the token, no request is made.
+
+        Args:
+            rejected_token: Token that the server rejected
+
+        Returns:
+            True if the request should be retried with the current token
+        """
+        with self._lock:
+            if self.api.token and self.api.token != rejected_token:
+                return True
+
+            print("[INFO] Access token rejected (401), renewing...")
+            self.clear()
+            if self._refresh_locked():
+                self.stats['unauthorized_recoveries'] += 1
+                return True
+            return False
+
+    async def run(self) -> None:
+        """Background loop renewing tokens shortly before they expire."""
+        while True:
+            delay = self.seconds_until_refresh()
+            if delay > 0:
+                await asyncio.sleep(min(delay, self.check_interval))
+                continue
+
+            if self.api.is_using_mock_data() or self.api.is_offline():
+                await asyncio.sleep(self.check_interval)
+                continue
+
+            if not await asyncio.to_thread(self.refresh):
+                print("[WARNING] Token renewal failed, retrying shortly")
+                await asyncio.sleep(min(30.0, self.check_interval))
+
+    def start(self) -> asyncio.Task:
+        """
+        Start the background renewal task on the running loop.
+
+        Returns:
+            The renewal task
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background renewal task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Example usage
+if __name__ == "__main__":
+    from aafr.tradovate_api import TradovateAPI
+
+    api = TradovateAPI()
+    if api.authenticate():
+        manager = api.token_manager
+        print(f"Token file: {manager.path}")
+        print(f"Renewal due in {manager.seconds_until_refresh() / 60:.1f} min")
+        print(f"Stats: {manager.stats}")
@@ -3,6 +3,7 @@ Tradovate API integration module for live and historical market data.
 Supports both demo and live environments with graceful fallback to mock data.
 """
 
+import itertools
 import json
 import time
 from typing import Dict, List, Optional, Any
@@ -12,6 +13,149 @@ from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 
 from aafr.utils import load_config, generate_mock_candles, generate_mock_volume_data
+from aafr.bar_resampler import parse_interval
+from aafr.candle_cache import CandleCache
+from aafr.market_data_stream import MarketDataStream, WEBSOCKETS_AVAILABLE
+from aafr.token_manager import TokenManager
+
+
+def build_auth_payload(api_config: Dict) -> Dict:
+    """
+    Build the access token request body in Tradovate's official format.
+    
+    Args:
+        api_config: Environment section of the tradovate config
+    
+    Returns:
+        Authentication request dictionary
+    """
+    return {
+        'name': api_config['username'],
+        'appId': api_config.get('app_id', 'AAFR Trading System'),
+        'appVersion': api_config.get('app_version', '1.0'),
+        'cid': int(api_config['client_id']),  # Convert to int
+        'sec': api_config['client_secret'],
+        'deviceId': api_config.get('device_id', 'aafr-device-001'),
+        'password': api_config.get('password', '')
+    }
+
+
+def parse_expiration_time(expiration_time: Optional[str]) -> float:
+    """
+    Parse a token expiration time into an epoch timestamp.
+    
+    Args:
+        expiration_time: ISO format string, e.g. "2021-06-15T15:40:30.056Z"
+    
+    Returns:
+        Expiry as epoch seconds (defaults to 1 hour from now)
+    """
+    if not expiration_time:
+        return time.time() + 3600  # Default 1 hour
+    
+    try:
+        # Handle both with and without timezone
+        if expiration_time.endswith('Z'):
+            expiration_time = expiration_time[:-1] + '+00:00'
+        elif '+' not in expiration_time and 'T' in expiration_time:
+            expiration_time = expiration_time + '+00:00'
+        return datetime.fromisoformat(expiration_time).timestamp()
+    except Exception as e:
+        # Fallback to 1 hour if parsing fails
+        print(f"[WARNING] Could not parse expiration time: {e}, using 1 hour default")
+        return time.time() + 3600
+
+
+def build_api_url(base_url: str, endpoint: str) -> str:
+    """
+    Build a full API URL from the configured base URL and an endpoint.
+    
+    Args:
+        base_url: Configured base URL (with or without /v1)
+        endpoint: API endpoint (with or without /v1 prefix)
+    
+    Returns:
+        Absolute request URL
+    """
+    # Ensure endpoint starts with /v1 if not already present
+    if not endpoint.startswith('/v1'):
+        endpoint = f"/v1{endpoint}" if endpoint.startswith('/') else f"/v1/{endpoint}"
+    
+    return f"{base_url.replace('/v1', '')}{endpoint}"
+
+
+_mock_order_ids = itertools.count(1)
+
+
+def next_mock_order_id() -> str:
+    """
+    Return a mock order id that is unique within the process.
+    
+    Returns:
+        Order id string (e.g., "mock_42")
+    """
+    return f"mock_{next(_mock_order_ids)}"
+
+
+def build_history_request(symbol: str, interval: str, count: int,
+                          time_range: Optional[Dict] = None) -> Dict:
+    """
+    Build the /chart/history request body.
+    
+    Args:
+        symbol: Trading instrument symbol
+        interval: Candle interval (e.g., "5Min", "1Hour", "1Day")
+        count: Number of candles to retrieve
+        time_range: Optional explicit timeRange (closestTimestamp/asFarAsTimestamp)
+    
+    Returns:
+        Request body dictionary
+    """
+    # Parse interval to determine elementSize and underlyingType
+    # Examples: "5Min" -> elementSize=5, "1Hour" -> elementSize=60, "1Day" -> elementSize=1
+    underlying_type, element_size = parse_interval(interval)
+    
+    return {
+        "symbol": symbol,
+        "chartDescription": {
+            "underlyingType": underlying_type,
+            "elementSize": element_size,
+            "elementSizeUnit": "UnderlyingUnits"
+        },
+        "timeRange": time_range or {
+            "asMuchAsElements": count
+        }
+    }
+
+
+def parse_history_bars(result: Dict, symbol: str) -> List[Dict]:
+    """
+    Transform a /chart/history response into the standard candle format.
+    
+    Args:
+        result: Response JSON
+        symbol: Trading instrument symbol
+    
+    Returns:
+        List of candle dictionaries
+    """
+    # Tradovate API response structure may vary - try different possible structures
+    bars = result.get('bars', []) or result.get('data', []) or result.get('elements', [])
+    
+    candles = []
+    for bar in bars:
+        # Handle different possible field names in response
+        candles.append({
+            'timestamp': bar.get('time', bar.get('timestamp', bar.get('t', 0))),
+            'open': float(bar.get('open', bar.get('o', 0))),
+            'high': float(bar.get('high', bar.get('h', 0))),
+            'low': float(bar.get('low', bar.get('l', 0))),
+            'close': float(bar.get('close', bar.get('c', 0))),
+            'volume': int(bar.get('volume', bar.get('v', 0))),
+            'symbol': symbol
+        })
+    
+    return candles
 
 
 class TradovateAPI:
@@ -51,31 +195,54 @@ class TradovateAPI:
         
         # Mock data fallback
         self.use_mock_data = False
+        
+        # Local historical data cache (None when disabled)
+        self.cache = CandleCache.from_config(self.config)
+        
+        # Live market data WebSocket (created by subscribe_live_data)
+        self.market_data_stream = None
+        
+        # Token persistence and renewal
+        self.token_manager = TokenManager.from_config(self)
+    
+    def enable_offline_mode(self) -> None:
+        """Serve historical data purely from the local cache, without network access."""
+        if self.cache is None:
+            self.cache = CandleCache.from_config(self.config, offline=True)
+        self.cache.offline = True
+    
+    def is_offline(self) -> bool:
+        """
+        Check if historical data is served purely from the local cache.
+        
+        Returns:
+            True if in offline mode
+        """
+        return self.cache is not None and self.cache.offline
     
-    def authenticate(self) -> bool:
+    def authenticate(self, use_cache: bool = True, fallback_to_mock: bool = True) -> bool:
         """
         Authenticate with Tradovate API and obtain access tokens.
         Uses Tradovate's official authentication format.
         
+        Args:
+            use_cache: Reuse still-valid tokens persisted by a previous run
+            fallback_to_mock: Switch to mock data if authentication fails
+                              (False when re-authenticating a live session)
+        
         Returns:
             True if authentication successful, False otherwise
         """
+        if self.is_offline():
+            print("[INFO] Offline mode: serving historical data from local cache, skipping authentication")
+            return True
+        
+        if use_cache and self.token_manager.load():
+            return True
+        
         try:
             # Tradovate API authentication format
-            app_id = self.api_config.get('app_id', 'AAFR Trading System')
-            app_version = self.api_config.get('app_version', '1.0')
-            device_id = self.api_config.get('device_id', 'aafr-device-001')
-            password = self.api_config.get('password', '')
-            
-            auth_data = {
-                'name': self.api_config['username'],
-                'appId': app_id,
-                'appVersion': app_version,
-                'cid': int(self.api_config['client_id']),  # Convert to int
-                'sec': self.api_config['client_secret'],
-                'deviceId': device_id,
-                'password': password
-            }
+            auth_data = build_auth_payload(self.api_config)
             
             response = self.session.post(
                 self.auth_url,
@@ -133,51 +300,10 @@ class TradovateAPI:
                         print(f"[ERROR] Retry authentication failed: HTTP {retry_response.status_code}")
                         return False
                 
-                # Check if response contains an error (even with HTTP 200)
-                if 'errorText' in auth_response:
-                    error_text = auth_response.get('errorText', 'Unknown error')
-                    print(f"[ERROR] Authentication failed: {error_text}")
-                    print(f"[ERROR] Request URL: {self.auth_url}")
-                    print(f"[ERROR] Request body: {auth_data}")
-                    print(f"[ERROR] Full response: {auth_response}")
+                if not self._apply_auth_response(auth_response, auth_data):
                     return False
                 
-                # Check if we have an access token
-                if 'accessToken' not in auth_response:
-                    print(f"[ERROR] Authentication response missing accessToken")
-                    print(f"[ERROR] Response keys: {list(auth_response.keys())}")
-                    print(f"[ERROR] Full response: {auth_response}")
-                    return False
-                
-                self.token = auth_response.get('accessToken')  # For trading operations
-                self.md_token = auth_response.get('mdAccessToken')  # For market data operations
-                
-                # Parse expiration time
-                expiration_time = auth_response.get('expirationTime')
-                if expiration_time:
-                    try:
-                        # Parse ISO format: "2021-06-15T15:40:30.056Z"
-                        # Handle both with and without timezone
-                        if expiration_time.endswith('Z'):
-                            expiration_time = expiration_time[:-1] + '+00:00'
-                        elif '+' not in expiration_time and 'T' in expiration_time:
-                            expiration_time = expiration_time + '+00:00'
-                        exp_dt = datetime.fromisoformat(expiration_time)
-                        self.token_expiry = exp_dt.timestamp()
-                    except Exception as e:
-                        # Fallback to 1 hour if parsing fails
-                        print(f"[WARNING] Could not parse expiration time: {e}, using 1 hour default")
-                        self.token_expiry = time.time() + 3600
-                else:
-                    self.token_expiry = time.time() + 3600  # Default 1 hour
-                
-                has_market_data = auth_response.get('hasMarketData', False)
-                print(f"[OK] Authenticated with Tradovate {self.environment} API")
-                if self.md_token:
-                    print(f"[OK] Market data token obtained (hasMarketData: {has_market_data})")
-                else:
-                    print(f"[WARNING] No market data token received (hasMarketData: {has_market_data})")
-                
+                self.token_manager.save()
                 return True
             else:
                 # Check if credentials are placeholder values
@@ -199,20 +325,102 @@ class TradovateAPI:
                     except Exception as e:
                         print(f"[ERROR] Could not parse error response: {e}")
                         print(f"[ERROR] Raw response text: {response.text[:500]}")
-                print("[INFO] Falling back to mock data for testing")
-                self.use_mock_data = True
+                if fallback_to_mock:
+                    print("[INFO] Falling back to mock data for testing")
+                    self.use_mock_data = True
                 return False
                 
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] Authentication error: {e}")
-            print("Falling back to mock data for testing")
-            self.use_mock_data = True
+            if fallback_to_mock:
+                print("Falling back to mock data for testing")
+                self.use_mock_data = True
             return False
         except Exception as e:
             print(f"[ERROR] Unexpected auth error: {e}")
-            self.use_mock_data = True
+            if fallback_to_mock:
+                self.use_mock_data = True
             return False
     
+    def _apply_auth_response(self, auth_response: Dict, auth_data: Dict) -> bool:
+        """
+        Validate an access token response and store the tokens.
+        
+        Args:
+            auth_response: Parsed authentication response
+            auth_data: Request body (for error reporting)
+        
+        Returns:
+            True if tokens were stored
+        """
+        # Check if response contains an error (even with HTTP 200)
+        if 'errorText' in auth_response:
+            error_text = auth_response.get('errorText', 'Unknown error')
+            print(f"[ERROR] Authentication failed: {error_text}")
+            print(f"[ERROR] Request URL: {self.auth_url}")
+            print(f"[ERROR] Request body: {auth_data}")
+            print(f"[ERROR] Full response: {auth_response}")
+            return False
+        
+        # Check if we have an access token
+        if 'accessToken' not in auth_response:
+            print(f"[ERROR] Authentication response missing accessToken")
+            print(f"[ERROR] Response keys: {list(auth_response.keys())}")
+            print(f"[ERROR] Full response: {auth_response}")
+            return False
+        
+        self.token = auth_response.get('accessToken')  # For trading operations
+        self.md_token = auth_response.get('mdAccessToken')  # For market data operations
+        self.token_expiry = parse_expiration_time(auth_response.get('expirationTime'))
+        
+        has_market_data = auth_response.get('hasMarketData', False)
+        print(f"[OK] Authenticated with Tradovate {self.environment} API")
+        if self.md_token:
+            print(f"[OK] Market data token obtained (hasMarketData: {has_market_data})")
+        else:
+            print(f"[WARNING] No market data token received (hasMarketData: {has_market_data})")
+        
+        return True
+    
+    def renew_token(self) -> bool:
+        """
+        Extend the current session without re-sending credentials.
+        Renewal does not count against the access token request limit.
+        
+        Returns:
+            True if fresh tokens were stored
+        """
+        if not self.token:
+            return False
+        
+        md_token = self.md_token
+        try:
+            response = self.session.get(
+                build_api_url(self.base_url, '/auth/renewaccesstoken'),
+                headers={
+                    'Authorization': f"Bearer {self.token}",
+                    'Accept': 'application/json'
+                },
+                timeout=10
+            )
+            if response.status_code != 200:
+                print(f"[WARNING] Token renewal failed: HTTP {response.status_code}")
+                return False
+            auth_response = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"[WARNING] Token renewal failed: {e}")
+            return False
+        
+        if not self._apply_auth_response(auth_response, {}):
+            return False
+        
+        # Renewal responses may omit the market data token; keep the current one
+        if not self.md_token:
+            self.md_token = md_token
+        
+        self.token_manager.save()
+        return True
+    
     def _ensure_authenticated(self) -> bool:
         """
         Ensure we have a valid authentication token.
@@ -223,11 +431,15 @@ class TradovateAPI:
         if self.use_mock_data:
             return True
         
-        if self.token is None or (self.token_expiry and time.time() > self.token_expiry):
+        if self.token is None:
             return self.authenticate()
+        if self.token_expiry and time.time() > self.token_expiry:
+            # Expired live session: renew/re-authenticate without falling back to mock data
+            return self.token_manager.refresh()
         return True
     
-    def _make_request(self, method: str, endpoint: str, use_md_token: bool = False, **kwargs) -> Optional[Dict]:
+    def _make_request(self, method: str, endpoint: str, use_md_token: bool = False,
+                      _retry_unauthorized: bool = True, **kwargs) -> Optional[Dict]:
         """
         Make authenticated API request.
         
@@ -235,6 +447,7 @@ class TradovateAPI:
             method: HTTP method (GET, POST, etc.)
             endpoint: API endpoint (without base URL, should not include /v1)
             use_md_token: If True, use market data token instead of regular token
+            _retry_unauthorized: Renew the token and retry once on 401
             **kwargs: Additional arguments to pass to requests
         
         Returns:
@@ -247,11 +460,7 @@ class TradovateAPI:
             # Return mock response structure
             return None
         
-        # Ensure endpoint starts with /v1 if not already present
-        if not endpoint.startswith('/v1'):
-            endpoint = f"/v1{endpoint}" if not endpoint.startswith('/') else f"/v1{endpoint}"
-        
-        url = f"{self.base_url.replace('/v1', '')}{endpoint}"
+        url = build_api_url(self.base_url, endpoint)
         
         # Use market data token for market data requests, regular token for trading operations
         token = self.md_token if use_md_token and self.md_token else self.token
@@ -260,15 +469,16 @@ class TradovateAPI:
             print(f"[ERROR] No access token available (use_md_token={use_md_token})")
             return None
         
-        headers = kwargs.pop('headers', {})
-        headers['Authorization'] = f"Bearer {token}"
-        headers['Content-Type'] = 'application/json'
-        headers['Accept'] = 'application/json'
+        headers = dict(kwargs.pop('headers', {}))
+        request_headers = dict(headers)
+        request_headers['Authorization'] = f"Bearer {token}"
+        request_headers['Content-Type'] = 'application/json'
+        request_headers['Accept'] = 'application/json'
         
         try:
-            response = self.session.request(method, url, headers=headers, timeout=10, **kwargs)
+            response = self.session.request(method, url, headers=request_headers, timeout=10, **kwargs)
             
-            # Handle 401 Unauthorized - switch to mock data
+            # Handle 401 Unauthorized - renew the token once, then give up on this request only
             if response.status_code == 401:
                 try:
                     error_detail = response.json()
@@ -277,22 +487,13 @@ class TradovateAPI:
                     print(f"[WARNING] API request unauthorized (401). Response: {response.text[:200]}")
                 print(f"[WARNING] Request URL: {url}")
                 print(f"[WARNING] Using token type: {'mdAccessToken' if use_md_token else 'accessToken'}")
-                self.use_mock_data = True
+                if _retry_unauthorized and self.token_manager.handle_unauthorized(self.token):
+                    return self._make_request(method, endpoint, use_md_token=use_md_token,
+                                              _retry_unauthorized=False, headers=headers, **kwargs)
                 return None
             
             response.raise_for_status()
             return response.json()
-        except requests.exceptions.HTTPError as e:
-            if e.response and e.response.status_code == 401:
-                try:
-                    error_detail = e.response.json()
-                    print(f"[WARNING] API request unauthorized (401). Response: {error_detail}")
-                except:
-                    print(f"[WARNING] API request unauthorized (401). Response: {e.response.text[:200]}")
-                self.use_mock_data = True
-            else:
-                print(f"[ERROR] API request failed: {e}")
-            return None
         except requests.exceptions.RequestException as e:
             print(f"[ERROR] API request failed: {e}")
             return None
@@ -302,11 +503,15 @@ class TradovateAPI:
         Retrieve list of trading accounts.
         
         Returns:
-            List of account dictionaries
+            List of account dictionaries (a placeholder account in mock or
+            offline mode, empty if the request failed)
         """
         result = self._make_request('GET', '/account/list')
         
         if result is None:
+            if not (self.use_mock_data or self.is_offline()):
+                print("[ERROR] Could not retrieve the Tradovate account list")
+                return []
             # Return mock account for testing
             return [{
                 'accountId': 'mock_account',
@@ -321,6 +526,7 @@ class TradovateAPI:
                                count: int = 100) -> List[Dict]:
         """
         Retrieve historical candle data for backtesting.
+        When the data cache is enabled only bars missing from the cache are requested.
         
         Args:
             symbol: Trading instrument symbol (e.g., "MNQ")
@@ -330,48 +536,49 @@ class TradovateAPI:
         Returns:
             List of candle dictionaries
         """
+        if self.cache is not None:
+            candles = self.cache.get_candles(symbol, interval, count, self._fetch_history)
+            if candles:
+                return candles
+            if self.cache.offline:
+                print(f"[WARNING] Offline mode: no cached {interval} data for {symbol}, using mock data")
+                return generate_mock_candles(count, symbol)
+        else:
+            candles = self._fetch_history(symbol, interval, count)
+            if candles is not None:
+                return candles
+        
         if self.use_mock_data:
             # Don't print every time to avoid spam, only on first call
             if not hasattr(self, '_mock_data_notified'):
                 print(f"[INFO] Using mock historical data for {symbol}")
                 self._mock_data_notified = True
-            return generate_mock_candles(count, symbol)
-        
-        # Parse interval to determine elementSize and underlyingType
-        # Examples: "5Min" -> elementSize=5, "1Hour" -> elementSize=60, "1Day" -> elementSize=1
-        interval_lower = interval.lower()
-        if "day" in interval_lower or "d" in interval_lower:
-            underlying_type = "DayBar"
-            element_size = 1
-        elif "hour" in interval_lower or "h" in interval_lower:
-            underlying_type = "MinuteBar"
-            # Extract number (e.g., "1Hour" -> 60, "2Hour" -> 120)
-            hour_match = interval_lower.replace("hour", "").replace("h", "").strip()
-            element_size = int(hour_match) * 60 if hour_match.isdigit() else 60
-        elif "min" in interval_lower or "m" in interval_lower:
-            underlying_type = "MinuteBar"
-            # Extract number (e.g., "5Min" -> 5, "15Min" -> 15)
-            min_match = interval_lower.replace("min", "").replace("m", "").strip()
-            element_size = int(min_match) if min_match.isdigit() else 5
         else:
-            # Default to 5-minute bars
-            underlying_type = "MinuteBar"
-            element_size = 5
+            print(f"Failed to fetch historical data, using mock data for {symbol}")
+        return generate_mock_candles(count, symbol)
+    
+    def _fetch_history(self, symbol: str, interval: str, count: int,
+                       time_range: Optional[Dict] = None) -> Optional[List[Dict]]:
+        """
+        Request bars from /chart/history.
+        Mock data is never returned here, so it can never end up in the cache.
+        
+        Args:
+            symbol: Trading instrument symbol
+            interval: Candle interval
+            count: Number of candles to retrieve
+            time_range: Optional explicit timeRange
+        
+        Returns:
+            List of candle dictionaries, or None if the request failed or in mock mode
+        """
+        if self.use_mock_data:
+            return None
         
         # Tradovate API requires POST with JSON body
         # Use market data token for historical data requests
         endpoint = "/chart/history"
-        request_body = {
-            "symbol": symbol,
-            "chartDescription": {
-                "underlyingType": underlying_type,
-                "elementSize": element_size,
-                "elementSizeUnit": "UnderlyingUnits"
-            },
-            "timeRange": {
-                "asMuchAsElements": count
-            }
-        }
+        request_body = build_history_request(symbol, interval, count, time_range)
         
         # Try with market data token first, fall back to regular token if not available
         result = self._make_request('POST', endpoint, use_md_token=True, json=request_body)
@@ -382,43 +589,26 @@ class TradovateAPI:
             result = self._make_request('POST', endpoint, use_md_token=False, json=request_body)
         
         if result is None:
-            # If we're in mock mode, the message was already printed
-            if not self.use_mock_data:
-                print(f"Failed to fetch historical data, using mock data for {symbol}")
-            return generate_mock_candles(count, symbol)
+            return None
         
         # Transform API response to standard candle format
-        # Tradovate API response structure may vary - adjust based on actual response
-        candles = []
-        
-        # Try different possible response structures
-        bars = result.get('bars', []) or result.get('data', []) or result.get('elements', [])
-        
-        for bar in bars:
-            # Handle different possible field names in response
-            candles.append({
-                'timestamp': bar.get('time', bar.get('timestamp', bar.get('t', 0))),
-                'open': float(bar.get('open', bar.get('o', 0))),
-                'high': float(bar.get('high', bar.get('h', 0))),
-                'low': float(bar.get('low', bar.get('l', 0))),
-                'close': float(bar.get('close', bar.get('c', 0))),
-                'volume': int(bar.get('volume', bar.get('v', 0))),
-                'symbol': symbol
-            })
+        candles = parse_history_bars(result, symbol)
         
         if candles:
             print(f"[OK] Retrieved {len(candles)} candles from Tradovate API for {symbol}")
         
         return candles
     
-    def subscribe_live_data(self, symbol: str, callback) -> bool:
+    def subscribe_live_data(self, symbol: str, callback, interval: str = "5Min") -> bool:
         """
-        Subscribe to live market data stream.
-        Note: WebSocket implementation required for live streaming.
+        Subscribe to live bars over the market data WebSocket.
+        Subscriptions are collected on self.market_data_stream; run it with
+        `await api.market_data_stream.run()` inside the event loop.
         
         Args:
             symbol: Trading instrument symbol
-            callback: Function to call with new candle data
+            callback: Function (or coroutine) called with (symbol, candle) per completed bar
+            interval: Bar interval
         
         Returns:
             True if subscription successful
@@ -428,10 +618,39 @@ class TradovateAPI:
             # TODO: Implement mock streaming for testing
             return True
         
-        # TODO: Implement WebSocket connection for live data
-        # This would require websocket-client library
-        print("Live data streaming not yet implemented")
-        return False
+        if not WEBSOCKETS_AVAILABLE:
+            print("[ERROR] Live data streaming requires the websockets library")
+            return False
+        
+        if self.market_data_stream is None:
+            self.market_data_stream = MarketDataStream.from_api(self)
+        self.market_data_stream.register_bars(symbol, interval, callback)
+        return True
+    
+    def subscribe_live_ticks(self, symbol: str, callback) -> bool:
+        """
+        Subscribe to live trade prints over the market data WebSocket
+        (collected on self.market_data_stream like subscribe_live_data).
+        
+        Args:
+            symbol: Trading instrument symbol
+            callback: Function (or coroutine) called with (symbol, price, size, timestamp) per trade
+        
+        Returns:
+            True if subscription successful
+        """
+        if self.use_mock_data:
+            print(f"Mock live data mode for {symbol}")
+            return True
+        
+        if not WEBSOCKETS_AVAILABLE:
+            print("[ERROR] Live data streaming requires the websockets library")
+            return False
+        
+        if self.market_data_stream is None:
+            self.market_data_stream = MarketDataStream.from_api(self)
+        self.market_data_stream.register_quotes(symbol, callback)
+        return True
     
     def place_order(self, order_details: Dict) -> Optional[Dict]:
         """
@@ -446,7 +665,7 @@ class TradovateAPI:
         if self.use_mock_data:
             print(f"Mock order placement: {order_details}")
             return {
-                'orderId': f"mock_{int(time.time())}",
+                'orderId': next_mock_order_id(),
                 'status': 'filled',
                 'filledQty': order_details.get('quantity', 0),
                 'timestamp': datetime.now().isoformat()
@@ -456,6 +675,19 @@ class TradovateAPI:
         result = self._make_request('POST', endpoint, json=order_details)
         return result
     
+    def find_contract(self, symbol: str) -> Optional[int]:
+        """
+        Look up the contract id for a symbol (used to route streamed quotes).
+        
+        Args:
+            symbol: Contract symbol (e.g., "MNQZ5")
+        
+        Returns:
+            Contract id or None if not found
+        """
+        result = self._make_request('GET', '/contract/find', params={'name': symbol})
+        return result.get('id') if isinstance(result, dict) else None
+    
     def get_instrument_specs(self, symbol: str) -> Optional[Dict]:
         """
         Get instrument specifications (tick size, tick value, etc.).
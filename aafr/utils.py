@@ -8,6 +8,9 @@ import os
 import csv
 import random
 import math
+import sys
+import importlib.util
+from types import ModuleType
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from pathlib import Path
@@ -846,6 +849,34 @@ def export_equity_curve_csv(equity_curve: List[Dict], file_path: str) -> None:
             writer.writerow(row)
 
 
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module on first attribute access instead of immediately.
+    Keeps heavy optional dependencies (aiohttp, ...) off the startup path
+    of modes that never use them.
+    
+    Args:
+        name: Absolute module name
+    
+    Returns:
+        The module (already loaded, or loading on first attribute access)
+    
+    Raises:
+        ImportError: If the module is not installed
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
 # Example usage
 if __name__ == "__main__":
     # Test config loading
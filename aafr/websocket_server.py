@@ -1,16 +1,29 @@
 """
 WebSocket server for broadcasting AAFR trade events to GUI bot clients.
 Handles client connections and broadcasts JSON events in real-time.
+Each client has its own bounded send queue drained by a writer task, so a
+slow client never delays the others or the signal path. Clients can
+subscribe to a subset of symbols, strategies and event types. Events carry
+sequence numbers, and a reconnecting client receives the events it missed
+from a bounded replay ring. Clients may negotiate msgpack binary frames
+instead of JSON; each event is encoded at most once per encoding.
 """
 
 import asyncio
 import json
 import logging
-from typing import Set, Dict, Any, TYPE_CHECKING
+import uuid
+from collections import deque
+from typing import Dict, Any, Callable, List, Optional, Set, Tuple, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from websockets.server import WebSocketServerProtocol
 from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+from aafr.journal import EVENT
+from aafr.latency import LatencyHistogram, now_ms
+from shared.wire_format import ENCODING_JSON, encode_event, negotiate
 
 try:
     import websockets
@@ -22,29 +35,214 @@ except ImportError:
     print("[WARNING] websockets library not installed. Install with: pip install websockets")
 
 
+# Send queue overflow policies
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Discard the oldest queued event
+OVERFLOW_DISCONNECT = "disconnect"  # Close the client (GUI bots reconnect)
+
+# Subscription topics: SUBSCRIBE message key -> event field it filters on
+TOPIC_FIELDS = {
+    "symbols": "symbol",
+    "strategies": "strategy",
+    "events": "event"
+}
+
+
+def _request_path(websocket: "WebSocketServerProtocol", path: str = "") -> str:
+    """Get the request path (with query) across websockets releases."""
+    request = getattr(websocket, "request", None)
+    if request is not None and getattr(request, "path", None):
+        return request.path
+    return path or getattr(websocket, "path", "") or ""
+
+
+class ClientConnection:
+    """
+    One connected client: a bounded queue of encoded messages and send stats.
+    Messages are queued by broadcast and sent by the client's writer task.
+    """
+    
+    def __init__(self, websocket: "WebSocketServerProtocol", client_id: str, max_queue: int = 256):
+        """
+        Initialize connection.
+        
+        Args:
+            websocket: Client WebSocket connection
+            client_id: "host:port" of the client
+            max_queue: Maximum messages waiting to be sent
+        """
+        self.websocket = websocket
+        self.client_id = client_id
+        self.max_queue = max_queue
+        self.queue = deque()  # (message, queued_at_ms)
+        self.encoding = ENCODING_JSON
+        self.queued_bytes = 0
+        self.ready = asyncio.Event()
+        self.writer = None
+        
+        # Event field -> accepted values (None accepts every value)
+        self.subscriptions: Dict[str, Optional[Set[str]]] = {field: None for field in TOPIC_FIELDS.values()}
+        
+        self.stats = {
+            'sent': 0,
+            'dropped': 0,
+            'max_depth': 0,
+            'last_lag_ms': 0.0,
+            'max_lag_ms': 0.0
+        }
+    
+    def enqueue(self, message: Union[str, bytes], queued_at_ms: Optional[float] = None) -> bool:
+        """
+        Queue a message without waiting for network I/O.
+        
+        Args:
+            message: Encoded message
+            queued_at_ms: now_ms() time the broadcast started (defaults to now)
+        
+        Returns:
+            False if the queue was full (the message is not queued)
+        """
+        if len(self.queue) >= self.max_queue:
+            return False
+        self.queue.append((message, queued_at_ms if queued_at_ms is not None else now_ms()))
+        self.queued_bytes += len(message)
+        self.stats['max_depth'] = max(self.stats['max_depth'], len(self.queue))
+        self.ready.set()
+        return True
+    
+    def accepts(self, event: Dict[str, Any]) -> bool:
+        """
+        Check an event against the client's subscriptions.
+        
+        Args:
+            event: Event dictionary
+        
+        Returns:
+            True if the client is subscribed to the event
+        """
+        for field, values in self.subscriptions.items():
+            value = event.get(field)
+            if values is not None and value is not None and value not in values:
+                return False
+        return True
+    
+    def drop_oldest(self) -> None:
+        """Discard the oldest queued message to make room."""
+        message, _ = self.queue.popleft()
+        self.queued_bytes -= len(message)
+        self.stats['dropped'] += 1
+    
+    @property
+    def lag_ms(self) -> float:
+        """Age of the oldest unsent message (0 when the queue is empty)."""
+        return now_ms() - self.queue[0][1] if self.queue else 0.0
+    
+    async def run_writer(self, send_latency: Optional[LatencyHistogram] = None) -> None:
+        """
+        Send queued messages in order until cancelled or the connection closes.
+        
+        Args:
+            send_latency: Records broadcast -> sent time per message
+        """
+        while True:
+            if not self.queue:
+                self.ready.clear()
+                await self.ready.wait()
+                continue
+            message, queued_at_ms = self.queue.popleft()
+            self.queued_bytes -= len(message)
+            await self.websocket.send(message)
+            lag = now_ms() - queued_at_ms
+            self.stats['sent'] += 1
+            self.stats['last_lag_ms'] = lag
+            self.stats['max_lag_ms'] = max(self.stats['max_lag_ms'], lag)
+            if send_latency is not None:
+                send_latency.record(lag)
+
+
 class WebSocketServer:
     """
     Async WebSocket server for broadcasting trade events.
     Maintains connections to multiple clients and broadcasts events to all.
     """
     
-    def __init__(self, host: str = "localhost", port: int = 8765):
+    def __init__(self, host: str = "localhost", port: int = 8765, max_queue: int = 256,
+                 overflow: str = OVERFLOW_DROP_OLDEST, replay_size: int = 512):
         """
         Initialize WebSocket server.
         
         Args:
             host: Host address to bind to
             port: Port number to listen on
+            max_queue: Maximum unsent events per client
+            overflow: What to do when a client's queue is full
+                (OVERFLOW_DROP_OLDEST or OVERFLOW_DISCONNECT)
+            replay_size: Recent events kept for reconnecting clients
         """
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DISCONNECT):
+            raise ValueError(f"Unknown send queue overflow policy: {overflow}")
         self.host = host
         self.port = port
-        self.clients: Set[WebSocketServerProtocol] = set()
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.clients: Dict[WebSocketServerProtocol, ClientConnection] = {}
+        
+        # Subscription index: event field -> value -> subscribed clients, plus
+        # the clients accepting every value of the field
+        self.topics: Dict[str, Dict[str, Set[ClientConnection]]] = {field: {} for field in TOPIC_FIELDS.values()}
+        self.wildcards: Dict[str, Set[ClientConnection]] = {field: set() for field in TOPIC_FIELDS.values()}
         self.server = None
         self.running = False
         
+        # Events are numbered per server session; the last replay_size
+        # (seq, event, {encoding: message}) entries are kept for reconnecting clients
+        self.session = uuid.uuid4().hex[:12]
+        self.sequence = 0
+        self.replay = deque(maxlen=replay_size)
+        
+        # Broadcast -> sent time of every client message
+        self.send_latency = LatencyHistogram("broadcast->client send")
+        self.stats = {
+            'broadcasts': 0,
+            'dropped': 0,
+            'overflow_disconnects': 0,
+            'replayed': 0
+        }
+        
+        # Client message handlers: event name -> callback(message)
+        self.message_handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        
+        # Optional SessionJournal recording outbound events
+        self.journal = None
+        
         # Setup logging
         self.logger = logging.getLogger(__name__)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "WebSocketServer":
+        """
+        Create a server from the "gui_bot" config section.
         
+        Args:
+            config: Full configuration dictionary
+        
+        Returns:
+            WebSocketServer
+        """
+        settings = config.get('gui_bot', {})
+        return cls(settings.get('websocket_host', 'localhost'), settings.get('websocket_port', 8765),
+                   settings.get('send_queue_size', 256), settings.get('overflow_policy', OVERFLOW_DROP_OLDEST),
+                   settings.get('replay_size', 512))
+        
+    def on(self, event_name: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a handler for messages sent by clients.
+        
+        Args:
+            event_name: Value of the message's "event" field
+            handler: Called with the decoded message
+        """
+        self.message_handlers[event_name] = handler
+    
     async def start(self) -> None:
         """Start the WebSocket server."""
         if not WEBSOCKETS_AVAILABLE:
@@ -82,28 +280,49 @@ class WebSocketServer:
             print(f"[ERROR] WebSocket server failed to start: {e}")
             self.running = False
     
-    async def handle_client(self, websocket: "WebSocketServerProtocol", path: str) -> None:
+    async def handle_client(self, websocket: "WebSocketServerProtocol", path: str = "") -> None:
         """
         Handle individual client connection.
+        The connection URL's query may carry subscriptions
+        (symbols=NQ,ES&strategies=AJR&events=NEW_POSITION), the wanted
+        encoding (encoding=msgpack) and, when reconnecting, the last event
+        seen (session=<id>&last_seq=<n>), so all apply before any event is
+        queued. The welcome message is always JSON.
         
         Args:
             websocket: Client WebSocket connection
-            path: Connection path
+            path: Connection path (only passed by websockets releases before 13)
         """
         client_id = f"{websocket.remote_address[0]}:{websocket.remote_address[1]}"
-        self.clients.add(websocket)
+        connection = ClientConnection(websocket, client_id, self.max_queue)
+        params = parse_qs(urlsplit(_request_path(websocket, path)).query)
+        connection.encoding = negotiate(params.get('encoding', [None])[0])
+        subscription = {key: params[key][0].split(",") for key in TOPIC_FIELDS if key in params}
+        if subscription:
+            self.subscribe(connection, subscription)
+        self._register(connection)  # Events broadcast from now on are queued
+        replayed, missed = 0, 0
+        if 'last_seq' in params and params['last_seq'][0].isdigit():
+            replayed, missed = self._replay(connection, int(params['last_seq'][0]),
+                                            params.get('session', [None])[0])
         print(f"[INFO] GUI Bot client connected: {client_id} (Total: {len(self.clients)})")
         self.logger.info(f"Client connected: {client_id}")
         
         try:
-            # Send welcome message
+            # Send welcome message (ahead of any queued events)
             welcome = {
                 "event": "CONNECTED",
                 "message": "Connected to AAFR WebSocket server",
                 "server_time": datetime.now().isoformat(),
-                "client_id": client_id
+                "client_id": client_id,
+                "session": self.session,
+                "last_seq": self.sequence,
+                "replayed": replayed,
+                "missed": missed,
+                "encoding": connection.encoding
             }
             await websocket.send(json.dumps(welcome))
+            connection.writer = asyncio.create_task(self._run_writer(connection))
             
             # Keep connection alive and listen for messages
             async for message in websocket:
@@ -116,6 +335,14 @@ class WebSocketServer:
                     if data.get("event") == "PING":
                         pong = {"event": "PONG", "timestamp": datetime.now().isoformat()}
                         await websocket.send(json.dumps(pong))
+                    
+                    # Narrow the events this client receives
+                    elif data.get("event") == "SUBSCRIBE":
+                        await websocket.send(json.dumps(self.subscribe(connection, data)))
+                    
+                    handler = self.message_handlers.get(data.get("event"))
+                    if handler is not None:
+                        handler(data)
                         
                 except json.JSONDecodeError:
                     self.logger.warning(f"Invalid JSON from {client_id}: {message}")
@@ -127,43 +354,241 @@ class WebSocketServer:
             self.logger.error(f"Error handling client {client_id}: {e}")
             
         finally:
-            self.clients.discard(websocket)
+            if connection.writer is not None:
+                connection.writer.cancel()
+            if self.clients.get(websocket) is connection:
+                self._unregister(connection)
             print(f"[INFO] GUI Bot client disconnected: {client_id} (Remaining: {len(self.clients)})")
     
+    async def _run_writer(self, connection: ClientConnection) -> None:
+        """
+        Run a client's writer task, logging why it stopped.
+        
+        Args:
+            connection: Client connection
+        """
+        try:
+            await connection.run_writer(self.send_latency)
+        except websockets.exceptions.ConnectionClosed:
+            self.logger.info(f"Client connection closed while sending: {connection.client_id}")
+        except Exception as e:
+            self.logger.error(f"Error sending to client {connection.client_id}: {e}")
+    
+    def _replay(self, connection: ClientConnection, last_seq: int, session: Optional[str]) -> Tuple[int, int]:
+        """
+        Queue the events a reconnecting client missed.
+        
+        Args:
+            connection: Client connection (not yet sending)
+            last_seq: Sequence number of the last event the client received
+            session: Server session the client's last_seq belongs to
+        
+        Returns:
+            (events queued, events no longer in the replay ring)
+        """
+        if session != self.session:
+            last_seq = 0  # The server restarted: every event of this session is new
+        oldest = self.replay[0][0] if self.replay else self.sequence + 1
+        missed = max(0, min(oldest - 1, self.sequence) - last_seq)
+        events = [self._encoded(event, encoded, connection.encoding)
+                  for seq, event, encoded in self.replay if seq > last_seq and connection.accepts(event)]
+        if len(events) > self.max_queue:
+            missed += len(events) - self.max_queue
+            events = events[-self.max_queue:]
+        queued_at_ms = now_ms()
+        for message in events:
+            connection.enqueue(message, queued_at_ms)
+        self.stats['replayed'] += len(events)
+        if events or missed:
+            print(f"[INFO] Replaying {len(events)} events to {connection.client_id} after seq {last_seq}"
+                  + (f" ({missed} no longer available)" if missed else ""))
+        return len(events), missed
+    
+    @staticmethod
+    def _encoded(event: Dict[str, Any], encoded: Dict[str, Union[str, bytes]], encoding: str) -> Union[str, bytes]:
+        """Get an event's message in an encoding, encoding it on first use."""
+        message = encoded.get(encoding)
+        if message is None:
+            message = encoded[encoding] = encode_event(event, encoding)
+        return message
+    
+    def _register(self, connection: ClientConnection) -> None:
+        """Add a client and index its subscriptions."""
+        self.clients[connection.websocket] = connection
+        for field, values in connection.subscriptions.items():
+            if values is None:
+                self.wildcards[field].add(connection)
+            else:
+                for value in values:
+                    self.topics[field].setdefault(value, set()).add(connection)
+    
+    def _unregister(self, connection: ClientConnection) -> None:
+        """Remove a client and its subscriptions from the index."""
+        self.clients.pop(connection.websocket, None)
+        for field, values in connection.subscriptions.items():
+            if values is None:
+                self.wildcards[field].discard(connection)
+                continue
+            for value in values:
+                subscribers = self.topics[field].get(value)
+                if subscribers is not None:
+                    subscribers.discard(connection)
+                    if not subscribers:
+                        del self.topics[field][value]
+    
+    def subscribe(self, connection: ClientConnection, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace a client's subscriptions.
+        Each of "symbols", "strategies" and "events" is a list of accepted
+        values; an omitted (or null) list accepts every value. Events without
+        the filtered field (e.g., no "strategy") are not filtered by it.
+        
+        Args:
+            connection: Client connection
+            message: SUBSCRIBE message
+        
+        Returns:
+            SUBSCRIBED reply (or ERROR if a list is malformed)
+        """
+        subscriptions = {}
+        for key, field in TOPIC_FIELDS.items():
+            values = message.get(key)
+            if values is not None and (not isinstance(values, list)
+                                       or not all(isinstance(v, str) for v in values)):
+                return {"event": "ERROR", "message": f"SUBSCRIBE {key} must be a list of strings"}
+            subscriptions[field] = set(values) if values is not None else None
+        
+        registered = self.clients.get(connection.websocket) is connection
+        if registered:
+            self._unregister(connection)
+        connection.subscriptions = subscriptions
+        if registered:
+            self._register(connection)
+        
+        reply = {"event": "SUBSCRIBED"}
+        for key, field in TOPIC_FIELDS.items():
+            reply[key] = sorted(subscriptions[field]) if subscriptions[field] is not None else None
+        self.logger.info(f"Client {connection.client_id} subscribed: {reply}")
+        return reply
+    
+    def recipients(self, event: Dict[str, Any]) -> List[ClientConnection]:
+        """
+        Get the clients subscribed to an event.
+        Only the index entries for the event's own values are touched.
+        
+        Args:
+            event: Event dictionary
+        
+        Returns:
+            Subscribed client connections
+        """
+        matched = None
+        for field in TOPIC_FIELDS.values():
+            value = event.get(field)
+            if value is None:
+                continue
+            interested = self.wildcards[field].union(self.topics[field].get(value, ()))
+            matched = interested if matched is None else matched & interested
+            if not matched:
+                return []
+        return list(self.clients.values()) if matched is None else list(matched)
+    
+    def _disconnect(self, connection: ClientConnection) -> None:
+        """
+        Drop a client that fell too far behind (closing happens in the background).
+        
+        Args:
+            connection: Client connection
+        """
+        self._unregister(connection)
+        if connection.writer is not None:
+            connection.writer.cancel()
+        self.stats['overflow_disconnects'] += 1
+        print(f"[WARNING] GUI Bot client {connection.client_id} disconnected: "
+              f"{len(connection.queue)} events unsent")
+        task = asyncio.create_task(connection.websocket.close(code=1013, reason="Send queue overflow"))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    
+    def send_backlog(self) -> int:
+        """
+        Get bytes queued for sending across all client connections.
+        
+        Returns:
+            Total bytes in client send queues and transport write buffers
+        """
+        total = 0
+        for client, connection in self.clients.items():
+            total += connection.queued_bytes
+            transport = getattr(client, "transport", None)
+            if transport is not None:
+                total += transport.get_write_buffer_size()
+        return total
+    
+    def client_lag(self) -> Dict[str, float]:
+        """
+        Get how far behind each client is.
+        
+        Returns:
+            Dictionary of client id -> age in seconds of its oldest unsent event
+        """
+        return {c.client_id: c.lag_ms / 1000.0 for c in self.clients.values()}
+    
+    def client_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get send queue statistics per client.
+        
+        Returns:
+            Dictionary of client id -> queue depth, lag and sent/dropped counts
+        """
+        return {c.client_id: dict(c.stats, queued=len(c.queue), lag_ms=c.lag_ms)
+                for c in self.clients.values()}
+    
     async def broadcast_event(self, event: Dict[str, Any]) -> None:
         """
         Broadcast event to all connected clients.
+        The event is encoded once per encoding in use and queued for every
+        subscribed client; this never waits for network I/O.
         
         Args:
             event: Event dictionary to broadcast
         """
+        # Add timestamp if not present
+        if "timestamp" not in event:
+            event["timestamp"] = datetime.now().isoformat()
+        self.sequence += 1
+        event["seq"] = self.sequence
+        
+        if self.journal is not None:
+            self.journal.append(EVENT, {'clients': len(self.clients), 'event': event})
+        
+        # Kept for replay even when no client is connected (encoded when first sent)
+        encoded = {}
+        self.replay.append((self.sequence, event, encoded))
+        
         if not self.clients:
             self.logger.debug("No clients connected, skipping broadcast")
             return
         
-        # Add timestamp if not present
-        if "timestamp" not in event:
-            event["timestamp"] = datetime.now().isoformat()
+        recipients = self.recipients(event)
+        if not recipients:
+            self.logger.debug(f"No clients subscribed to {event.get('event', 'UNKNOWN')}, skipping broadcast")
+            return
+        
+        queued_at_ms = now_ms()
+        self.stats['broadcasts'] += 1
+        self.logger.info(f"Broadcasting event: {event.get('event', 'UNKNOWN')} to {len(recipients)} clients")
+        print(f"[WS] Broadcasting {event.get('event', 'UNKNOWN')} event to {len(recipients)} client(s)")
         
-        message = json.dumps(event)
-        self.logger.info(f"Broadcasting event: {event.get('event', 'UNKNOWN')} to {len(self.clients)} clients")
-        print(f"[WS] Broadcasting {event.get('event', 'UNKNOWN')} event to {len(self.clients)} client(s)")
-        
-        # Broadcast to all clients
-        disconnected = set()
-        for client in self.clients:
-            try:
-                await client.send(message)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected.add(client)
-                self.logger.warning("Client connection closed during broadcast")
-            except Exception as e:
-                self.logger.error(f"Error broadcasting to client: {e}")
-                disconnected.add(client)
-        
-        # Remove disconnected clients
-        for client in disconnected:
-            self.clients.discard(client)
+        for connection in recipients:
+            message = self._encoded(event, encoded, connection.encoding)
+            if connection.enqueue(message, queued_at_ms):
+                continue
+            if self.overflow == OVERFLOW_DISCONNECT:
+                self._disconnect(connection)
+                continue
+            connection.drop_oldest()
+            self.stats['dropped'] += 1
+            connection.enqueue(message, queued_at_ms)
     
     def broadcast_sync(self, event: Dict[str, Any]) -> None:
         """
@@ -194,11 +619,17 @@ class WebSocketServer:
         
         # Close all client connections
         if self.clients:
+            for connection in self.clients.values():
+                if connection.writer is not None:
+                    connection.writer.cancel()
             await asyncio.gather(
                 *[client.close() for client in self.clients],
                 return_exceptions=True
             )
             self.clients.clear()
+            for field in TOPIC_FIELDS.values():
+                self.topics[field].clear()
+                self.wildcards[field].clear()
         
         # Close server
         if self.server:
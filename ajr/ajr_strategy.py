@@ -3,12 +3,14 @@ AJR (Andrew's Justified Reversal) Strategy Module.
 Inversion gap strategy - detects gaps and trades reversals.
 """
 
+import threading
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from ajr.gap_tracker import GapTracker, Gap
 from shared.signal_schema import TradeSignal
 from aafr.utils import load_config
+from aafr.candle_buffer import CandleRingBuffer
 
 
 class AJRStrategy:
@@ -46,10 +48,14 @@ class AJRStrategy:
             max_gap_age_candles=max_age
         )
         
-        # Store recent candles for swing detection
-        self.candle_history: Dict[str, List[Dict]] = {}
+        # Store recent candles for swing detection (ring buffers track the 20-bar swing)
+        self.candle_history: Dict[str, CandleRingBuffer] = {}
         self.max_history = 200
         
+        # Detection runs in a thread pool with one job per symbol at a time, so
+        # different symbols can update the shared tracker dicts concurrently
+        self._lock = threading.Lock()
+        
         print(f"[AJR] Strategy initialized")
         print(f"[AJR] Enabled: {self.enabled}")
     
@@ -67,31 +73,29 @@ class AJRStrategy:
         if not self.enabled:
             return None
         
-        # Store candle in history
-        self._add_to_history(candle, instrument)
-        
-        # Process candle through gap tracker
-        new_gap = self.gap_tracker.process_candle(candle, instrument)
-        
-        # Check for recent gap inversion
-        inverted_gap = self.gap_tracker.get_recent_inversion(instrument)
-        
-        if inverted_gap:
-            # Generate trade signal (candle already added to history)
-            return self._generate_signal(inverted_gap, candle, instrument)
+        with self._lock:
+            # Store candle in history
+            self._add_to_history(candle, instrument)
+            
+            # Process candle through gap tracker
+            new_gap = self.gap_tracker.process_candle(candle, instrument)
+            
+            # Check for recent gap inversion
+            inverted_gap = self.gap_tracker.get_recent_inversion(instrument)
+            
+            if inverted_gap:
+                # Generate trade signal (candle already added to history)
+                return self._generate_signal(inverted_gap, candle, instrument)
         
         return None
     
     def _add_to_history(self, candle: Dict[str, Any], instrument: str):
         """Add candle to history for swing detection."""
         if instrument not in self.candle_history:
-            self.candle_history[instrument] = []
+            # Fixed capacity: the oldest candle is dropped once full
+            self.candle_history[instrument] = CandleRingBuffer(self.max_history, swing_lookback=20)
         
         self.candle_history[instrument].append(candle)
-        
-        # Keep only recent candles
-        if len(self.candle_history[instrument]) > self.max_history:
-            self.candle_history[instrument] = self.candle_history[instrument][-self.max_history:]
     
     def _generate_signal(self, gap: Gap, current_candle: Dict[str, Any],
                         instrument: str) -> Optional[TradeSignal]:
@@ -190,11 +194,11 @@ class AJRStrategy:
         
         # Find recent swing
         if direction == "BUY":
-            # For BUY, find recent swing low
-            swing = self._find_swing_low(history[-20:])
+            # For BUY, recent (20-bar) swing low
+            swing = history.swing_low
         else:
-            # For SELL, find recent swing high
-            swing = self._find_swing_high(history[-20:])
+            # For SELL, recent (20-bar) swing high
+            swing = history.swing_high
         
         if swing is None:
             return self._simple_stop(current_candle, direction, instrument)
@@ -312,17 +316,35 @@ class AJRStrategy:
         }
         return tick_sizes.get(instrument, 0.25)
     
+    def snapshot(self, instruments: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Capture gap phase state and swing history (only for instruments if given) for a warm restart."""
+        with self._lock:
+            instruments = list(self.candle_history) if instruments is None else instruments
+            return {
+                "gap_tracker": self.gap_tracker.snapshot(instruments),
+                "candle_history": {instrument: self.candle_history[instrument].snapshot()
+                                   for instrument in instruments if instrument in self.candle_history}
+            }
+    
+    def restore(self, state: Dict[str, Any], instruments: Optional[List[str]] = None):
+        """Restore state saved by snapshot() (only for instruments if given)."""
+        with self._lock:
+            self.gap_tracker.restore(state.get("gap_tracker", {}), instruments)
+            for instrument, ring in state.get("candle_history", {}).items():
+                if instruments is None or instrument in instruments:
+                    self.candle_history[instrument] = CandleRingBuffer.from_snapshot(ring)
+    
     def reset(self, instrument: Optional[str] = None):
         """Reset strategy state."""
-        if instrument:
-            self.gap_tracker.clear_instrument(instrument)
-            if instrument in self.candle_history:
-                self.candle_history[instrument] = []
-        else:
-            # Reset all
-            for inst in list(self.gap_tracker.gaps.keys()):
-                self.gap_tracker.clear_instrument(inst)
-            self.candle_history = {}
+        with self._lock:
+            if instrument:
+                self.gap_tracker.clear_instrument(instrument)
+                self.candle_history.pop(instrument, None)
+            else:
+                # Reset all
+                for inst in list(self.gap_tracker.gaps.keys()):
+                    self.gap_tracker.clear_instrument(inst)
+                self.candle_history = {}
 
 
 # Test
@@ -67,6 +67,32 @@ class Gap:
         else:  # DOWN
             return candle['close'] > self.gap_high
     
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert gap to dictionary."""
+        return {
+            "gap_id": self.gap_id,
+            "instrument": self.instrument,
+            "gap_high": self.gap_high,
+            "gap_low": self.gap_low,
+            "candle_idx": self.candle_idx,
+            "direction": self.direction,
+            "created_at": self.created_at.isoformat(),
+            "filled": self.filled,
+            "inverted": self.inverted,
+            "inversion_candle_idx": self.inversion_candle_idx
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Gap':
+        """Create gap from dictionary."""
+        gap = cls(data["gap_id"], data["instrument"], data["gap_high"], data["gap_low"],
+                  data["candle_idx"], data["direction"])
+        gap.created_at = datetime.fromisoformat(data["created_at"])
+        gap.filled = data["filled"]
+        gap.inverted = data["inverted"]
+        gap.inversion_candle_idx = data["inversion_candle_idx"]
+        return gap
+    
     def __repr__(self) -> str:
         return f"Gap({self.gap_id}, {self.instrument}, {self.direction}, "  \
                f"{self.gap_low:.2f}-{self.gap_high:.2f}, Age: {self.age_in_candles(0)})"
@@ -240,6 +266,21 @@ class GapTracker:
         return [gap for gap in self.gaps.get(instrument, [])
                 if not gap.filled and gap.age_in_candles(self.candle_count.get(instrument, 0)) <= self.max_gap_age_candles]
     
+    def snapshot(self, instruments: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Capture tracked gaps and candle counts (only for instruments if given) for a warm restart."""
+        instruments = list(self.gaps) if instruments is None else [i for i in instruments if i in self.gaps]
+        return {
+            "gaps": {instrument: [gap.to_dict() for gap in self.gaps[instrument]] for instrument in instruments},
+            "candle_count": {instrument: self.candle_count[instrument] for instrument in instruments}
+        }
+    
+    def restore(self, state: Dict[str, Any], instruments: Optional[List[str]] = None):
+        """Restore gaps saved by snapshot() (only for instruments if given)."""
+        for instrument, gaps in state.get("gaps", {}).items():
+            if instruments is None or instrument in instruments:
+                self.gaps[instrument] = [Gap.from_dict(gap) for gap in gaps]
+                self.candle_count[instrument] = state["candle_count"].get(instrument, 0)
+    
     def clear_instrument(self, instrument: str):
         """Clear all gaps for an instrument."""
         if instrument in self.gaps:
@@ -4,15 +4,17 @@ Both strategies share execution arbiter and GUI bot.
 """
 
 import sys
+import time
 import asyncio
 from datetime import datetime
+from functools import cached_property
 from typing import Dict, List, Optional
 from pathlib import Path
 
-from aafr.icc_module import ICCDetector
+from aafr.icc_module import ICCDetector, evaluate_icc_setup
 from aafr.cvd_module import CVDCalculator
 from aafr.tradovate_api import TradovateAPI
-from aafr.utils import load_config, get_formatted_timestamp, calculate_atr
+from aafr.utils import load_config, get_formatted_timestamp
 
 from ajr.ajr_strategy import AJRStrategy
 
@@ -21,18 +23,29 @@ from shared.unified_risk_manager import UnifiedRiskManager
 from shared.execution_arbiter import ExecutionArbiter
 from shared.signal_logger import SignalLogger
 
-from aafr.websocket_server import WebSocketServer
+from aafr.signal_dedup import SignalDedupCache, icc_fingerprint
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.journal import DETECTION, DECISION
+from aafr.latency import (
+    StageLatencyTracker, now_ms, STAGE_DETECTION, STAGE_RISK, STAGE_ORDER,
+    STAGE_LOGGING, STAGE_BROADCAST, STAGE_GUI_RECEIPT
+)
 
 
 class DualStrategySystem:
     """
     Main orchestrator for running AAFR and AJR strategies in parallel.
     Both strategies emit signals through shared execution arbiter.
+    
+    The async client, order fan-out, metrics, journal, snapshots, detection
+    pool and bar pipeline are created, and their modules imported, on first
+    access, like AAFRTradingSystem's live components.
     """
     
     def __init__(self, config_path: str = "config.json"):
         """Initialize dual strategy system."""
         self.config = load_config(config_path)
+        self.config_path = config_path
         
         # Initialize shared components
         self.risk_manager = UnifiedRiskManager(config_path)
@@ -42,6 +55,10 @@ class DualStrategySystem:
         # Initialize API
         self.api = TradovateAPI(config_path)
         
+        # Order placement mirrored across the configured account group
+        self.auto_trade = self.config.get('order_management', {}).get('enabled', False)
+        self._order_tasks = set()  # Order dispatches still waiting on account acks
+        
         # Initialize AAFR strategy modules
         self.icc_detector = ICCDetector()
         self.cvd_calculator = CVDCalculator()
@@ -53,13 +70,23 @@ class DualStrategySystem:
         gui_bot_config = self.config.get('gui_bot', {})
         self.ws_server = None
         if gui_bot_config.get('enabled', False):
-            ws_host = gui_bot_config.get('websocket_host', 'localhost')
-            ws_port = gui_bot_config.get('websocket_port', 8765)
-            self.ws_server = WebSocketServer(ws_host, ws_port)
+            from aafr.websocket_server import WebSocketServer
+            self.ws_server = WebSocketServer.from_config(self.config)
+        
+        # Per-stage latency of the bar -> signal -> GUI click path
+        self.latency = StageLatencyTracker.from_config(self.config)
+        self.status_interval = self.config.get('latency', {}).get('status_interval', 60)
+        if self.ws_server:
+            self.ws_server.on('LATENCY_REPORT', self.latency.record_report)
         
         # System state
         self.running = False
-        self.candle_buffers = {}  # Per-symbol candle buffers
+        self.clock = datetime.now  # Wall clock (simulated during replays)
+        self.max_buffer_bars = 500
+        self.poll_interval = 5  # Seconds between REST polls when no bar stream is available
+        
+        self.signal_cache = SignalDedupCache.from_config(self.config)  # One AAFR signal per ICC structure
+        self.signal_sink = None  # Set in shard worker processes: signals go to the supervisor
         
         print(f"\n{'='*60}")
         print("DUAL STRATEGY SYSTEM - AAFR + AJR")
@@ -70,6 +97,103 @@ class DualStrategySystem:
         print(f"[SYSTEM] Arbiter: {'enabled' if self.arbiter.enabled else 'disabled'}")
         print(f"[SYSTEM] GUI Bot: {'enabled' if self.ws_server else 'disabled'}")
     
+    @cached_property
+    def async_api(self):
+        """Async REST client for history and order placement."""
+        from aafr.async_tradovate_api import AsyncTradovateAPI
+        return AsyncTradovateAPI(self.config_path, token_source=self.api)
+    
+    @cached_property
+    def order_fanout(self):
+        """Order routing to every account of the configured group."""
+        from aafr.account_fanout import AccountFanout
+        return AccountFanout.from_config(self.async_api, self.config, self.config_path)
+    
+    @cached_property
+    def detection_executor(self):
+        """Worker pool for CPU-bound detection, one job at a time per symbol."""
+        from aafr.detection_executor import DetectionExecutor
+        return DetectionExecutor.from_config(self.config)
+    
+    @cached_property
+    def journal(self):
+        """Append-only record of market data, signals, arbiter decisions and events."""
+        from aafr.journal import SessionJournal
+        journal = SessionJournal.from_config(self.config)
+        if self.ws_server:
+            self.ws_server.journal = journal
+        return journal
+    
+    @cached_property
+    def pipeline(self):
+        """Per-symbol closed bar queues; both strategies run once per bar."""
+        from aafr.bar_pipeline import BarPipeline
+        pipeline = BarPipeline(self._evaluate_bar, max_bars=self.max_buffer_bars)
+        pipeline.journal = self.journal
+        return pipeline
+    
+    @property
+    def candle_buffers(self) -> Dict[str, CandleRingBuffer]:
+        """Per-symbol candle ring buffers."""
+        return self.pipeline.buffers
+    
+    @cached_property
+    def snapshots(self):
+        """Periodic state snapshots, so a restarted live session resumes warm."""
+        from aafr.state_snapshot import SnapshotStore
+        return SnapshotStore.from_config(self.config, "dual")
+    
+    @cached_property
+    def metrics(self):
+        """Opt-in Prometheus endpoint (config "metrics" section)."""
+        from aafr.metrics import MetricsServer
+        metrics = MetricsServer.from_config(self.config)
+        self._register_metrics(metrics.registry)
+        return metrics
+    
+    def _loaded(self, name: str) -> bool:
+        """True if a lazily created component exists."""
+        return name in self.__dict__
+    
+    def _count(self, name: str, **labels) -> None:
+        """Bump a metrics counter, only once the metrics endpoint exists and is enabled."""
+        if self._loaded('metrics') and self.metrics.enabled:
+            self.metrics.registry.inc(name, **labels)
+    
+    def _register_metrics(self, registry) -> None:
+        """Export pipeline, arbiter, WebSocket and latency stats to the metrics registry."""
+        from aafr.metrics import COUNTER, GAUGE, HISTOGRAM
+        pipeline = self.pipeline.stats
+        registry.register("bars_pushed_total", COUNTER, "Closed bars queued by market data",
+                          lambda: pipeline['bars_pushed'])
+        registry.register("bars_processed_total", COUNTER, "Closed bars run through detection",
+                          lambda: pipeline['bars_processed'])
+        registry.register("bar_backlog", GAUGE, "Closed bars waiting for detection",
+                          self.pipeline.backlog, label="symbol")
+        registry.register("detections_total", COUNTER, "Strategy signals detected")
+        registry.register("rejections_total", COUNTER, "Detections rejected before the arbiter, by reason")
+        registry.register("arbiter_decisions_total", COUNTER, "Execution arbiter decisions",
+                          lambda: {key: value for key, value in self.arbiter.get_stats().items()
+                                   if key in ('accepted', 'rejected', 'merged')}, label="decision")
+        registry.register("open_positions", GAUGE, "Positions open in the arbiter",
+                          lambda: self.arbiter.get_stats()['open_positions'])
+        if self.ws_server:
+            registry.register("websocket_clients", GAUGE, "Connected GUI bot clients",
+                              lambda: len(self.ws_server.clients))
+            registry.register("websocket_send_queue_bytes", GAUGE, "Bytes queued for WebSocket clients",
+                              self.ws_server.send_backlog)
+            registry.register("websocket_client_lag_seconds", GAUGE, "Age of each client's oldest unsent event",
+                              self.ws_server.client_lag, label="client")
+            registry.register("websocket_dropped_events_total", COUNTER, "Events dropped from full client queues",
+                              lambda: self.ws_server.stats['dropped'])
+            registry.register("websocket_send_latency_seconds", HISTOGRAM, "Broadcast to client send time",
+                              lambda: self.ws_server.send_latency)
+        registry.register("stage_latency_seconds", HISTOGRAM, "Signal path latency per stage",
+                          lambda: self.latency.histograms, label="stage")
+        registry.register("detection_latency_seconds", HISTOGRAM, "Detection job queue wait and run time",
+                          lambda: {'wait': self.detection_executor.wait_time,
+                                   'run': self.detection_executor.run_time}, label="phase")
+    
     async def start(self, symbols: List[str]):
         """
         Start monitoring and trading for specified symbols.
@@ -81,12 +205,29 @@ class DualStrategySystem:
         print(f"[SYSTEM] Symbols: {symbols}")
         print(f"[SYSTEM] Press Ctrl+C to stop\n")
         
-        # Authenticate with API
-        if not self.api.authenticate():
+        # Authenticate with API (off the event loop)
+        if not await asyncio.to_thread(self.api.authenticate):
             print("[WARNING] API authentication failed, using mock data")
         
+        # Renew tokens in the background so requests never wait on authentication
+        if not self.api.is_using_mock_data() and not self.api.is_offline():
+            self.api.token_manager.start()
+        
         self.running = True
         
+        # Resume from the last state snapshot; only symbols without one load full history
+        resumed = self._restore_snapshot(symbols)
+        histories = await self.async_api.load_history([s for s in symbols if s not in resumed], count=200)
+        
+        # Resolve trading accounts and pre-build order templates
+        if self.auto_trade and not await self.order_fanout.prepare(symbols):
+            print("[WARNING] Order placement disabled: no trading account")
+            self.auto_trade = False
+        
+        await self.detection_executor.warm_up()
+        await self.metrics.start()
+        self.journal.start(system="DUAL", mode="live", symbols=symbols)
+        
         try:
             # Start WebSocket server if enabled
             tasks = []
@@ -99,11 +240,29 @@ class DualStrategySystem:
                     print(f"[WARNING] WebSocket server not started: {e}")
                     print(f"[INFO] System will continue without WebSocket (GUI bot won't connect)")
             
+            # Stream completed bars (or trade prints aggregated into bars) for
+            # every symbol over one market data connection
+            tick_bars = self.config.get('market_data', {}).get('bar_source', 'chart') == 'ticks'
+            for symbol in symbols:
+                if tick_bars:
+                    self.api.subscribe_live_ticks(symbol, self.pipeline.push_tick)
+                else:
+                    self.api.subscribe_live_data(symbol, self._on_bar_close)
+            stream = self.api.market_data_stream
+            if stream is not None:
+                tasks.append(asyncio.create_task(stream.run()))
+            
             # Start monitoring each symbol
             for symbol in symbols:
-                task = asyncio.create_task(self._monitor_symbol(symbol))
+                task = asyncio.create_task(self._monitor_symbol(symbol, histories.get(symbol),
+                                                                resumed=symbol in resumed))
                 tasks.append(task)
             
+            if self.status_interval:
+                tasks.append(asyncio.create_task(self._report_latency()))
+            if self.snapshots.enabled:
+                tasks.append(asyncio.create_task(self.snapshots.run(self.capture_state)))
+            
             # Wait for all tasks
             await asyncio.gather(*tasks)
             
@@ -112,67 +271,358 @@ class DualStrategySystem:
             if self.ws_server:
                 await self.ws_server.stop()
             self.stop()
+        finally:
+            if self.api.market_data_stream is not None:
+                await self.api.market_data_stream.stop()
+            await self._wait_for_orders()
+            await self.api.token_manager.stop()
+            await self.metrics.stop()
+            await self.async_api.close()
+            self.snapshots.save(await self.capture_state())
+            self.detection_executor.shutdown(wait=False)
+    
+    async def start_sharded(self, symbols: List[str], shards: Optional[int] = None):
+        """
+        Run both strategies in worker processes, one shard of symbols each.
+        The arbiter, risk manager, order placement and WebSocket server stay
+        in this process and see the signals of every symbol.
+        
+        Args:
+            symbols: List of symbols to trade
+            shards: Worker process count (config "sharding" section if None)
+        """
+        from aafr.shard_supervisor import ShardSupervisor
+        
+        supervisor = ShardSupervisor.from_config(self, self.config, "dual", self.config_path, shards)
+        supervisor.offline = self.api.is_offline()
+        print(f"\n[SYSTEM] Starting dual strategy system (sharded)...")
+        print(f"[SYSTEM] Symbols: {symbols}")
+        print(f"[SYSTEM] Press Ctrl+C to stop\n")
+        
+        # Orders are placed from this process, so only it needs an order session
+        if self.auto_trade:
+            if not await asyncio.to_thread(self.api.authenticate):
+                print("[WARNING] API authentication failed, using mock data")
+            if not self.api.is_using_mock_data() and not self.api.is_offline():
+                self.api.token_manager.start()
+            if not await self.order_fanout.prepare(symbols):
+                print("[WARNING] Order placement disabled: no trading account")
+                self.auto_trade = False
+        
+        self.running = True
+        self._restore_snapshot([])  # Open positions and risk counters; workers keep their own buffers
+        await self.metrics.start()
+        self.journal.start(system="DUAL", mode="supervisor", symbols=symbols)
+        
+        tasks = []
+        try:
+            if self.ws_server:
+                tasks.append(asyncio.create_task(self.ws_server.start()))
+                await asyncio.sleep(0.5)
+            if self.status_interval:
+                tasks.append(asyncio.create_task(self._report_latency()))
+            if self.snapshots.enabled:
+                tasks.append(asyncio.create_task(self.snapshots.run(self.capture_state)))
+            tasks.append(asyncio.create_task(supervisor.run(symbols)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await supervisor.stop()
+            if self.ws_server:
+                await self.ws_server.stop()
+            await self._wait_for_orders()
+            await self.api.token_manager.stop()
+            await self.metrics.stop()
+            await self.async_api.close()
+            self.snapshots.save(await self.capture_state())
+            print(f"\n[SHARDS] {supervisor.format_stats()}")
+    
+    async def process_remote_signal(self, payload: Dict, trace: Optional[Dict] = None) -> bool:
+        """
+        Process a signal detected by a shard worker.
+        
+        Args:
+            payload: {'signal': TradeSignal} sent by the worker
+            trace: Stage latency trace rebuilt from the worker's timings
+        
+        Returns:
+            True
+        """
+        await self._process_signal(payload['signal'], trace)
+        return True
+    
+    async def capture_state(self) -> Dict:
+        """
+        Capture the state a live session builds up, for a warm restart snapshot.
+        AJR state is changed in detection threads, so each symbol's part is
+        taken in that symbol's detection queue, between two bars.
+        
+        Returns:
+            JSON-compatible state
+        """
+        ajr = {}
+        for symbol in list(self.candle_buffers):
+            ajr[symbol] = await self.detection_executor.run(
+                symbol, self.ajr_strategy.snapshot, [symbol], stateful=True
+            )
+        return {
+            'pipeline': self.pipeline.snapshot(),
+            'signal_cache': self.signal_cache.snapshot(),
+            'ajr': ajr,
+            'arbiter': self.arbiter.snapshot(),
+            'risk': self.risk_manager.snapshot()
+        }
+    
+    def restore_state(self, state: Dict, symbols: List[str]) -> List[str]:
+        """
+        Restore a snapshot taken by capture_state().
+        
+        Args:
+            state: Saved state
+            symbols: Symbols being traded (strategy state of other symbols is ignored)
+        
+        Returns:
+            Symbols whose candle buffers were restored
+        """
+        self.signal_cache.restore(state.get('signal_cache', []))
+        restored_positions = self.arbiter.restore(state.get('arbiter', {}))
+        if restored_positions:
+            print(f"[ARBITER] Restored {restored_positions} open positions")
+        if not self.risk_manager.restore(state.get('risk', {})):
+            print("[INFO] Snapshot is from an earlier day: daily risk counters start fresh")
+        resumed = self.pipeline.restore(state.get('pipeline', {}), symbols)
+        for symbol in resumed:
+            if symbol in state.get('ajr', {}):
+                self.ajr_strategy.restore(state['ajr'][symbol], [symbol])
+        return resumed
+    
+    def _restore_snapshot(self, symbols: List[str]) -> List[str]:
+        """
+        Load the last state snapshot, if any.
+        
+        Args:
+            symbols: Symbols being traded
+        
+        Returns:
+            Symbols resumed from the snapshot
+        """
+        state = self.snapshots.load()
+        if state is None:
+            return []
+        resumed = self.restore_state(state, symbols)
+        if resumed:
+            print(f"[SYSTEM] Resuming {', '.join(resumed)} from snapshot")
+        return resumed
+    
+    async def _catch_up(self, symbol: str) -> bool:
+        """
+        Fetch only the bars missed since a restored buffer's newest bar.
+        
+        Args:
+            symbol: Trading symbol with a restored buffer
+        
+        Returns:
+            True if resumed, False if too much was missed (full history is needed)
+        """
+        from aafr.bulk_downloader import interval_seconds
+        from aafr.state_snapshot import missed_bar_count
+        
+        buffer = self.candle_buffers[symbol]
+        missed = missed_bar_count(buffer.last_time, interval_seconds(self.pipeline.interval))
+        if missed > 200:
+            return False
+        candles = await self.async_api.get_historical_candles(symbol, count=missed)
+        added = self.pipeline.catch_up(symbol, candles or [])
+        print(f"[{symbol}] Resumed {len(buffer)} bars from snapshot, {added} missed bars fetched")
+        return True
+    
+    def _on_bar_close(self, symbol: str, candle: Dict):
+        """Market data callback: queue a completed bar for the symbol's strategies."""
+        self.pipeline.push_bar(symbol, candle)
     
-    async def _monitor_symbol(self, symbol: str):
+    async def _monitor_symbol(self, symbol: str, candles: Optional[List[Dict]] = None,
+                              resumed: bool = False):
         """
         Monitor single symbol with both strategies.
         
         Args:
             symbol: Trading symbol
+            candles: Preloaded history (fetched asynchronously if None)
+            resumed: The symbol's state was restored from a snapshot
         """
         print(f"[{symbol}] Starting monitoring...")
         
-        # Load historical candles
-        candles = self.api.get_historical_candles(symbol, count=200)
+        if resumed and not await self._catch_up(symbol):
+            resumed = False
+            self.ajr_strategy.reset(symbol)  # Gap state is stale after a long outage
         
-        if not candles:
-            print(f"[{symbol}] ERROR: Failed to get candles")
-            return
-        
-        self.candle_buffers[symbol] = candles
-        print(f"[{symbol}] Loaded {len(candles)} historical candles")
-        
-        # Main monitoring loop
-        check_count = 0
-        while self.running:
-            await asyncio.sleep(5)  # Check every 5 seconds
-            
-            check_count += 1
-            if check_count % 12 == 0:  # Status every minute
-                print(f"[{symbol}] Monitoring... ({check_count * 5}s elapsed)")
+        if not resumed:
+            # Load historical candles
+            if candles is None:
+                candles = await self.async_api.get_historical_candles(symbol, count=200)
             
-            # Get current candle buffer
-            candle_buffer = self.candle_buffers.get(symbol, [])
+            if not candles:
+                print(f"[{symbol}] ERROR: Failed to get candles")
+                return
             
-            if not candle_buffer:
-                continue
-            
-            # Check both strategies in parallel
-            aafr_signal = await self._check_aafr(symbol, candle_buffer)
-            ajr_signal = await self._check_ajr(symbol, candle_buffer)
+            # Bars streamed while history was loading stay queued
+            self.pipeline.seed(symbol, candles)
+            print(f"[{symbol}] Loaded {len(candles)} historical candles")
+        
+        # Without a bar stream, poll for new bars over REST (mock data never changes)
+        poller = None
+        if self.api.market_data_stream is None and not self.api.is_using_mock_data():
+            poller = asyncio.create_task(self._poll_bars(symbol))
+        
+        # Evaluate the latest loaded bar, then every closed bar as it is pushed
+        await self._evaluate_bar(symbol, self.candle_buffers[symbol], None)
+        try:
+            await self.pipeline.run_symbol(symbol)
+        finally:
+            if poller is not None:
+                poller.cancel()
+    
+    async def run_replay(self, feeds: Dict[str, tuple], speed: Optional[float] = 1.0,
+                         warmup_bars: int = 200, gui_bot: bool = False,
+                         history: Optional[Dict[str, List[Dict]]] = None) -> Dict:
+        """
+        Replay recorded data through the live pipeline (both strategies,
+        arbiter, WebSocket) on a simulated clock. Orders are never sent.
+        
+        Args:
+            feeds: symbol -> (kind, records) from load_replay_file()
+            speed: Replay speed multiplier (None for maximum speed)
+            warmup_bars: Leading bars per symbol loaded as history
+            gui_bot: Run a dry-run GUI bot client against the WebSocket server
+            history: Recorded history per symbol (replaces warm-up bars)
+        
+        Returns:
+            Replay statistics
+        """
+        from aafr.replay import MarketReplay, ReplayClock, start_dry_run_gui_bot, stop_gui_bot
+        from aafr.websocket_server import WebSocketServer
+        
+        clock = ReplayClock(speed)
+        self.clock = clock.now
+        self.arbiter.clock = clock.now
+        self.signal_cache.clock = clock.time
+        self.auto_trade = False
+        
+        if gui_bot and self.ws_server is None:
+            self.ws_server = WebSocketServer.from_config(self.config)
+            self.ws_server.on('LATENCY_REPORT', self.latency.record_report)
+            self.ws_server.journal = self.journal
+        
+        speed_label = f"{speed:g}x" if speed is not None else "max speed"
+        print(f"\n[SYSTEM] Replaying {', '.join(feeds)} at {speed_label} (orders disabled)")
+        
+        self.running = True
+        self.journal.start(system="DUAL", mode="replay", symbols=list(feeds))
+        replay = MarketReplay(self.pipeline, clock, warmup_bars,
+                              on_new_day=lambda now: self.risk_manager.reset_daily())
+        remaining = replay.seed(feeds, history)
+        await self.detection_executor.warm_up()
+        await self.metrics.start()
+        
+        tasks = []
+        bot = None
+        try:
+            if self.ws_server:
+                tasks.append(asyncio.create_task(self.ws_server.start()))
+                await asyncio.sleep(0.5)
+                if gui_bot:
+                    bot = start_dry_run_gui_bot(self.ws_server.host, self.ws_server.port)
+                    await asyncio.sleep(0.5)  # Let the client connect
+            tasks.extend(asyncio.create_task(self.pipeline.run_symbol(symbol)) for symbol in feeds)
             
-            # Process signals through arbiter
-            if aafr_signal:
-                await self._process_signal(aafr_signal)
+            await replay.run({symbol: (feeds[symbol][0], remaining[symbol]) for symbol in feeds})
             
-            if ajr_signal:
-                await self._process_signal(ajr_signal)
+            # Wait (bounded) for the GUI bot to report on every broadcast event
+            broadcasts = self.latency.histograms[STAGE_BROADCAST]
+            receipts = self.latency.histograms[STAGE_GUI_RECEIPT]
+            for _ in range(300):
+                if bot is None or receipts.count >= broadcasts.count:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            if bot is not None:
+                await stop_gui_bot(*bot)
+            if self.ws_server:
+                await self.ws_server.stop()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.metrics.stop()
+            self.detection_executor.shutdown(wait=False)
+        
+        print(f"\n[REPLAY] {replay.format_stats()}")
+        return replay.stats
+    
+    async def _poll_bars(self, symbol: str):
+        """Fallback producer: poll recent bars over REST and push new ones."""
+        while self.running:
+            await asyncio.sleep(self.poll_interval)
+            candles = await self.async_api.get_historical_candles(symbol, count=5)
+            if candles:
+                self.pipeline.push_candles(symbol, candles)
+    
+    async def _report_latency(self):
+        """Periodically print per-stage latency and write the JSON dump."""
+        while self.running:
+            await asyncio.sleep(self.status_interval)
+            print(f"\n[LATENCY] Stages:\n{self.latency.format()}")
+            self.latency.dump_json()
+    
+    async def _evaluate_bar(self, symbol: str, candle_buffer: List[Dict],
+                            bar_event: Optional[Dict]) -> bool:
+        """
+        Run both strategies for a symbol's newest closed bar.
+        
+        Args:
+            symbol: Trading symbol
+            candle_buffer: Symbol's candle buffer (newest bar last)
+            bar_event: Pipeline event of the bar (None for the initial check)
+        
+        Returns:
+            True if either strategy produced a signal
+        """
+        if not candle_buffer:
+            return False
+        
+        trace = self.latency.start(bar_event['closed_at_ms'] if bar_event is not None else None)
+        aafr_signal = await self._check_aafr(symbol, candle_buffer)
+        ajr_signal = await self._check_ajr(symbol, candle_buffer)
+        self.latency.mark(trace, STAGE_DETECTION)
+        
+        # Process signals through arbiter (each signal continues its own copy of the trace)
+        if aafr_signal:
+            await self._process_signal(aafr_signal, dict(trace))
+        
+        if ajr_signal:
+            await self._process_signal(ajr_signal, dict(trace))
+        
+        return bool(aafr_signal or ajr_signal)
     
     async def _check_aafr(self, symbol: str, candles: List[Dict]) -> Optional[TradeSignal]:
         """Check AAFR for signals."""
         if not self.config.get('strategies', {}).get('AAFR', {}).get('enabled', True):
             return None
         
-        # Detect ICC structure
-        icc_structure = self.icc_detector.detect_icc_structure(candles, require_all_phases=True)
+        # Detect and validate ICC structure off the event loop
+        icc_structure, is_valid, violations = await self.detection_executor.run(
+            symbol, evaluate_icc_setup, candles
+        )
         
-        if not icc_structure or not icc_structure.get('complete'):
+        if not is_valid:
+            if icc_structure and icc_structure.get('complete'):
+                self._count("rejections_total", strategy="AAFR", reason="invalid_setup")
             return None
         
-        # Validate
-        is_valid, violations = self.icc_detector.validate_full_setup(icc_structure, candles)
-        
-        if not is_valid:
+        # Drop structures that already produced a signal
+        if not self.signal_cache.add(icc_fingerprint(symbol, icc_structure, candles)):
+            self._count("rejections_total", strategy="AAFR", reason="duplicate")
             return None
         
         # Calculate trade levels
@@ -181,6 +631,7 @@ class DualStrategySystem:
         )
         
         if not entry or not stop:
+            self._count("rejections_total", strategy="AAFR", reason="trade_levels")
             return None
         
         # Create signal
@@ -214,35 +665,111 @@ class DualStrategySystem:
         if len(candles) > 1:
             latest_candle['prev_close'] = candles[-2]['close']
         
-        signal = self.ajr_strategy.process_candle(latest_candle, symbol)
+        # Stateful (gap tracker), so it runs in a thread even in process mode
+        signal = await self.detection_executor.run(
+            symbol, self.ajr_strategy.process_candle, latest_candle, symbol, stateful=True
+        )
         
         return signal
     
-    async def _process_signal(self, signal: TradeSignal):
+    async def _process_signal(self, signal: TradeSignal, trace: Optional[Dict] = None):
         """
         Process signal through arbiter and emit to GUI bot.
         
         Args:
             signal: Trade signal from either strategy
+            trace: Stage latency trace started when the bar arrived
         """
+        if self.signal_sink is not None:
+            # Shard worker: the arbiter runs in the supervisor process
+            await self.signal_sink({'signal': signal}, trace)
+            return
+        
+        detected_at = now_ms()
+        signal.timestamp = self.clock()  # Arbiter pending-signal windows use the system clock
+        self._count("detections_total", strategy=signal.strategy_id, symbol=signal.instrument)
+        
+        self.journal.append(DETECTION, signal.to_dict())
+        
         # Submit to arbiter
         accepted, reason, details = await self.arbiter.process_signal(signal)
+        self.latency.mark(trace, STAGE_RISK)
+        self.journal.append(DECISION, {'signal_id': signal.signal_id, 'accepted': accepted,
+                                       'reason': reason, 'details': details})
+        
+        # Send orders to every account in the background, so a slow account's
+        # acks never hold up logging or the GUI broadcast
+        if accepted and self.auto_trade:
+            task = asyncio.create_task(self._place_orders(signal, detected_at))
+            self._order_tasks.add(task)
+            task.add_done_callback(self._order_tasks.discard)
         
         # Log decision
         self.signal_logger.log_arbiter_decision(signal, accepted, reason, details)
+        self.latency.mark(trace, STAGE_LOGGING)
         
         if accepted:
             # Emit to GUI bot via WebSocket
             if self.ws_server and details:
-                await self._emit_to_gui_bot(signal, details)
+                await self._emit_to_gui_bot(signal, details, trace)
+            self.latency.finish(trace)
+    
+    async def _place_orders(self, signal: TradeSignal, detected_at: float) -> Dict[str, Dict]:
+        """
+        Size and submit the signal's bracket for every account concurrently.
+        
+        Args:
+            signal: Accepted trade signal
+            detected_at: now_ms() timestamp of signal detection
+        
+        Returns:
+            Per-account order results
+        """
+        order_signal = {
+            'signal_id': signal.signal_id,
+            'symbol': signal.instrument,
+            'direction': signal.direction,
+            'entry': signal.entry_price,
+            'stop_loss': signal.stop_price,
+            'take_profit': signal.take_profit[-1]
+        }
+        
+        def tp_ladder(account_signal: Dict) -> List[Dict]:
+            # 1 contract per TP level, remainder on the final target
+            size = account_signal['position_size']
+            levels = signal.take_profit[:size]
+            ladder = [{'price': price, 'qty': 1} for price in levels]
+            ladder[-1]['qty'] += size - len(levels)
+            return ladder
+        
+        try:
+            results = await self.order_fanout.dispatch(
+                order_signal, self.candle_buffers.get(signal.instrument, []),
+                tp_ladder=tp_ladder, signal_time_ms=detected_at
+            )
+        except Exception as e:
+            print(f"[ERROR] Order dispatch failed for {signal.instrument}: {e}")
+            return {}
+        self.latency.record(STAGE_ORDER, now_ms() - detected_at)
+        for account, result in results.items():
+            print(f"[ORDER] {signal.strategy_id} {signal.instrument} -> {account}: {result['reason']} "
+                  f"({result['position_size']} contracts)")
+        return results
+    
+    async def _wait_for_orders(self):
+        """Let order dispatches still waiting on account acks finish."""
+        if self._order_tasks:
+            await asyncio.gather(*self._order_tasks, return_exceptions=True)
     
-    async def _emit_to_gui_bot(self, signal: TradeSignal, details: Dict):
+    async def _emit_to_gui_bot(self, signal: TradeSignal, details: Dict,
+                               trace: Optional[Dict] = None):
         """
         Emit trade event to GUI bot.
         
         Args:
             signal: Trade signal
             details: Execution details
+            trace: Stage latency trace (its timing is sent for the GUI bot to report back)
         """
         # Build TP ladder: 1 contract per TP level (2-3 contracts = 2-3 TPs)
         position_size = details['position_size']
@@ -267,10 +794,18 @@ class DualStrategySystem:
             'tps': tp_ladder,
             'mode': self.config.get('gui_bot', {}).get('mode', 'EVAL'),
             'strategy': signal.strategy_id,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self.clock().isoformat()
         }
         
+        # The GUI bot measures receipt against the wall-clock send time
+        if trace is not None:
+            event['latency'] = {
+                'pipeline_ms': round(now_ms() - trace['origin_ms'], 3),
+                'sent_at': time.time()
+            }
+        
         await self.ws_server.broadcast_event(event)
+        self.latency.mark(trace, STAGE_BROADCAST)
         print(f"[WS] Emitted {signal.strategy_id} signal to GUI bot")
     
     def stop(self):
@@ -283,6 +818,22 @@ class DualStrategySystem:
         print(f"{'='*60}")
         
         self.arbiter.print_stats()
+        if self._loaded('pipeline'):
+            print(f"\n[LATENCY] Bar pipeline: {self.pipeline.format_stats()}")
+        if self._loaded('detection_executor'):
+            print(f"[LATENCY] Detection: {self.detection_executor.format_stats()}")
+        print(f"[SIGNALS] AAFR dedup: {self.signal_cache.format_stats()}")
+        print(f"[LATENCY] Stages:\n{self.latency.format()}")
+        dump = self.latency.dump_json()
+        if dump:
+            print(f"[OK] Stage latency written to {dump}")
+        if self.auto_trade and self._loaded('order_fanout'):
+            self.order_fanout.print_stats()
+        if self._loaded('journal') and self.journal.running:
+            self.journal.stop()
+            print(f"[JOURNAL] {self.journal.format_stats()}")
+        if self._loaded('snapshots') and self.snapshots.stats['saves']:
+            print(f"[SNAPSHOT] {self.snapshots.format_stats()}")
         
         risk_summary = self.risk_manager.get_risk_summary()
         print(f"\n[RISK] Summary:")
@@ -301,6 +852,16 @@ async def main():
                        help='Trading symbols (NQ, ES, GC, CL)')
     parser.add_argument('--config', default='config.json',
                        help='Path to config file (relative to aafr directory)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Serve historical data purely from the local cache (no API access)')
+    parser.add_argument('--replay', nargs='+', metavar='FILE',
+                       help='Replay recorded bar/tick files (one per symbol, in --symbols order) or a session journal')
+    parser.add_argument('--speed', default='1',
+                       help='Replay speed: multiplier (1, 10, 1000) or "max"')
+    parser.add_argument('--gui-bot', action='store_true',
+                       help='Replay with a dry-run GUI bot connected over WebSocket')
+    parser.add_argument('--shards', type=int,
+                       help='Run symbols in this many worker processes (default: config "sharding")')
     
     args = parser.parse_args()
     
@@ -314,9 +875,35 @@ async def main():
     
     # Create and start system
     system = DualStrategySystem(args.config)
+    if args.offline:
+        system.api.enable_offline_mode()
     
     try:
-        await system.start(symbols)
+        if args.replay:
+            journal_replay = len(args.replay) == 1 and args.replay[0].endswith('.jnl')
+            if not journal_replay and len(args.replay) != len(symbols):
+                print("[ERROR] --replay needs one file per symbol (or a single session journal)")
+                sys.exit(1)
+            from aafr.journal import JournalReader
+            from aafr.replay import load_replay_file, parse_speed
+            
+            try:
+                speed = parse_speed(args.speed)
+                if journal_replay:
+                    # Session journal: the bars and history the live strategies saw
+                    journal = JournalReader(args.replay[0])
+                    feeds, history = journal.replay_feeds(), journal.history()
+                else:
+                    feeds = {symbol: load_replay_file(path, symbol) for symbol, path in zip(symbols, args.replay)}
+                    history = None
+            except (OSError, ValueError) as e:
+                print(f"[ERROR] Failed to load replay: {e}")
+                sys.exit(1)
+            await system.run_replay(feeds, speed, gui_bot=args.gui_bot, history=history)
+        elif (args.shards or system.config.get('sharding', {}).get('shards', 1)) > 1 and len(symbols) > 1:
+            await system.start_sharded(symbols, args.shards)
+        else:
+            await system.start(symbols)
     except KeyboardInterrupt:
         print("\n[SYSTEM] Interrupted by user")
     finally:
@@ -8,6 +8,7 @@ import json
 import sys
 from typing import Dict, Any, Optional
 from datetime import datetime
+from urllib.parse import urlencode
 import time
 
 try:
@@ -28,6 +29,7 @@ from gui_bot.event_handlers import (
 )
 from gui_bot.logger import BotLogger
 from gui_bot.config import load_bot_config
+from shared.wire_format import ENCODING_JSON, ENCODING_MSGPACK, MSGPACK_AVAILABLE, decode_event
 
 
 class GUIBotClient:
@@ -60,6 +62,17 @@ class GUIBotClient:
         self.port = aafr_config.get('port', 8765)
         self.uri = f"ws://{self.host}:{self.port}"
         
+        # Optional filter, e.g. {"symbols": ["NQ"]} for a bot driving one DOM window
+        self.subscription = aafr_config.get('subscribe')
+        
+        # Binary msgpack events when available (the server falls back to JSON)
+        encoding = aafr_config.get('encoding', ENCODING_MSGPACK)
+        self.encoding = encoding if encoding != ENCODING_MSGPACK or MSGPACK_AVAILABLE else ENCODING_JSON
+        
+        # Last event received, so a reconnect resumes after it
+        self.session = None
+        self.last_seq = None
+        
         print(f"[INFO] GUI Bot initialized")
         print(f"[INFO] AAFR Server: {self.uri}")
     
@@ -93,7 +106,7 @@ class GUIBotClient:
     async def connect(self) -> None:
         """Establish WebSocket connection to AAFR."""
         try:
-            async with websockets.connect(self.uri) as websocket:
+            async with websockets.connect(self.connect_uri()) as websocket:
                 self.websocket = websocket
                 self.reconnect_delay = 1  # Reset backoff on successful connection
                 
@@ -103,11 +116,13 @@ class GUIBotClient:
                 # Listen for messages
                 async for message in websocket:
                     try:
-                        event = json.loads(message)
+                        event = decode_event(message)
+                    except ValueError as e:
+                        self.logger.error(f"Invalid message received: {e}")
+                        print(f"[ERROR] Invalid message: {message[:100]!r}")
+                        continue
+                    try:
                         await self.handle_event(event)
-                    except json.JSONDecodeError as e:
-                        self.logger.error(f"Invalid JSON received: {e}")
-                        print(f"[ERROR] Invalid JSON: {message[:100]}")
                     except Exception as e:
                         self.logger.error(f"Error handling event: {e}")
                         print(f"[ERROR] Error handling event: {e}")
@@ -124,6 +139,27 @@ class GUIBotClient:
             self.logger.error(f"Connection error: {e}")
             raise
     
+    def connect_uri(self) -> str:
+        """
+        Build the connection URL.
+        Carries the wanted encoding, the subscription and, after the first
+        connection, the last event received, so the server replays only the
+        events missed while disconnected.
+        
+        Returns:
+            WebSocket URL
+        """
+        params = {}
+        if self.encoding != ENCODING_JSON:
+            params['encoding'] = self.encoding
+        for key, values in (self.subscription or {}).items():
+            if values:
+                params[key] = ",".join(values)
+        if self.last_seq is not None:
+            params['session'] = self.session
+            params['last_seq'] = self.last_seq
+        return f"{self.uri}/?{urlencode(params)}" if params else self.uri
+    
     async def handle_event(self, event: Dict[str, Any]) -> None:
         """
         Route event to appropriate handler.
@@ -131,8 +167,11 @@ class GUIBotClient:
         Args:
             event: Event dictionary from AAFR
         """
+        received_at = time.time()
         event_type = event.get('event', 'UNKNOWN')
         timestamp = event.get('timestamp', datetime.now().isoformat())
+        if 'seq' in event:
+            self.last_seq = event['seq']
         
         self.logger.log_event(event)
         print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Received {event_type} event")
@@ -141,11 +180,24 @@ class GUIBotClient:
         try:
             if event_type == 'CONNECTED':
                 print(f"[OK] {event.get('message', 'Connected to server')}")
+                if self.session is None:
+                    self.last_seq = event.get('last_seq')  # Earlier events were not meant for this bot
+                elif event.get('session') != self.session:
+                    self.last_seq = 0  # Server restarted; its events are being replayed from the start
+                self.session = event.get('session')
+                if event.get('encoding', ENCODING_JSON) != self.encoding:
+                    print(f"[INFO] Server sends {event.get('encoding', ENCODING_JSON)} events")
+                if event.get('replayed'):
+                    print(f"[INFO] Receiving {event['replayed']} events missed while disconnected")
+                if event.get('missed'):
+                    self.logger.warning(f"{event['missed']} events were lost while disconnected")
+                    print(f"[WARNING] {event['missed']} events sent while disconnected are no longer available")
                 # Send ping to keep connection alive
                 await self.send_ping()
                 
             elif event_type == 'NEW_POSITION':
                 await handle_new_position(event, self.automator, self.tracker, self.logger)
+                await self.send_latency_report(event, received_at)
                 
             elif event_type == 'TP_FILLED':
                 await handle_tp_filled(event, self.automator, self.tracker, self.logger)
@@ -160,6 +212,14 @@ class GUIBotClient:
                 # Keepalive response
                 pass
                 
+            elif event_type == 'SUBSCRIBED':
+                topics = {key: event.get(key) for key in ('symbols', 'strategies', 'events')}
+                print(f"[OK] Subscribed to {topics} (null = all)")
+                
+            elif event_type == 'ERROR':
+                self.logger.error(f"Server error: {event.get('message')}")
+                print(f"[ERROR] Server: {event.get('message')}")
+                
             else:
                 self.logger.warning(f"Unknown event type: {event_type}")
                 print(f"[WARNING] Unknown event type: {event_type}")
@@ -182,6 +242,31 @@ class GUIBotClient:
             except Exception as e:
                 self.logger.warning(f"Failed to send ping: {e}")
     
+    async def send_latency_report(self, event: Dict[str, Any], received_at: float) -> None:
+        """
+        Report receipt and entry click latency of a NEW_POSITION event to the server.
+        
+        Args:
+            event: Handled event (with the server's latency block)
+            received_at: Wall-clock time the event was received
+        """
+        latency = event.get('latency')
+        if not self.websocket or not latency or 'sent_at' not in latency:
+            return
+        
+        clicked_at = latency.get('clicked_at')
+        report = {
+            "event": "LATENCY_REPORT",
+            "symbol": event.get('symbol'),
+            "pipeline_ms": latency.get('pipeline_ms'),
+            "receipt_ms": round((received_at - latency['sent_at']) * 1000.0, 3),
+            "click_ms": round((clicked_at - received_at) * 1000.0, 3) if clicked_at else None
+        }
+        try:
+            await self.websocket.send(json.dumps(report))
+        except Exception as e:
+            self.logger.warning(f"Failed to send latency report: {e}")
+    
     def stop(self) -> None:
         """Stop the GUI bot client."""
         self.running = False
@@ -4,6 +4,7 @@ Processes trade events and executes appropriate DOM actions.
 """
 
 import asyncio
+import time
 from typing import Dict, Any
 from gui_bot.dom_automation import DOMAutomator
 from gui_bot.position_tracker import PositionTracker
@@ -43,6 +44,9 @@ async def handle_new_position(event: Dict[str, Any], automator: DOMAutomator,
         print(f"\n[1/3] Placing entry order...")
         success = automator.place_limit_order(side, entry_price, size, symbol)
         if success:
+            # Entry click time for the server's latency report
+            if 'latency' in event:
+                event['latency']['clicked_at'] = time.time()
             logger.log_click(
                 'BUY' if side == 'LONG' else 'SELL',
                 'LIMIT',
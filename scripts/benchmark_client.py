@@ -0,0 +1,155 @@
+"""
+Script to benchmark the Tradovate clients offline against the local mock server.
+Measures request throughput and latency through the pooled async client,
+recovery under injected 5xx/401 errors, order submit->ack latency, and
+market data reconnect time.
+"""
+
+import sys
+import asyncio
+import argparse
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aafr.async_tradovate_api import AsyncTradovateAPI
+from aafr.latency import LatencyHistogram, now_ms
+from aafr.market_data_stream import MarketDataStream
+from aafr.mock_tradovate_server import MockTradovateServer, point_at
+from aafr.order_manager import OrderManager
+
+
+async def bench_throughput(server, requests, concurrency):
+    """
+    Fire `requests` contract lookups with `concurrency` pooled connections.
+    """
+    api = AsyncTradovateAPI(max_connections=concurrency, max_concurrency=concurrency)
+    api.rate_limiter = None  # Measure the client, not the configured request budget
+    point_at(api, server.base_url)
+    histogram = LatencyHistogram("request")
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        start = now_ms()
+        if await api.find_contract('MNQZ5') is None:
+            failures += 1
+        histogram.record_since(start)
+
+    async with api:
+        await api.authenticate()
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return requests / elapsed, histogram, failures
+
+
+async def bench_orders(server, brackets):
+    """
+    Submit `brackets` three-order brackets and report submit->ack latency.
+    """
+    api = AsyncTradovateAPI()
+    api.rate_limiter = None
+    point_at(api, server.base_url)
+    async with api:
+        manager = OrderManager(api)
+        await manager.prepare(['MNQZ5'])
+        signal = {'symbol': 'MNQZ5', 'direction': 'LONG', 'position_size': 3,
+                  'stop_loss': 20990.0, 'take_profit': 21030.0}
+        for _ in range(brackets):
+            await manager.submit_bracket(signal, signal_time_ms=now_ms())
+    return manager
+
+
+async def bench_reconnect(server, drops):
+    """
+    Drop the market data connection `drops` times and time resubscription.
+    """
+    api = AsyncTradovateAPI()
+    point_at(api, server.base_url, server.md_url)
+    histogram = LatencyHistogram("reconnect")
+    async with api:
+        await api.authenticate()
+        stream = MarketDataStream.from_api(api)
+        stream.contract_ids['MNQZ5'] = 42
+        stream.reconnect_min_delay = 0.05
+        task = asyncio.create_task(stream.run())
+        try:
+            await stream.subscribe_bars('MNQZ5', '1Min', lambda symbol, candle: None)
+            await asyncio.wait_for(server.subscribed.wait(), 5)
+            for _ in range(drops):
+                start = now_ms()
+                await server.drop_connections()
+                await asyncio.wait_for(server.subscribed.wait(), 5)
+                histogram.record_since(start)
+        finally:
+            await stream.stop()
+            await asyncio.wait_for(task, 5)
+    return histogram
+
+
+async def run(args):
+    """
+    Run every benchmark, each against a fresh mock server.
+    """
+    print(f"\n{'='*70}")
+    print("TRADOVATE CLIENT BENCHMARK (local mock server)")
+    print(f"{'='*70}")
+    print(f"  Server latency: {args.latency * 1000:.1f}ms (+{args.jitter * 1000:.1f}ms jitter)")
+
+    async with MockTradovateServer(latency=args.latency, jitter=args.jitter, seed=1) as server:
+        rate, histogram, failures = await bench_throughput(server, args.requests, args.concurrency)
+    print(f"\n[Throughput] {args.requests} requests, concurrency {args.concurrency}")
+    print(f"  {rate:.0f} req/s, {failures} failures")
+    print(f"  {histogram.format()}")
+
+    async with MockTradovateServer(latency=args.latency, jitter=args.jitter, seed=1,
+                                   error_rate=args.error_rate, unauthorized_rate=args.unauthorized_rate) as server:
+        rate, histogram, failures = await bench_throughput(server, args.requests // 4, args.concurrency)
+        injected = server.calls - server.endpoint_calls.get('/v1/contract/find', 0)
+    print(f"\n[Faults] {args.error_rate:.0%} HTTP 503, {args.unauthorized_rate:.0%} HTTP 401")
+    print(f"  {rate:.0f} req/s, {failures} failures, {server.unauthorized} unauthorized, "
+          f"{server.auth_calls} authentications")
+    print(f"  {histogram.format()}")
+
+    async with MockTradovateServer(latency=args.latency, jitter=args.jitter, seed=1) as server:
+        manager = await bench_orders(server, args.brackets)
+    print(f"\n[Orders] {args.brackets} brackets, {manager.stats['acked']} acks, "
+          f"{manager.stats['rejected']} rejected")
+    print(f"  {manager.ack_latency.format()}")
+    print(f"  {manager.signal_latency.format()}")
+
+    async with MockTradovateServer() as server:
+        histogram = await bench_reconnect(server, args.drops)
+    print(f"\n[Market data] {args.drops} dropped connections")
+    print(f"  {histogram.format()}")
+    print(f"{'='*70}\n")
+
+
+def main():
+    """
+    Parse arguments and run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Tradovate clients against a local mock server')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests in the throughput run')
+    parser.add_argument('--concurrency', type=int, default=20, help='Pooled connections')
+    parser.add_argument('--latency', type=float, default=0.005, help='Server latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.002, help='Maximum extra server latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Fraction of HTTP 503 in the fault run')
+    parser.add_argument('--unauthorized-rate', type=float, default=0.01, help='Fraction of HTTP 401 in the fault run')
+    parser.add_argument('--brackets', type=int, default=100, help='Order brackets to submit')
+    parser.add_argument('--drops', type=int, default=5, help='Market data connection drops')
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nBenchmark interrupted by user")
+        sys.exit(0)
@@ -0,0 +1,125 @@
+"""
+Script to benchmark cold startup of the trading system entry points.
+Each measurement runs in a fresh interpreter, so it includes module
+import time exactly as a user launching the system would see it.
+Reports the wall time per entry point, the extra cost of modules that
+only some modes load, and the slowest imports behind an entry point.
+"""
+
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# What every mode pays before argument parsing
+ENTRY_POINTS = {
+    'python (no imports)': ['-c', 'pass'],
+    'import aafr.main': ['-c', 'import aafr.main'],
+    'aafr.main --help': ['-m', 'aafr.main', '--help'],
+    'import dual_strategy_main': ['-c', 'import dual_strategy_main']
+}
+
+# Loaded on demand by the modes that need them
+DEFERRED = {
+    'backtest': 'aafr.backtester',
+    'backtest plots': 'matplotlib.pyplot',
+    'replay': 'aafr.replay',
+    'sharded live': 'aafr.shard_supervisor',
+    'GUI bot server': 'aafr.websocket_server',
+    'HTTP session': 'aiohttp.client'
+}
+
+# Modules importing aafr.main must not load
+HEAVY_MODULES = ('matplotlib', 'aafr.backtester', 'aafr.replay', 'aafr.shard_supervisor', 'aiohttp.client',
+                 'aafr.telegram_bot')
+
+
+def time_command(args, repeat):
+    """
+    Run `python <args>` `repeat` times and return wall times in ms.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000.0)
+    return times
+
+
+def import_times(code):
+    """
+    Run `code` with -X importtime and return {module: (self ms, cumulative ms)}.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            check=True, capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(own) / 1000.0, int(cumulative) / 1000.0)
+    return times
+
+
+def loaded_heavy_modules(entry):
+    """
+    Import `entry` in a fresh interpreter and list the heavy modules it loaded.
+    """
+    code = (f"import sys, {entry}; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.split()
+
+
+def main():
+    """
+    Parse arguments and run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark cold startup of the AAFR entry points')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per entry point')
+    parser.add_argument('--top', type=int, default=10, help='Slowest imports to list for aafr.main')
+    args = parser.parse_args()
+
+    print(f"\n{'='*70}")
+    print("STARTUP BENCHMARK (fresh interpreter per run)")
+    print(f"{'='*70}")
+
+    print(f"\n[Entry points] best / median of {args.repeat} runs")
+    for name, command in ENTRY_POINTS.items():
+        times = time_command(command, args.repeat)
+        print(f"  {name:<28} {min(times):7.1f}ms  {statistics.median(times):7.1f}ms")
+
+    print("\n[Deferred] extra import time on top of aafr.main")
+    base = import_times('import aafr.main')
+    for mode, module in DEFERRED.items():
+        times = import_times(f'import aafr.main, {module}')
+        extra = sum(own for name, (own, _) in times.items() if name not in base)
+        print(f"  {mode:<16} {module:<24} {extra:7.1f}ms")
+
+    print(f"\n[Slowest imports] import aafr.main (cumulative)")
+    ranked = sorted(((cumulative, name) for name, (_, cumulative) in base.items() if name != 'aafr.main'),
+                    reverse=True)
+    for cumulative, name in ranked[:args.top]:
+        print(f"  {name:<40} {cumulative:7.1f}ms")
+
+    heavy = loaded_heavy_modules('aafr.main')
+    if heavy:
+        print(f"\n[WARNING] import aafr.main loaded: {', '.join(heavy)}")
+    else:
+        print(f"\n[OK] import aafr.main loads none of: {', '.join(HEAVY_MODULES)}")
+    print(f"{'='*70}\n")
+    return 1 if heavy else 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\nBenchmark interrupted by user")
+        sys.exit(0)
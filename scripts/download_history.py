@@ -0,0 +1,74 @@
+"""
+Script to bulk-download months of historical bars into the local candle cache.
+Pages are fetched concurrently under the "bulk_download" rate limit, so later
+backtests and live startups read the data from disk.
+"""
+
+import sys
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aafr.async_tradovate_api import AsyncTradovateAPI
+from aafr.bulk_downloader import BulkHistoryDownloader
+from aafr.candle_cache import CandleCache
+from aafr.utils import get_micro_symbol
+
+
+async def run(symbols, days, interval):
+    """
+    Download the last `days` days for every symbol.
+    """
+    end = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    start = end - timedelta(days=days)
+
+    async with AsyncTradovateAPI() as api:
+        if not await api.authenticate():
+            print("[ERROR] Authentication failed, nothing downloaded")
+            return 1
+
+        cache = api.cache or CandleCache()
+        downloader = BulkHistoryDownloader.from_config(api, cache)
+        history = await downloader.download_many(symbols, start, end, interval)
+
+    print(f"\n{'='*70}")
+    print("DOWNLOAD SUMMARY")
+    print(f"{'='*70}")
+    for symbol, candles in history.items():
+        print(f"  {symbol}: {len(candles)} {interval} bars")
+    print(f"  Pages: {downloader.stats['pages']}, retries: {downloader.stats['retries']}, "
+          f"penalties: {downloader.rate_limiter.stats['penalties']}")
+    print(f"  Elapsed: {downloader.stats['elapsed_seconds']:.1f}s")
+    print(f"  Cache: {cache.directory}")
+    print(f"{'='*70}\n")
+
+    return 1 if downloader.failed_pages else 0
+
+
+def main():
+    """
+    Parse arguments and run the download.
+    """
+    parser = argparse.ArgumentParser(description='Bulk-download historical bars into the candle cache')
+    parser.add_argument('--symbols', nargs='+', default=['MNQ'],
+                        help='Symbols to download (NQ/ES/GC/CL/YM map to micro contracts)')
+    parser.add_argument('--days', type=int, default=90,
+                        help='Number of days of history')
+    parser.add_argument('--interval', default='1Min',
+                        help='Bar interval (e.g., 1Min, 5Min)')
+    args = parser.parse_args()
+
+    symbols = [get_micro_symbol(s) for s in args.symbols]
+    sys.exit(asyncio.run(run(symbols, args.days, args.interval)))
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\nDownload interrupted by user")
+        sys.exit(0)
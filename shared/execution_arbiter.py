@@ -38,6 +38,7 @@ class ExecutionArbiter:
         self.open_positions = {}  # symbol -> position_info
         self.position_locks = defaultdict(asyncio.Lock)  # symbol -> lock
         self.pending_signals = {}  # signal_id -> signal
+        self.clock = datetime.now  # Wall clock (simulated during replays)
         
         # Stats
         self.total_signals = 0
@@ -51,7 +52,7 @@ class ExecutionArbiter:
     
     def is_continuation_hours(self) -> bool:
         """Check if current time is in continuation hours (favor AAFR)."""
-        now = datetime.now()
+        now = self.clock()
         hour = now.hour
         minute = now.minute
         
@@ -65,7 +66,7 @@ class ExecutionArbiter:
     
     def is_reversal_window(self) -> bool:
         """Check if current time is in reversal window (favor AJR)."""
-        now = datetime.now()
+        now = self.clock()
         hour = now.hour
         minute = now.minute
         
@@ -237,7 +238,7 @@ class ExecutionArbiter:
         self.open_positions[signal.instrument] = {
             "signal": signal,
             "position_size": risk_details['position_size'],
-            "opened_at": datetime.now(),
+            "opened_at": self.clock(),
             "risk_details": risk_details
         }
         
@@ -258,14 +259,14 @@ class ExecutionArbiter:
             "risk_usd": risk_details['actual_risk_usd'],
             "risk_pct": risk_details['actual_risk_pct'],
             "r_multiples": risk_details['r_multiples'],
-            "timestamp": datetime.now().isoformat()
+            "timestamp": self.clock().isoformat()
         }
         
         return True, "Signal accepted and executed", execution_details
     
     def _get_pending_signal(self, instrument: str) -> Optional[TradeSignal]:
         """Get any pending signal for this instrument (within last 5 seconds)."""
-        now = datetime.now()
+        now = self.clock()
         
         for signal_id, signal in self.pending_signals.items():
             if signal.instrument == instrument:
@@ -282,6 +283,32 @@ class ExecutionArbiter:
             del self.open_positions[instrument]
             print(f"[ARBITER] Position closed for {instrument}")
     
+    def snapshot(self) -> Dict[str, Any]:
+        """Capture open positions for a warm restart."""
+        return {
+            instrument: {
+                "signal": position["signal"].to_dict(),
+                "position_size": position["position_size"],
+                "opened_at": position["opened_at"].isoformat(),
+                "risk_details": position["risk_details"]
+            }
+            for instrument, position in self.open_positions.items()
+        }
+    
+    def restore(self, state: Dict[str, Any]) -> int:
+        """Restore open positions saved by snapshot(); returns the number restored."""
+        for instrument, position in state.items():
+            signal = TradeSignal.from_dict(position["signal"])
+            signal.signal_id = position["signal"]["signal_id"]
+            signal.timestamp = datetime.fromisoformat(position["signal"]["timestamp"])
+            self.open_positions[instrument] = {
+                "signal": signal,
+                "position_size": position["position_size"],
+                "opened_at": datetime.fromisoformat(position["opened_at"]),
+                "risk_details": position["risk_details"]
+            }
+        return len(state)
+    
     def get_stats(self) -> Dict[str, Any]:
         """Get arbiter statistics."""
         return {
@@ -194,6 +194,24 @@ class UnifiedRiskManager:
         self.trade_history = []
         print(f"[RISK] Daily counters reset")
     
+    def snapshot(self) -> Dict[str, Any]:
+        """Capture daily counters and trade history for a warm restart."""
+        return {
+            "date": datetime.now().date().isoformat(),
+            "daily_loss": self.daily_loss,
+            "daily_trades": self.daily_trades,
+            "trade_history": list(self.trade_history)
+        }
+    
+    def restore(self, state: Dict[str, Any]) -> bool:
+        """Restore counters saved by snapshot() on the same day (False if from an earlier day)."""
+        if state.get("date") != datetime.now().date().isoformat():
+            return False
+        self.daily_loss = state["daily_loss"]
+        self.daily_trades = state["daily_trades"]
+        self.trade_history = list(state["trade_history"])
+        return True
+    
     def get_risk_summary(self) -> Dict[str, Any]:
         """Get current risk summary."""
         return {
@@ -0,0 +1,151 @@
+"""
+Wire encodings for WebSocket trade events.
+JSON text frames are the default. Clients that negotiate msgpack receive
+binary frames instead: msgpack maps with ISO timestamps replaced by integer
+epoch nanoseconds, which are smaller and about twice as fast to decode as
+the JSON text.
+
+Prices stay float64: converting integer tick prices back to prices in
+Python would cost more per event than msgpack saves in decoding, for a
+couple of bytes per price.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Union
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+
+# Event fields holding ISO timestamps (sent as epoch nanoseconds in binary frames)
+TIMESTAMP_FIELDS = ("timestamp", "server_time")
+
+
+def negotiate(requested: Optional[str]) -> str:
+    """
+    Pick the encoding for a client.
+
+    Args:
+        requested: Encoding the client asked for (None for the default)
+
+    Returns:
+        ENCODING_MSGPACK if requested and available, else ENCODING_JSON
+    """
+    if requested == ENCODING_MSGPACK and MSGPACK_AVAILABLE:
+        return ENCODING_MSGPACK
+    return ENCODING_JSON
+
+
+def iso_to_epoch_ns(value: str) -> int:
+    """
+    Convert an ISO-8601 timestamp to epoch nanoseconds.
+    Naive timestamps are local time, like datetime.timestamp().
+
+    Args:
+        value: ISO-8601 string
+
+    Returns:
+        Epoch nanoseconds
+    """
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+
+def epoch_ns_to_iso(value: int) -> str:
+    """
+    Convert epoch nanoseconds back to a local ISO-8601 timestamp.
+
+    Args:
+        value: Epoch nanoseconds
+
+    Returns:
+        ISO-8601 string (microsecond precision)
+    """
+    seconds, ns = divmod(value, 1_000_000_000)
+    return datetime.fromtimestamp(seconds).replace(microsecond=ns // 1000).isoformat()
+
+
+def _to_wire(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy an event with its ISO timestamps as epoch nanoseconds."""
+    wire = dict(event)
+    for key in TIMESTAMP_FIELDS:
+        value = wire.get(key)
+        if isinstance(value, str):
+            try:
+                wire[key] = iso_to_epoch_ns(value)
+            except ValueError:
+                pass  # Not ISO-8601; sent as is
+    return wire
+
+
+def encode_event(event: Dict[str, Any], encoding: str = ENCODING_JSON) -> Union[str, bytes]:
+    """
+    Encode an event for sending.
+
+    Args:
+        event: Event dictionary
+        encoding: ENCODING_JSON or ENCODING_MSGPACK
+
+    Returns:
+        JSON text or msgpack bytes
+    """
+    if encoding != ENCODING_MSGPACK:
+        return json.dumps(event)
+    return msgpack.packb(_to_wire(event))
+
+
+def decode_event(message: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Decode a received event (text frames are JSON, binary frames msgpack).
+    Binary events carry timestamps as epoch nanoseconds.
+
+    Args:
+        message: Frame payload
+
+    Returns:
+        Event dictionary
+
+    Raises:
+        ValueError: If the payload cannot be decoded
+    """
+    if isinstance(message, str):
+        return json.loads(message)
+    if not MSGPACK_AVAILABLE:
+        raise ValueError("binary event received but msgpack is not installed")
+    event = msgpack.unpackb(message)
+    if not isinstance(event, dict):
+        raise ValueError("binary event is not a map")
+    return event
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    event = {
+        'event': 'NEW_POSITION', 'symbol': 'NQ', 'side': 'LONG', 'entry_price': 20150.25,
+        'size': 3, 'initial_stop': 20131.784, 'mode': 'EVAL', 'atr': 12.31, 'strategy': 'AJR',
+        'tps': [{'price': 20165.0, 'qty': 1}, {'price': 20180.5, 'qty': 1}, {'price': 20200.0, 'qty': 1}],
+        'timestamp': datetime.now().isoformat(), 'seq': 1234,
+        'latency': {'pipeline_ms': 3.2, 'sent_at': time.time()}
+    }
+    encodings = [ENCODING_JSON] + ([ENCODING_MSGPACK] if MSGPACK_AVAILABLE else [])
+    for encoding in encodings:
+        payload = encode_event(event, encoding)
+        start = time.perf_counter()
+        for _ in range(10000):
+            encode_event(event, encoding)
+        encode_us = (time.perf_counter() - start) * 100
+        start = time.perf_counter()
+        for _ in range(10000):
+            decoded = decode_event(payload)
+        decode_us = (time.perf_counter() - start) * 100
+        print(f"{encoding:8s} {len(payload):4d} bytes  encode {encode_us:.1f}us  decode {decode_us:.1f}us")
+    print(f"Decoded timestamp: {decoded['timestamp']} ({epoch_ns_to_iso(decoded['timestamp'])})")
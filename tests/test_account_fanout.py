@@ -0,0 +1,190 @@
+"""
+Test suite for multi-account order fan-out.
+Tests per-account sizing, concurrent dispatch, isolation of slow and
+rejecting accounts, daily trade reservation and config-driven account groups.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from aafr.account_fanout import AccountFanout, AccountRoute
+from aafr.mock_exchange import MockExchange
+from aafr.order_manager import OrderManager
+from aafr.risk_engine import RiskEngine
+from aafr.utils import load_config
+
+ACCOUNTS = [{'id': 1, 'name': 'BIG'}, {'id': 2, 'name': 'SMALL'}, {'id': 3, 'name': 'SLOW'}]
+
+# 10 NQ points = 40 ticks * $5 = $200 per contract
+SIGNAL = {'symbol': 'NQ', 'direction': 'LONG', 'entry': 21000.0,
+          'stop_loss': 20990.0, 'take_profit': 21030.0}
+
+
+def _route(exchange, spec, size, timeout=2.0):
+    """Build a route trading `spec` with a risk engine sized for `size` dollars."""
+    engine = RiskEngine(account_overrides={'size': size})
+    return AccountRoute(spec, engine, OrderManager(exchange, account_spec=spec, order_timeout=timeout))
+
+
+class TestAccountFanout(unittest.TestCase):
+    """Test cases for AccountFanout."""
+
+    def _dispatch(self, fanout, signal=SIGNAL, **kwargs):
+        """Prepare and dispatch one signal, returning (results, elapsed)."""
+        async def run():
+            await fanout.prepare(['NQ'])
+            start = time.monotonic()
+            results = await fanout.dispatch(signal, [], **kwargs)
+            return results, time.monotonic() - start
+        return asyncio.run(run())
+
+    def test_sized_per_account(self):
+        """Test each account gets a size from its own risk limits."""
+        exchange = MockExchange(accounts=ACCOUNTS)
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000), _route(exchange, 'SMALL', 50000)])
+
+        results, _ = self._dispatch(fanout)
+
+        # 0.5% risk: $750 -> 3 contracts, $250 -> 1 contract
+        self.assertEqual(results['BIG']['position_size'], 3)
+        self.assertEqual(results['SMALL']['position_size'], 1)
+        self.assertTrue(all(r['accepted'] for r in results.values()))
+        self.assertEqual(fanout.routes[0].risk_engine.daily_trades, 1)
+
+        sizes = sorted((o['accountSpec'], o['orderQty']) for o in exchange.orders.values()
+                       if o['orderType'] == 'Market')
+        self.assertEqual(sizes, [('BIG', 3), ('SMALL', 1)])
+
+    def test_slow_account_does_not_delay_others(self):
+        """Test accounts are dispatched concurrently and acked independently."""
+        exchange = MockExchange(accounts=ACCOUNTS, account_latency={'SLOW': 0.15})
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000), _route(exchange, 'SLOW', 150000),
+                                _route(exchange, 'SMALL', 50000)])
+
+        results, elapsed = self._dispatch(fanout)
+
+        self.assertLess(elapsed, 0.5)
+        report = fanout.report()
+        self.assertLess(report['BIG']['ack_latency']['max_ms'], 50)
+        self.assertLess(report['SMALL']['ack_latency']['max_ms'], 50)
+        self.assertGreaterEqual(report['SLOW']['ack_latency']['min_ms'], 140)
+
+    def test_timeout_and_rejection_isolated(self):
+        """Test one account timing out and one rejecting leave the other accepted."""
+        exchange = MockExchange(accounts=ACCOUNTS, account_latency={'SLOW': 1.0})
+        exchange.rejected_accounts.add('SMALL')
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000), _route(exchange, 'SLOW', 150000, timeout=0.1),
+                                _route(exchange, 'SMALL', 50000)])
+
+        results, _ = self._dispatch(fanout)
+
+        self.assertTrue(results['BIG']['accepted'])
+        self.assertEqual(results['SLOW']['reason'], 'no ack')
+        self.assertTrue(results['SMALL']['reason'].startswith('rejected'))
+        report = fanout.report()
+        self.assertEqual((report['SLOW']['timed_out'], report['SMALL']['order_rejected']), (1, 1))
+        # The unacked entry may be working at the exchange, so it still counts
+        self.assertEqual([route.risk_engine.daily_trades for route in fanout.routes], [1, 1, 0])
+
+    def test_trade_reserved_before_submission(self):
+        """Test concurrent signals cannot overrun an account's daily limit, and rejects give the trade back."""
+        exchange = MockExchange(accounts=ACCOUNTS, ack_latency=0.05, fill_latency=0.2)
+        route = _route(exchange, 'BIG', 150000)
+        route.risk_engine.max_daily_trades = 1
+        exchange.subscribe(route.order_manager.on_order_update)
+        fanout = AccountFanout([route])
+
+        async def run():
+            await fanout.prepare(['NQ'])
+            first, second = await asyncio.gather(fanout.dispatch(SIGNAL, []), fanout.dispatch(SIGNAL, []))
+            reserved = route.risk_engine.daily_trades
+            entry = first['BIG']['orders'][0]
+            exchange.reject(entry['order_id'])  # Rejected after the ack
+            await asyncio.sleep(0.01)
+            return first, second, reserved
+
+        first, second, reserved = asyncio.run(run())
+
+        self.assertTrue(first['BIG']['accepted'])
+        self.assertIn('Max daily trades', second['BIG']['reason'])
+        self.assertEqual(reserved, 1)
+        self.assertEqual(route.risk_engine.daily_trades, 0)
+        self.assertEqual(route.stats['released'], 1)
+
+    def test_risk_rejection_per_account(self):
+        """Test an account whose limits cannot take the trade is skipped."""
+        exchange = MockExchange(accounts=ACCOUNTS)
+        small = _route(exchange, 'SMALL', 20000)  # $100 budget < $200 for one contract
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000), small])
+
+        results, _ = self._dispatch(fanout)
+
+        self.assertTrue(results['BIG']['accepted'])
+        self.assertFalse(results['SMALL']['accepted'])
+        self.assertIn('Risk too high', results['SMALL']['reason'])
+        self.assertEqual(small.stats['risk_rejected'], 1)
+        self.assertFalse(any(o['accountSpec'] == 'SMALL' for o in exchange.orders.values()))
+
+    def test_unknown_account_disabled(self):
+        """Test accounts missing from the account list are disabled at prepare."""
+        exchange = MockExchange(accounts=ACCOUNTS[:1])
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000), _route(exchange, 'GONE', 150000)])
+
+        results, _ = self._dispatch(fanout)
+
+        self.assertEqual(list(results), ['BIG'])
+        self.assertFalse(fanout.routes[1].enabled)
+
+    def test_account_list_unavailable(self):
+        """Test an account that cannot be resolved is skipped instead of trading a placeholder."""
+        exchange = MockExchange(accounts=ACCOUNTS)
+        failing = MockExchange()
+        failing.accounts = []  # Account list request failed
+        unresolved = OrderManager(failing, account_spec='SMALL')
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000),
+                                AccountRoute('SMALL', RiskEngine(account_overrides={'size': 50000}), unresolved)])
+
+        results, _ = self._dispatch(fanout)
+
+        self.assertFalse(unresolved.account_resolved)
+        self.assertEqual(list(results), ['BIG'])
+        self.assertFalse(any(o['accountSpec'] == 'SMALL' for o in exchange.orders.values()))
+
+        fanout.routes[1].enabled = True  # Still unresolved: skipped for each signal
+        plans = {route.name: reason for route, _, reason in fanout.plan(SIGNAL, [])}
+        self.assertEqual(plans, {'BIG': 'OK', 'SMALL': 'account unresolved'})
+
+    def test_tp_ladder_per_account(self):
+        """Test the TP ladder is built from each account's size."""
+        exchange = MockExchange(accounts=ACCOUNTS)
+        fanout = AccountFanout([_route(exchange, 'BIG', 150000)])
+
+        ladder = lambda s: [{'price': 21010.0, 'qty': 1}, {'price': 21030.0, 'qty': s['position_size'] - 1}]
+        results, _ = self._dispatch(fanout, tp_ladder=ladder)
+
+        tps = [o for o in results['BIG']['orders'] if o['role'] == 'tp']
+        self.assertEqual([(o['price'], o['quantity']) for o in tps], [(21010.0, 1), (21030.0, 2)])
+
+    def test_from_config(self):
+        """Test account groups and the single-account default."""
+        config = load_config("config.json")
+        shared_engine = RiskEngine()
+
+        default = AccountFanout.from_config(MockExchange(), config, risk_engine=shared_engine)
+        self.assertEqual(len(default.routes), 1)
+        self.assertIs(default.routes[0].risk_engine, shared_engine)
+        self.assertFalse(default.routes[0].track_trades)
+
+        config['order_management']['account_group'] = 'prop_mirror'
+        group = AccountFanout.from_config(MockExchange(), config)
+        self.assertEqual([r.name for r in group.routes], ['TPT-150K', 'TPT-50K'])
+        self.assertEqual(group.routes[1].risk_engine.account_size, 50000)
+        self.assertEqual(group.routes[1].risk_engine.max_daily_trades, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
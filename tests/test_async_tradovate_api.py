@@ -0,0 +1,240 @@
+"""
+Test suite for the asyncio Tradovate API client.
+Tests mock fallback, concurrent history loading, token sharing, pooled
+requests/retries and single-send order placement against a local mock server.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock
+from aafr.async_tradovate_api import AsyncTradovateAPI, AIOHTTP_AVAILABLE
+from aafr.tradovate_api import TradovateAPI
+from aafr.order_manager import OrderManager, REJECTED, TIMED_OUT
+
+if AIOHTTP_AVAILABLE:
+    from aafr.mock_tradovate_server import MockTradovateServer, point_at
+
+SIGNAL = {
+    'symbol': 'MNQ', 'direction': 'LONG', 'position_size': 1,
+    'entry': 21000.0, 'stop_loss': 20990.0, 'take_profit': 21030.0
+}
+
+
+class TestAsyncTradovateAPI(unittest.TestCase):
+    """Test cases for the async Tradovate API client."""
+
+    def test_mock_history(self):
+        """Test mock candles are returned without network access."""
+        async def run():
+            async with AsyncTradovateAPI() as api:
+                api._cache = None
+                api.use_mock_data = True
+                return await api.get_historical_candles('MNQ', count=30)
+
+        candles = asyncio.run(run())
+
+        self.assertEqual(len(candles), 30)
+        self.assertEqual(candles[0]['symbol'], 'MNQ')
+
+    def test_load_history_all_symbols(self):
+        """Test parallel history load returns every symbol."""
+        async def run():
+            async with AsyncTradovateAPI() as api:
+                api._cache = None
+                api.use_mock_data = True
+                return await api.load_history(['MNQ', 'MES', 'MGC'], count=20)
+
+        history = asyncio.run(run())
+
+        self.assertEqual(set(history), {'MNQ', 'MES', 'MGC'})
+        for symbol, candles in history.items():
+            self.assertEqual(len(candles), 20)
+            self.assertEqual(candles[0]['symbol'], symbol)
+
+    def test_tokens_shared_from_sync_client(self):
+        """Test tokens and mock state are adopted from the sync client."""
+        sync_api = TradovateAPI()
+        sync_api.token = 'shared-token'
+        sync_api.md_token = 'shared-md-token'
+        sync_api.token_expiry = time.time() + 3600
+
+        api = AsyncTradovateAPI(token_source=sync_api)
+        self.assertTrue(asyncio.run(api._ensure_authenticated()))
+        self.assertEqual(api.token, 'shared-token')
+        self.assertEqual(api.md_token, 'shared-md-token')
+
+        sync_api.use_mock_data = True
+        asyncio.run(api._ensure_authenticated())
+        self.assertTrue(api.is_using_mock_data())
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_concurrent_requests_share_pool(self):
+        """Test history requests overlap and reuse pooled connections."""
+        async def run():
+            server = MockTradovateServer(latency=0.2)
+            await server.start()
+            try:
+                api = AsyncTradovateAPI(max_connections=4, max_concurrency=4)
+                point_at(api, server.base_url)
+                async with api:
+                    self.assertTrue(await api.authenticate())
+                    start = time.perf_counter()
+                    await api.load_history(['MNQ', 'MES', 'MGC', 'MYM'], count=3)
+                    elapsed = time.perf_counter() - start
+                    await api.load_history(['MNQ', 'MES', 'MGC', 'MYM'], count=3)
+                return server, elapsed
+            finally:
+                await server.stop()
+
+        server, elapsed = asyncio.run(run())
+
+        # Four 0.2s requests in parallel finish well under the 0.8s sequential time
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(server.max_in_flight, 4)
+        # Eight requests were served over at most four keep-alive connections
+        self.assertEqual(server.history_calls, 8)
+        self.assertLessEqual(len(server.peers), 4)
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_retry_on_server_error(self):
+        """Test 5xx responses are retried and real bars are parsed."""
+        async def run():
+            server = MockTradovateServer(fail_first=1)
+            await server.start()
+            try:
+                api = AsyncTradovateAPI()
+                point_at(api, server.base_url)
+                async with api:
+                    candles = await api.get_historical_candles('MNQ', count=5)
+                return server, api, candles
+            finally:
+                await server.stop()
+
+        server, api, candles = asyncio.run(run())
+
+        self.assertEqual(server.endpoint_calls['/v1/chart/history'], 2)
+        self.assertFalse(api.is_using_mock_data())
+        self.assertEqual(len(candles), 5)
+        self.assertEqual(candles[0]['volume'], 15)
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_failed_account_list_has_no_placeholder(self):
+        """Test a failed account list request returns no accounts in live mode."""
+        async def run():
+            server = MockTradovateServer()
+            await server.start()
+            try:
+                api = AsyncTradovateAPI(max_retries=1)
+                point_at(api, server.base_url)
+                async with api:
+                    await api.authenticate()
+                    server.fail_first = server.calls + 10  # Every following request fails
+                    accounts = await api.get_account_list()
+                    api.use_mock_data = True
+                    return accounts, await api.get_account_list()
+            finally:
+                await server.stop()
+
+        live, mock = asyncio.run(run())
+
+        self.assertEqual(live, [])
+        self.assertEqual(mock[0]['accountId'], 'mock_account')
+
+    def test_mock_order_ids_unique(self):
+        """Test mock order ids never repeat, even within one second."""
+        async def run():
+            api = AsyncTradovateAPI()
+            api.use_mock_data = True
+            orders = [await api.place_order({'orderQty': 1}) for _ in range(3)]
+            pair = await api.place_oco({'orderQty': 1}, {'orderType': 'Stop'})
+            return [order['orderId'] for order in orders] + [pair['orderId'], pair['ocoId']]
+
+        ids = asyncio.run(run())
+        self.assertEqual(len(set(ids)), 5)
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_orders_never_resent(self):
+        """Test a failed order request is sent once and reported to the order manager."""
+        async def run():
+            server = MockTradovateServer()
+            await server.start()
+            try:
+                api = AsyncTradovateAPI()
+                point_at(api, server.base_url)
+                async with api:
+                    manager = OrderManager(api, order_timeout=1.0)
+                    await manager.prepare(['MNQ'])
+                    server.fail_first = server.calls + 1  # 503: the order may have been taken
+                    unknown = await manager.submit_bracket(SIGNAL)
+                    server.penalties = 1  # Penalty: the order was not taken
+                    refused = await manager.submit_bracket(SIGNAL)
+                return server, unknown, refused
+            finally:
+                await server.stop()
+
+        server, unknown, refused = asyncio.run(run())
+
+        self.assertEqual(server.endpoint_calls['/v1/order/placeorder'], 2)
+        self.assertNotIn('/v1/order/placeoco', server.endpoint_calls)
+        self.assertEqual(unknown[0].state, TIMED_OUT)
+        self.assertEqual(refused[0].state, REJECTED)
+        self.assertEqual(server.orders, {})
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_unauthorized_order_fails_fast(self):
+        """Test a 401 fails the order at once and the session is renewed in the background."""
+        async def run():
+            server = MockTradovateServer()
+            await server.start()
+            try:
+                sync_api = TradovateAPI()
+                point_at(sync_api, server.base_url)
+                api = AsyncTradovateAPI(token_source=sync_api)
+                point_at(api, server.base_url)
+                async with api:
+                    await asyncio.to_thread(sync_api.authenticate, use_cache=False)
+                    server.revoke_tokens()
+                    rejected = await api.place_order({'symbol': 'MNQ', 'orderQty': 1})
+                    renewing = not api._renewal.done()
+                    renewed = await api._renewal
+                    placed = await api.place_order({'symbol': 'MNQ', 'orderQty': 1})
+                return server, api, rejected, renewing, renewed, placed
+            finally:
+                await server.stop()
+
+        server, api, rejected, renewing, renewed, placed = asyncio.run(run())
+
+        self.assertIsNone(rejected)
+        self.assertTrue(renewing)  # The order did not wait for re-authentication
+        self.assertTrue(renewed)
+        self.assertIn('orderId', placed)
+        self.assertEqual(server.endpoint_calls['/v1/order/placeorder'], 2)
+        self.assertFalse(api.is_using_mock_data())
+
+    def test_shared_session_never_falls_back_to_mock(self):
+        """Test implicit authentication of a shared session keeps live mode."""
+        sync_api = TradovateAPI()
+        api = AsyncTradovateAPI(token_source=sync_api)
+        api.authenticate = AsyncMock(return_value=False)
+        api._recover_unauthorized = AsyncMock(return_value=False)
+
+        async def order_path():
+            ready = await api._ensure_authenticated(wait=False)
+            await api._renewal
+            return ready
+
+        self.assertFalse(asyncio.run(api._ensure_authenticated()))
+        api.authenticate.assert_awaited_once_with(fallback_to_mock=False)
+        self.assertFalse(asyncio.run(order_path()))
+        self.assertEqual(api.authenticate.await_count, 1)  # Order path never authenticates inline
+        api._recover_unauthorized.assert_awaited_once()
+        self.assertFalse(api.is_using_mock_data())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+"""
+Test suite for the push-driven bar-close pipeline.
+Tests once-per-bar detection, duplicate and correction handling, tick
+aggregation, REST poll fallback, and bar-close latency recording.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from aafr.bar_pipeline import BarPipeline, TickBarBuilder
+from aafr.candle_cache import to_iso_timestamp
+
+START = 1736172000  # 2025-01-06 14:00 UTC
+
+
+def _bar(index, close=100.0):
+    """Build a 5-minute bar `index` bars after START."""
+    return {'timestamp': to_iso_timestamp(START + index * 300), 'open': close, 'high': close + 1,
+            'low': close - 1, 'close': close, 'volume': 10}
+
+
+class TestBarPipeline(unittest.TestCase):
+    """Test cases for BarPipeline."""
+
+    def setUp(self):
+        """Record every detection call."""
+        self.calls = []
+
+        async def detect(symbol, buffer, event):
+            self.calls.append((symbol, buffer[-1]['timestamp'], len(buffer)))
+            return buffer[-1]['close'] > 100
+
+        self.pipeline = BarPipeline(detect, max_bars=25)
+
+    def _run(self, symbols, push):
+        """Start consumers for `symbols`, call push(), and drain the queues."""
+        async def run():
+            tasks = [asyncio.create_task(self.pipeline.run_symbol(s)) for s in symbols]
+            push()
+            await self.pipeline.drain()
+            for task in tasks:
+                task.cancel()
+        asyncio.run(run())
+
+    def test_detects_once_per_closed_bar(self):
+        """Test each new bar runs detection once and duplicates are skipped."""
+        self.pipeline.seed('NQ', [_bar(0), _bar(1)])
+
+        def push():
+            self.pipeline.push_bar('NQ', _bar(2))
+            self.pipeline.push_bar('NQ', _bar(2, close=101.0))  # Correction
+            self.pipeline.push_bar('NQ', _bar(1))  # Already in history
+            self.pipeline.push_bar('NQ', _bar(3, close=102.0))
+        self._run(['NQ'], push)
+
+        self.assertEqual([c[1] for c in self.calls], [_bar(2)['timestamp'], _bar(3)['timestamp']])
+        self.assertEqual(self.pipeline.stats['duplicates'], 2)
+        self.assertEqual(self.pipeline.stats['signals'], 1)
+        self.assertEqual(self.pipeline.buffers['NQ'][-2]['close'], 101.0)  # Correction merged
+
+    def test_buffer_bounded(self):
+        """Test the buffer keeps at most max_bars bars."""
+        self.pipeline.seed('NQ', [_bar(i) for i in range(30)])
+        self.assertEqual(len(self.pipeline.buffers['NQ']), 25)
+
+        self._run(['NQ'], lambda: [self.pipeline.push_bar('NQ', _bar(i)) for i in range(30, 33)])
+
+        self.assertEqual([c[2] for c in self.calls], [25, 25, 25])
+        self.assertEqual(self.pipeline.buffers['NQ'][-1]['timestamp'], _bar(32)['timestamp'])
+
+    def test_symbols_independent(self):
+        """Test bars are routed to their own symbol's buffer."""
+        self.pipeline.seed('NQ', [_bar(0)])
+        self.pipeline.seed('ES', [_bar(0)])
+
+        def push():
+            self.pipeline.push_bar('ES', _bar(1))
+            self.pipeline.push_bar('NQ', _bar(1))
+            self.pipeline.push_bar('NQ', _bar(2))
+        self._run(['NQ', 'ES'], push)
+
+        self.assertEqual(sorted(c[0] for c in self.calls), ['ES', 'NQ', 'NQ'])
+        self.assertEqual(len(self.pipeline.buffers['ES']), 2)
+        self.assertEqual(len(self.pipeline.buffers['NQ']), 3)
+
+    def test_bars_pushed_before_seed_kept(self):
+        """Test bars streamed while history loads are processed after seeding."""
+        self.pipeline.push_bar('NQ', _bar(3))
+        self.pipeline.seed('NQ', [_bar(0), _bar(1), _bar(2)])
+
+        self._run(['NQ'], lambda: None)
+
+        self.assertEqual(self.calls, [('NQ', _bar(3)['timestamp'], 4)])
+
+    def test_push_candles_queues_new_bars_only(self):
+        """Test a REST poll only queues bars newer than the buffer."""
+        self.pipeline.seed('NQ', [_bar(0), _bar(1)])
+        queued = self.pipeline.push_candles('NQ', [_bar(0), _bar(1), _bar(2), _bar(3)])
+        self.assertEqual(queued, 2)
+
+    def test_latency_recorded(self):
+        """Test bar-close latency is recorded for detections and signals."""
+        self.pipeline.seed('NQ', [_bar(0)])
+        self._run(['NQ'], lambda: [self.pipeline.push_bar('NQ', _bar(1, close=101.0)),
+                                   self.pipeline.push_bar('NQ', _bar(2))])
+
+        self.assertEqual(self.pipeline.detection_latency.count, 2)
+        self.assertEqual(self.pipeline.signal_latency.count, 1)
+        self.assertIn('bar close->signal', self.pipeline.format_stats())
+
+    def test_tick_bar_builder(self):
+        """Test ticks aggregate into a bar that closes on the next interval."""
+        builder = TickBarBuilder('NQ', '5Min')
+        self.assertIsNone(builder.update(100.0, 2, START))
+        self.assertIsNone(builder.update(102.0, 1, START + 60))
+        self.assertIsNone(builder.update(99.0, 3, START + 299))
+        bar = builder.update(101.0, 1, START + 300)
+
+        self.assertEqual((bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']),
+                         (100.0, 102.0, 99.0, 99.0, 6))
+        self.assertEqual(bar['timestamp'], to_iso_timestamp(START))
+        self.assertIsNone(builder.update(98.0, 1, START + 10))  # Late print ignored
+
+    def test_push_tick(self):
+        """Test ticks drive detection when a bar completes."""
+        self.pipeline.seed('NQ', [_bar(-1)])
+        self._run(['NQ'], lambda: [self.pipeline.push_tick('NQ', p, 1, START + i * 150)
+                                   for i, p in enumerate([100.0, 101.0, 102.0])])
+
+        self.assertEqual(self.calls, [('NQ', _bar(0)['timestamp'], 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
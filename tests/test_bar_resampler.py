@@ -0,0 +1,175 @@
+"""
+Test suite for bar resampling utilities.
+Tests interval parsing, columnar conversion, OHLCV/CVD aggregation and session alignment.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from datetime import datetime, timedelta, timezone
+from aafr.bar_resampler import (
+    parse_interval, to_epoch_seconds, candles_to_columns, columns_to_candles,
+    resample_columns, resample_candles
+)
+from aafr.utils import generate_mock_candles_for_period
+
+
+def _minute_candles(start: datetime, count: int, symbol: str = 'MNQ'):
+    """Build deterministic 1-minute candles starting at start (UTC)."""
+    candles = []
+    for i in range(count):
+        base = 100.0 + i
+        candles.append({
+            'timestamp': int((start + timedelta(minutes=i)).timestamp()),
+            'open': base,
+            'high': base + 2,
+            'low': base - 1,
+            'close': base + 1,
+            'volume': 10 + i,
+            'delta': 1 if i % 2 == 0 else -1,
+            'symbol': symbol
+        })
+    return candles
+
+
+class TestBarResampler(unittest.TestCase):
+    """Test cases for bar resampling."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        # 22:50 UTC, ten minutes before the 17:00 CST (23:00 UTC) session open
+        self.start = datetime(2025, 1, 6, 22, 50, tzinfo=timezone.utc)
+
+    def test_parse_interval(self):
+        """Test interval string parsing matches Tradovate chart parameters."""
+        self.assertEqual(parse_interval("5Min"), ("MinuteBar", 5))
+        self.assertEqual(parse_interval("15Min"), ("MinuteBar", 15))
+        self.assertEqual(parse_interval("1Hour"), ("MinuteBar", 60))
+        self.assertEqual(parse_interval("4H"), ("MinuteBar", 240))
+        self.assertEqual(parse_interval("1Day"), ("DayBar", 1))
+
+    def test_to_epoch_seconds(self):
+        """Test timestamp normalization."""
+        self.assertEqual(to_epoch_seconds(1700000000), 1700000000)
+        self.assertEqual(to_epoch_seconds(1700000000000), 1700000000)
+        self.assertEqual(to_epoch_seconds("2021-06-15T15:40:00Z"),
+                         int(datetime(2021, 6, 15, 15, 40, tzinfo=timezone.utc).timestamp()))
+        with self.assertRaises(ValueError):
+            to_epoch_seconds(None)
+
+    def test_columns_round_trip(self):
+        """Test candle <-> column conversion preserves data."""
+        candles = _minute_candles(self.start, 5)
+        columns = candles_to_columns(candles)
+
+        self.assertEqual(len(columns['close']), 5)
+        self.assertIn('delta', columns)
+        self.assertEqual(columns_to_candles(columns, 'MNQ'), candles)
+
+    def test_ohlcv_aggregation(self):
+        """Test OHLCV and delta aggregation for 5-minute bars."""
+        start = datetime(2025, 1, 6, 14, 0, tzinfo=timezone.utc)
+        candles = _minute_candles(start, 10)
+
+        bars = resample_candles(candles, "5Min")
+
+        self.assertEqual(len(bars), 2)
+        first = bars[0]
+        self.assertEqual(first['timestamp'], candles[0]['timestamp'])
+        self.assertEqual(first['open'], candles[0]['open'])
+        self.assertEqual(first['high'], max(c['high'] for c in candles[:5]))
+        self.assertEqual(first['low'], min(c['low'] for c in candles[:5]))
+        self.assertEqual(first['close'], candles[4]['close'])
+        self.assertEqual(first['volume'], sum(c['volume'] for c in candles[:5]))
+        self.assertEqual(first['delta'], 1)
+        self.assertEqual(first['symbol'], 'MNQ')
+
+    def test_cvd_takes_last_value(self):
+        """Test cumulative CVD column keeps the last value per bar."""
+        start = datetime(2025, 1, 6, 14, 0, tzinfo=timezone.utc)
+        candles = _minute_candles(start, 6)
+        cumulative = 0
+        for candle in candles:
+            cumulative += candle['delta']
+            candle['cvd'] = cumulative
+
+        bars = resample_candles(candles, "3Min")
+
+        self.assertEqual([b['cvd'] for b in bars], [candles[2]['cvd'], candles[5]['cvd']])
+
+    def test_session_boundary_alignment(self):
+        """Test bars never span the session open."""
+        # 22:50 -> 23:10 UTC crosses the 23:00 session open
+        candles = _minute_candles(self.start, 20)
+
+        bars = resample_candles(candles, "1Hour")
+
+        self.assertEqual(len(bars), 2)
+        session_open = int(datetime(2025, 1, 6, 23, 0, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(bars[1]['timestamp'], session_open)
+        self.assertEqual(bars[0]['volume'] + bars[1]['volume'],
+                         sum(c['volume'] for c in candles))
+
+    def test_session_open_follows_daylight_saving(self):
+        """Test the session open is 17:00 Chicago time in summer and winter."""
+        for start, open_hour in ((datetime(2025, 7, 7, 21, 50, tzinfo=timezone.utc), 22),
+                                 (datetime(2025, 11, 3, 22, 50, tzinfo=timezone.utc), 23)):
+            bars = resample_candles(_minute_candles(start, 20), "Session")
+            session_open = start.replace(hour=open_hour, minute=0)
+            self.assertEqual([b['timestamp'] for b in bars],
+                             [int((session_open - timedelta(days=1)).timestamp()),
+                              int(session_open.timestamp())])
+
+    def test_fixed_session_start(self):
+        """Test an explicit session start keeps a fixed UTC anchor."""
+        start = datetime(2025, 1, 6, 21, 50, tzinfo=timezone.utc)
+
+        bars = resample_candles(_minute_candles(start, 20), "1Hour", session_start_minute=22 * 60)
+
+        session_open = int(datetime(2025, 1, 6, 22, 0, tzinfo=timezone.utc).timestamp())
+        self.assertEqual(bars[1]['timestamp'], session_open)
+
+    def test_session_bars(self):
+        """Test one bar per session."""
+        candles = _minute_candles(self.start, 20)
+
+        bars = resample_candles(candles, "Session")
+
+        self.assertEqual(len(bars), 2)
+        self.assertEqual(bars[0]['close'], candles[9]['close'])
+        self.assertEqual(bars[1]['open'], candles[10]['open'])
+
+    def test_unsorted_input_and_gaps(self):
+        """Test unsorted input is ordered and missing minutes are skipped."""
+        start = datetime(2025, 1, 6, 14, 0, tzinfo=timezone.utc)
+        candles = _minute_candles(start, 30)
+        sparse = candles[:5] + candles[20:]
+        sparse.reverse()
+
+        bars = resample_candles(sparse, "5Min")
+
+        timestamps = [b['timestamp'] for b in bars]
+        self.assertEqual(timestamps, sorted(timestamps))
+        self.assertEqual(len(bars), 3)
+
+    def test_empty_input(self):
+        """Test empty inputs resample to empty outputs."""
+        self.assertEqual(resample_candles([], "15Min"), [])
+        empty = resample_columns({'timestamp': [], 'close': []}, "15Min")
+        self.assertEqual(empty, {'timestamp': [], 'close': []})
+
+    def test_generated_data_counts(self):
+        """Test resampling of generated 1-minute history."""
+        end = datetime(2025, 1, 10, 22, 0)
+        candles = generate_mock_candles_for_period(end - timedelta(days=1), end, 'MNQ', 1)
+
+        bars = resample_candles(candles, "15Min")
+
+        self.assertEqual(sum(b['volume'] for b in bars), sum(c['volume'] for c in candles))
+        self.assertAlmostEqual(len(bars), len(candles) / 15, delta=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Test suite for the bulk history downloader and token-bucket rate limiter.
+Tests page planning, concurrent paged downloads against a local mock
+server, rate limiting, p-ticket penalties and streaming into the cache.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import shutil
+import tempfile
+import time
+import unittest
+from aafr.async_tradovate_api import AsyncTradovateAPI, AIOHTTP_AVAILABLE
+from aafr.bulk_downloader import BulkHistoryDownloader, plan_pages, interval_seconds
+from aafr.candle_cache import CandleCache
+from aafr.rate_limiter import TokenBucket
+
+if AIOHTTP_AVAILABLE:
+    from aafr.mock_tradovate_server import MockTradovateServer, point_at
+
+SERIES_START = 1736172000
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the token bucket."""
+
+    def test_rejects_invalid_rate(self):
+        """Test non-positive rates are rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucket(0)
+
+    def test_burst_then_rate(self):
+        """Test a full bucket allows a burst, then refills at the rate."""
+        async def run():
+            bucket = TokenBucket(rate=20, capacity=3)
+            start = time.monotonic()
+            for _ in range(3):
+                await bucket.acquire()
+            burst = time.monotonic() - start
+            for _ in range(4):
+                await bucket.acquire()
+            return burst, time.monotonic() - start
+
+        burst, total = asyncio.run(run())
+
+        self.assertLess(burst, 0.05)
+        # Four more tokens at 20/s take ~0.2s
+        self.assertGreaterEqual(total, 0.18)
+
+    def test_penalty_blocks_acquirers(self):
+        """Test a penalty pauses acquirers and is counted."""
+        async def run():
+            bucket = TokenBucket(rate=100, capacity=10)
+            bucket.penalize(0.2)
+            self.assertTrue(bucket.is_blocked())
+            start = time.monotonic()
+            await bucket.acquire()
+            return bucket, time.monotonic() - start
+
+        bucket, waited = asyncio.run(run())
+
+        self.assertGreaterEqual(waited, 0.19)
+        self.assertEqual(bucket.stats['penalties'], 1)
+
+    def test_from_config(self):
+        """Test config parsing."""
+        self.assertIsNone(TokenBucket.from_config({}))
+        bucket = TokenBucket.from_config({'rate_limit': {'requests_per_second': 5, 'burst': 2}})
+        self.assertEqual((bucket.rate, bucket.capacity), (5.0, 2.0))
+
+
+class TestBulkHistoryDownloader(unittest.TestCase):
+    """Test cases for the bulk downloader."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_plan_pages(self):
+        """Test ranges split into contiguous pages."""
+        pages = plan_pages(0, 3600 * 5, "1Min", page_bars=120)
+
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(pages[0], (0, 7200))
+        self.assertEqual(pages[-1], (14400, 18000))
+        self.assertEqual(interval_seconds("5Min"), 300)
+        self.assertEqual(interval_seconds("1Day"), 86400)
+
+    def _download(self, server, **kwargs):
+        """Run a download of the whole mock series."""
+        async def run():
+            await server.start()
+            try:
+                api = AsyncTradovateAPI()
+                point_at(api, server.base_url)
+                cache = CandleCache(self.temp_dir)
+                async with api:
+                    downloader = BulkHistoryDownloader(api, cache, **kwargs)
+                    candles = await downloader.download(
+                        'MNQ', SERIES_START, SERIES_START + server.series_bars * 60
+                    )
+                return downloader, cache, candles
+            finally:
+                await server.stop()
+
+        return asyncio.run(run())
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_download_pages_concurrently(self):
+        """Test every page is fetched concurrently and streamed into the cache."""
+        server = MockTradovateServer(latency=0.1, series_bars=1000)
+
+        downloader, cache, candles = self._download(
+            server, requests_per_second=100, burst=10, max_concurrency=4, page_bars=100
+        )
+
+        self.assertEqual(len(candles), 1000)
+        self.assertEqual(downloader.stats['pages'], 10)
+        self.assertEqual(server.max_in_flight, 4)
+        self.assertEqual(downloader.failed_pages, [])
+
+        # Persisted once and readable by a fresh cache
+        reloaded = CandleCache(self.temp_dir)
+        self.assertEqual(len(reloaded.get_cached('MNQ', '1Min')), 1000)
+        self.assertEqual(cache.get_range('MNQ', '1Min', SERIES_START, SERIES_START + 600)[-1]['timestamp'],
+                         candles[9]['timestamp'])
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_rate_limit_respected(self):
+        """Test request starts never exceed the configured rate."""
+        server = MockTradovateServer(series_bars=600)
+
+        self._download(server, requests_per_second=20, burst=1, max_concurrency=6, page_bars=100)
+
+        times = server.request_times
+        self.assertEqual(len(times), 6)
+        # Six requests at 20/s with no burst span at least 5 intervals
+        self.assertGreaterEqual(times[-1] - times[0], 5 / 20 - 0.02)
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_penalty_pauses_and_retries(self):
+        """Test p-ticket responses pause the bucket and the page is retried."""
+        server = MockTradovateServer(penalties=1, penalty_seconds=0.3, series_bars=300)
+
+        downloader, _, candles = self._download(
+            server, requests_per_second=100, burst=5, max_concurrency=3, page_bars=100
+        )
+
+        self.assertEqual(len(candles), 300)
+        self.assertEqual(downloader.rate_limiter.stats['penalties'], 1)
+        # The retried request waited out the penalty
+        self.assertGreaterEqual(max(server.request_times) - min(server.request_times), 0.28)
+
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+    def test_server_errors_retried(self):
+        """Test 5xx pages are retried until they succeed."""
+        server = MockTradovateServer(fail_first=2, series_bars=200)
+
+        downloader, _, candles = self._download(
+            server, requests_per_second=100, burst=5, max_concurrency=2, page_bars=100
+        )
+
+        self.assertEqual(len(candles), 200)
+        self.assertEqual(downloader.failed_pages, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
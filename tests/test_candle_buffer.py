@@ -0,0 +1,121 @@
+"""
+Test suite for the candle ring buffer.
+Tests list behaviour, bounded capacity, and that the incremental ATR, CVD
+and swing values match a full recomputation over the retained bars.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import unittest
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.cvd_module import CVDCalculator
+from aafr.icc_module import ICCDetector
+from aafr.utils import calculate_atr, generate_mock_candles
+
+
+def _atr(candles):
+    """Recompute ATR the way the detectors do."""
+    return calculate_atr([c['high'] for c in candles], [c['low'] for c in candles],
+                         [c['close'] for c in candles])
+
+
+class TestCandleRingBuffer(unittest.TestCase):
+    """Test cases for CandleRingBuffer."""
+
+    def setUp(self):
+        """Create mock candles with integer timestamps."""
+        random.seed(7)
+        self.candles = generate_mock_candles(400, "MNQ")
+
+    def test_behaves_like_list(self):
+        """Test indexing, slicing, iteration and length."""
+        ring = CandleRingBuffer(capacity=50)
+        ring.extend(self.candles[:30])
+
+        self.assertEqual(len(ring), 30)
+        self.assertIs(ring[0], self.candles[0])
+        self.assertIs(ring[-1], self.candles[29])
+        self.assertEqual(ring[-5:], self.candles[25:30])
+        self.assertEqual(list(ring), self.candles[:30])
+        with self.assertRaises(IndexError):
+            ring[30]
+
+    def test_capacity_bounded(self):
+        """Test the oldest bars are evicted once full."""
+        ring = CandleRingBuffer(capacity=100)
+        ring.extend(self.candles)
+
+        self.assertEqual(len(ring), 100)
+        self.assertEqual(list(ring), self.candles[-100:])
+        self.assertEqual(ring[-20:-10], self.candles[-20:-10])
+
+    def test_indicators_match_recomputation(self):
+        """Test ATR, CVD and swing values after every appended bar."""
+        ring = CandleRingBuffer(capacity=60)
+        for i, candle in enumerate(self.candles):
+            ring.append(candle)
+            window = self.candles[max(0, i - 59):i + 1]
+
+            expected_atr = _atr(window)
+            if expected_atr is None:
+                self.assertIsNone(ring.atr)
+            else:
+                self.assertAlmostEqual(ring.atr, expected_atr, places=6)
+            self.assertEqual(list(ring.cvd), CVDCalculator().calculate_cvd(window))
+            self.assertEqual(ring.swing_high, max(c['high'] for c in window[-20:]))
+            self.assertEqual(ring.swing_low, min(c['low'] for c in window[-20:]))
+
+    def test_merge_replaces_and_ignores_stale_bars(self):
+        """Test merge() semantics match merge_closed_bar()."""
+        ring = CandleRingBuffer(capacity=50)
+        ring.extend(self.candles[:30])
+
+        correction = dict(self.candles[29], high=self.candles[29]['high'] + 500, volume=10000)
+        self.assertTrue(ring.merge(correction))
+        self.assertFalse(ring.merge(self.candles[10]))
+
+        window = self.candles[:29] + [correction]
+        self.assertEqual(len(ring), 30)
+        self.assertIs(ring[-1], correction)
+        self.assertAlmostEqual(ring.atr, _atr(window), places=6)
+        self.assertEqual(list(ring.cvd), CVDCalculator().calculate_cvd(window))
+        self.assertEqual(ring.swing_high, correction['high'])
+
+        # Undo the correction: the swing high must drop back
+        self.assertTrue(ring.merge(self.candles[29]))
+        self.assertEqual(ring.swing_high, max(c['high'] for c in self.candles[10:30]))
+
+    def test_detection_matches_list(self):
+        """Test ICC detection gives the same result on a ring as on a list."""
+        # Insert a displacement candle so an indication is found
+        i = len(self.candles) - 8
+        start = self.candles[i - 1]['close']
+        self.candles[i] = dict(self.candles[i], open=start, close=start + 150,
+                               high=start + 152, low=start - 2, volume=5000)
+        ring = CandleRingBuffer(capacity=100)
+        ring.extend(self.candles)
+        window = self.candles[-100:]
+
+        from_list = ICCDetector().detect_icc_structure(window, require_all_phases=False)
+        from_ring = ICCDetector().detect_icc_structure(ring, require_all_phases=False)
+        self.assertIsNotNone(from_list)
+        self.assertEqual(from_ring, from_list)
+
+        on_ring, on_list = CVDCalculator(), CVDCalculator()
+        on_ring.calculate_cvd(ring)
+        on_list.calculate_cvd(window)
+        self.assertEqual(on_ring.check_divergence(ring), on_list.check_divergence(window))
+
+    def test_capacity_validation(self):
+        """Test the capacity must cover the ATR period and swing lookback."""
+        with self.assertRaises(ValueError):
+            CandleRingBuffer(capacity=15)
+        with self.assertRaises(ValueError):
+            CandleRingBuffer(capacity=30, swing_lookback=40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+"""
+Test suite for the on-disk historical candle cache.
+Tests persistence, incremental tail/head requests, offline mode and
+that mock data never reaches the cache.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import shutil
+import tempfile
+import unittest
+from aafr.candle_cache import CandleCache, to_iso_timestamp
+from aafr.tradovate_api import TradovateAPI
+
+START = 1736172000  # 2025-01-06 14:00 UTC
+STEP = 300
+
+
+def _bars(first: int, count: int, symbol: str = 'MNQ'):
+    """Build count 5-minute bars starting at bar index first."""
+    return [{
+        'timestamp': to_iso_timestamp(START + (first + i) * STEP),
+        'open': 100.0 + i, 'high': 101.0 + i, 'low': 99.0 + i, 'close': 100.5 + i,
+        'volume': 10, 'symbol': symbol
+    } for i in range(count)]
+
+
+class FakeHistoryServer:
+    """Serves bars 0..last from a fixed series and records timeRange requests."""
+
+    def __init__(self, last: int):
+        self.last = last
+        self.requests = []
+
+    def fetch(self, symbol, interval, count, time_range):
+        self.requests.append(dict(time_range))
+        series = _bars(0, self.last + 1, symbol)
+        if 'asFarAsTimestamp' in time_range:
+            series = [b for b in series if b['timestamp'] >= time_range['asFarAsTimestamp']]
+        if 'closestTimestamp' in time_range:
+            series = [b for b in series if b['timestamp'] <= time_range['closestTimestamp']]
+        return series[-time_range['asMuchAsElements']:]
+
+
+class TestCandleCache(unittest.TestCase):
+    """Test cases for the candle cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = CandleCache(self.temp_dir)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_first_load_fetches_everything(self):
+        """Test an empty cache requests the full count and persists it."""
+        server = FakeHistoryServer(last=199)
+
+        candles = self.cache.get_candles('MNQ', '5Min', 100, server.fetch)
+
+        self.assertEqual(len(candles), 100)
+        self.assertEqual(server.requests, [{'asMuchAsElements': 100}])
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'MNQ', '5Min.json')))
+
+    def test_incremental_tail(self):
+        """Test later loads only request bars from the last cached bar on."""
+        server = FakeHistoryServer(last=99)
+        self.cache.get_candles('MNQ', '5Min', 100, server.fetch)
+
+        server.last = 104
+        reloaded = CandleCache(self.temp_dir)
+        candles = reloaded.get_candles('MNQ', '5Min', 100, server.fetch)
+
+        self.assertEqual(server.requests[-1]['asFarAsTimestamp'], to_iso_timestamp(START + 99 * STEP))
+        self.assertEqual(reloaded.stats['bars_fetched'], 6)
+        self.assertEqual(candles[-1]['timestamp'], to_iso_timestamp(START + 104 * STEP))
+        self.assertEqual(len(candles), 100)
+
+    def test_head_backfill(self):
+        """Test asking for more bars than cached fetches the older range once."""
+        server = FakeHistoryServer(last=149)
+        self.cache.get_candles('MNQ', '5Min', 50, server.fetch)
+
+        candles = self.cache.get_candles('MNQ', '5Min', 200, server.fetch)
+
+        head = server.requests[-1]
+        self.assertEqual(head['closestTimestamp'], to_iso_timestamp(START + 100 * STEP - 1))
+        self.assertEqual(len(candles), 150)
+        self.assertEqual(candles[0]['timestamp'], to_iso_timestamp(START))
+
+        # Server had fewer bars than asked: the head is not requested again
+        server.requests.clear()
+        self.cache.get_candles('MNQ', '5Min', 200, server.fetch)
+        self.assertEqual(len(server.requests), 1)
+
+    def test_duplicates_replaced(self):
+        """Test overlapping bars are deduplicated and refreshed."""
+        self.cache.merge('MNQ', '5Min', _bars(0, 10))
+        updated = _bars(9, 2)
+        updated[0]['close'] = 999.0
+
+        added = self.cache.merge('MNQ', '5Min', updated)
+
+        cached = self.cache.get_cached('MNQ', '5Min')
+        self.assertEqual(added, 1)
+        self.assertEqual(len(cached), 11)
+        self.assertEqual(cached[9]['close'], 999.0)
+
+    def test_offline_serves_cache_only(self):
+        """Test offline mode never calls the fetch callback."""
+        self.cache.merge('MNQ', '5Min', _bars(0, 30))
+        offline = CandleCache(self.temp_dir, offline=True)
+
+        def fail_fetch(*args):
+            raise AssertionError("offline cache must not fetch")
+
+        self.assertEqual(len(offline.get_candles('MNQ', '5Min', 20, fail_fetch)), 20)
+        self.assertIsNone(offline.get_candles('MES', '5Min', 20, fail_fetch))
+
+    def test_failed_fetch_serves_cache(self):
+        """Test network failures fall back to cached bars."""
+        self.cache.merge('MNQ', '5Min', _bars(0, 30))
+
+        candles = self.cache.get_candles('MNQ', '5Min', 50, lambda *args: None)
+
+        self.assertEqual(len(candles), 30)
+
+    def test_async_variant(self):
+        """Test coroutine fetch callbacks."""
+        server = FakeHistoryServer(last=99)
+
+        async def fetch(*args):
+            return server.fetch(*args)
+
+        candles = asyncio.run(self.cache.get_candles_async('MNQ', '5Min', 40, fetch))
+
+        self.assertEqual(len(candles), 40)
+
+    def test_mock_data_not_cached(self):
+        """Test the API never writes mock candles to the cache."""
+        api = TradovateAPI()
+        api.cache = self.cache
+        api.use_mock_data = True
+
+        candles = api.get_historical_candles('MNQ', count=25)
+
+        self.assertEqual(len(candles), 25)
+        self.assertEqual(self.cache.get_cached('MNQ', '5Min'), [])
+
+    def test_from_config(self):
+        """Test config parsing and offline override."""
+        self.assertIsNone(CandleCache.from_config({}))
+        cache = CandleCache.from_config({}, offline=True)
+        self.assertTrue(cache.offline)
+        cache = CandleCache.from_config({'data_cache': {'enabled': True, 'directory': self.temp_dir}})
+        self.assertFalse(cache.offline)
+
+
+if __name__ == '__main__':
+    unittest.main()
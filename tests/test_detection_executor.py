@@ -0,0 +1,175 @@
+"""
+Test suite for the detection executor.
+Tests per-symbol ordering, cross-symbol concurrency, event loop
+responsiveness, process-pool evaluation and stateful job routing.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import random
+import time
+import unittest
+from aafr.detection_executor import DetectionExecutor, INLINE, PROCESS, THREAD
+from aafr.icc_module import evaluate_icc_setup
+from aafr.utils import generate_mock_candles, load_config
+
+
+def _busy(seconds):
+    """Block the calling worker for `seconds`."""
+    time.sleep(seconds)
+    return seconds
+
+
+class TestDetectionExecutor(unittest.TestCase):
+    """Test cases for DetectionExecutor."""
+
+    def test_same_symbol_runs_in_order(self):
+        """Test jobs for one symbol never overlap and keep submission order."""
+        executor = DetectionExecutor(THREAD, max_workers=4)
+        log = []
+
+        def job(index, delay):
+            log.append(('start', index))
+            time.sleep(delay)
+            log.append(('end', index))
+            return index
+
+        async def run():
+            return await asyncio.gather(*(executor.run('NQ', job, i, 0.03 - i * 0.01) for i in range(3)))
+
+        try:
+            results = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(results, [0, 1, 2])
+        self.assertEqual(log, [('start', 0), ('end', 0), ('start', 1), ('end', 1), ('start', 2), ('end', 2)])
+
+    def test_symbols_run_concurrently(self):
+        """Test different symbols use separate workers."""
+        executor = DetectionExecutor(THREAD, max_workers=4)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(executor.run(symbol, _busy, 0.2) for symbol in ['NQ', 'ES', 'GC', 'CL']))
+            return time.monotonic() - start
+
+        try:
+            elapsed = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(executor.stats['jobs'], 4)
+        self.assertEqual(executor.run_time.count, 4)
+
+    def test_event_loop_stays_responsive(self):
+        """Test the loop keeps running while a long job is in the pool."""
+        executor = DetectionExecutor(THREAD, max_workers=1)
+        ticks = []
+
+        async def heartbeat(stop):
+            while not stop.is_set():
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            stop = asyncio.Event()
+            beat = asyncio.create_task(heartbeat(stop))
+            await executor.run('NQ', _busy, 0.3)
+            stop.set()
+            await beat
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        self.assertGreater(len(ticks), 10)
+        self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), 0.1)
+
+    def test_process_pool_matches_inline(self):
+        """Test ICC evaluation in worker processes matches running inline."""
+        random.seed(3)
+        batches = {symbol: generate_mock_candles(200, symbol) for symbol in ['MNQ', 'MES']}
+        inline = DetectionExecutor(INLINE)
+        pool = DetectionExecutor(PROCESS, max_workers=2)
+
+        async def run(executor):
+            await executor.warm_up()
+            return await asyncio.gather(*(executor.run(symbol, evaluate_icc_setup, candles)
+                                          for symbol, candles in batches.items()))
+
+        try:
+            expected = asyncio.run(run(inline))
+            results = asyncio.run(run(pool))
+        finally:
+            pool.shutdown()
+
+        self.assertEqual(results, expected)
+
+    def test_stateful_jobs_stay_in_process(self):
+        """Test stateful jobs run in a thread when the pool is process-based."""
+        executor = DetectionExecutor(PROCESS, max_workers=1)
+        state = []
+
+        async def run():
+            return await executor.run('NQ', state.append, 1, stateful=True)
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(state, [1])
+        self.assertIsNone(executor._process_pool)
+
+    def test_ajr_symbols_share_state_safely(self):
+        """Test concurrent AJR jobs for different symbols serialize on the strategy lock."""
+        from ajr.ajr_strategy import AJRStrategy
+        strategy = AJRStrategy("config.json")
+        executor = DetectionExecutor(THREAD, max_workers=4)
+        candle = {'open': 100.0, 'high': 101.0, 'low': 99.0, 'close': 100.5}
+
+        async def run():
+            with strategy._lock:
+                jobs = [asyncio.ensure_future(executor.run(symbol, strategy.process_candle, dict(candle), symbol,
+                                                           stateful=True)) for symbol in ('NQ', 'ES', 'GC')]
+                await asyncio.sleep(0.05)
+                blocked = not any(job.done() for job in jobs)
+            await asyncio.gather(*jobs)
+            return blocked
+
+        try:
+            self.assertTrue(asyncio.run(run()))
+        finally:
+            executor.shutdown()
+
+        self.assertEqual(strategy.gap_tracker.candle_count, {'NQ': 1, 'ES': 1, 'GC': 1})
+
+    def test_errors_reraised(self):
+        """Test job exceptions reach the caller and are counted."""
+        executor = DetectionExecutor(INLINE)
+
+        async def run():
+            await executor.run('NQ', int, 'not a number')
+
+        with self.assertRaises(ValueError):
+            asyncio.run(run())
+        self.assertEqual(executor.stats['errors'], 1)
+
+    def test_from_config(self):
+        """Test the executor is built from the detection config section."""
+        executor = DetectionExecutor.from_config(load_config("config.json"))
+        self.assertEqual(executor.mode, THREAD)
+        self.assertEqual(executor.max_workers, 4)
+
+        with self.assertRaises(ValueError):
+            DetectionExecutor("gpu")
+
+
+if __name__ == '__main__':
+    unittest.main()
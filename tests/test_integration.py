@@ -7,7 +7,9 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import asyncio
 import unittest
+from unittest.mock import AsyncMock, Mock, patch
 from aafr.main import AAFRTradingSystem
 from aafr.icc_module import ICCDetector
 from aafr.cvd_module import CVDCalculator
@@ -215,6 +217,46 @@ class TestIntegration(unittest.TestCase):
         # Reset for other tests
         self.system.risk_engine.daily_pnl = 0.0
     
+    def test_daily_trade_reserved_before_orders(self):
+        """Test concurrent signals cannot pass the daily trade limit while orders are in flight."""
+        system = self.system
+        system.auto_trade = True
+        system.ws_server = Mock()
+        system._emit_new_position_event = AsyncMock()
+        details = {'r_multiple': 2.0, 'position_size': 1, 'dollar_risk': 100.0, 'risk_percent': 0.5}
+        structure = {'indication': {'direction': 'LONG'}}
+
+        def validate(*args):
+            if system.risk_engine.daily_trades >= 1:
+                return False, "Max daily trades reached", {}
+            return True, "Trade setup valid", details
+
+        def run(reason):
+            async def dispatch(*args, **kwargs):
+                await asyncio.sleep(0.05)  # Entry acks and exits in flight
+                return {'default': {'accepted': reason == "OK", 'reason': reason,
+                                    'position_size': 1, 'orders': []}}
+
+            async def signals():
+                issued = await asyncio.gather(*(system._process_trade_signal(symbol, structure, [])
+                                                for symbol in ('MNQ', 'MES')))
+                pending = len(system._order_tasks)  # Broadcast already sent
+                await system._wait_for_orders()
+                return issued, pending
+
+            system.order_fanout = Mock(dispatch=dispatch)
+            with patch('aafr.main.ICCDetector.calculate_trade_levels', return_value=(100.0, 90.0, 120.0, 2.0)), \
+                    patch.object(system.risk_engine, 'validate_trade_setup', side_effect=validate):
+                return asyncio.run(signals())
+
+        self.assertEqual(run("OK"), ([True, False], 1))
+        self.assertEqual(system._emit_new_position_event.await_count, 1)
+        self.assertEqual(system.risk_engine.daily_trades, 1)
+
+        system.risk_engine.daily_trades = 0
+        run("rejected: no margin")
+        self.assertEqual(system.risk_engine.daily_trades, 0)  # Reservation released
+
     def _create_icc_test_candles(self):
         """Create test candles with ICC pattern."""
         candles = []
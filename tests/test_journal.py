@@ -0,0 +1,148 @@
+"""
+Test suite for the session journal.
+Tests the binary record round trip, indexed lookups, crash-truncated
+files, corruption detection, and journaling of pipeline input and
+WebSocket events for replay.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import tempfile
+import unittest
+from aafr.bar_pipeline import BarPipeline
+from aafr.journal import (
+    SessionJournal, JournalReader, MAGIC, RECORD_HEADER,
+    SESSION, HISTORY, BAR, TICK, DETECTION, EVENT
+)
+from aafr.replay import BARS
+from aafr.websocket_server import WebSocketServer
+
+
+def _candle(i):
+    return {'timestamp': 1736172000 + i * 300, 'open': 100.0, 'high': 101.0,
+            'low': 99.0, 'close': 100.0 + i, 'volume': 10}
+
+
+class TestSessionJournal(unittest.TestCase):
+    """Test cases for SessionJournal and JournalReader."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.journal = SessionJournal(self.tmp.name, enabled=True, flush_interval=0.01)
+
+    def tearDown(self):
+        self.journal.stop()
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Test records come back in order with gapless sequence numbers."""
+        self.assertFalse(self.journal.append(BAR, {}))  # Not started
+        self.journal.start(system="test", symbols=["NQ"])
+        for i in range(50):
+            self.assertTrue(self.journal.append(BAR, {'symbol': "NQ", 'candle': _candle(i)}))
+        self.journal.append(DETECTION, {'symbol': "NQ", 'valid': True})
+        self.journal.stop()
+
+        reader = JournalReader(self.journal.path)
+        self.assertEqual(len(reader), 53)
+        self.assertEqual(reader.seqs, list(range(53)))
+        self.assertFalse(reader.truncated)
+        self.assertEqual(reader.summary(), {'session': 2, 'bar': 50, 'detection': 1})
+
+        first = reader.read(0)
+        self.assertEqual(first['kind'], SESSION)
+        self.assertEqual(first['data'], {'system': "test", 'symbols': ["NQ"], 'status': "start"})
+        self.assertEqual(reader.read(10)['data']['candle']['close'], 109.0)
+        with self.assertRaises(KeyError):
+            reader.read(99)
+
+        detections = list(reader.records((DETECTION,)))
+        self.assertEqual([r['seq'] for r in detections], [51])
+        self.assertEqual(len(list(reader.records(start_seq=50))), 3)
+        self.assertEqual(len(list(reader.records(start_time=reader.timestamps[-1]))), 1)
+        self.assertEqual(self.journal.stats['records'], 53)
+
+    def test_truncated_and_corrupt_records(self):
+        """Test a torn final record ends the index and CRC mismatches are reported."""
+        self.journal.start()
+        for i in range(3):
+            self.journal.append(BAR, {'symbol': "NQ", 'candle': _candle(i)})
+        self.journal.stop()
+        path = self.journal.path
+
+        with open(path, 'ab') as f:
+            f.write(RECORD_HEADER.pack(100, 0, 5, 0.0, BAR) + b"{}")
+        reader = JournalReader(path)
+        self.assertTrue(reader.truncated)
+        self.assertEqual(len(reader), 5)
+
+        with open(path, 'r+b') as f:
+            f.seek(reader.offsets[1] + RECORD_HEADER.size)
+            f.write(b"X")
+        with self.assertRaises(ValueError):
+            reader.read(1)
+
+        bad = os.path.join(self.tmp.name, "bad.jnl")
+        with open(bad, 'wb') as f:
+            f.write(b"NOTAJNL!")
+        with self.assertRaises(ValueError):
+            JournalReader(bad)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(len(MAGIC)), MAGIC)
+
+    def test_full_queue_drops(self):
+        """Test appends never block when the writer falls behind."""
+        journal = SessionJournal(self.tmp.name, enabled=True, max_queue=1)
+        journal.running = True  # Queue without a writer thread
+        self.assertTrue(journal.append(BAR, {}))
+        self.assertFalse(journal.append(BAR, {}))
+        self.assertEqual(journal.stats['dropped'], 1)
+
+    def test_disabled(self):
+        """Test a disabled journal writes nothing."""
+        journal = SessionJournal(self.tmp.name, enabled=False)
+        self.assertIsNone(journal.start())
+        self.assertFalse(journal.append(BAR, {}))
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+class TestJournalHooks(unittest.TestCase):
+    """Test cases for journaling pipeline input and outbound events."""
+
+    def test_pipeline_and_events_rebuild_replay(self):
+        """Test journaled history, bars, ticks and events rebuild the session's replay feeds."""
+        async def detect(symbol, candles, event):
+            return False
+
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = SessionJournal(tmp, enabled=True)
+            journal.start()
+            pipeline = BarPipeline(detect, interval="5Min")
+            pipeline.journal = journal
+            pipeline.seed("NQ", [_candle(0), _candle(1)])
+            pipeline.push_bar("NQ", _candle(2))
+            pipeline.push_tick("ES", 5000.0, 1, 1736172000)
+            pipeline.push_tick("ES", 5001.0, 2, 1736172300)  # Closes the first ES bar
+
+            server = WebSocketServer()
+            server.journal = journal
+            asyncio.run(server.broadcast_event({'event': 'NEW_POSITION', 'symbol': 'NQ'}))
+            journal.stop()
+
+            reader = JournalReader(journal.path)
+            self.assertEqual(reader.summary(), {'session': 2, 'history': 1, 'bar': 2, 'tick': 2, 'event': 1})
+            self.assertEqual([c['close'] for c in reader.history()["NQ"]], [100.0, 101.0])
+            feeds = reader.replay_feeds()
+            self.assertEqual(feeds["NQ"], (BARS, [_candle(2)]))
+            self.assertEqual(feeds["ES"][1][0]['close'], 5000.0)
+            event = next(reader.records((EVENT,)))['data']
+            self.assertEqual(event['clients'], 0)
+            self.assertEqual(event['event']['event'], 'NEW_POSITION')
+            self.assertEqual(len(list(reader.records((HISTORY, TICK)))), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Test suite for the WebSocket market data stream.
+Tests frame parsing, bar-close detection, tick routing, live tick bars
+and resubscription after reconnect against a local mock feed.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from aafr.market_data_stream import (
+    MarketDataStream, parse_frame, build_request, chart_bar_to_candle,
+    merge_closed_bar, WEBSOCKETS_AVAILABLE
+)
+from aafr.async_tradovate_api import AIOHTTP_AVAILABLE
+from aafr.bar_pipeline import BarPipeline
+from aafr.tradovate_api import TradovateAPI
+
+if WEBSOCKETS_AVAILABLE and AIOHTTP_AVAILABLE:
+    from aafr.mock_tradovate_server import MockTradovateServer, point_at
+
+
+def _bar(minute: int, close: float) -> dict:
+    """Build a chart bar at 14:MM UTC."""
+    return {
+        'timestamp': f"2025-01-06T14:{minute:02d}:00Z",
+        'open': 100.0, 'high': max(100.0, close), 'low': min(100.0, close), 'close': close,
+        'upVolume': 30, 'downVolume': 10
+    }
+
+
+async def _wait_until(predicate, timeout: float = 3.0) -> None:
+    """Poll until predicate() is true."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestFrameHelpers(unittest.TestCase):
+    """Test cases for frame parsing helpers."""
+
+    def test_parse_frame(self):
+        """Test every frame type."""
+        self.assertEqual(parse_frame('o'), ('o', None))
+        self.assertEqual(parse_frame('h'), ('h', None))
+        self.assertEqual(parse_frame('a[{"s":200,"i":1}]'), ('a', [{'s': 200, 'i': 1}]))
+        self.assertEqual(parse_frame('c[1000,"bye"]'), ('c', [1000, 'bye']))
+        self.assertEqual(parse_frame(''), ('', None))
+
+    def test_build_request(self):
+        """Test request frame layout."""
+        self.assertEqual(build_request('md/subscribeQuote', 3, {'symbol': 'MNQ'}),
+                         'md/subscribeQuote\n3\n\n{"symbol":"MNQ"}')
+
+    def test_chart_bar_to_candle(self):
+        """Test chart bars convert with volume and delta."""
+        candle = chart_bar_to_candle(_bar(0, 101.0), 'MNQ')
+        self.assertEqual(candle['volume'], 40)
+        self.assertEqual(candle['delta'], 20)
+        self.assertEqual(candle['symbol'], 'MNQ')
+
+    def test_merge_closed_bar(self):
+        """Test buffer append, replace and trim."""
+        buffer = [chart_bar_to_candle(_bar(i, 100.0), 'MNQ') for i in range(3)]
+
+        self.assertTrue(merge_closed_bar(buffer, chart_bar_to_candle(_bar(3, 101.0), 'MNQ'), max_bars=3))
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer[-1]['close'], 101.0)
+        self.assertTrue(merge_closed_bar(buffer, chart_bar_to_candle(_bar(3, 102.0), 'MNQ')))
+        self.assertEqual(buffer[-1]['close'], 102.0)
+        self.assertFalse(merge_closed_bar(buffer, chart_bar_to_candle(_bar(1, 99.0), 'MNQ')))
+
+
+@unittest.skipUnless(WEBSOCKETS_AVAILABLE and AIOHTTP_AVAILABLE, "websockets/aiohttp not installed")
+class TestMarketDataStream(unittest.TestCase):
+    """Test cases for the stream against the mock feed."""
+
+    def _run(self, scenario):
+        """Run a scenario(feed, stream, closed, ticks) coroutine against a fresh feed."""
+        async def run():
+            feed = MockTradovateServer()
+            await feed.start()
+            md_token = feed.issue_tokens()['mdAccessToken']
+            stream = MarketDataStream(feed.md_url, lambda: md_token, contract_ids={'MNQ': 42})
+            stream.reconnect_min_delay = 0.05
+            closed, ticks = [], []
+            task = asyncio.create_task(stream.run())
+            try:
+                await scenario(feed, stream, closed, ticks)
+            finally:
+                await stream.stop()
+                await asyncio.wait_for(task, 3)
+                await feed.stop()
+            return stream, feed
+
+        return asyncio.run(run())
+
+    def test_bar_close_on_newer_bar(self):
+        """Test updates to the forming bar emit once, with final values, when the next bar starts."""
+        async def scenario(feed, stream, closed, ticks):
+            await stream.subscribe_bars('MNQ', '1Min', lambda s, c: closed.append(c))
+            await asyncio.wait_for(feed.subscribed.wait(), 3)
+
+            await feed.push_bar('MNQ', _bar(0, 100.5))
+            await feed.push_bar('MNQ', _bar(0, 101.5))
+            await feed.push_bar('MNQ', _bar(1, 101.0))
+            await _wait_until(lambda: closed)
+
+            self.assertEqual(len(closed), 1)
+            self.assertEqual(closed[0]['timestamp'], '2025-01-06T14:00:00Z')
+            self.assertEqual(closed[0]['close'], 101.5)
+
+        stream, _ = self._run(scenario)
+        self.assertEqual(stream.stats['bars_closed'], 1)
+
+    def test_many_symbols_one_connection(self):
+        """Test several symbols share one connection and async callbacks are awaited."""
+        async def scenario(feed, stream, closed, ticks):
+            async def on_bar(symbol, candle):
+                closed.append(symbol)
+
+            for symbol in ('MNQ', 'MES', 'MGC'):
+                await stream.subscribe_bars(symbol, '1Min', on_bar)
+            await _wait_until(lambda: len(feed.charts) == 3)
+
+            for symbol in ('MNQ', 'MES', 'MGC'):
+                await feed.push_bar(symbol, _bar(0, 100.0))
+                await feed.push_bar(symbol, _bar(1, 100.0))
+            await _wait_until(lambda: len(closed) == 3)
+
+            self.assertEqual(sorted(closed), ['MES', 'MGC', 'MNQ'])
+            self.assertEqual(len(feed.md_connections), 1)
+
+        self._run(scenario)
+
+    def test_ticks_routed_by_contract(self):
+        """Test trade prints reach the symbol's tick callback."""
+        async def scenario(feed, stream, closed, ticks):
+            await stream.subscribe_quotes('MNQ', lambda s, p, q, t: ticks.append((s, p, q)))
+            await _wait_until(lambda: 'MNQ' in feed.quotes)
+
+            await feed.push_quote(42, 21000.25, 3)
+            await feed.push_quote(99, 5000.0, 1)  # Unknown contract is ignored
+            await _wait_until(lambda: ticks)
+            await asyncio.sleep(0.05)
+
+            self.assertEqual(ticks, [('MNQ', 21000.25, 3)])
+
+        self._run(scenario)
+
+    def test_resubscribe_after_reconnect(self):
+        """Test subscriptions are replayed after the connection drops."""
+        async def scenario(feed, stream, closed, ticks):
+            await stream.subscribe_bars('MNQ', '1Min', lambda s, c: closed.append(c))
+            await stream.subscribe_quotes('MNQ', lambda s, p, q, t: ticks.append(p))
+            await asyncio.wait_for(feed.subscribed.wait(), 3)
+
+            await feed.drop_connections()
+            await asyncio.wait_for(feed.subscribed.wait(), 3)
+            await _wait_until(lambda: 'MNQ' in feed.quotes)
+
+            await feed.push_bar('MNQ', _bar(5, 100.0))
+            await feed.push_bar('MNQ', _bar(6, 100.0))
+            await _wait_until(lambda: closed)
+
+            self.assertEqual(closed[0]['timestamp'], '2025-01-06T14:05:00Z')
+            self.assertEqual(feed.md_requests.count('authorize'), 2)
+
+        stream, _ = self._run(scenario)
+        self.assertEqual(stream.stats['reconnects'], 1)
+
+    def test_live_ticks_build_pipeline_bars(self):
+        """Test ticks registered before connecting resolve their contract and close pipeline bars."""
+        async def run():
+            feed = MockTradovateServer()
+            await feed.start()
+            api = TradovateAPI()
+            point_at(api, feed.base_url, feed.md_url)
+            pipeline = BarPipeline(None, interval="1Min")
+            try:
+                await asyncio.to_thread(api.authenticate, use_cache=False)
+                self.assertTrue(api.subscribe_live_ticks('MNQ', pipeline.push_tick))
+                stream = api.market_data_stream
+                task = asyncio.create_task(stream.run())
+                await _wait_until(lambda: 'MNQ' in feed.quotes)
+
+                contract_id = stream.contract_ids['MNQ']
+                await feed.push_quote(contract_id, 21000.25, 3, '2025-01-06T14:00:10Z')
+                await feed.push_quote(contract_id, 21001.0, 2, '2025-01-06T14:00:40Z')
+                await feed.push_quote(contract_id, 21002.0, 1, '2025-01-06T14:01:05Z')
+                await _wait_until(lambda: pipeline.stats['bars_pushed'])
+                await stream.stop()
+                await asyncio.wait_for(task, 3)
+            finally:
+                await feed.stop()
+            return pipeline.queues['MNQ'].get_nowait()['candle']
+
+        bar = asyncio.run(run())
+
+        self.assertEqual((bar['open'], bar['close'], bar['volume']), (21000.25, 21001.0, 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+"""
+Test suite for the Prometheus metrics endpoint.
+Tests text exposition of counters, gauges and latency histograms, the
+local HTTP endpoint, event loop lag sampling, and the live system's
+detection and rejection counters.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+from aafr.detection_executor import DetectionExecutor, INLINE
+from aafr.latency import LatencyHistogram
+from aafr.main import AAFRTradingSystem
+from aafr.metrics import MetricsRegistry, MetricsServer, current_rss_bytes, COUNTER, GAUGE, HISTOGRAM
+
+
+async def _get(server, path):
+    """Send a GET request and return (status line, body)."""
+    reader, writer = await asyncio.open_connection(server.host, server.port)
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.decode().partition("\r\n\r\n")
+    return head.splitlines()[0], body
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for MetricsRegistry rendering."""
+
+    def test_counters_and_gauges(self):
+        """Test direct and callback samples render with HELP/TYPE lines and labels."""
+        registry = MetricsRegistry()
+        stats = {'bars': 7}
+        registry.register("bars_total", COUNTER, "Bars", lambda: stats['bars'])
+        registry.register("backlog", GAUGE, "Backlog", lambda: {'NQ': 2, 'ES': 0}, label="symbol")
+        registry.inc("rejections_total", reason="risk")
+        registry.inc("rejections_total", 2, reason="risk")
+        registry.set("temperature", 1.5, name='quote"d')
+
+        text = registry.render()
+        self.assertIn("# TYPE aafr_bars_total counter\naafr_bars_total 7\n", text)
+        self.assertIn('aafr_backlog{symbol="NQ"} 2', text)
+        self.assertIn('aafr_rejections_total{reason="risk"} 3', text)
+        self.assertIn('aafr_temperature{name="quote\\"d"} 1.5', text)
+        self.assertEqual(registry.value("rejections_total", reason="risk"), 3)
+
+    def test_histogram_buckets_are_cumulative_seconds(self):
+        """Test LatencyHistogram export uses cumulative buckets in seconds."""
+        histogram = LatencyHistogram("stage", buckets_ms=[1, 10])
+        for value in (0.5, 5, 5, 50):
+            histogram.record(value)
+        registry = MetricsRegistry()
+        registry.register("stage_latency_seconds", HISTOGRAM, "Latency",
+                          lambda: {'detection': histogram}, label="stage")
+
+        text = registry.render()
+        self.assertIn('aafr_stage_latency_seconds_bucket{stage="detection",le="0.001"} 1', text)
+        self.assertIn('aafr_stage_latency_seconds_bucket{stage="detection",le="0.01"} 3', text)
+        self.assertIn('aafr_stage_latency_seconds_bucket{stage="detection",le="+Inf"} 4', text)
+        self.assertIn('aafr_stage_latency_seconds_sum{stage="detection"} 0.0605', text)
+        self.assertIn('aafr_stage_latency_seconds_count{stage="detection"} 4', text)
+
+    def test_rss(self):
+        """Test RSS is reported."""
+        self.assertGreater(current_rss_bytes(), 0)
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test cases for the HTTP endpoint."""
+
+    def test_scrape(self):
+        """Test /metrics serves the registry and samples loop lag."""
+        async def run():
+            server = MetricsServer(enabled=True, port=0, lag_interval=0.01)
+            server.registry.inc("signals_total", symbol="NQ")
+            await server.start()
+            try:
+                await asyncio.sleep(0.05)
+                time.sleep(0.05)  # Block the loop to produce lag
+                await asyncio.sleep(0.02)
+                return server, await _get(server, "/metrics"), await _get(server, "/other")
+            finally:
+                await server.stop()
+
+        server, (status, body), (missing, _) = asyncio.run(run())
+        self.assertEqual(status, "HTTP/1.1 200 OK")
+        self.assertIn('aafr_signals_total{symbol="NQ"} 1', body)
+        self.assertIn("aafr_process_resident_memory_bytes", body)
+        self.assertIn("aafr_event_loop_lag_seconds_count", body)
+        self.assertEqual(missing, "HTTP/1.1 404 Not Found")
+        self.assertGreaterEqual(server.stats['max_loop_lag_ms'], 30.0)
+        self.assertEqual(server.stats['scrapes'], 1)
+
+    def test_failing_source_keeps_connection(self):
+        """Test a raising source is skipped and a failed render answers 500."""
+        async def run():
+            server = MetricsServer(enabled=True, port=0)
+            server.registry.register("broken", GAUGE, "Source that raises", lambda: 1 / 0)
+            server.registry.inc("signals_total", symbol="NQ")
+            await server.start()
+            try:
+                scraped = await _get(server, "/metrics")
+                with patch.object(server.registry, 'render', side_effect=ValueError("bad sample")):
+                    failed = await _get(server, "/metrics")
+                return scraped, failed
+            finally:
+                await server.stop()
+
+        (status, body), (failed, _) = asyncio.run(run())
+        self.assertEqual(status, "HTTP/1.1 200 OK")
+        self.assertNotIn("aafr_broken", body)
+        self.assertIn('aafr_signals_total{symbol="NQ"} 1', body)
+        self.assertEqual(failed, "HTTP/1.1 500 Internal Server Error")
+
+    def test_disabled(self):
+        """Test a disabled endpoint does not listen."""
+        server = MetricsServer(enabled=False, port=0)
+        asyncio.run(server.start())
+        self.assertIsNone(server._server)
+
+    def test_live_system_counts_rejections(self):
+        """Test the live system counts detections and rejection reasons."""
+        system = AAFRTradingSystem()
+        system.detection_executor = DetectionExecutor(INLINE)
+        system.metrics.enabled = True  # Counters are skipped while the endpoint is off
+        structure = {
+            'indication': {'idx': 0, 'direction': 'LONG', 'candle': {'timestamp': "2025-01-06T14:00:00"}},
+            'correction': {'start_idx': 1, 'end_idx': 2},
+            'complete': True
+        }
+        candles = [{'timestamp': "2025-01-06T14:00:00", 'close': 100.0}] * 3
+
+        async def run():
+            with patch('aafr.main.evaluate_icc_setup', return_value=(structure, False, ["ATR too low"])):
+                await system._detect_on_bar('NQ', candles, None)
+
+        asyncio.run(run())
+        registry = system.metrics.registry
+        self.assertEqual(registry.value("detections_total", symbol="NQ"), 1)
+        self.assertEqual(registry.value("rejections_total", reason="invalid_setup"), 1)
+        text = registry.render()
+        self.assertIn("aafr_bars_processed_total 0", text)
+        self.assertIn("# TYPE aafr_stage_latency_seconds histogram", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
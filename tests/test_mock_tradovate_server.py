@@ -0,0 +1,153 @@
+"""
+Test suite for the local mock Tradovate server.
+Tests the sync and async clients against it end to end: 401 recovery,
+order round trips, error injection, high request rates and market data
+authorization.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from aafr.async_tradovate_api import AsyncTradovateAPI, AIOHTTP_AVAILABLE
+from aafr.tradovate_api import TradovateAPI
+from aafr.market_data_stream import MarketDataStream, WEBSOCKETS_AVAILABLE
+from aafr.order_manager import OrderManager, FILLED, WORKING
+
+if AIOHTTP_AVAILABLE:
+    from aafr.mock_tradovate_server import MockTradovateServer, point_at
+
+
+def _serve(server, scenario):
+    """Run scenario(server) while the mock server is up."""
+    async def run():
+        async with server:
+            return await scenario(server)
+    return asyncio.run(run())
+
+
+@unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp not installed")
+class TestMockTradovateServer(unittest.TestCase):
+    """Test cases for MockTradovateServer."""
+
+    def test_sync_client_recovers_from_revoked_token(self):
+        """Test a server-side token revocation is recovered without mock data."""
+        async def scenario(server):
+            api = TradovateAPI()
+            point_at(api, server.base_url)
+            self.assertTrue(await asyncio.to_thread(api.authenticate))
+            server.revoke_tokens()
+            accounts = await asyncio.to_thread(api.get_account_list)
+            return api, accounts
+
+        server = MockTradovateServer()
+        api, accounts = _serve(server, scenario)
+
+        self.assertEqual(accounts[0]['name'], 'DEMO0001')
+        self.assertFalse(api.is_using_mock_data())
+        # Renewal with the revoked token failed, so credentials were sent again
+        self.assertEqual((server.auth_calls, server.unauthorized), (2, 2))
+        self.assertEqual(api.token_manager.stats['unauthorized_recoveries'], 1)
+
+    def test_async_client_recovers_from_401(self):
+        """Test the standalone async client re-authenticates on 401."""
+        async def scenario(server):
+            api = AsyncTradovateAPI()
+            point_at(api, server.base_url)
+            async with api:
+                await api.authenticate()
+                server.revoke_tokens()
+                return api, await api.find_contract('MNQZ5')
+
+        server = MockTradovateServer()
+        api, contract_id = _serve(server, scenario)
+
+        self.assertEqual(contract_id, 1000)
+        self.assertFalse(api.is_using_mock_data())
+        self.assertEqual(server.auth_calls, 2)
+
+    def test_order_round_trip(self):
+        """Test a bracket placed through the async client is acked by the server."""
+        async def scenario(server):
+            api = AsyncTradovateAPI()
+            point_at(api, server.base_url)
+            async with api:
+                manager = OrderManager(api)
+                await manager.prepare(['MNQZ5'])
+                orders = await manager.submit_bracket({
+                    'symbol': 'MNQZ5', 'direction': 'SHORT', 'position_size': 2,
+                    'stop_loss': 21010.0, 'take_profit': 20980.0
+                })
+                return orders, await api._make_request('GET', '/order/list')
+
+        server = MockTradovateServer(latency=0.01)
+        orders, listed = _serve(server, scenario)
+
+        self.assertEqual([o.state for o in orders], [WORKING, WORKING, WORKING])
+        self.assertEqual(len(listed), 3)
+        statuses = {o['orderType']: o['ordStatus'] for o in listed}
+        self.assertEqual(statuses, {'Market': 'Filled', 'Stop': 'Working', 'Limit': 'Working'})
+        self.assertEqual(listed[0]['accountSpec'], 'DEMO0001')
+        self.assertNotEqual(orders[0].state, FILLED)  # Fills arrive via order updates, not the ack
+
+    def test_error_injection_retried(self):
+        """Test random 5xx responses are absorbed by client retries."""
+        async def scenario(server):
+            api = AsyncTradovateAPI(max_retries=6)
+            point_at(api, server.base_url)
+            async with api:
+                await api.authenticate()
+                return await asyncio.gather(*(api.get_account_list() for _ in range(40)))
+
+        server = MockTradovateServer(error_rate=0.3, seed=7)
+        results = _serve(server, scenario)
+
+        self.assertTrue(all(r[0]['name'] == 'DEMO0001' for r in results))
+        self.assertGreater(server.calls, 40)
+
+    def test_high_request_rate(self):
+        """Test hundreds of concurrent requests are served."""
+        async def scenario(server):
+            api = AsyncTradovateAPI(max_connections=50, max_concurrency=50)
+            api.rate_limiter = None
+            point_at(api, server.base_url)
+            async with api:
+                await api.authenticate()
+                return await asyncio.gather(*(api.find_contract('MESZ5') for _ in range(500)))
+
+        server = MockTradovateServer(latency=0.005)
+        results = _serve(server, scenario)
+
+        self.assertEqual(set(results), {1000})
+        self.assertEqual(server.endpoint_calls['/v1/contract/find'], 500)
+        self.assertEqual(server.max_in_flight, 50)
+
+    @unittest.skipUnless(WEBSOCKETS_AVAILABLE, "websockets not installed")
+    def test_market_data_requires_valid_token(self):
+        """Test the WebSocket accepts issued md tokens only."""
+        async def scenario(server):
+            api = TradovateAPI()
+            point_at(api, server.base_url, server.md_url)
+            await asyncio.to_thread(api.authenticate)
+            stream = MarketDataStream.from_api(api)
+            stream.contract_ids['MNQZ5'] = 42
+            task = asyncio.create_task(stream.run())
+            try:
+                await stream.subscribe_bars('MNQZ5', '1Min', lambda s, c: None)
+                await asyncio.wait_for(server.subscribed.wait(), 3)
+            finally:
+                await stream.stop()
+                await asyncio.wait_for(task, 3)
+            return stream
+
+        server = MockTradovateServer()
+        _serve(server, scenario)
+
+        self.assertEqual(server.md_requests[:2], ['authorize', 'md/getChart'])
+        self.assertEqual(list(server.charts.values()), ['MNQZ5'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+"""
+Test suite for the order management pipeline.
+Tests bracket construction, entry-first submission with OCO exit pairs,
+the order state machine and latency histograms against the in-process
+mock exchange.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from aafr.latency import LatencyHistogram, now_ms
+from aafr.mock_exchange import MockExchange
+from aafr.order_manager import (
+    OrderManager, ManagedOrder, WORKING, FILLED, PARTIAL, REJECTED, TIMED_OUT,
+    CANCELLED, ROLE_ENTRY, ROLE_STOP, ROLE_TP
+)
+
+PAIR = [ROLE_TP, ROLE_STOP]
+
+SIGNAL = {
+    'symbol': 'MNQ', 'direction': 'LONG', 'position_size': 3,
+    'entry': 21000.0, 'stop_loss': 20990.0, 'take_profit': 21030.0
+}
+LADDER = [{'price': 21010.0, 'qty': 1}, {'price': 21020.0, 'qty': 1}, {'price': 21030.0, 'qty': 1}]
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for LatencyHistogram."""
+
+    def test_percentiles(self):
+        """Test percentile estimates follow the bucket bounds."""
+        histogram = LatencyHistogram("test")
+        for _ in range(90):
+            histogram.record(0.8)
+        for _ in range(10):
+            histogram.record(40.0)
+
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(50), 1)  # Upper bound of the 0.5-1ms bucket
+        self.assertEqual(histogram.percentile(99), 40.0)
+        self.assertAlmostEqual(histogram.mean_ms, 4.72)
+        self.assertIn('p99=40.00ms', histogram.format())
+
+    def test_empty_and_merge(self):
+        """Test empty summaries and merging."""
+        first, second = LatencyHistogram(), LatencyHistogram()
+        self.assertEqual(first.summary()['p50_ms'], 0.0)
+
+        first.record(2.0)
+        second.record(8.0)
+        first.merge(second)
+
+        self.assertEqual(first.count, 2)
+        self.assertEqual((first.min_ms, first.max_ms), (2.0, 8.0))
+        with self.assertRaises(ValueError):
+            first.merge(LatencyHistogram(buckets_ms=[1, 2]))
+
+
+class TestOrderStateMachine(unittest.TestCase):
+    """Test cases for ManagedOrder transitions."""
+
+    def test_valid_and_stale_transitions(self):
+        """Test allowed transitions apply and stale ones are ignored."""
+        order = ManagedOrder('MNQ-1', ROLE_ENTRY, {'orderQty': 2})
+
+        self.assertFalse(order.transition(FILLED))  # Not yet submitted
+        self.assertTrue(order.transition('SUBMITTED'))
+        self.assertTrue(order.transition(WORKING))
+        self.assertTrue(order.transition(PARTIAL))
+        self.assertTrue(order.transition(FILLED))
+        self.assertFalse(order.transition(CANCELLED))
+        self.assertTrue(order.is_terminal)
+        self.assertEqual(order.history, ['PENDING', 'SUBMITTED', WORKING, PARTIAL, FILLED])
+
+
+class TestOrderManager(unittest.TestCase):
+    """Test cases for OrderManager."""
+
+    def _run(self, exchange, scenario):
+        """Prepare a manager on the exchange and run scenario(manager)."""
+        async def run():
+            manager = OrderManager(exchange, order_timeout=0.5)
+            exchange.subscribe(manager.on_order_update)
+            await manager.prepare(['MNQ'])
+            result = await scenario(manager)
+            await asyncio.sleep(0.01)  # Let fills scheduled by the exchange land
+            return manager, result
+
+        return asyncio.run(run())
+
+    def test_build_bracket(self):
+        """Test the entry and a TP/stop pair per level come from the symbol template."""
+        async def scenario(manager):
+            return manager.build_bracket(SIGNAL, LADDER)
+
+        manager, orders = self._run(MockExchange(), scenario)
+
+        self.assertEqual([o.role for o in orders], [ROLE_ENTRY] + PAIR * 3)
+        entry, stop = orders[0].request, orders[2].request
+        self.assertEqual((entry['action'], entry['orderType'], entry['orderQty']), ('Buy', 'Market', 3))
+        self.assertEqual((stop['action'], stop['orderType'], stop['stopPrice']), ('Sell', 'Stop', 20990.0))
+        self.assertEqual([o.quantity for o in orders[1:]], [1] * 6)
+        self.assertEqual(orders[5].request['price'], 21030.0)
+        self.assertIs(orders[1].oco, orders[2])
+        self.assertIs(orders[6].parent, orders[0])
+        self.assertEqual((entry['accountId'], entry['accountSpec']), (1, 'DEMO0001'))
+        self.assertTrue(entry['isAutomated'])
+
+    def test_exits_sent_after_entry_ack(self):
+        """Test the exit pairs are sent together once the entry is acked."""
+        exchange = MockExchange(ack_latency=0.1)
+
+        async def scenario(manager):
+            start = time.monotonic()
+            orders = await manager.submit_bracket(SIGNAL, LADDER)
+            return orders, time.monotonic() - start
+
+        manager, (orders, elapsed) = self._run(exchange, scenario)
+
+        # Entry ack, then three OCO pairs in flight at once
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(manager.stats['acked'], 7)
+        self.assertEqual(orders[0].state, FILLED)  # Market entry filled by the exchange
+        self.assertEqual({o.state for o in orders[1:]}, {WORKING})
+        self.assertGreaterEqual(min(o.submitted_at_ms for o in orders[1:]), orders[0].acked_at_ms)
+        self.assertEqual(manager.ack_latency.count, 7)
+        self.assertGreaterEqual(manager.ack_latency.min_ms, 95)
+
+    def test_fill_updates(self):
+        """Test fills move orders through the state machine and cancel the paired stop."""
+        exchange = MockExchange()
+
+        async def scenario(manager):
+            orders = await manager.submit_bracket(SIGNAL, LADDER)
+            await asyncio.sleep(0)
+            tp1 = orders[1]
+            exchange.fill(tp1.order_id, 0)
+            self.assertEqual(tp1.state, PARTIAL)
+            exchange.fill(tp1.order_id)
+            exchange.fill(orders[3].order_id)
+            return orders
+
+        manager, orders = self._run(exchange, scenario)
+
+        self.assertEqual([o.state for o in orders[1:5]], [FILLED, CANCELLED, FILLED, CANCELLED])
+        self.assertEqual(manager.open_orders(), orders[5:])  # Last TP and its stop still working
+
+    def test_rejection(self):
+        """Test a rejected entry records the reason and no exit order is sent."""
+        exchange = MockExchange()
+        exchange.rejected_symbols.add('MNQ')
+
+        manager, orders = self._run(exchange, lambda m: m.submit_bracket(SIGNAL, LADDER))
+
+        self.assertEqual(orders[0].state, REJECTED)
+        self.assertEqual(orders[0].reject_reason, 'Rejected by mock exchange')
+        self.assertEqual({o.state for o in orders[1:]}, {CANCELLED})
+        self.assertEqual(manager.stats['rejected'], 1)
+        self.assertEqual(manager.stats['submitted'], 1)
+        self.assertEqual(manager.open_orders(), [])
+        self.assertEqual(exchange.working_orders(), [])
+
+    def test_entry_rejected_after_ack_cancels_exits(self):
+        """Test exits already at the exchange are cancelled when the entry is rejected later."""
+        exchange = MockExchange(fill_latency=0.05)
+
+        async def scenario(manager):
+            orders = await manager.submit_bracket(SIGNAL, LADDER)
+            self.assertEqual(len(exchange.working_orders()), 7)
+            exchange.reject(orders[0].order_id)
+            await asyncio.sleep(0.1)
+            return orders
+
+        manager, orders = self._run(exchange, scenario)
+
+        self.assertEqual(orders[0].state, REJECTED)
+        self.assertEqual({o.state for o in orders[1:]}, {CANCELLED})
+        self.assertEqual(manager.stats['exits_cancelled'], 6)
+        self.assertEqual(manager.open_orders(), [])
+        self.assertEqual(exchange.working_orders(), [])
+
+    def test_ack_timeout(self):
+        """Test orders without an ack in time are marked TIMED_OUT."""
+        exchange = MockExchange(ack_latency=1.0)
+
+        manager, orders = self._run(exchange, lambda m: m.submit_bracket(SIGNAL))
+
+        self.assertEqual(orders[0].state, TIMED_OUT)
+        self.assertEqual([o.state for o in orders[1:]], [CANCELLED, CANCELLED])  # Exits never sent
+        self.assertEqual(manager.stats['timed_out'], 1)
+
+    def test_signal_to_order_latency(self):
+        """Test signal->order latency stays in the low milliseconds."""
+        exchange = MockExchange()
+
+        async def scenario(manager):
+            for _ in range(50):
+                await manager.submit_bracket(SIGNAL, LADDER, signal_time_ms=now_ms())
+
+        manager, _ = self._run(exchange, scenario)
+
+        self.assertEqual(manager.signal_latency.count, 50)
+        self.assertLess(manager.signal_latency.percentile(99), 5.0)
+        self.assertEqual(manager.stats['brackets'], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
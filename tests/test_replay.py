@@ -0,0 +1,162 @@
+"""
+Test suite for accelerated market replay.
+Tests speed parsing, replay file loading, the simulated clock, paced and
+maximum-speed replays through a BarPipeline, and a replay through the
+live system with orders disabled.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from aafr.bar_pipeline import BarPipeline
+from aafr.detection_executor import DetectionExecutor, INLINE
+from aafr.main import AAFRTradingSystem
+from aafr.replay import MarketReplay, ReplayClock, load_replay_file, parse_speed, BARS, TICKS
+
+START = 1736172000  # 2025-01-06 14:00 UTC
+
+
+def _bars(count, start=START, spacing=300):
+    """Create flat test bars with epoch timestamps."""
+    return [{'timestamp': start + i * spacing, 'open': 100.0, 'high': 101.0,
+             'low': 99.0, 'close': 100.0 + i, 'volume': 10} for i in range(count)]
+
+
+async def _replay(records, speed, warmup_bars=2, on_new_day=None):
+    """Replay bars for NQ and return (replay, clock times seen by detection, closes)."""
+    seen = []
+
+    async def detect(symbol, candles, event):
+        seen.append((clock.time(), candles[-1]['close']))
+        return False
+
+    pipeline = BarPipeline(detect)
+    clock = ReplayClock(speed)
+    replay = MarketReplay(pipeline, clock, warmup_bars, on_new_day)
+    remaining = replay.seed({'NQ': (BARS, records)})
+    consumer = asyncio.create_task(pipeline.run_symbol('NQ'))
+    try:
+        await replay.run({'NQ': (BARS, remaining['NQ'])})
+    finally:
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+    return replay, seen
+
+
+class TestReplayInput(unittest.TestCase):
+    """Test cases for speed parsing and replay files."""
+
+    def test_parse_speed(self):
+        """Test multipliers, the x suffix and max speed."""
+        self.assertEqual(parse_speed("1"), 1.0)
+        self.assertEqual(parse_speed("10x"), 10.0)
+        self.assertIsNone(parse_speed("MAX"))
+        with self.assertRaises(ValueError):
+            parse_speed("0")
+
+    def test_load_files(self):
+        """Test CSV ticks and ISO-timestamped JSON bars are detected and sorted."""
+        with tempfile.TemporaryDirectory() as tmp:
+            ticks_path = os.path.join(tmp, "ticks.csv")
+            with open(ticks_path, "w") as f:
+                f.write("timestamp,price,size\n1736172005,100.5,2\n1736172001,100.25,1\n")
+            bars_path = os.path.join(tmp, "bars.json")
+            with open(bars_path, "w") as f:
+                json.dump([{'timestamp': "2025-01-06T14:05:00", 'open': 1, 'high': 2, 'low': 0.5,
+                            'close': 1.5, 'volume': 3, 'symbol': 'ES'},
+                           {'timestamp': "2025-01-06T14:00:00", 'open': 1, 'high': 2, 'low': 0.5,
+                            'close': 1.0, 'volume': 3}], f)
+
+            kind, ticks = load_replay_file(ticks_path, 'NQ')
+            self.assertEqual(kind, TICKS)
+            self.assertEqual([t['price'] for t in ticks], [100.25, 100.5])
+            self.assertEqual(ticks[0]['symbol'], 'NQ')
+
+            kind, bars = load_replay_file(bars_path, 'NQ')
+            self.assertEqual(kind, BARS)
+            self.assertEqual([b['close'] for b in bars], [1.0, 1.5])
+            self.assertEqual(bars[1]['symbol'], 'ES')
+
+            with self.assertRaises(FileNotFoundError):
+                load_replay_file(os.path.join(tmp, "missing.csv"), 'NQ')
+
+    def test_clock(self):
+        """Test the clock jumps to events and advances at the replay speed."""
+        clock = ReplayClock(speed=None)
+        clock.set(START)
+        self.assertEqual(clock.time(), START)
+        self.assertEqual(clock.now(), datetime.fromtimestamp(START))
+
+        fast = ReplayClock(speed=1000.0, start=START)
+        time.sleep(0.01)
+        self.assertGreaterEqual(fast.time(), START + 10)
+
+
+class TestMarketReplay(unittest.TestCase):
+    """Test cases for MarketReplay."""
+
+    def test_max_speed_shows_bar_close_time(self):
+        """Test each bar is evaluated in order with the clock at its close."""
+        replay, seen = asyncio.run(_replay(_bars(10), speed=None))
+        self.assertEqual(replay.stats['bars_seeded'], 2)
+        self.assertEqual(replay.stats['records'], 8)
+        self.assertEqual([close for _, close in seen], [100.0 + i for i in range(2, 10)])
+        self.assertEqual([t for t, _ in seen], [START + (i + 1) * 300 for i in range(2, 10)])
+        self.assertIn("8 records replayed", replay.format_stats())
+
+    def test_paced_speed(self):
+        """Test a finite speed paces the replay by simulated time."""
+        # 5 streamed bars one minute apart at 3000x: 4 gaps of 20ms
+        replay, seen = asyncio.run(_replay(_bars(7, spacing=60), speed=3000.0))
+        self.assertEqual(len(seen), 5)
+        self.assertGreaterEqual(replay.stats['wall_seconds'], 0.07)
+        self.assertAlmostEqual(replay.stats['simulated_seconds'], 240, delta=60)
+
+    def test_new_day_callback(self):
+        """Test the callback runs once per replayed date change."""
+        days = []
+        asyncio.run(_replay(_bars(6, spacing=12 * 3600), speed=None, warmup_bars=0,
+                            on_new_day=days.append))
+        self.assertEqual(len(days), len({d.date() for d in days}))
+        self.assertGreaterEqual(len(days), 2)
+
+
+class TestLiveSystemReplay(unittest.TestCase):
+    """Test cases for replaying through the live system."""
+
+    def test_run_replay(self):
+        """Test replays use the simulated clock and never trade or alert."""
+        system = AAFRTradingSystem()
+        system.detection_executor = DetectionExecutor(INLINE)
+        system.ws_server = None
+        system.journal.enabled = False
+        system.auto_trade = True
+        seen = []
+
+        async def detect(symbol, candles, event):
+            seen.append(system.clock())
+            return False
+
+        system._detect_on_bar = detect
+        system.pipeline = BarPipeline(detect)
+        system.stop = lambda: None
+        system.risk_engine.reset_daily_tracking = MagicMock()
+
+        stats = asyncio.run(system.run_replay({'NQ': (BARS, _bars(8))}, speed=None, warmup_bars=3))
+        self.assertEqual(stats['records'], 5)
+        self.assertEqual(seen[-1], datetime.fromtimestamp(START + 8 * 300))
+        self.assertEqual(system.risk_engine.clock(), seen[-1])
+        self.assertFalse(system.auto_trade)
+        self.assertFalse(system.alerts.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
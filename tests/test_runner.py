@@ -28,7 +28,30 @@ def run_all_tests():
         'tests.test_integration',
         'tests.test_edge_cases',
         'tests.test_multi_instrument',
-        'tests.test_backtest_metrics'
+        'tests.test_backtest_metrics',
+        'tests.test_bar_resampler',
+        'tests.test_async_tradovate_api',
+        'tests.test_candle_cache',
+        'tests.test_bulk_downloader',
+        'tests.test_market_data_stream',
+        'tests.test_token_manager',
+        'tests.test_order_manager',
+        'tests.test_mock_tradovate_server',
+        'tests.test_account_fanout',
+        'tests.test_bar_pipeline',
+        'tests.test_candle_buffer',
+        'tests.test_detection_executor',
+        'tests.test_telegram_bot',
+        'tests.test_signal_dedup',
+        'tests.test_stage_latency',
+        'tests.test_metrics',
+        'tests.test_replay',
+        'tests.test_journal',
+        'tests.test_shard_supervisor',
+        'tests.test_startup',
+        'tests.test_state_snapshot',
+        'tests.test_websocket_server',
+        'tests.test_wire_format'
     ]
     
     for module_name in test_modules:
@@ -0,0 +1,177 @@
+"""
+Test suite for multi-process symbol sharding.
+Tests symbol partitioning, the authenticated worker channel, latency
+trace hand-over, worker restarts, and signal forwarding in the live system.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.detection_executor import DetectionExecutor, INLINE
+from aafr.latency import now_ms, STAGE_DETECTION
+from aafr.main import AAFRTradingSystem
+from aafr.shard_supervisor import (
+    ShardSupervisor, ShardWorker, partition_symbols, write_frame, FRAME_HEADER, STATS
+)
+
+
+def _system():
+    """Create a supervisor-side system with signal processing mocked."""
+    system = AAFRTradingSystem()
+    system.process_remote_signal = AsyncMock(return_value=True)
+    return system
+
+
+async def _connect(supervisor, token, shard_id=0):
+    """Open a worker connection to a started supervisor."""
+    worker = ShardWorker("aafr", "config.json", shard_id, ["MNQ"], supervisor.host, supervisor.port, token)
+    reader, worker._writer = await asyncio.open_connection(supervisor.host, supervisor.port)
+    worker._writer.write(token.encode('ascii') + FRAME_HEADER.pack(shard_id))
+    await worker._writer.drain()
+    return worker, reader
+
+
+async def _until(condition, timeout=2.0):
+    """Wait for a condition to hold."""
+    deadline = now_ms() + timeout * 1000.0
+    while not condition() and now_ms() < deadline:
+        await asyncio.sleep(0.01)
+
+
+class TestPartition(unittest.TestCase):
+    """Test cases for partition_symbols."""
+
+    def test_round_robin(self):
+        """Test symbols are spread evenly and no shard is empty."""
+        symbols = ["MNQ", "MES", "MGC", "MCL", "MYM"]
+        self.assertEqual(partition_symbols(symbols, 2), [["MNQ", "MGC", "MYM"], ["MES", "MCL"]])
+        self.assertEqual(len(partition_symbols(symbols, 8)), 5)
+        self.assertEqual(partition_symbols(symbols, 0), [symbols])
+
+
+class TestSupervisorChannel(unittest.TestCase):
+    """Test cases for the supervisor side of the worker channel."""
+
+    def test_signal_and_stats(self):
+        """Test forwarded signals reach the system with the worker's stage timings."""
+        system = _system()
+        supervisor = ShardSupervisor(system, shards=2)
+
+        async def run():
+            await supervisor.start()
+            try:
+                worker, _ = await _connect(supervisor, supervisor.token, shard_id=1)
+                trace = system.latency.start(now_ms() - 30.0)
+                trace['stages'][STAGE_DETECTION] = 25.0
+                await worker.send_signal({'symbol': "MNQ"}, trace)
+                write_frame(worker._writer, {'type': STATS, 'shard': 1, 'backlog': 3,
+                                             'pipeline': {'bars_processed': 7}})
+                await worker._writer.drain()
+                await _until(lambda: 1 in supervisor.shard_stats)
+                connected = dict(supervisor.connections)
+                worker._writer.close()
+                return connected
+            finally:
+                await supervisor.stop()
+
+        connected = asyncio.run(run())
+        self.assertIn(1, connected)
+        payload, trace = system.process_remote_signal.await_args.args
+        self.assertEqual(payload, {'symbol': "MNQ"})
+        self.assertEqual(trace['stages'], {STAGE_DETECTION: 25.0})
+        self.assertGreaterEqual(now_ms() - trace['origin_ms'], 30.0)
+        self.assertEqual(supervisor.stats['signals'], 1)
+        text = system.metrics.registry.render()
+        self.assertIn('aafr_shard_bars_processed_total{shard="1"} 7', text)
+        self.assertIn('aafr_shard_bar_backlog{shard="1"} 3', text)
+
+    def test_rejects_unknown_peer(self):
+        """Test a connection without the token is dropped before anything is unpickled."""
+        system = _system()
+        supervisor = ShardSupervisor(system, shards=1)
+
+        async def run():
+            await supervisor.start()
+            try:
+                worker, reader = await _connect(supervisor, "0" * 32)
+                await worker.send_signal({'symbol': "MNQ"}, None)
+                return await reader.read()  # Supervisor closes the connection
+            finally:
+                await supervisor.stop()
+
+        self.assertEqual(asyncio.run(run()), b"")
+        self.assertEqual(supervisor.stats['rejected_connections'], 1)
+        system.process_remote_signal.assert_not_awaited()
+
+    def test_restarts_exited_workers(self):
+        """Test exited workers are restarted up to the limit."""
+        supervisor = ShardSupervisor(_system(), shards=1, max_restarts=1, restart_delay=0)
+        dead = MagicMock(exitcode=1)
+        dead.is_alive.return_value = False
+        supervisor.processes = {0: dead}
+
+        def respawn(shard_id):
+            supervisor.processes[shard_id] = dead
+
+        async def run():
+            with patch.object(supervisor, 'spawn', side_effect=respawn) as spawn, \
+                    patch('aafr.shard_supervisor.asyncio.sleep', new=AsyncMock()):
+                await supervisor._watch()
+            return spawn
+
+        spawn = asyncio.run(run())
+        spawn.assert_called_once_with(0)
+        self.assertEqual(supervisor.stats['restarts'], 1)
+        self.assertEqual(supervisor.processes, {})
+
+
+class TestLiveSystemSharding(unittest.TestCase):
+    """Test cases for the live system's shard hooks."""
+
+    structure = {
+        'indication': {'idx': 0, 'direction': 'LONG', 'candle': {'timestamp': "2025-01-06T14:00:00"}},
+        'correction': {'start_idx': 1, 'end_idx': 2},
+        'complete': True
+    }
+
+    def test_worker_forwards_validated_setups(self):
+        """Test a shard worker sends validated setups instead of processing them."""
+        system = AAFRTradingSystem()
+        system.detection_executor = DetectionExecutor(INLINE)
+        system.signal_sink = AsyncMock(return_value=True)
+        system._process_trade_signal = AsyncMock()
+        candles = [{'timestamp': f"2025-01-06T14:0{i}:00", 'close': 100.0} for i in range(3)]
+
+        async def run():
+            with patch('aafr.main.evaluate_icc_setup', return_value=(self.structure, True, [])):
+                return await system._detect_on_bar('NQ', candles, None)
+
+        self.assertTrue(asyncio.run(run()))
+        payload = system.signal_sink.await_args.args[0]
+        self.assertEqual(payload['symbol'], 'NQ')
+        self.assertEqual(payload['candles'], candles)
+        system._process_trade_signal.assert_not_awaited()
+
+    def test_supervisor_processes_remote_setups(self):
+        """Test remote setups are processed against a rebuilt candle buffer."""
+        system = AAFRTradingSystem()
+        system._process_trade_signal = AsyncMock(return_value=True)
+        candles = [{'timestamp': 1736172000 + i * 300, 'open': 100.0, 'high': 102.0,
+                    'low': 99.0, 'close': 101.0, 'volume': 10} for i in range(20)]
+
+        self.assertTrue(asyncio.run(system.process_remote_signal(
+            {'symbol': 'NQ', 'structure': self.structure, 'candles': candles})))
+        symbol, structure, buffer, trace = system._process_trade_signal.await_args.args
+        self.assertIsInstance(buffer, CandleRingBuffer)
+        self.assertEqual(len(buffer), 20)
+        self.assertGreater(buffer.atr, 0)
+        self.assertIsNone(trace)
+
+
+if __name__ == '__main__':
+    unittest.main()
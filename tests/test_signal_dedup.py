@@ -0,0 +1,112 @@
+"""
+Test suite for live signal de-duplication.
+Tests structure fingerprints, TTL expiry, eviction, hit counts, and that
+the live system drops re-detected structures before processing them.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from aafr.detection_executor import DetectionExecutor, INLINE
+from aafr.main import AAFRTradingSystem
+from aafr.signal_dedup import SignalDedupCache, icc_fingerprint
+
+
+def _candles(start, count=30):
+    """Candles with minute timestamps starting at minute `start`."""
+    return [{'timestamp': f"2025-01-06T14:{start + i:02d}:00", 'close': 100.0} for i in range(count)]
+
+
+def _structure(candles, indication_idx, direction='LONG'):
+    """ICC structure with a correction right after the indication."""
+    return {
+        'indication': {'idx': indication_idx, 'direction': direction, 'candle': candles[indication_idx]},
+        'correction': {'start_idx': indication_idx + 1, 'end_idx': indication_idx + 3},
+        'continuation': {'idx': indication_idx + 4, 'candle': candles[indication_idx + 4]},
+        'complete': True
+    }
+
+
+class FakeClock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestSignalDedup(unittest.TestCase):
+    """Test cases for icc_fingerprint and SignalDedupCache."""
+
+    def test_fingerprint_survives_buffer_roll(self):
+        """Test the same structure fingerprints equally after the buffer shifts."""
+        before = _candles(0)
+        after = _candles(1)  # One new bar: every index moves down by one
+        self.assertEqual(icc_fingerprint('NQ', _structure(before, 20), before),
+                         icc_fingerprint('NQ', _structure(after, 19), after))
+
+    def test_fingerprint_distinguishes_structures(self):
+        """Test direction, indication and symbol change the fingerprint."""
+        candles = _candles(0)
+        base = icc_fingerprint('NQ', _structure(candles, 20), candles)
+        self.assertNotEqual(base, icc_fingerprint('NQ', _structure(candles, 20, 'SHORT'), candles))
+        self.assertNotEqual(base, icc_fingerprint('NQ', _structure(candles, 21), candles))
+        self.assertNotEqual(base, icc_fingerprint('ES', _structure(candles, 20), candles))
+
+    def test_repeats_dropped_until_ttl(self):
+        """Test a fingerprint is a hit until it goes unseen for the TTL."""
+        clock = FakeClock()
+        cache = SignalDedupCache(ttl_seconds=60, clock=clock)
+        key = ('NQ', 'LONG', 1, 2, 3)
+
+        self.assertTrue(cache.add(key))
+        clock.now = 50
+        self.assertFalse(cache.add(key))  # Seen again: TTL restarts
+        clock.now = 100
+        self.assertFalse(cache.add(key))
+        clock.now = 161
+        self.assertTrue(cache.add(key))
+
+        self.assertEqual(cache.stats['hits'], 2)
+        self.assertEqual(cache.stats['expired'], 1)
+        self.assertEqual(cache.hits_by_symbol, {'NQ': 2})
+
+    def test_max_entries(self):
+        """Test the least recently seen fingerprint is evicted."""
+        cache = SignalDedupCache(max_entries=2)
+        for key in [('NQ', 1), ('NQ', 2), ('NQ', 1), ('NQ', 3)]:
+            cache.add(key)
+
+        self.assertIn(('NQ', 1), cache)
+        self.assertNotIn(('NQ', 2), cache)
+        self.assertEqual((len(cache), cache.stats['evicted']), (2, 1))
+        self.assertIn("1/4 duplicate signals dropped (NQ=1)", cache.format_stats())
+
+    def test_live_system_processes_structure_once(self):
+        """Test re-detecting a structure on later bars skips signal processing."""
+        system = AAFRTradingSystem()
+        system.detection_executor = DetectionExecutor(INLINE)
+        system._process_trade_signal = AsyncMock(return_value=True)
+
+        def detect(candles):
+            # The same structure, found at a shifted index on every bar
+            idx = next(i for i, c in enumerate(candles) if c['timestamp'] == "2025-01-06T14:20:00")
+            return (_structure(candles, idx), True, [])
+
+        async def run():
+            with patch('aafr.main.evaluate_icc_setup', side_effect=detect):
+                return [await system._detect_on_bar('NQ', _candles(start), None) for start in range(3)]
+
+        self.assertEqual(asyncio.run(run()), [True, False, False])
+        self.assertEqual(system._process_trade_signal.await_count, 1)
+        self.assertEqual(system.signal_cache.hits_by_symbol, {'NQ': 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
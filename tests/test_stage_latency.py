@@ -0,0 +1,142 @@
+"""
+Test suite for end-to-end stage latency instrumentation.
+Tests per-stage marks, GUI bot latency reports, the JSON dump, and the
+report round trip through the WebSocket server and GUI bot client.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from aafr.detection_executor import DetectionExecutor, INLINE
+from aafr.latency import (
+    StageLatencyTracker, now_ms, STAGE_DETECTION, STAGE_RISK, STAGE_BROADCAST,
+    STAGE_GUI_RECEIPT, STAGE_CLICK, PIPELINE, END_TO_END
+)
+from aafr.main import AAFRTradingSystem
+from aafr.websocket_server import WebSocketServer
+from gui_bot.client import GUIBotClient
+
+
+class FakeWebSocket:
+    """Server-side connection yielding scripted client messages."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.remote_address = ("127.0.0.1", 50000)
+        self.send = AsyncMock()
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+
+
+class TestStageLatency(unittest.TestCase):
+    """Test cases for StageLatencyTracker."""
+
+    def test_marks_record_time_since_previous_stage(self):
+        """Test each mark measures from the previous stage and finish from the origin."""
+        tracker = StageLatencyTracker(dump_path=None)
+        trace = tracker.start(now_ms() - 5.0)
+        detection = tracker.mark(trace, STAGE_DETECTION)
+        risk = tracker.mark(trace, STAGE_RISK)
+        total = tracker.finish(trace)
+
+        self.assertGreaterEqual(detection, 5.0)
+        self.assertLess(risk, 5.0)
+        self.assertAlmostEqual(total, detection + risk, places=6)
+        self.assertEqual(set(trace['stages']), {STAGE_DETECTION, STAGE_RISK})
+        summary = tracker.summary()
+        self.assertEqual(list(summary), [STAGE_DETECTION, STAGE_RISK, PIPELINE])
+        self.assertEqual(summary[PIPELINE]['count'], 1)
+        self.assertEqual(tracker.mark(None, STAGE_RISK), 0.0)
+
+    def test_gui_report(self):
+        """Test GUI bot reports fill receipt, click and end-to-end histograms."""
+        tracker = StageLatencyTracker(dump_path=None)
+        tracker.record_report({'pipeline_ms': 10.0, 'receipt_ms': 2.0, 'click_ms': 100.0})
+        tracker.record_report({'pipeline_ms': 10.0, 'receipt_ms': 3.0, 'click_ms': None})
+
+        self.assertEqual(tracker.histograms[STAGE_GUI_RECEIPT].count, 2)
+        self.assertEqual(tracker.histograms[STAGE_CLICK].count, 1)
+        self.assertEqual(tracker.histograms[END_TO_END].max_ms, 112.0)
+        self.assertIn("end_to_end", tracker.format())
+
+    def test_dump_json(self):
+        """Test the summary is written as JSON."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tracker = StageLatencyTracker(os.path.join(tmp, "latency", "stages.json"))
+            tracker.record(STAGE_BROADCAST, 1.5)
+            path = tracker.dump_json()
+            with open(path) as f:
+                data = json.load(f)
+        self.assertEqual(data['stages'][STAGE_BROADCAST]['max_ms'], 1.5)
+        self.assertIsNone(StageLatencyTracker(dump_path=None).dump_json())
+
+    def test_server_routes_latency_reports(self):
+        """Test LATENCY_REPORT messages reach the registered handler."""
+        tracker = StageLatencyTracker(dump_path=None)
+        server = WebSocketServer()
+        server.on('LATENCY_REPORT', tracker.record_report)
+        report = {'event': 'LATENCY_REPORT', 'pipeline_ms': 4.0, 'receipt_ms': 1.0, 'click_ms': 50.0}
+        websocket = FakeWebSocket([json.dumps({'event': 'PING'}), json.dumps(report)])
+
+        asyncio.run(server.handle_client(websocket, "/"))
+        self.assertEqual(tracker.histograms[END_TO_END].count, 1)
+        self.assertEqual(websocket.send.await_count, 2)  # Welcome and PONG
+
+    def test_gui_client_reports_receipt_and_click(self):
+        """Test the GUI bot reports latency after handling NEW_POSITION."""
+        with patch('gui_bot.client.BotLogger'):
+            client = GUIBotClient()
+        client.websocket = MagicMock(send=AsyncMock())
+        client.automator = MagicMock()
+        client.automator.place_limit_order.return_value = True
+        client.automator.place_stop_order.return_value = True
+        event = {
+            'event': 'NEW_POSITION', 'symbol': 'MNQ', 'side': 'LONG', 'entry_price': 20000.0,
+            'size': 1, 'initial_stop': 19990.0, 'tps': [], 'atr': 0,
+            'latency': {'pipeline_ms': 3.0, 'sent_at': time.time() - 0.01}
+        }
+
+        with patch('gui_bot.event_handlers.asyncio.sleep', new=AsyncMock()):
+            asyncio.run(client.handle_event(event))
+        report = json.loads(client.websocket.send.await_args.args[0])
+        self.assertEqual(report['event'], 'LATENCY_REPORT')
+        self.assertEqual(report['pipeline_ms'], 3.0)
+        self.assertGreaterEqual(report['receipt_ms'], 10.0)
+        self.assertGreaterEqual(report['click_ms'], 0.0)
+
+    def test_live_system_traces_bar(self):
+        """Test detection is timed from bar arrival and the trace reaches signal processing."""
+        system = AAFRTradingSystem()
+        system.detection_executor = DetectionExecutor(INLINE)
+        system._process_trade_signal = AsyncMock(return_value=True)
+        structure = {
+            'indication': {'idx': 0, 'direction': 'LONG', 'candle': {'timestamp': "2025-01-06T14:00:00"}},
+            'correction': {'start_idx': 1, 'end_idx': 2},
+            'complete': True
+        }
+        candles = [{'timestamp': "2025-01-06T14:00:00", 'close': 100.0}] * 3
+
+        async def run():
+            with patch('aafr.main.evaluate_icc_setup', return_value=(structure, True, [])):
+                return await system._detect_on_bar('NQ', candles, {'closed_at_ms': now_ms() - 20.0})
+
+        self.assertTrue(asyncio.run(run()))
+        self.assertGreaterEqual(system.latency.histograms[STAGE_DETECTION].min_ms, 20.0)
+        trace = system._process_trade_signal.await_args.args[3]
+        self.assertIn(STAGE_DETECTION, trace['stages'])
+
+
+if __name__ == '__main__':
+    unittest.main()
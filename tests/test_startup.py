@@ -0,0 +1,83 @@
+"""
+Test suite for startup imports.
+Tests that entry points leave mode-specific and heavy modules unloaded
+until a mode needs them, and that deferred modules still work.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import subprocess
+import unittest
+from aafr.utils import lazy_import
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+def _loaded_after(code, modules):
+    """Run code in a fresh interpreter and return which of modules it loaded."""
+    check = f"{code}; import sys; print(' '.join(m for m in {modules!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-c', check], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.splitlines()[-1].split()  # Last line: constructors may print a banner
+
+
+class TestStartup(unittest.TestCase):
+    """Test cases for lazy imports on the startup path."""
+
+    def test_entry_points_skip_mode_modules(self):
+        """Importing an entry point does not load backtest, replay or sharding."""
+        heavy = ('matplotlib', 'aafr.backtester', 'aafr.replay', 'aafr.shard_supervisor',
+                 'aiohttp.client')
+        self.assertEqual(_loaded_after("import aafr.main", heavy), [])
+        self.assertEqual(_loaded_after("import dual_strategy_main", heavy), [])
+
+    def test_offline_system_skips_live_components(self):
+        """Importing and constructing the system leaves live-only modules unloaded."""
+        live = ('aiohttp', 'aafr.telegram_bot', 'aafr.async_tradovate_api', 'aafr.account_fanout',
+                'aafr.metrics', 'aafr.state_snapshot', 'aafr.detection_executor',
+                'aafr.bar_pipeline')
+        self.assertEqual(_loaded_after("import aafr.main", live), [])
+        self.assertEqual(_loaded_after("import aafr.main; aafr.main.AAFRTradingSystem()", live), [])
+        loaded = _loaded_after("import aafr.main; aafr.main.AAFRTradingSystem().metrics",
+                               ('aafr.metrics', 'aafr.telegram_bot'))
+        self.assertEqual(loaded, ['aafr.metrics'])
+
+    def test_dual_system_skips_live_components(self):
+        """Constructing the dual strategy system leaves live-only modules unloaded."""
+        live = ('aiohttp', 'aafr.async_tradovate_api', 'aafr.account_fanout', 'aafr.metrics',
+                'aafr.state_snapshot', 'aafr.detection_executor', 'aafr.bar_pipeline')
+        self.assertEqual(_loaded_after("import dual_strategy_main; dual_strategy_main.DualStrategySystem()",
+                                       live), [])
+
+    def test_counters_skip_unbuilt_metrics(self):
+        """Signal path counters never create the metrics endpoint."""
+        loaded = _loaded_after("import aafr.main; s = aafr.main.AAFRTradingSystem(); "
+                               "s._count('detections_total', symbol='NQ')",
+                               ('aafr.metrics', 'aafr.telegram_bot'))
+        self.assertEqual(loaded, [])
+
+    def test_package_exports_load_on_access(self):
+        """aafr package exports resolve on first access."""
+        loaded = _loaded_after("import aafr; aafr.Backtester",
+                               ('aafr.backtester', 'matplotlib'))
+        self.assertEqual(loaded, ['aafr.backtester'])
+
+        import aafr
+        self.assertIs(aafr.RiskEngine, __import__('aafr.risk_engine').risk_engine.RiskEngine)
+        with self.assertRaises(AttributeError):
+            aafr.NotAnExport
+
+    def test_lazy_import(self):
+        """lazy_import defers execution and raises for missing modules."""
+        loaded = _loaded_after("from aafr.utils import lazy_import; m = lazy_import('aiohttp')",
+                               ('aiohttp.client',))
+        self.assertEqual(loaded, [])
+        self.assertEqual(lazy_import('json').dumps([1]), '[1]')
+        with self.assertRaises(ImportError):
+            lazy_import('aafr_no_such_module')
+
+
+if __name__ == '__main__':
+    unittest.main()
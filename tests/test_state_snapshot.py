@@ -0,0 +1,245 @@
+"""
+Test suite for warm-restart state snapshots.
+Tests exact ring buffer restoration, atomic snapshot files, catching a
+restored buffer up on missed bars, and the risk, dedup, arbiter and AJR
+state carried across a restart.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+from aafr.bar_pipeline import BarPipeline
+from aafr.candle_buffer import CandleRingBuffer
+from aafr.main import AAFRTradingSystem
+from aafr.signal_dedup import SignalDedupCache
+from aafr.state_snapshot import SnapshotStore, SNAPSHOT_VERSION, missed_bar_count
+from ajr.ajr_strategy import AJRStrategy
+from shared.execution_arbiter import ExecutionArbiter
+from shared.signal_schema import TradeSignal
+
+BASE = 1736172000
+
+
+def _candle(i, close=100.0):
+    return {'timestamp': BASE + i * 300, 'open': close - 0.5, 'high': close + 1.0 + i % 7,
+            'low': close - 1.0 - i % 5, 'close': close + (i % 11) - 5, 'volume': 10 + i % 13,
+            'bid_volume': 4, 'ask_volume': 6 + i % 3}
+
+
+async def _no_signal(symbol, candles, event):
+    return False
+
+
+def _round_trip(state):
+    """Encode and decode like SnapshotStore does."""
+    return json.loads(json.dumps(state, separators=(',', ':'), default=str))
+
+
+class TestRingBufferSnapshot(unittest.TestCase):
+    """Test cases for CandleRingBuffer.snapshot()/from_snapshot()."""
+
+    def test_restored_buffer_continues_identically(self):
+        """Test a restored buffer matches the original now and after more bars."""
+        ring = CandleRingBuffer(capacity=50)
+        for i in range(137):  # Wrapped several times
+            ring.append(_candle(i))
+        restored = CandleRingBuffer.from_snapshot(_round_trip(ring.snapshot()))
+        self.assertEqual(list(restored), list(ring))
+        self.assertEqual(restored.atr, ring.atr)
+
+        for i in range(137, 160):
+            ring.append(_candle(i))
+            restored.append(_candle(i))
+            self.assertEqual(list(restored), list(ring))
+            self.assertAlmostEqual(restored.atr, ring.atr)
+            self.assertAlmostEqual(restored.current_cvd, ring.current_cvd)
+            self.assertEqual(restored.swing_high, ring.swing_high)
+            self.assertEqual(restored.swing_low, ring.swing_low)
+            self.assertEqual(restored.last_time, ring.last_time)
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """Test cases for SnapshotStore."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "state", "aafr.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_save_and_load(self):
+        """Test atomic save, load, and ignored stale, foreign or disabled snapshots."""
+        store = SnapshotStore(self.path, enabled=True, max_age=60)
+        self.assertIsNone(store.load())  # Nothing saved yet
+        self.assertTrue(store.save({'risk': {'daily_pnl': -250.0}}))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+        self.assertEqual(store.load(), {'risk': {'daily_pnl': -250.0}})
+        self.assertEqual(store.stats['saves'], 1)
+
+        with open(self.path, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION, 'saved_at': time.time() - 120, 'state': {}}, f)
+        self.assertIsNone(store.load())  # Older than max_age
+        with open(self.path, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION + 1, 'saved_at': time.time(), 'state': {}}, f)
+        self.assertIsNone(store.load())
+        with open(self.path, 'w') as f:
+            f.write('{"version": 1, "sta')
+        self.assertIsNone(store.load())
+
+        disabled = SnapshotStore(self.path, enabled=False)
+        self.assertFalse(disabled.save({}))
+        self.assertIsNone(disabled.load())
+
+    def test_missed_bar_count(self):
+        """Test the bars fetched to catch up include the newest stored and the forming bar."""
+        self.assertEqual(missed_bar_count(BASE, 300, now=BASE + 10), 2)
+        self.assertEqual(missed_bar_count(BASE, 300, now=BASE + 900), 4)
+        self.assertEqual(missed_bar_count(None, 300), 0)
+
+
+class TestPipelineRestore(unittest.TestCase):
+    """Test cases for BarPipeline.snapshot()/restore()/catch_up()."""
+
+    def test_restore_and_catch_up(self):
+        """Test only missed bars are merged and old bars stay duplicates."""
+        pipeline = BarPipeline(_no_signal, max_bars=100)
+        pipeline.seed("MNQ", [_candle(i) for i in range(80)])
+        pipeline.seed("MES", [])
+        pipeline.push_tick("MNQ", 100.0, 2, BASE + 80 * 300 + 5)
+
+        restored = BarPipeline(_no_signal, max_bars=100)
+        self.assertEqual(restored.restore(_round_trip(pipeline.snapshot()), ["MNQ", "MES"]), ["MNQ"])
+        self.assertEqual(list(restored.buffers["MNQ"]), list(pipeline.buffers["MNQ"]))
+        self.assertEqual(restored._tick_builders["MNQ"].bar['volume'], 2)
+
+        # Recent bars from the API overlap the stored ones; the newest stored bar is corrected
+        corrected = dict(_candle(79), close=123.0)
+        added = restored.catch_up("MNQ", [_candle(78), corrected, _candle(80), _candle(81)])
+        buffer = restored.buffers["MNQ"]
+        self.assertEqual(added, 2)
+        self.assertEqual(len(buffer), 82)
+        self.assertEqual(buffer[-3]['close'], 123.0)
+        self.assertEqual(restored.last_processed["MNQ"], BASE + 81 * 300)
+
+        async def run():
+            restored.push_bar("MNQ", _candle(81))
+            event = await restored._queue("MNQ").get()
+            return await restored.process(event)
+
+        self.assertFalse(asyncio.run(run()))
+        self.assertEqual(restored.stats['duplicates'], 1)
+
+
+class TestSystemState(unittest.TestCase):
+    """Test cases for the state carried across a restart."""
+
+    def test_signal_cache_round_trip(self):
+        """Test restored fingerprints are repeats and keep their age."""
+        now = [1000.0]
+        cache = SignalDedupCache(ttl_seconds=600, clock=lambda: now[0])
+        fingerprint = ("MNQ", "LONG", "2025-01-06T14:00:00", "2025-01-06T14:05:00", None)
+        cache.add(fingerprint)
+        now[0] += 100
+
+        later = [50.0]  # Monotonic clocks restart from an arbitrary value
+        restored = SignalDedupCache(ttl_seconds=600, clock=lambda: later[0])
+        self.assertEqual(restored.restore(_round_trip(cache.snapshot())), 1)
+        self.assertFalse(restored.add(fingerprint))
+
+        expiring = SignalDedupCache(ttl_seconds=600, clock=lambda: later[0])
+        expiring.restore(_round_trip(cache.snapshot()))
+        later[0] += 501  # 100s + 501s since last seen
+        self.assertTrue(expiring.add(fingerprint))
+
+    def test_aafr_system_round_trip(self):
+        """Test buffers, fingerprints and same-day risk counters are restored."""
+        system = AAFRTradingSystem()
+        system.pipeline.seed("MNQ", [_candle(i) for i in range(60)])
+        system.signal_cache.add(("MNQ", "SHORT", 1, 2, 3))
+        system.risk_engine.daily_pnl = -420.0
+        system.risk_engine.daily_trades = 3
+        state = _round_trip(system.capture_state())
+
+        restarted = AAFRTradingSystem()
+        self.assertEqual(restarted.restore_state(state, ["MNQ", "MES"]), ["MNQ"])
+        self.assertIs(restarted.candle_buffers["MNQ"], restarted.pipeline.buffers["MNQ"])
+        self.assertEqual(len(restarted.candle_buffers["MNQ"]), 60)
+        self.assertFalse(restarted.signal_cache.add(("MNQ", "SHORT", 1, 2, 3)))
+        self.assertEqual(restarted.risk_engine.daily_pnl, -420.0)
+        self.assertEqual(restarted.risk_engine.daily_trades, 3)
+
+        next_day = AAFRTradingSystem()
+        next_day.risk_engine.clock = lambda: datetime.now() + timedelta(days=1)
+        next_day.restore_state(state, ["MNQ"])
+        self.assertEqual(next_day.risk_engine.daily_pnl, 0.0)
+
+    def test_monitor_symbol_fetches_only_missed_bars(self):
+        """Test a resumed symbol requests the missed bars instead of full history."""
+        system = AAFRTradingSystem()
+        now = time.time()
+        last = now - now % 300 - 600  # Two bar intervals ago
+        system.pipeline.restore({'buffers': {'MNQ': _ring_state(last)}, 'last_processed': {'MNQ': last}})
+        system.async_api.get_historical_candles = AsyncMock(return_value=[
+            dict(_candle(0), timestamp=last + 300), dict(_candle(1), timestamp=last + 600)
+        ])
+        system.pipeline.run_symbol = AsyncMock()
+        system._detect_on_bar = AsyncMock(return_value=False)
+
+        asyncio.run(system._monitor_symbol("MNQ", resumed=True))
+        self.assertEqual(system.async_api.get_historical_candles.await_args.kwargs['count'],
+                         missed_bar_count(last, 300))
+        self.assertLessEqual(system.async_api.get_historical_candles.await_args.kwargs['count'], 4)
+        self.assertEqual(len(system.candle_buffers["MNQ"]), 42)
+
+    def test_arbiter_and_ajr_round_trip(self):
+        """Test open positions and AJR gap phase state survive a restart."""
+        arbiter = ExecutionArbiter("config.json")
+        signal = TradeSignal("AJR", "NQ", "BUY", 20000.0, 19990.0, [20015.0, 20025.0])
+        arbiter.open_positions["NQ"] = {"signal": signal, "position_size": 2,
+                                        "opened_at": datetime(2025, 1, 6, 9, 35), "risk_details": {"r": 1.5}}
+        restored = ExecutionArbiter("config.json")
+        self.assertEqual(restored.restore(_round_trip(arbiter.snapshot())), 1)
+        position = restored.open_positions["NQ"]
+        self.assertEqual(position["signal"].signal_id, signal.signal_id)
+        self.assertEqual(position["signal"].take_profit, [20015.0, 20025.0])
+        self.assertEqual(position["opened_at"], datetime(2025, 1, 6, 9, 35))
+
+        ajr = AJRStrategy("config.json")
+        ajr.process_candle({"open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5}, "NQ")
+        ajr.process_candle({"open": 110.0, "high": 111.0, "low": 109.0, "close": 110.5,
+                            "prev_close": 100.5}, "NQ")
+        self.assertEqual(len(ajr.gap_tracker.gaps["NQ"]), 1)
+
+        restarted = AJRStrategy("config.json")
+        restarted.restore(_round_trip(ajr.snapshot(["NQ"])), ["NQ"])
+        gap = restarted.gap_tracker.gaps["NQ"][0]
+        self.assertEqual(gap.to_dict(), ajr.gap_tracker.gaps["NQ"][0].to_dict())
+        self.assertEqual(restarted.gap_tracker.candle_count["NQ"], 2)
+        self.assertEqual(list(restarted.candle_history["NQ"]), list(ajr.candle_history["NQ"]))
+
+        # An inversion after the restart is detected against the restored gap
+        restarted.process_candle({"open": 100.0, "high": 100.5, "low": 95.0, "close": 96.0,
+                                  "prev_close": 110.5}, "NQ")
+        self.assertTrue(gap.inverted)
+
+
+def _ring_state(last):
+    """Snapshot of a 40-bar buffer whose newest bar closed at `last`."""
+    ring = CandleRingBuffer(500)
+    for i in range(40):
+        ring.append(dict(_candle(i), timestamp=last - (39 - i) * 300))
+    return _round_trip(ring.snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Test suite for the background Telegram alert dispatcher.
+Tests non-blocking enqueue, retry/backoff, 429 retry_after handling,
+permanent failures, digest batching and queue limits against a local
+stand-in for the Bot API.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from aiohttp import web
+from aafr.telegram_bot import TelegramDispatcher, chunk_messages
+
+
+class FakeTelegram:
+    """Local sendMessage endpoint answering with scripted statuses."""
+
+    def __init__(self, statuses=(), delay=0.0):
+        self.statuses = list(statuses)  # Consumed per request, then 200
+        self.delay = delay
+        self.texts = []
+        self.request_times = []
+        self.runner = None
+        self.url = None
+
+    async def handle(self, request):
+        self.request_times.append(time.monotonic())
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if status == 200:
+            self.texts.append((await request.json())['text'])
+            return web.json_response({'ok': True, 'result': {}})
+        body = {'ok': False, 'error_code': status, 'description': 'scripted'}
+        if status == 429:
+            body['parameters'] = {'retry_after': 0.2}
+        return web.json_response(body, status=status)
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/sendMessage', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+class TestTelegramDispatcher(unittest.TestCase):
+    """Test cases for TelegramDispatcher."""
+
+    def _run(self, server, messages, **kwargs):
+        """Send messages through a dispatcher pointed at `server`."""
+        async def run():
+            async with server:
+                options = {'min_interval': 0.0, 'backoff_base': 0.01, **kwargs}
+                dispatcher = TelegramDispatcher('TOKEN', '42', api_url=server.url, **options)
+                dispatcher.start()
+                for message in messages:
+                    dispatcher.enqueue(message)
+                await dispatcher.stop(timeout=5)
+                return dispatcher
+        return asyncio.run(run())
+
+    def test_delivers_messages(self):
+        """Test queued alerts are delivered in order."""
+        server = FakeTelegram()
+        dispatcher = self._run(server, ['one', 'two'])
+
+        self.assertEqual(server.texts, ['one', 'two'])
+        self.assertEqual(dispatcher.stats['messages_sent'], 2)
+        self.assertEqual(dispatcher.delivery_latency.count, 2)
+
+    def test_enqueue_does_not_wait_for_delivery(self):
+        """Test enqueue returns immediately while the server is slow."""
+        server = FakeTelegram(delay=0.3)
+
+        async def run():
+            async with server:
+                dispatcher = TelegramDispatcher('TOKEN', '42', api_url=server.url, min_interval=0.0)
+                dispatcher.start()
+                start = time.perf_counter()
+                for i in range(20):
+                    dispatcher.enqueue(f"alert {i}")
+                elapsed = time.perf_counter() - start
+                await dispatcher.stop(timeout=0.1)
+                return elapsed
+
+        self.assertLess(asyncio.run(run()), 0.01)
+
+    def test_rate_limit_honours_retry_after(self):
+        """Test a 429 waits retry_after seconds before retrying."""
+        server = FakeTelegram(statuses=[429])
+        dispatcher = self._run(server, ['alert'])
+
+        self.assertEqual(server.texts, ['alert'])
+        self.assertEqual(dispatcher.stats['rate_limited'], 1)
+        self.assertGreaterEqual(server.request_times[1] - server.request_times[0], 0.19)
+
+    def test_server_errors_retried_then_given_up(self):
+        """Test 5xx errors are retried up to max_retries."""
+        server = FakeTelegram(statuses=[500, 503])
+        dispatcher = self._run(server, ['alert'])
+        self.assertEqual((dispatcher.stats['retries'], dispatcher.stats['sent']), (2, 1))
+
+        server = FakeTelegram(statuses=[500] * 5)
+        dispatcher = self._run(server, ['alert'], max_retries=2)
+        self.assertEqual(len(server.request_times), 3)
+        self.assertEqual(dispatcher.stats['failed'], 1)
+
+    def test_client_errors_not_retried(self):
+        """Test a 400 fails without retrying and the next alert still goes out."""
+        server = FakeTelegram(statuses=[400])
+        dispatcher = self._run(server, ['bad', 'good'])
+
+        self.assertEqual(server.texts, ['good'])
+        self.assertEqual((dispatcher.stats['failed'], dispatcher.stats['retries']), (1, 0))
+
+    def test_digest_batches_messages(self):
+        """Test alerts within the digest window are sent as one message."""
+        server = FakeTelegram()
+        dispatcher = self._run(server, ['a', 'b', 'c'], digest_seconds=0.1)
+
+        self.assertEqual(server.texts, ['a\n\nb\n\nc'])
+        self.assertEqual((dispatcher.stats['sent'], dispatcher.stats['messages_sent']), (1, 3))
+
+    def test_queue_limit(self):
+        """Test alerts beyond the queue size are dropped, and disabled dispatchers queue nothing."""
+        dispatcher = TelegramDispatcher('TOKEN', '42', max_queue=2)
+        self.assertEqual([dispatcher.enqueue(m) for m in 'abc'], [True, True, False])
+        self.assertEqual(dispatcher.stats['dropped'], 1)
+
+        self.assertFalse(TelegramDispatcher('', '').enqueue('alert'))
+
+    def test_chunk_messages(self):
+        """Test digests respect the message length limit."""
+        groups = chunk_messages(['x' * 6, 'y' * 6, 'z' * 20], limit=14)
+        self.assertEqual(groups, [['x' * 6, 'y' * 6], ['z' * 14]])
+
+
+if __name__ == '__main__':
+    unittest.main()
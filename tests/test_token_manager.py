@@ -0,0 +1,212 @@
+"""
+Test suite for token persistence and renewal.
+Tests the on-disk token cache, background renewal and 401 recovery
+without switching the client to mock data.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import shutil
+import stat
+import tempfile
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from aafr.tradovate_api import TradovateAPI
+from aafr.token_manager import TokenManager, load_cached_tokens, token_cache_path
+
+
+def _response(status: int, payload: dict = None) -> MagicMock:
+    """Build a fake requests response."""
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = payload or {}
+    response.text = str(payload)
+    return response
+
+
+def _auth_payload(token: str, lifetime: float = 5400) -> dict:
+    """Build an access token response expiring after `lifetime` seconds."""
+    expiry = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + lifetime))
+    return {'accessToken': token, 'mdAccessToken': f"md-{token}", 'expirationTime': expiry}
+
+
+class TestTokenManager(unittest.TestCase):
+    """Test cases for TokenManager."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.api = TradovateAPI()
+        self.api.token_manager = TokenManager(self.api, directory=self.temp_dir, check_interval=0.05)
+        self.manager = self.api.token_manager
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _set_tokens(self, token: str, lifetime: float = 5400):
+        """Give the client tokens expiring after `lifetime` seconds."""
+        self.api.token = token
+        self.api.md_token = f"md-{token}"
+        self.api.token_expiry = time.time() + lifetime
+
+    def test_save_and_load(self):
+        """Test tokens round-trip through an owner-only file."""
+        self._set_tokens('abc')
+        self.manager.save()
+
+        mode = stat.S_IMODE(os.stat(self.manager.path).st_mode)
+        self.assertEqual(mode, 0o600)
+
+        self.api.token = self.api.md_token = None
+        self.assertTrue(self.manager.load())
+        self.assertEqual((self.api.token, self.api.md_token), ('abc', 'md-abc'))
+        self.assertEqual(self.manager.stats['loaded_from_disk'], 1)
+
+    def test_nearly_expired_tokens_not_loaded(self):
+        """Test tokens inside the refresh margin are ignored."""
+        self._set_tokens('old', lifetime=60)
+        self.manager.save()
+
+        self.api.token = None
+        self.assertFalse(self.manager.load())
+        self.assertIsNone(load_cached_tokens(self.manager.path, min_valid_seconds=600))
+
+    def test_token_path_per_environment_and_user(self):
+        """Test file names are sanitized and environment specific."""
+        path = token_cache_path('/tmp/x', 'live', 'me@example.com')
+        self.assertEqual(path.name, 'live_me_example_com.json')
+
+    def test_authenticate_reuses_cached_tokens(self):
+        """Test a restart skips the access token request."""
+        self._set_tokens('cached')
+        self.manager.save()
+        self.api.token = None
+
+        with patch.object(self.api.session, 'post') as post:
+            self.assertTrue(self.api.authenticate())
+            post.assert_not_called()
+        self.assertEqual(self.api.token, 'cached')
+
+    def test_authenticate_persists_tokens(self):
+        """Test a fresh authentication is written to disk."""
+        with patch.object(self.api.session, 'post', return_value=_response(200, _auth_payload('fresh'))):
+            self.assertTrue(self.api.authenticate(use_cache=False))
+
+        self.assertEqual(load_cached_tokens(self.manager.path)['token'], 'fresh')
+
+    def test_renew_keeps_md_token_when_omitted(self):
+        """Test renewal responses without an md token keep the current one."""
+        self._set_tokens('abc')
+        payload = _auth_payload('renewed')
+        del payload['mdAccessToken']
+
+        with patch.object(self.api.session, 'get', return_value=_response(200, payload)):
+            self.assertTrue(self.manager.refresh())
+
+        self.assertEqual((self.api.token, self.api.md_token), ('renewed', 'md-abc'))
+        self.assertEqual(self.manager.stats['renewals'], 1)
+
+    def test_refresh_falls_back_to_authenticate(self):
+        """Test a failed renewal re-authenticates with credentials."""
+        self._set_tokens('abc')
+
+        with patch.object(self.api.session, 'get', return_value=_response(401)), \
+             patch.object(self.api.session, 'post', return_value=_response(200, _auth_payload('new'))):
+            self.assertTrue(self.manager.refresh())
+
+        self.assertEqual(self.api.token, 'new')
+        self.assertEqual(self.manager.stats['reauthentications'], 1)
+
+    def test_failed_renewal_keeps_live_mode(self):
+        """Test a renewal outage is retried with backoff and never enables mock data."""
+        self._set_tokens('abc')
+        self.manager.reauth_backoff = 0.01
+
+        with patch.object(self.api.session, 'get', return_value=_response(500)), \
+             patch.object(self.api.session, 'post', return_value=_response(503)) as post:
+            self.assertFalse(self.manager.refresh())
+
+        self.assertEqual(post.call_count, 3)  # Bounded re-authentication attempts
+        self.assertFalse(self.api.is_using_mock_data())
+        self.assertEqual(self.api.token, 'abc')  # Current token kept for the next attempt
+        self.assertEqual(self.manager.stats['failures'], 1)
+
+        with patch.object(self.api.session, 'get', return_value=_response(200, _auth_payload('renewed'))):
+            self.assertTrue(self.manager.refresh())
+
+        self.assertEqual(self.api.token, 'renewed')
+        self.assertFalse(self.api.is_using_mock_data())
+
+    def test_reauthentication_retried_after_failure(self):
+        """Test a failed re-authentication is retried instead of switching to mock data."""
+        self._set_tokens('abc')
+        self.manager.reauth_backoff = 0.01
+        responses = [_response(500), _response(200, _auth_payload('new'))]
+
+        with patch.object(self.api.session, 'get', return_value=_response(401)), \
+             patch.object(self.api.session, 'post', side_effect=responses):
+            self.assertTrue(self.manager.refresh())
+
+        self.assertEqual(self.api.token, 'new')
+        self.assertFalse(self.api.is_using_mock_data())
+        self.assertEqual(self.manager.stats['reauthentications'], 2)
+
+    def test_unauthorized_request_renews_and_retries(self):
+        """Test a 401 renews the token and retries instead of switching to mock data."""
+        self._set_tokens('stale')
+        responses = [_response(401), _response(200, [{'id': 1}])]
+
+        with patch.object(self.api.session, 'request', side_effect=responses) as request, \
+             patch.object(self.api.session, 'get', return_value=_response(200, _auth_payload('renewed'))):
+            result = self.api._make_request('GET', '/account/list')
+
+        self.assertEqual(result, [{'id': 1}])
+        self.assertFalse(self.api.use_mock_data)
+        self.assertEqual(request.call_args.kwargs['headers']['Authorization'], 'Bearer renewed')
+        self.assertEqual(self.manager.stats['unauthorized_recoveries'], 1)
+
+    def test_unauthorized_twice_gives_up_on_request_only(self):
+        """Test a request rejected after renewal fails without enabling mock data."""
+        self._set_tokens('stale')
+
+        with patch.object(self.api.session, 'request', return_value=_response(401)) as request, \
+             patch.object(self.api.session, 'get', return_value=_response(200, _auth_payload('renewed'))):
+            self.assertIsNone(self.api._make_request('GET', '/account/list'))
+
+        self.assertEqual(request.call_count, 2)
+        self.assertFalse(self.api.use_mock_data)
+
+    def test_unauthorized_after_concurrent_renewal(self):
+        """Test a 401 for an already replaced token triggers no new renewal."""
+        self._set_tokens('current')
+
+        with patch.object(self.api.session, 'get') as get:
+            self.assertTrue(self.manager.handle_unauthorized('previous'))
+            get.assert_not_called()
+
+    def test_background_renewal(self):
+        """Test the loop renews tokens once they enter the refresh margin."""
+        self._set_tokens('expiring', lifetime=30)
+
+        async def run():
+            self.manager.start()
+            deadline = time.monotonic() + 3
+            while self.api.token == 'expiring' and time.monotonic() < deadline:
+                await asyncio.sleep(0.02)
+            await self.manager.stop()
+
+        with patch.object(self.api.session, 'get', return_value=_response(200, _auth_payload('renewed'))):
+            asyncio.run(run())
+
+        self.assertEqual(self.api.token, 'renewed')
+        self.assertGreater(self.manager.seconds_until_refresh(), 0)
+        self.assertEqual(load_cached_tokens(self.manager.path)['token'], 'renewed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,277 @@
+"""
+Test suite for WebSocketServer fan-out.
+Tests that broadcasts are queued per client without waiting for network
+I/O, that a slow client never delays the others, the send queue overflow
+policies, topic subscriptions, replay of missed events to reconnecting
+GUI bot clients, and negotiated binary encoding.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import json
+import unittest
+from unittest.mock import patch
+
+from aafr.websocket_server import WebSocketServer, OVERFLOW_DISCONNECT
+from gui_bot.client import GUIBotClient
+from shared.wire_format import MSGPACK_AVAILABLE, decode_event, encode_event
+
+
+class FakeClient:
+    """Server-side connection whose sends can be held back after the welcome."""
+
+    def __init__(self, port, slow=False, messages=(), path="/"):
+        self.remote_address = ("127.0.0.1", port)
+        self.path = path
+        self.slow = slow
+        self.messages = [json.dumps(m) for m in messages]
+        self.gate = asyncio.Event()
+        self.closed = asyncio.Event()
+        self.close_code = None
+        self.sent = []
+        self.frames = []
+
+    async def send(self, message):
+        if self.slow and self.sent:
+            await self.gate.wait()
+        self.frames.append(message)
+        self.sent.append(decode_event(message))
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for message in self.messages:
+            yield message
+        await self.closed.wait()
+        return
+        yield
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+        self.closed.set()
+
+    def events(self):
+        return [m.get('n') for m in self.sent if m['event'] not in ('CONNECTED', 'SUBSCRIBED', 'ERROR')]
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestWebSocketServer(unittest.TestCase):
+    """Test cases for per-client send queues."""
+
+    def test_slow_client_does_not_delay_others(self):
+        """Test broadcasts reach fast clients while a slow client's oldest events are dropped."""
+        async def run():
+            server = WebSocketServer(max_queue=2)
+            fast, slow = FakeClient(1), FakeClient(2, slow=True)
+            tasks = [asyncio.create_task(server.handle_client(c)) for c in (fast, slow)]
+            await _settle()
+
+            for n in range(5):
+                await server.broadcast_event({'event': 'TEST', 'n': n})
+                await _settle()  # Fast clients keep up between events
+            self.assertEqual(fast.events(), [0, 1, 2, 3, 4])
+            self.assertEqual(slow.events(), [])
+
+            # Event 0 is in flight; 1 and 2 were dropped to make room for 3 and 4
+            stats = server.client_stats()["127.0.0.1:2"]
+            self.assertEqual((stats['queued'], stats['dropped']), (2, 2))
+            self.assertGreater(server.client_lag()["127.0.0.1:2"], 0.0)
+            self.assertEqual(server.client_lag()["127.0.0.1:1"], 0.0)
+            self.assertEqual(server.stats['dropped'], 2)
+            self.assertGreater(server.send_backlog(), 0)
+
+            slow.gate.set()
+            await _settle()
+            self.assertEqual(slow.events(), [0, 3, 4])
+            self.assertEqual(server.send_backlog(), 0)
+            self.assertEqual(server.send_latency.count, 8)
+
+            await server.stop()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_overflow_disconnects_client(self):
+        """Test the disconnect policy closes a client that falls behind."""
+        async def run():
+            server = WebSocketServer(max_queue=1, overflow=OVERFLOW_DISCONNECT)
+            fast, slow = FakeClient(1), FakeClient(2, slow=True)
+            tasks = [asyncio.create_task(server.handle_client(c)) for c in (fast, slow)]
+            await _settle()
+
+            for n in range(3):
+                await server.broadcast_event({'event': 'TEST', 'n': n})
+                await _settle()  # Fast clients keep up between events
+            await asyncio.gather(*tasks[1:])
+            self.assertEqual(slow.close_code, 1013)
+            self.assertEqual(list(server.client_stats()), ["127.0.0.1:1"])
+            self.assertEqual(server.stats['overflow_disconnects'], 1)
+
+            await _settle()
+            self.assertEqual(fast.events(), [0, 1, 2])
+            await server.stop()
+            await tasks[0]
+
+        asyncio.run(run())
+
+    def test_subscriptions_filter_broadcasts(self):
+        """Test clients receive only events matching their symbol, strategy and event filters."""
+        async def run():
+            server = WebSocketServer()
+            everything = FakeClient(1)
+            nq = FakeClient(2, messages=[{'event': 'SUBSCRIBE', 'symbols': ['NQ']}])
+            es_ajr = FakeClient(3, messages=[{'event': 'SUBSCRIBE', 'symbols': ['ES'], 'strategies': ['AJR'],
+                                              'events': ['NEW_POSITION']}])
+            bad = FakeClient(4, messages=[{'event': 'SUBSCRIBE', 'symbols': 'NQ'}])
+            clients = (everything, nq, es_ajr, bad)
+            tasks = [asyncio.create_task(server.handle_client(c)) for c in clients]
+            await _settle()
+            self.assertEqual(es_ajr.sent[1], {'event': 'SUBSCRIBED', 'symbols': ['ES'], 'strategies': ['AJR'],
+                                              'events': ['NEW_POSITION']})
+            self.assertEqual(bad.sent[1]['event'], 'ERROR')
+            self.assertEqual(set(server.topics['symbol']), {'NQ', 'ES'})
+
+            events = [
+                {'event': 'NEW_POSITION', 'symbol': 'NQ', 'strategy': 'AAFR', 'n': 0},
+                {'event': 'NEW_POSITION', 'symbol': 'ES', 'strategy': 'AJR', 'n': 1},
+                {'event': 'NEW_POSITION', 'symbol': 'ES', 'strategy': 'AAFR', 'n': 2},
+                {'event': 'TP_FILLED', 'symbol': 'ES', 'n': 3},
+                {'event': 'STOP_UPDATE', 'symbol': 'NQ', 'n': 4},
+                {'event': 'NEW_POSITION', 'symbol': 'CL', 'strategy': 'AJR', 'n': 5},
+            ]
+            for event in events:
+                await server.broadcast_event(event)
+            await _settle()
+            self.assertEqual(everything.events(), [0, 1, 2, 3, 4, 5])
+            self.assertEqual(bad.events(), [0, 1, 2, 3, 4, 5])  # Rejected filter leaves it unchanged
+            self.assertEqual(nq.events(), [0, 4])
+            self.assertEqual(es_ajr.events(), [1])
+
+            # Disconnected clients leave the index
+            es_ajr.closed.set()
+            await tasks[2]
+            self.assertEqual(set(server.topics['symbol']), {'NQ'})
+            self.assertEqual({c.client_id for c in server.recipients({'symbol': 'ES'})},
+                             {"127.0.0.1:1", "127.0.0.1:4"})
+
+            await server.stop()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_reconnecting_client_receives_missed_events(self):
+        """Test events are numbered and a reconnect replays only what was missed."""
+        async def run():
+            server = WebSocketServer(replay_size=4)
+            for n in range(3):
+                await server.broadcast_event({'event': 'NEW_POSITION', 'symbol': 'NQ', 'n': n})
+            self.assertEqual([seq for seq, _, _ in server.replay], [1, 2, 3])
+
+            resumed = FakeClient(1, path=f"/?session={server.session}&last_seq=1")
+            fresh = FakeClient(2)
+            tasks = [asyncio.create_task(server.handle_client(c)) for c in (resumed, fresh)]
+            await _settle()
+            self.assertEqual(resumed.events(), [1, 2])
+            self.assertEqual([m['seq'] for m in resumed.sent[1:]], [2, 3])
+            self.assertEqual((resumed.sent[0]['replayed'], resumed.sent[0]['missed']), (2, 0))
+            self.assertEqual((resumed.sent[0]['last_seq'], fresh.sent[0]['last_seq']), (3, 3))
+            self.assertEqual(fresh.events(), [])
+
+            # Replayed events stay ahead of live ones
+            await server.broadcast_event({'event': 'STOP_UPDATE', 'symbol': 'NQ', 'n': 3})
+            for n in range(4, 7):
+                await server.broadcast_event({'event': 'NEW_POSITION', 'symbol': 'ES', 'n': n})
+            await _settle()
+            self.assertEqual(resumed.events(), [1, 2, 3, 4, 5, 6])
+
+            # Events 2-3 left the 4-event ring; only the NQ events still in it are replayed
+            late = FakeClient(3, path=f"/?symbols=NQ&session={server.session}&last_seq=1")
+            restarted = FakeClient(4, path="/?session=previous&last_seq=5")
+            tasks += [asyncio.create_task(server.handle_client(c)) for c in (late, restarted)]
+            await _settle()
+            self.assertEqual(late.events(), [3])
+            self.assertEqual(late.sent[0]['missed'], 2)
+            self.assertEqual(restarted.events(), [3, 4, 5, 6])  # A new server session replays from its start
+            self.assertEqual(server.stats['replayed'], 7)
+
+            await server.stop()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_gui_client_resumes_from_last_seq(self):
+        """Test the GUI bot tracks the last event seen and presents it on reconnect."""
+        async def run():
+            with patch('gui_bot.client.BotLogger'):
+                client = GUIBotClient()
+            client.subscription = {'symbols': ['NQ', 'ES']}
+            if MSGPACK_AVAILABLE:
+                self.assertEqual(client.connect_uri(), f"{client.uri}/?encoding=msgpack&symbols=NQ%2CES")
+            client.encoding = "json"
+            self.assertEqual(client.connect_uri(), f"{client.uri}/?symbols=NQ%2CES")
+
+            await client.handle_event({'event': 'CONNECTED', 'session': 'abc', 'last_seq': 7})
+            self.assertEqual(client.connect_uri(), f"{client.uri}/?symbols=NQ%2CES&session=abc&last_seq=7")
+            await client.handle_event({'event': 'PONG', 'seq': 9})
+            self.assertEqual(client.last_seq, 9)
+
+            await client.handle_event({'event': 'CONNECTED', 'session': 'abc', 'last_seq': 12, 'replayed': 3})
+            self.assertEqual(client.last_seq, 9)  # Replayed events follow the welcome
+            await client.handle_event({'event': 'CONNECTED', 'session': 'new', 'last_seq': 2, 'replayed': 2})
+            self.assertEqual(client.last_seq, 0)
+
+        with patch('gui_bot.client.GUIBotClient.send_ping'):
+            asyncio.run(run())
+
+    @unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack not installed")
+    def test_negotiated_binary_encoding(self):
+        """Test msgpack clients get binary frames, encoded once per broadcast and reused for replay."""
+        async def run():
+            server = WebSocketServer()
+            binary = [FakeClient(port, path="/?encoding=msgpack") for port in (1, 2)]
+            text = FakeClient(3, path="/?encoding=cbor")
+            tasks = [asyncio.create_task(server.handle_client(c)) for c in binary + [text]]
+            await _settle()
+            self.assertEqual([c.sent[0]['encoding'] for c in binary + [text]], ["msgpack", "msgpack", "json"])
+
+            with patch('aafr.websocket_server.encode_event', wraps=encode_event) as encode:
+                await server.broadcast_event({'event': 'NEW_POSITION', 'symbol': 'NQ', 'entry_price': 20150.25,
+                                              'timestamp': '2026-01-06T09:35:00', 'n': 0})
+                await _settle()
+                late = FakeClient(4, path=f"/?encoding=msgpack&session={server.session}&last_seq=0")
+                tasks.append(asyncio.create_task(server.handle_client(late)))
+                await _settle()
+            self.assertEqual(encode.call_count, 2)  # One msgpack and one JSON message
+
+            self.assertIs(binary[0].frames[1], binary[1].frames[1])
+            self.assertIs(late.frames[1], binary[0].frames[1])
+            self.assertIsInstance(binary[0].frames[1], bytes)
+            self.assertIsInstance(text.frames[1], str)
+            self.assertEqual(binary[0].sent[1]['entry_price'], 20150.25)
+            self.assertIsInstance(binary[0].sent[1]['timestamp'], int)
+            self.assertEqual(text.sent[1]['timestamp'], '2026-01-06T09:35:00')
+
+            await server.stop()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+
+    def test_from_config(self):
+        """Test queue settings are read from the gui_bot section."""
+        server = WebSocketServer.from_config({'gui_bot': {'websocket_port': 9000, 'send_queue_size': 8,
+                                                          'overflow_policy': 'disconnect'}})
+        self.assertEqual((server.port, server.max_queue, server.overflow), (9000, 8, OVERFLOW_DISCONNECT))
+        with self.assertRaises(ValueError):
+            WebSocketServer(overflow="block")
+
+
+if __name__ == '__main__':
+    unittest.main()
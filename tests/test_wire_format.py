@@ -0,0 +1,70 @@
+"""
+Test suite for WebSocket event wire encodings.
+Tests JSON and msgpack round trips, epoch-nanosecond timestamps and
+encoding negotiation.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import unittest
+from datetime import datetime
+
+from shared.wire_format import (
+    ENCODING_JSON, ENCODING_MSGPACK, MSGPACK_AVAILABLE,
+    decode_event, encode_event, epoch_ns_to_iso, iso_to_epoch_ns, negotiate
+)
+
+EVENT = {
+    'event': 'NEW_POSITION', 'symbol': 'NQ', 'side': 'LONG', 'entry_price': 20150.25,
+    'size': 3, 'initial_stop': 20131.784, 'strategy': 'AJR',
+    'tps': [{'price': 20165.0, 'qty': 1}, {'price': 20180.5, 'qty': 2}],
+    'timestamp': '2026-01-06T09:35:00.123456', 'seq': 42,
+    'latency': {'pipeline_ms': 3.2, 'sent_at': 1767692100.5}
+}
+
+
+class TestWireFormat(unittest.TestCase):
+    """Test cases for encode_event()/decode_event()."""
+
+    def test_json_round_trip(self):
+        """Test JSON stays the default text encoding."""
+        message = encode_event(EVENT)
+        self.assertIsInstance(message, str)
+        self.assertEqual(json.loads(message), EVENT)
+        self.assertEqual(decode_event(message), EVENT)
+
+    @unittest.skipUnless(MSGPACK_AVAILABLE, "msgpack not installed")
+    def test_msgpack_round_trip(self):
+        """Test binary events keep every value except timestamps, which become epoch ns."""
+        message = encode_event(EVENT, ENCODING_MSGPACK)
+        self.assertIsInstance(message, bytes)
+        self.assertLess(len(message), len(encode_event(EVENT)))
+
+        decoded = decode_event(message)
+        timestamp = decoded.pop('timestamp')
+        self.assertEqual(decoded, {k: v for k, v in EVENT.items() if k != 'timestamp'})
+        self.assertEqual(timestamp, iso_to_epoch_ns(EVENT['timestamp']))
+        self.assertEqual(epoch_ns_to_iso(timestamp), EVENT['timestamp'])
+        self.assertIn('timestamp', EVENT)  # The event itself is not modified
+
+        with self.assertRaises(ValueError):
+            decode_event(b'\x93\x01\x02\x03')  # Not a map
+
+    def test_timestamps(self):
+        """Test ISO timestamps convert to exact epoch nanoseconds."""
+        self.assertEqual(iso_to_epoch_ns("2026-01-06T14:35:00.000001Z"), 1767710100_000_001_000)
+        now = datetime.now()
+        self.assertEqual(epoch_ns_to_iso(iso_to_epoch_ns(now.isoformat())), now.isoformat())
+
+    def test_negotiate(self):
+        """Test msgpack is used only when requested and installed."""
+        self.assertEqual(negotiate(None), ENCODING_JSON)
+        self.assertEqual(negotiate("cbor"), ENCODING_JSON)
+        self.assertEqual(negotiate(ENCODING_MSGPACK), ENCODING_MSGPACK if MSGPACK_AVAILABLE else ENCODING_JSON)
+
+
+if __name__ == '__main__':
+    unittest.main()